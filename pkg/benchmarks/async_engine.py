@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+
+"""
+Benchmark the AsyncEngine on the default setup.
+
+Runs the same layered circuit (single-qubit rotations followed by a CNOT ladder) through the default compiler engines,
+once without and once with an AsyncEngine before the back-end, and reports the time spent. With the AsyncEngine, the
+compiler engines keep processing commands while the back-end executes the previous ones. This only pays off if the
+back-end releases the GIL while it works, hence two back-ends are used: the Simulator, and a back-end waiting for a
+fixed time per command list (a stand-in for, e.g., a remote back-end or the C++ simulator kernels).
+
+Usage:
+    .. code-block:: bash
+
+        python benchmarks/async_engine.py [num_layers] [num_qubits] [latency]
+"""
+
+import sys
+import time
+
+from divya.backends import Simulator
+from divya.cengines import AsyncEngine, DummyEngine, MainEngine
+from divya.ops import CNOT, All, H, Measure, Rx, Rz
+from divya.setups.default import get_engine_list
+
+class _LatencyBackend(DummyEngine):
+    """Back-end accepting all commands and waiting for a fixed time per command list."""
+
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+
+    def receive(self, command_list):
+        time.sleep(self.latency)
+        super().receive(command_list)
+
+def _apply_circuit(qureg, num_layers):
+    """Apply num_layers layers of rotations and CNOT gates to qureg."""
+    All(H) | qureg
+    for layer in range(num_layers):
+        for i, qubit in enumerate(qureg):
+            Rz(0.1 * (layer + i)) | qubit
+            Rx(0.2 * (layer + i)) | qubit
+        for i in range(len(qureg) - 1):
+            CNOT | (qureg[i], qureg[i + 1])
+
+def run(num_layers, num_qubits=10, use_async=False, latency=None):
+    """
+    Return the number of seconds spent to compile and execute the circuit.
+
+    Args:
+        num_layers (int): Number of layers of the circuit.
+        num_qubits (int): Number of qubits of the circuit.
+        use_async (bool): Whether to run the back-end on a worker thread using an AsyncEngine.
+        latency (float): If not None, use a back-end waiting latency seconds per command list instead of the
+            Simulator.
+    """
+    backend = Simulator(rnd_seed=42) if latency is None else _LatencyBackend(latency)
+    engine_list = get_engine_list() + ([AsyncEngine()] if use_async else [])
+    eng = MainEngine(backend=backend, engine_list=engine_list)
+    qureg = eng.allocate_qureg(num_qubits)
+    start = time.perf_counter()
+    _apply_circuit(qureg, num_layers)
+    eng.flush()
+    seconds = time.perf_counter() - start
+    All(Measure) | qureg
+    eng.flush(deallocate_qubits=True)
+    return seconds
+
+if __name__ == '__main__':
+    layers = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    qubits = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    wait = float(sys.argv[3]) if len(sys.argv) > 3 else 1e-4
+    for name, backend_latency in (('Simulator', None), ('latency {:g} s'.format(wait), wait)):
+        sync_seconds = run(layers, qubits, latency=backend_latency)
+        async_seconds = run(layers, qubits, use_async=True, latency=backend_latency)
+        print(
+            "{}: synchronous {:.3f} s, AsyncEngine {:.3f} s (speedup {:.2f}x)".format(
+                name, sync_seconds, async_seconds, sync_seconds / async_seconds
+            )
+        )
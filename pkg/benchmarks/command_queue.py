@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Benchmark the memory usage and throughput of queued Command objects.
+
+Applies a mix of single- and two-qubit gates and stores the resulting commands in a DummyEngine (as, e.g., the
+LocalOptimizer or the mappers do), reporting the time per command and the memory held per queued command.
+
+Usage:
+    .. code-block:: bash
+
+        python benchmarks/command_queue.py [num_commands]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from divya.cengines import DummyEngine, MainEngine
+from divya.meta import Compute, Uncompute
+from divya.ops import CNOT, H, Rz
+
+def _queue_commands(num_commands, num_qubits):
+    """Apply (at least) num_commands commands and return the engine holding them."""
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[])
+    qureg = eng.allocate_qureg(num_qubits)
+    num_applied = 0
+    while num_applied < num_commands:
+        for i in range(num_qubits - 1):
+            with Compute(eng):
+                H | qureg[i]
+            CNOT | (qureg[i], qureg[i + 1])
+            Uncompute(eng)
+            Rz(0.1 * i) | qureg[i + 1]
+        num_applied += 4 * (num_qubits - 1)
+    return backend
+
+def run(num_commands, num_qubits=16):
+    """
+    Queue num_commands commands and return a tuple (seconds per command, bytes per command).
+
+    Throughput and memory usage are measured in separate runs, as tracing memory allocations slows down the
+    execution considerably.
+
+    Args:
+        num_commands (int): Number of commands to apply.
+        num_qubits (int): Number of qubits the commands act upon.
+    """
+    start = time.perf_counter()
+    backend = _queue_commands(num_commands, num_qubits)
+    elapsed = time.perf_counter() - start
+    num_queued = len(backend.received_commands)
+    del backend
+
+    tracemalloc.start()
+    backend = _queue_commands(num_commands, num_qubits)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / num_queued, current / len(backend.received_commands)
+
+if __name__ == '__main__':
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    seconds, num_bytes = run(num)
+    print("{:.2f} us and {:.0f} bytes per queued command".format(seconds * 1e6, num_bytes))
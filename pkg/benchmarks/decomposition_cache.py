@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Benchmark the decomposition cache of the AutoReplacer.
+
+Lowers a Toffoli-heavy circuit to one-qubit gates and CNOT gates with an AutoReplacer using all decomposition rules,
+with and without cache_decompositions, and reports the time spent and the number of commands reaching the back-end.
+
+Usage:
+    .. code-block:: bash
+
+        python benchmarks/decomposition_cache.py [num_gates] [num_qubits]
+"""
+
+import sys
+import time
+
+import divya.setups.decompositions
+from divya.cengines import (
+    AutoReplacer,
+    BasicEngine,
+    DecompositionRuleSet,
+    InstructionFilter,
+    MainEngine,
+)
+from divya.meta import get_control_count
+from divya.ops import CNOT, ClassicalInstructionGate, H, T, Toffoli
+
+class _CountingBackend(BasicEngine):
+    """Back-end accepting and counting all commands."""
+
+    def __init__(self):
+        super().__init__()
+        self.num_commands = 0
+
+    def is_available(self, cmd):
+        return True
+
+    def receive(self, command_list):
+        self.num_commands += len(command_list)
+
+def _one_qubit_gates_and_cnot(eng, cmd):
+    """Return True for classical instructions, one-qubit gates and CNOT gates."""
+    if isinstance(cmd.gate, ClassicalInstructionGate):
+        return True
+    num_qubits = sum(len(qureg) for qureg in cmd.qubits)
+    return num_qubits == 1 and get_control_count(cmd) <= 1
+
+def _apply_circuit(qureg, num_gates):
+    """Apply num_gates gates, most of them Toffoli gates, to qureg."""
+    num_qubits = len(qureg)
+    for i in range(num_gates // 4):
+        Toffoli | (qureg[i % num_qubits], qureg[(i + 1) % num_qubits], qureg[(i + 2) % num_qubits])
+        Toffoli | (qureg[(i + 3) % num_qubits], qureg[i % num_qubits], qureg[(i + 1) % num_qubits])
+        H | qureg[(i + 2) % num_qubits]
+        CNOT | (qureg[i % num_qubits], qureg[(i + 3) % num_qubits])
+        T | qureg[i % num_qubits]
+
+def run(num_gates, num_qubits=8, cache_decompositions=False):
+    """
+    Return a tuple (seconds spent, number of commands sent to the back-end).
+
+    Args:
+        num_gates (int): Number of gates in the circuit.
+        num_qubits (int): Number of qubits the gates act upon.
+        cache_decompositions (bool): Whether the AutoReplacer caches decompositions.
+    """
+    backend = _CountingBackend()
+    rule_set = DecompositionRuleSet(modules=[divya.setups.decompositions])
+    engine_list = [
+        AutoReplacer(rule_set, cache_decompositions=cache_decompositions),
+        InstructionFilter(_one_qubit_gates_and_cnot),
+    ]
+    eng = MainEngine(backend=backend, engine_list=engine_list)
+    qureg = eng.allocate_qureg(num_qubits)
+    start = time.perf_counter()
+    _apply_circuit(qureg, num_gates)
+    eng.flush()
+    return time.perf_counter() - start, backend.num_commands
+
+if __name__ == '__main__':
+    gates = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    qubits = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    for use_cache in (False, True):
+        seconds, num_sent = run(gates, qubits, use_cache)
+        print("cache_decompositions={!s:>5}: {:.3f} s, {} commands sent".format(use_cache, seconds, num_sent))
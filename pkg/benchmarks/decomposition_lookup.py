@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Benchmark the lookup of decomposition rules in the AutoReplacer.
+
+Lowers a circuit of rotations, daggered gates and controlled gates to rotations, Hadamard gates and CNOT gates with
+an AutoReplacer using all decomposition rules (including the ones of divya.libs.math), and reports the time spent and
+the number of commands reaching the back-end. Most of the commands are decomposed several times, and their gates are
+mostly handled by the generic rules registered for BasicGate (which are checked last).
+
+Usage:
+    .. code-block:: bash
+
+        python benchmarks/decomposition_lookup.py [num_gates] [num_qubits]
+"""
+
+import math
+import sys
+import time
+
+import divya.libs.math
+import divya.setups.decompositions
+from divya.cengines import (
+    AutoReplacer,
+    BasicEngine,
+    DecompositionRuleSet,
+    InstructionFilter,
+    MainEngine,
+)
+from divya.meta import Control, get_control_count
+from divya.ops import (
+    CNOT,
+    ClassicalInstructionGate,
+    H,
+    Ph,
+    Rx,
+    Ry,
+    Rz,
+    Sdag,
+    Tdag,
+    X,
+    Y,
+)
+
+class _CountingBackend(BasicEngine):
+    """Back-end accepting and counting all commands."""
+
+    def __init__(self):
+        super().__init__()
+        self.num_commands = 0
+
+    def is_available(self, cmd):
+        return True
+
+    def receive(self, command_list):
+        self.num_commands += len(command_list)
+
+def _rotations_h_and_cnot(eng, cmd):
+    """Return True for classical instructions, rotations, Hadamard gates and CNOT gates."""
+    if isinstance(cmd.gate, ClassicalInstructionGate):
+        return True
+    if get_control_count(cmd) == 0:
+        return isinstance(cmd.gate, (Rx, Ry, Rz)) or cmd.gate == H
+    return cmd.gate == X and get_control_count(cmd) == 1
+
+def _apply_circuit(qureg, num_gates):
+    """Apply num_gates gates to qureg."""
+    num_qubits = len(qureg)
+    for i in range(num_gates // 6):
+        qubit, other = qureg[i % num_qubits], qureg[(i + 1) % num_qubits]
+        angle = math.pi / (i % 7 + 2)
+        Tdag | other
+        Sdag | qubit
+        Y | other
+        Ph(angle) | qubit
+        CNOT | (qubit, other)
+        with Control(qubit.engine, qubit):
+            Ph(angle) | other
+
+def run(num_gates, num_qubits=8):
+    """
+    Return a tuple (seconds spent, number of commands sent to the back-end).
+
+    Args:
+        num_gates (int): Number of gates in the circuit.
+        num_qubits (int): Number of qubits the gates act upon.
+    """
+    backend = _CountingBackend()
+    rule_set = DecompositionRuleSet(modules=[divya.libs.math, divya.setups.decompositions])
+    engine_list = [AutoReplacer(rule_set), InstructionFilter(_rotations_h_and_cnot)]
+    eng = MainEngine(backend=backend, engine_list=engine_list)
+    qureg = eng.allocate_qureg(num_qubits)
+    start = time.perf_counter()
+    _apply_circuit(qureg, num_gates)
+    eng.flush()
+    return time.perf_counter() - start, backend.num_commands
+
+if __name__ == '__main__':
+    gates = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    qubits = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seconds, num_sent = run(gates, qubits)
+    print("{:.3f} s, {} commands sent".format(seconds, num_sent))
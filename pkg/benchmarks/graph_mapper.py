@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Benchmark the GraphMapper against the LinearMapper and the GridMapper.
+
+Maps a random circuit of CNOT and single-qubit gates acting on all qubits of a linear chain (with a LinearMapper and
+with a GraphMapper given the path graph) and of a 2-D grid (with a GridMapper and with a GraphMapper given the grid
+graph), and reports the time spent and the number of Swap gates inserted by each mapper.
+
+Usage:
+    .. code-block:: bash
+
+        python benchmarks/graph_mapper.py [num_gates] [num_rows] [num_columns]
+"""
+
+import random
+import sys
+import time
+
+import networkx as nx
+
+from divya.cengines import BasicEngine, GraphMapper, GridMapper, LinearMapper, MainEngine
+from divya.ops import CNOT, All, H, Measure, Rz, Swap
+
+class _SwapCountingBackend(BasicEngine):
+    """Back-end accepting all commands and counting the Swap gates."""
+
+    def __init__(self):
+        super().__init__()
+        self.num_swaps = 0
+
+    def is_available(self, cmd):
+        return True
+
+    def receive(self, command_list):
+        self.num_swaps += sum(cmd.gate == Swap for cmd in command_list)
+
+def _apply_circuit(qureg, num_gates, seed=5):
+    """Apply num_gates random gates (a third of which are CNOT gates) to qureg."""
+    rng = random.Random(seed)
+    for _ in range(num_gates // 3):
+        qubit, other = rng.sample(qureg, 2)
+        H | qubit
+        Rz(rng.random()) | other
+        CNOT | (qubit, other)
+
+def _grid_graph(num_rows, num_columns):
+    """Return the grid graph whose nodes are numbered in row-major order (as in the GridMapper)."""
+    return nx.relabel_nodes(
+        nx.grid_2d_graph(num_rows, num_columns), lambda node: node[0] * num_columns + node[1], copy=True
+    )
+
+def run(mapper, num_gates, num_qubits):
+    """
+    Return a tuple (seconds spent, number of Swap gates inserted by the mapper).
+
+    Args:
+        mapper (BasicMapperEngine): Mapper to benchmark.
+        num_gates (int): Number of gates in the circuit.
+        num_qubits (int): Number of qubits the gates act upon.
+    """
+    backend = _SwapCountingBackend()
+    eng = MainEngine(backend=backend, engine_list=[mapper])
+    start = time.perf_counter()
+    qureg = eng.allocate_qureg(num_qubits)
+    _apply_circuit(qureg, num_gates)
+    All(Measure) | qureg
+    eng.flush()
+    return time.perf_counter() - start, backend.num_swaps
+
+if __name__ == '__main__':
+    gates = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    columns = int(sys.argv[3]) if len(sys.argv) > 3 else 6
+    qubits = rows * columns
+    mappers = [
+        ("line, LinearMapper", lambda: LinearMapper(num_qubits=qubits)),
+        ("line, GraphMapper", lambda: GraphMapper(nx.path_graph(qubits))),
+        ("grid, GridMapper", lambda: GridMapper(num_rows=rows, num_columns=columns)),
+        ("grid, GraphMapper", lambda: GraphMapper(_grid_graph(rows, columns))),
+    ]
+    for name, make_mapper in mappers:
+        seconds, num_swaps = run(make_mapper(), gates, qubits)
+        print("{:>18}: {:.3f} s, {} swaps".format(name, seconds, num_swaps))
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Benchmark the computation of the swap operations of the GridMapper.
+
+Maps a periodic circuit, which alternates between two layers of CNOT gates acting on random pairs of qubits, on a
+num_rows x num_columns grid (storing one layer before mapping it) with and without caching the swap operations. It
+reports the time spent, the time spent computing the swap operations, and the number of changes of mapping and of
+Swap gates inserted.
+
+Usage:
+    .. code-block:: bash
+
+        python benchmarks/grid_mapper.py [num_repetitions] [num_rows] [num_columns]
+"""
+
+import random
+import sys
+import time
+
+from divya.cengines import BasicEngine, GridMapper, MainEngine
+from divya.ops import CNOT, All, Measure, Swap
+
+class _SwapCountingBackend(BasicEngine):
+    """Back-end accepting all commands and counting the Swap gates."""
+
+    def __init__(self):
+        super().__init__()
+        self.num_swaps = 0
+
+    def is_available(self, cmd):
+        return True
+
+    def receive(self, command_list):
+        self.num_swaps += sum(cmd.gate == Swap for cmd in command_list)
+
+def run(num_repetitions, num_rows, num_columns, swaps_cache_size=100):
+    """
+    Return a tuple (seconds spent, seconds spent computing swaps, number of mappings, number of Swap gates).
+
+    Args:
+        num_repetitions (int): Number of times the two layers of CNOT gates are applied.
+        num_rows (int): Number of rows in the grid.
+        num_columns (int): Number of columns in the grid.
+        swaps_cache_size (int): Number of swap operation lists the GridMapper caches.
+    """
+    num_qubits = num_rows * num_columns
+    mapper = GridMapper(
+        num_rows=num_rows, num_columns=num_columns, storage=num_qubits // 2, swaps_cache_size=swaps_cache_size
+    )
+    swaps_time = 0.0
+    return_lowest_cost_swaps = mapper._return_lowest_cost_swaps
+
+    def timed_return_lowest_cost_swaps(old_mapping, new_mapping):
+        nonlocal swaps_time
+        start = time.perf_counter()
+        swaps = return_lowest_cost_swaps(old_mapping, new_mapping)
+        swaps_time += time.perf_counter() - start
+        return swaps
+
+    mapper._return_lowest_cost_swaps = timed_return_lowest_cost_swaps
+    backend = _SwapCountingBackend()
+    eng = MainEngine(backend=backend, engine_list=[mapper])
+    rng = random.Random(5)
+    start = time.perf_counter()
+    qureg = eng.allocate_qureg(num_qubits)
+    layers = []
+    for _ in range(2):
+        qubits = rng.sample(qureg, num_qubits)
+        layers.append(list(zip(qubits[::2], qubits[1::2])))
+    for _ in range(num_repetitions):
+        for layer in layers:
+            for control, target in layer:
+                CNOT | (control, target)
+    All(Measure) | qureg
+    eng.flush()
+    return time.perf_counter() - start, swaps_time, mapper.num_mappings, backend.num_swaps
+
+if __name__ == '__main__':
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    columns = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    for cache_size in (0, 100):
+        seconds, seconds_swaps, num_mappings, num_swaps = run(repetitions, rows, columns, cache_size)
+        print(
+            "swaps_cache_size={:>3}: {:.3f} s ({:.3f} s computing swaps), {} mappings, {} swaps".format(
+                cache_size, seconds, seconds_swaps, num_mappings, num_swaps
+            )
+        )
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Benchmark the LocalOptimizer for window sizes from 5 to 10^4 gates.
+
+Sends num_gates commands (a layered circuit with mergeable rotations and cancelling gates) through a LocalOptimizer
+for each cache_size, with and without commutation rules, and reports the time spent and the number of commands
+reaching the back-end.
+
+Usage:
+    .. code-block:: bash
+
+        python benchmarks/local_optimizer.py [num_gates] [num_qubits]
+"""
+
+import sys
+import time
+
+from divya.cengines import DummyEngine, LocalOptimizer, MainEngine
+from divya.ops import CNOT, H, Rx, Rz
+
+CACHE_SIZES = (5, 10, 100, 1000, 10000)
+
+def _apply_circuit(qureg, num_gates):
+    """Apply about num_gates commands to qureg."""
+    num_qubits = len(qureg)
+    for i in range(num_gates // 6):
+        qubit = qureg[i % num_qubits]
+        H | qubit
+        CNOT | (qubit, qureg[(i + 1) % num_qubits])
+        Rz(0.1) | qubit
+        Rz(0.2) | qubit
+        Rx(0.3) | qureg[(i + 2) % num_qubits]
+        CNOT | (qubit, qureg[(i + 1) % num_qubits])
+
+def run(cache_size, num_gates, num_qubits=8, commutation=False):
+    """
+    Return a tuple (seconds spent, number of commands sent to the back-end) for one optimizer window size.
+
+    Args:
+        cache_size (int): Window size of the LocalOptimizer.
+        num_gates (int): Number of gates in the circuit.
+        num_qubits (int): Number of qubits the gates act upon.
+        commutation (bool): Whether the LocalOptimizer uses commutation rules.
+    """
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[LocalOptimizer(cache_size=cache_size, commutation=commutation)])
+    qureg = eng.allocate_qureg(num_qubits)
+    start = time.perf_counter()
+    _apply_circuit(qureg, num_gates)
+    eng.flush()
+    return time.perf_counter() - start, len(backend.received_commands)
+
+if __name__ == '__main__':
+    gates = int(sys.argv[1]) if len(sys.argv) > 1 else 60000
+    qubits = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    for use_commutation in (False, True):
+        for size in CACHE_SIZES:
+            seconds, num_sent = run(size, gates, qubits, use_commutation)
+            print(
+                "cache_size={:>6}, commutation={!s:>5}: {:.3f} s, {} commands sent".format(
+                    size, use_commutation, seconds, num_sent
+                )
+            )
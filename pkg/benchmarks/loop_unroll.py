@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Benchmark unrolling loops and uncomputing compute sections.
+
+Unrolls a Loop whose body consists of body_size commands and uncomputes a Compute section of the same size, reporting
+the time spent per command sent to the back-end.
+
+Usage:
+    .. code-block:: bash
+
+        python benchmarks/loop_unroll.py [num_iterations] [body_size]
+"""
+
+import sys
+import time
+
+from divya.cengines import DummyEngine, MainEngine
+from divya.meta import Compute, Loop, Uncompute
+from divya.ops import CNOT, H, Rz
+
+def _apply_body(qureg, body_size):
+    """Apply body_size commands to qureg."""
+    num_qubits = len(qureg)
+    for i in range(body_size // 3):
+        H | qureg[i % num_qubits]
+        CNOT | (qureg[i % num_qubits], qureg[(i + 1) % num_qubits])
+        Rz(0.1) | qureg[(i + 1) % num_qubits]
+
+def run(num_iterations, body_size, num_qubits=16):
+    """
+    Return a tuple (seconds to unroll the loop, seconds to uncompute) for the given loop and body sizes.
+
+    Args:
+        num_iterations (int): Number of loop iterations.
+        body_size (int): Number of commands in the loop body and in the compute section.
+        num_qubits (int): Number of qubits the commands act upon.
+    """
+    eng = MainEngine(backend=DummyEngine(), engine_list=[])
+    qureg = eng.allocate_qureg(num_qubits)
+    with Loop(eng, num_iterations):
+        _apply_body(qureg, body_size)
+        # The loop is unrolled when leaving the with statement
+        start = time.perf_counter()
+    unroll_time = time.perf_counter() - start
+
+    with Compute(eng):
+        _apply_body(qureg, body_size)
+    start = time.perf_counter()
+    Uncompute(eng)
+    uncompute_time = time.perf_counter() - start
+    return unroll_time, uncompute_time
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    unroll_seconds, uncompute_seconds = run(iterations, size)
+    print("Unrolling {} x {} commands: {:.3f} s".format(iterations, size, unroll_seconds))
+    print("Uncomputing {} commands: {:.4f} s".format(size, uncompute_seconds))
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Benchmark the LinearMapper and the GridMapper with large storage windows.
+
+Maps a random circuit of CNOT and single-qubit gates acting on 16 qubits with a LinearMapper and with a GridMapper on
+a 4x4 grid, storing up to storage commands before mapping them, and reports the time spent by each mapper.
+
+Usage:
+    .. code-block:: bash
+
+        python benchmarks/mapper_storage.py [num_gates] [storage]
+"""
+
+import random
+import sys
+import time
+
+from divya.cengines import BasicEngine, GridMapper, LinearMapper, MainEngine
+from divya.ops import CNOT, All, H, Measure, Rz
+
+class _NullBackend(BasicEngine):
+    """Back-end accepting and discarding all commands."""
+
+    def is_available(self, cmd):
+        return True
+
+    def receive(self, command_list):
+        pass
+
+def _apply_circuit(qureg, num_gates, seed=5):
+    """Apply num_gates random gates (a third of which are CNOT gates) to qureg."""
+    rng = random.Random(seed)
+    for _ in range(num_gates // 3):
+        qubit, other = rng.sample(qureg, 2)
+        H | qubit
+        Rz(rng.random()) | other
+        CNOT | (qubit, other)
+
+def run(mapper, num_gates):
+    """
+    Return the seconds spent mapping a circuit of num_gates gates on 16 qubits.
+
+    Args:
+        mapper (BasicMapperEngine): Mapper to benchmark.
+        num_gates (int): Number of gates in the circuit.
+    """
+    eng = MainEngine(backend=_NullBackend(), engine_list=[mapper])
+    start = time.perf_counter()
+    qureg = eng.allocate_qureg(16)
+    _apply_circuit(qureg, num_gates)
+    All(Measure) | qureg
+    eng.flush()
+    return time.perf_counter() - start
+
+if __name__ == '__main__':
+    gates = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    storage = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    print("LinearMapper: {:.3f} s".format(run(LinearMapper(num_qubits=16, storage=storage), gates)))
+    print("  GridMapper: {:.3f} s".format(run(GridMapper(num_rows=4, num_columns=4, storage=storage), gates)))
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Benchmark the TwoQubitBlockResynthesizer on a circuit mapped onto a linear chain of qubits.
+
+Maps a random circuit of CNOT, Rzz and single-qubit gates with a LinearMapper and simulates it, with and without a
+TwoQubitBlockResynthesizer after the mapper, and reports the time spent and the number of commands reaching the
+simulator.
+
+Usage:
+    .. code-block:: bash
+
+        python benchmarks/two_qubit_blocks.py [num_gates] [num_qubits]
+"""
+
+import random
+import sys
+import time
+
+from divya.backends import Simulator
+from divya.cengines import LinearMapper, MainEngine, TwoQubitBlockResynthesizer
+from divya.ops import CNOT, All, H, Measure, Rx, Rzz, T
+
+class _CountingSimulator(Simulator):
+    """Simulator counting the commands it receives."""
+
+    def __init__(self):
+        super().__init__()
+        self.num_commands = 0
+
+    def receive(self, command_list):
+        self.num_commands += len(command_list)
+        super().receive(command_list)
+
+def _apply_circuit(qureg, num_gates):
+    """Apply num_gates random gates to qureg."""
+    rng = random.Random(42)
+    for _ in range(num_gates):
+        qubit1, qubit2 = rng.sample(list(qureg), 2)
+        kind = rng.random()
+        if kind < 0.3:
+            CNOT | (qubit1, qubit2)
+        elif kind < 0.5:
+            Rzz(rng.random()) | (qubit1, qubit2)
+        else:
+            rng.choice([H, T, Rx(rng.random())]) | qubit1
+
+def run(num_gates, num_qubits=12, resynthesize=False):
+    """
+    Return a tuple (seconds spent, number of commands sent to the simulator).
+
+    Args:
+        num_gates (int): Number of gates in the circuit.
+        num_qubits (int): Number of qubits of the linear chain.
+        resynthesize (bool): Whether a TwoQubitBlockResynthesizer follows the mapper.
+    """
+    backend = _CountingSimulator()
+    engine_list = [LinearMapper(num_qubits=num_qubits, cyclic=False)]
+    if resynthesize:
+        engine_list.append(TwoQubitBlockResynthesizer())
+    eng = MainEngine(backend=backend, engine_list=engine_list)
+    qureg = eng.allocate_qureg(num_qubits)
+    start = time.perf_counter()
+    _apply_circuit(qureg, num_gates)
+    All(Measure) | qureg
+    eng.flush()
+    return time.perf_counter() - start, backend.num_commands
+
+if __name__ == '__main__':
+    gates = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    qubits = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    for use_resynthesis in (False, True):
+        seconds, num_sent = run(gates, qubits, use_resynthesis)
+        print("resynthesize={!s:>5}: {:.3f} s, {} commands sent".format(use_resynthesis, seconds, num_sent))
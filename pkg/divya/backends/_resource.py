@@ -25,14 +25,119 @@ Contain a compiler engine to calculate resource count used by a quantum circuit.
 
 A resrouce counter compiler engine counts the number of calls for each type of gate used in a circuit, in addition to
 the max. number of active qubits.
+
+Besides the depth of the circuit, the resource counter keeps track of further critical-path metrics (weighted depth,
+T-depth and two-qubit-gate depth). All of them are computed from a per-qubit frontier: the value of a metric for a
+qubit is the maximum over all paths in the DAG of the program ending in the last command acting on this qubit. Only
+the frontier of the active qubits is stored, which makes the memory usage independent of the length of the circuit.
+
+Loops (commands carrying a LoopTag) are not unrolled: each loop body is counted once and its effect on the frontier
+is represented as max-plus forms, i.e., the value of a metric for a qubit after one iteration is written as
+max(c, max_j(d_j + a_j)) where d_j are the values of this metric for the qubits j at the start of the iteration.
+Forms are stored as dicts mapping qubit ids (or None for the constant c) to offsets, which allows composing iterations
+analytically.
 """
 
+import json
+
 from divya.cengines import BasicEngine, LastEngineException
-from divya.meta import LogicalQubitIDTag, get_control_count
-from divya.ops import Allocate, Deallocate, FlushGate, Measure
+from divya.meta import LogicalQubitIDTag, LoopTag, get_control_count
+from divya.ops import Allocate, Deallocate, FlushGate, Measure, T, Tdag
 from divya.types import WeakQubitRef
 
-class ResourceCounter(BasicEngine):
+# indices of the critical-path metrics in the per-qubit frontier
+_DEPTH = 0
+_WEIGHTED_DEPTH = 1
+_T_DEPTH = 2
+_TWO_QUBIT_DEPTH = 3
+_NUM_METRICS = 4
+
+def _merge_forms(forms):
+    """Return the maximum of max-plus forms."""
+    result = {}
+    for form in forms:
+        for key, offset in form.items():
+            if key not in result or offset > result[key]:
+                result[key] = offset
+    return result
+
+def _shift_form(form, offset):
+    """Return a max-plus form plus a constant offset."""
+    return {key: value + offset for key, value in form.items()}
+
+def _substitute_form(form, depths):
+    """
+    Substitute the depths of qubits in a max-plus form.
+
+    Args:
+        form (dict): Max-plus form.
+        depths (dict): Maps qubit ids to max-plus forms; qubit ids which are not in depths are left unchanged.
+    """
+    return _merge_forms(
+        _shift_form(depths.get(key, {key: 0}) if key is not None else {None: 0}, offset)
+        for key, offset in form.items()
+    )
+
+def _compose_transfers(outer, inner):
+    """Return the depth transfer of applying the transfer inner followed by the transfer outer."""
+    result = dict(inner)
+    for qubit_id, form in outer.items():
+        result[qubit_id] = _substitute_form(form, inner)
+    return result
+
+def _power_transfer(transfer, num):
+    """Return the depth transfer of applying a transfer num times (using repeated squaring)."""
+    result = {}
+    while num > 0:
+        if num & 1:
+            result = _compose_transfers(result, transfer)
+        transfer = _compose_transfers(transfer, transfer)
+        num >>= 1
+    return result
+
+def _add_counts(counts, other, multiplier=1):
+    """Add the gate counts other (multiplied by multiplier) to counts."""
+    for description, num in other.items():
+        counts[description] = counts.get(description, 0) + num * multiplier
+
+class _LoopBody:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """
+    Summary of one iteration of a loop body.
+
+    Attributes:
+        tag (LoopTag): Loop tag of the loop.
+        gate_counts (dict): Gate counts of one iteration (same keys as ResourceCounter.gate_counts).
+        gate_class_counts (dict): Gate class counts of one iteration (same keys as ResourceCounter.gate_class_counts).
+        depth_of_qubit (dict): Maps the ids of the qubits used in the body to their frontier (one max-plus form of the
+            frontier at the start of the iteration per metric).
+        start_of_qubit (dict): Maps the ids of the qubits which are first used in the body to the depth (as a
+            max-plus form) at which their first command starts.
+        previous_max_depth (list): Max-plus forms of the maximal frontier of the qubits deallocated in the body.
+        active_qubits (int): Number of qubits allocated (and not yet deallocated) in the body.
+        max_width (int): Maximal number of qubits allocated in the body at any given point.
+        qubit_time_volume (int): Qubit-time volume of the qubits allocated and deallocated in the body.
+    """
+
+    def __init__(self, tag):
+        """Initialize a _LoopBody object."""
+        self.tag = tag
+        self.gate_counts = {}
+        self.gate_class_counts = {}
+        self.depth_of_qubit = {}
+        self.start_of_qubit = {}
+        self.previous_max_depth = [{} for _ in range(_NUM_METRICS)]
+        self.active_qubits = 0
+        self.max_width = 0
+        self.qubit_time_volume = 0
+
+    def depth(self, qubit_id):
+        """Return the frontier of a qubit, starting from its frontier at the start of the iteration."""
+        try:
+            return self.depth_of_qubit[qubit_id]
+        except KeyError:
+            return [{qubit_id: 0}] * _NUM_METRICS
+
+class ResourceCounter(BasicEngine):  # pylint: disable=too-many-instance-attributes
     """
     ResourceCounter is a compiler engine which counts the number of gates and max. number of active qubits.
 
@@ -44,22 +149,50 @@ class ResourceCounter(BasicEngine):
         max_width (int): Maximal width (=max. number of active qubits at any given point).
     Properties:
         depth_of_dag (int): It is the longest path in the directed acyclic graph (DAG) of the program.
+        weighted_critical_path (float): Longest path in the DAG of the program where each command is weighted by
+            the cost of its gate (see gate_weights).
+        t_count (int): Number of (uncontrolled) T and Tdag gates.
+        t_depth (int): Maximal number of (uncontrolled) T and Tdag gates on any path in the DAG of the program.
+        two_qubit_depth (int): Maximal number of commands acting on more than one qubit (including control qubits)
+            on any path in the DAG of the program.
+        qubit_time_volume (int): Sum over all qubits of the number of DAG layers from the start of the first to the
+            end of the last command acting on the qubit.
+
+    Note:
+        If it is the last engine (or all following engines support LoopTag), loops are not unrolled: each loop body
+        is counted once and its statistics are multiplied by the number of iterations and composed analytically
+        (including nested loops). Loop bodies are accounted for once a command outside of the loop or a FlushGate is
+        received. For qubits allocated inside a loop body, the qubit-time volume of each iteration is evaluated as if
+        all qubits entered the iteration at the same depth.
     """
 
-    def __init__(self):
+    def __init__(self, gate_weights=None, default_weight=1):
         """
         Initialize a resource counter engine.
 
         Sets all statistics to zero.
+
+        Args:
+            gate_weights (dict): Cost of the gates for the weighted critical path.  The keys are either gate classes
+                or tuples of the form (gate class, ctrl_cnt), the latter taking precedence, e.g.,
+                ``{TGate: 1, (XGate, 1): 0.1}``.
+            default_weight (float): Cost of the gates which are not in gate_weights.
         """
         super().__init__()
         self.gate_counts = {}
         self.gate_class_counts = {}
+        self._gate_weights = dict(gate_weights) if gate_weights is not None else {}
+        self._default_weight = default_weight
         self._active_qubits = 0
         self.max_width = 0
-        # key: qubit id, depth of this qubit
+        # key: qubit id, value: frontier of this qubit (list of metrics, see _DEPTH etc.)
         self._depth_of_qubit = {}
-        self._previous_max_depth = 0
+        self._previous_max_depth = [0] * _NUM_METRICS
+        # key: qubit id, depth at which the first command acting on this qubit starts
+        self._start_of_qubit = {}
+        self._qubit_time_volume = 0
+        # stack of currently open loop bodies (outermost first)
+        self._loops = []
 
     def is_available(self, cmd):
         """
@@ -79,65 +212,279 @@ class ResourceCounter(BasicEngine):
         except LastEngineException:
             return True
 
+    def is_meta_tag_handler(self, meta_tag):
+        """
+        Check if the ResourceCounter handles a meta tag.
+
+        Args:
+            meta_tag: Meta tag class for which to check support
+
+        Returns:
+            True for LoopTag if the ResourceCounter is the last engine or if the following engines support LoopTag.
+        """
+        if meta_tag is not LoopTag:
+            return False
+        return self.is_last_engine or self.next_engine.is_meta_tag_supported(meta_tag)
+
+    def _max_depth(self, metric):
+        """Return the maximum of a metric over all qubits."""
+        current_max = max((depth[metric] for depth in self._depth_of_qubit.values()), default=0)
+        return max(current_max, self._previous_max_depth[metric])
+
     @property
     def depth_of_dag(self):
         """Return the depth of the DAG."""
-        if self._depth_of_qubit:
-            current_max = max(self._depth_of_qubit.values())
-            return max(current_max, self._previous_max_depth)
-        return self._previous_max_depth
+        return self._max_depth(_DEPTH)
+
+    @property
+    def weighted_critical_path(self):
+        """Return the length of the longest path in the DAG, where each command is weighted by its gate cost."""
+        return self._max_depth(_WEIGHTED_DEPTH)
+
+    @property
+    def t_depth(self):
+        """Return the T-depth of the DAG."""
+        return self._max_depth(_T_DEPTH)
+
+    @property
+    def two_qubit_depth(self):
+        """Return the two-qubit-gate depth of the DAG."""
+        return self._max_depth(_TWO_QUBIT_DEPTH)
+
+    @property
+    def t_count(self):
+        """Return the number of (uncontrolled) T and Tdag gates."""
+        return self.gate_counts.get((T, 0), 0) + self.gate_counts.get((Tdag, 0), 0)
+
+    @property
+    def qubit_time_volume(self):
+        """Return the qubit-time volume, i.e., the sum of the lifetimes (in DAG layers) of all qubits."""
+        volume = self._qubit_time_volume
+        for qubit_id, start in self._start_of_qubit.items():
+            volume += self._depth_of_qubit[qubit_id][_DEPTH] - start
+        return volume
+
+    def _increments(self, cmd, num_qubits):
+        """Return the increment of each metric caused by a command acting on num_qubits qubits."""
+        ctrl_cnt = get_control_count(cmd)
+        gate_class = cmd.gate.__class__
+        try:
+            weight = self._gate_weights[(gate_class, ctrl_cnt)]
+        except KeyError:
+            weight = self._gate_weights.get(gate_class, self._default_weight)
+        is_t_gate = ctrl_cnt == 0 and (cmd.gate == T or cmd.gate == Tdag)
+        return (1, weight, int(is_t_gate), int(num_qubits > 1))
 
     def _add_cmd(self, cmd):  # pylint: disable=too-many-branches
         """Add a gate to the count."""
+        if self._loops:
+            self._add_loop_cmd(self._loops[-1], cmd)
+            return
+
         if cmd.gate == Allocate:
             self._active_qubits += 1
-            self._depth_of_qubit[cmd.qubits[0][0].id] = 0
+            self._depth_of_qubit[cmd.qubits[0][0].id] = [0] * _NUM_METRICS
         elif cmd.gate == Deallocate:
             self._active_qubits -= 1
-            depth = self._depth_of_qubit[cmd.qubits[0][0].id]
-            self._previous_max_depth = max(self._previous_max_depth, depth)
-            self._depth_of_qubit.pop(cmd.qubits[0][0].id)
+            depth = self._depth_of_qubit.pop(cmd.qubits[0][0].id)
+            self._previous_max_depth = [max(pair) for pair in zip(self._previous_max_depth, depth)]
+            start = self._start_of_qubit.pop(cmd.qubits[0][0].id, None)
+            if start is not None:
+                self._qubit_time_volume += depth[_DEPTH] - start
         elif self.is_last_engine and cmd.gate == Measure:
+            increments = self._increments(cmd, 1)
             for qureg in cmd.qubits:
                 for qubit in qureg:
-                    self._depth_of_qubit[qubit.id] += 1
-                    # Check if a mapper assigned a different logical id
-                    logical_id_tag = None
-                    for tag in cmd.tags:
-                        if isinstance(tag, LogicalQubitIDTag):
-                            logical_id_tag = tag
-                    if logical_id_tag is not None:
-                        qubit = WeakQubitRef(qubit.engine, logical_id_tag.logical_qubit_id)
-                    self.main_engine.set_measurement_result(qubit, 0)
+                    depth = self._depth_of_qubit[qubit.id]
+                    self._start_of_qubit.setdefault(qubit.id, depth[_DEPTH])
+                    self._depth_of_qubit[qubit.id] = [value + inc for value, inc in zip(depth, increments)]
+            self._set_measurement_results(cmd)
         else:
             qubit_ids = set()
             for qureg in cmd.all_qubits:
                 for qubit in qureg:
                     qubit_ids.add(qubit.id)
-            if len(qubit_ids) == 1:
-                self._depth_of_qubit[list(qubit_ids)[0]] += 1
-            else:
-                max_depth = 0
+            increments = self._increments(cmd, len(qubit_ids))
+            depths = [self._depth_of_qubit[qubit_id] for qubit_id in qubit_ids]
+            start = max(depth[_DEPTH] for depth in depths)
+            depth = [max(values) + inc for values, inc in zip(zip(*depths), increments)]
+            for qubit_id in qubit_ids:
+                self._start_of_qubit.setdefault(qubit_id, start)
+                self._depth_of_qubit[qubit_id] = depth
+
+        self.max_width = max(self.max_width, self._active_qubits)
+        self._count_gate(self.gate_counts, self.gate_class_counts, cmd)
+
+    def _add_loop_cmd(self, body, cmd):
+        """Add a command to the summary of a loop body (see _add_cmd)."""
+        if cmd.gate == Allocate:
+            body.active_qubits += 1
+            body.depth_of_qubit[cmd.qubits[0][0].id] = [{None: 0}] * _NUM_METRICS
+        elif cmd.gate == Deallocate:
+            body.active_qubits -= 1
+            depth = body.depth(cmd.qubits[0][0].id)
+            body.previous_max_depth = [_merge_forms(pair) for pair in zip(body.previous_max_depth, depth)]
+            body.depth_of_qubit.pop(cmd.qubits[0][0].id, None)
+            start = body.start_of_qubit.pop(cmd.qubits[0][0].id, None)
+            if start is not None:
+                # lifetime for all qubits entering the iteration at depth 0
+                body.qubit_time_volume += max(depth[_DEPTH].values()) - max(start.values())
+        elif self.is_last_engine and cmd.gate == Measure:
+            increments = self._increments(cmd, 1)
+            for qureg in cmd.qubits:
+                for qubit in qureg:
+                    depth = body.depth(qubit.id)
+                    body.start_of_qubit.setdefault(qubit.id, depth[_DEPTH])
+                    body.depth_of_qubit[qubit.id] = [_shift_form(form, inc) for form, inc in zip(depth, increments)]
+            self._set_measurement_results(cmd)
+        else:
+            qubit_ids = {qubit.id for qureg in cmd.all_qubits for qubit in qureg}
+            increments = self._increments(cmd, len(qubit_ids))
+            depths = [body.depth(qubit_id) for qubit_id in qubit_ids]
+            start = _merge_forms(depth[_DEPTH] for depth in depths)
+            depth = [_shift_form(_merge_forms(forms), inc) for forms, inc in zip(zip(*depths), increments)]
+            for qubit_id in qubit_ids:
+                body.start_of_qubit.setdefault(qubit_id, start)
+                body.depth_of_qubit[qubit_id] = depth
+
+        body.max_width = max(body.max_width, body.active_qubits)
+        self._count_gate(body.gate_counts, body.gate_class_counts, cmd)
+
+    def _close_loops(self, num_open):  # pylint: disable=too-many-locals
+        """
+        Account for all loop bodies except for the num_open outermost ones.
+
+        The statistics of each loop body are multiplied by the number of iterations and added to the enclosing loop
+        body (or to the totals if there is none).
+        """
+        while len(self._loops) > num_open:
+            body = self._loops.pop()
+            num = body.tag.num
+            transfers = []
+            previous_max_depth = []
+            for metric in range(_NUM_METRICS):
+                transfer = {qubit_id: depth[metric] for qubit_id, depth in body.depth_of_qubit.items()}
+                # transfer of all but the last iteration; the frontier only increases from one iteration to the
+                # next, hence the qubits deallocated in the last iteration have the maximal depth.
+                partial_transfer = _power_transfer(transfer, num - 1)
+                previous_max_depth.append(_substitute_form(body.previous_max_depth[metric], partial_transfer))
+                transfers.append(_compose_transfers(transfer, partial_transfer))
+            qubit_ids = list(body.depth_of_qubit)
+
+            if self._loops:
+                parent = self._loops[-1]
+                entry_depths = {qubit_id: parent.depth(qubit_id) for qubit_id in qubit_ids}
+                for metric in range(_NUM_METRICS):
+                    depths = {qubit_id: depth[metric] for qubit_id, depth in entry_depths.items()}
+                    parent.previous_max_depth[metric] = _merge_forms(
+                        [parent.previous_max_depth[metric], _substitute_form(previous_max_depth[metric], depths)]
+                    )
+                    if metric == _DEPTH:
+                        for qubit_id, start in body.start_of_qubit.items():
+                            if qubit_id not in parent.start_of_qubit:
+                                parent.start_of_qubit[qubit_id] = _substitute_form(start, depths)
+                    transfers[metric] = {
+                        qubit_id: _substitute_form(form, depths) for qubit_id, form in transfers[metric].items()
+                    }
                 for qubit_id in qubit_ids:
-                    max_depth = max(max_depth, self._depth_of_qubit[qubit_id])
+                    parent.depth_of_qubit[qubit_id] = [transfer[qubit_id] for transfer in transfers]
+                parent.max_width = max(parent.max_width, parent.active_qubits + body.max_width)
+                parent.qubit_time_volume += body.qubit_time_volume * num
+                _add_counts(parent.gate_counts, body.gate_counts, num)
+                _add_counts(parent.gate_class_counts, body.gate_class_counts, num)
+            else:
+                entry_depths = {qubit_id: self._depth_of_qubit[qubit_id] for qubit_id in qubit_ids}
+                for metric in range(_NUM_METRICS):
+                    depths = {qubit_id: {None: depth[metric]} for qubit_id, depth in entry_depths.items()}
+                    if previous_max_depth[metric]:
+                        self._previous_max_depth[metric] = max(
+                            self._previous_max_depth[metric],
+                            _substitute_form(previous_max_depth[metric], depths)[None],
+                        )
+                    if metric == _DEPTH:
+                        for qubit_id, start in body.start_of_qubit.items():
+                            if qubit_id not in self._start_of_qubit:
+                                self._start_of_qubit[qubit_id] = _substitute_form(start, depths)[None]
+                    transfers[metric] = {
+                        qubit_id: _substitute_form(form, depths)[None] for qubit_id, form in transfers[metric].items()
+                    }
                 for qubit_id in qubit_ids:
-                    self._depth_of_qubit[qubit_id] = max_depth + 1
+                    self._depth_of_qubit[qubit_id] = [transfer[qubit_id] for transfer in transfers]
+                self.max_width = max(self.max_width, self._active_qubits + body.max_width)
+                self._qubit_time_volume += body.qubit_time_volume * num
+                _add_counts(self.gate_counts, body.gate_counts, num)
+                _add_counts(self.gate_class_counts, body.gate_class_counts, num)
 
-        self.max_width = max(self.max_width, self._active_qubits)
+    def _set_measurement_results(self, cmd):
+        """Set the results of a measurement to 0."""
+        for qureg in cmd.qubits:
+            for qubit in qureg:
+                # Check if a mapper assigned a different logical id
+                logical_id_tag = None
+                for tag in cmd.tags:
+                    if isinstance(tag, LogicalQubitIDTag):
+                        logical_id_tag = tag
+                if logical_id_tag is not None:
+                    qubit = WeakQubitRef(qubit.engine, logical_id_tag.logical_qubit_id)
+                self.main_engine.set_measurement_result(qubit, 0)
 
+    @staticmethod
+    def _count_gate(gate_counts, gate_class_counts, cmd):
+        """Increase the gate (class) counts of a command."""
         ctrl_cnt = get_control_count(cmd)
         gate_description = (cmd.gate, ctrl_cnt)
         gate_class_description = (cmd.gate.__class__, ctrl_cnt)
 
         try:
-            self.gate_counts[gate_description] += 1
+            gate_counts[gate_description] += 1
         except KeyError:
-            self.gate_counts[gate_description] = 1
+            gate_counts[gate_description] = 1
 
         try:
-            self.gate_class_counts[gate_class_description] += 1
+            gate_class_counts[gate_class_description] += 1
         except KeyError:
-            self.gate_class_counts[gate_class_description] = 1
+            gate_class_counts[gate_class_description] = 1
+
+    def to_dict(self):
+        """
+        Return the resources used as a dictionary.
+
+        Gates and gate classes are described by their names, prefixed by one "C" per control qubit (as in the string
+        representation).
+
+        Returns:
+            A dictionary containing only built-in types (suitable for JSON serialization).
+        """
+        gate_class_counts = {}
+        for (gate_class, ctrl_cnt), num in self.gate_class_counts.items():
+            name = ctrl_cnt * "C" + gate_class.__name__
+            gate_class_counts[name] = gate_class_counts.get(name, 0) + num
+
+        gate_counts = {}
+        for (gate, ctrl_cnt), num in self.gate_counts.items():
+            name = ctrl_cnt * "C" + str(gate)
+            gate_counts[name] = gate_counts.get(name, 0) + num
+
+        return {
+            'gate_class_counts': gate_class_counts,
+            'gate_counts': gate_counts,
+            'max_width': self.max_width,
+            'depth_of_dag': self.depth_of_dag,
+            'weighted_critical_path': self.weighted_critical_path,
+            't_count': self.t_count,
+            't_depth': self.t_depth,
+            'two_qubit_depth': self.two_qubit_depth,
+            'qubit_time_volume': self.qubit_time_volume,
+        }
+
+    def to_json(self, **kwargs):
+        """
+        Return the resources used as a JSON string (see to_dict).
+
+        Args:
+            kwargs: Keyword arguments passed on to json.dumps.
+        """
+        return json.dumps(self.to_dict(), **kwargs)
 
     def __str__(self):
         """
@@ -182,9 +529,27 @@ class ResourceCounter(BasicEngine):
             command_list (list<Command>): List of commands to receive (and count).
         """
         for cmd in command_list:
-            if not cmd.gate == FlushGate():
+            if cmd.gate == FlushGate():
+                self._close_loops(0)
+            else:
+                self._enter_loops(cmd)
                 self._add_cmd(cmd)
 
             # (try to) send on
             if not self.is_last_engine:
-                self.send([cmd])
\ No newline at end of file
+                self.send([cmd])
+
+    def _enter_loops(self, cmd):
+        """Close the loop bodies the command is not part of and open the ones it enters."""
+        # LoopTags are appended by the loop engines from the innermost to the outermost loop
+        loop_tags = [tag for tag in reversed(cmd.tags) if isinstance(tag, LoopTag)]
+        num_common = 0
+        while (
+            num_common < len(self._loops)
+            and num_common < len(loop_tags)
+            and self._loops[num_common].tag == loop_tags[num_common]
+        ):
+            num_common += 1
+        self._close_loops(num_common)
+        for tag in loop_tags[num_common:]:
+            self._loops.append(_LoopBody(tag))
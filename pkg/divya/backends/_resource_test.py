@@ -24,12 +24,29 @@
 Tests for divya.backends._resource.py.
 """
 
+import json
+
 import pytest
 
 from divya.backends import ResourceCounter
 from divya.cengines import DummyEngine, MainEngine, NotYetMeasuredError
-from divya.meta import LogicalQubitIDTag
-from divya.ops import CNOT, QFT, All, Allocate, Command, H, Measure, Rz, Rzz, X
+from divya.meta import Control, LogicalQubitIDTag, Loop, LoopTag
+from divya.ops import (
+    CNOT,
+    QFT,
+    All,
+    Allocate,
+    Command,
+    H,
+    Measure,
+    Rz,
+    Rzz,
+    T,
+    Tdag,
+    TGate,
+    X,
+    XGate,
+)
 from divya.types import WeakQubitRef
 
 class MockEngine(object):
@@ -141,4 +158,92 @@ def test_resource_counter_depth_of_dag():
     qb2[0].__del__()
     assert resource_counter.depth_of_dag == 9
     qb0[0].__del__()
-    assert resource_counter.depth_of_dag == 9
\ No newline at end of file
+    assert resource_counter.depth_of_dag == 9
+
+def _loop_circuit(eng):
+    qureg = eng.allocate_qureg(3)
+    H | qureg[0]
+    with Loop(eng, 5):
+        CNOT | (qureg[0], qureg[1])
+        with Loop(eng, 7):
+            T | qureg[1]
+            ancilla = eng.allocate_qubit()
+            CNOT | (qureg[1], ancilla)
+            Rz(0.3) | ancilla
+            Measure | ancilla
+            del ancilla
+        X | qureg[2]
+        with Loop(eng, 3):
+            Rzz(0.5) | (qureg[2], qureg[0])
+        CNOT | (qureg[2], qureg[1])
+    with Loop(eng, 4):
+        H | qureg[2]
+    All(Measure) | qureg
+    eng.flush()
+
+def test_resource_counter_loops():
+    resource_counter = ResourceCounter()
+    eng = MainEngine(resource_counter, [])
+    assert resource_counter.is_meta_tag_handler(LoopTag)
+    assert not resource_counter.is_meta_tag_handler(LogicalQubitIDTag)
+    _loop_circuit(eng)
+
+    unrolled_counter = ResourceCounter()
+    unrolled_eng = MainEngine(DummyEngine(), [unrolled_counter])
+    assert not unrolled_counter.is_meta_tag_handler(LoopTag)
+    _loop_circuit(unrolled_eng)
+
+    assert resource_counter.gate_counts == unrolled_counter.gate_counts
+    assert resource_counter.gate_class_counts == unrolled_counter.gate_class_counts
+    assert resource_counter.max_width == unrolled_counter.max_width == 4
+    assert resource_counter.depth_of_dag == unrolled_counter.depth_of_dag
+    assert resource_counter.gate_counts[(T, 0)] == 35
+    assert resource_counter.to_dict() == unrolled_counter.to_dict()
+
+def test_resource_counter_large_loop():
+    resource_counter = ResourceCounter()
+    eng = MainEngine(resource_counter, [])
+    qureg = eng.allocate_qureg(2)
+    with Loop(eng, 10**6):
+        with Loop(eng, 10**6):
+            CNOT | (qureg[0], qureg[1])
+            H | qureg[1]
+    eng.flush()
+    assert resource_counter.gate_counts[(X, 1)] == 10**12
+    assert resource_counter.depth_of_dag == 2 * 10**12
+
+def test_resource_counter_critical_path_metrics():
+    resource_counter = ResourceCounter(gate_weights={TGate: 1, (XGate, 1): 0.1}, default_weight=0)
+    eng = MainEngine(resource_counter, [])
+    qb0 = eng.allocate_qubit()
+    qb1 = eng.allocate_qubit()
+    T | qb0
+    Tdag | qb0
+    CNOT | (qb0, qb1)
+    T | qb1
+    X | qb1
+    with Control(eng, qb0):
+        T | qb1
+    H | qb0
+    qb2 = eng.allocate_qubit()
+    CNOT | (qb1, qb2)
+    Measure | qb2
+
+    assert resource_counter.depth_of_dag == 8
+    # Tdag is a DaggeredGate and has the default weight
+    assert resource_counter.weighted_critical_path == pytest.approx(3.2)
+    assert resource_counter.t_count == 3
+    assert resource_counter.t_depth == 3
+    assert resource_counter.two_qubit_depth == 3
+    # qb0: layers 0-7, qb1: layers 2-7, qb2: layers 6-8
+    assert resource_counter.qubit_time_volume == 7 + 5 + 2
+    del qb2
+    assert resource_counter.qubit_time_volume == 7 + 5 + 2
+
+    result = json.loads(resource_counter.to_json())
+    assert result['gate_counts']['T'] == 2
+    assert result['gate_counts']['CT'] == 1
+    assert result['gate_class_counts']['CXGate'] == 2
+    assert result['depth_of_dag'] == 8
+    assert result['t_count'] == 3
+    assert result['max_width'] == 3
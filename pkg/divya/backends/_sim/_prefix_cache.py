@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Memory-bounded LRU cache of simulator states used by the Simulator to skip shared circuit prefixes.
+
+Entries are keyed by a digest of the command stream which was executed since the simulator was last empty (see
+PrefixCache.extend_digest). Besides the snapshot of the state vector, every entry remembers the digests of all of its
+prefixes such that the simulator can tell whether the commands it currently receives may still lead to a cached
+checkpoint (in which case their execution is deferred).
+"""
+
+import hashlib
+from collections import Counter, OrderedDict
+
+#: Digest of the empty command stream.
+EMPTY_DIGEST = b''
+
+
+class _PrefixCacheEntry:  # pylint: disable=too-few-public-methods
+    """Snapshot of a simulator state at a checkpoint."""
+
+    def __init__(self, state, labels, prefix_digests):
+        self.state = state
+        self.labels = labels
+        self.prefix_digests = prefix_digests
+
+
+class PrefixCache:
+    """
+    LRU cache of state-vector snapshots bounded by the total number of bytes of the stored state vectors.
+
+    Attributes:
+        max_bytes (int): Maximal number of bytes of all cached state vectors.
+        hits (int): Number of successful lookups.
+        misses (int): Number of unsuccessful lookups.
+    """
+
+    def __init__(self, max_bytes):
+        """
+        Initialize a PrefixCache object.
+
+        Args:
+            max_bytes (int): Maximal number of bytes of all cached state vectors.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._prefixes = Counter()
+        self._nbytes = 0
+
+    @staticmethod
+    def extend_digest(digest, signature):
+        """
+        Return the digest of a command stream extended by one command.
+
+        Args:
+            digest (bytes): Digest of the command stream so far.
+            signature (str): Canonical representation of the command.
+        """
+        return hashlib.blake2b(digest + signature.encode(), digest_size=16).digest()
+
+    @property
+    def nbytes(self):
+        """Return the number of bytes of all cached state vectors."""
+        return self._nbytes
+
+    def __len__(self):
+        """Return the number of cached snapshots."""
+        return len(self._entries)
+
+    def is_prefix(self, digest):
+        """Return True if the command stream with the given digest is a prefix of a cached checkpoint."""
+        return digest in self._prefixes
+
+    def lookup(self, digest):
+        """
+        Return the snapshot stored for a digest (or None) and update the LRU order as well as the statistics.
+
+        Args:
+            digest (bytes): Digest of the command stream.
+
+        Returns:
+            Tuple (state, labels) of the snapshot or None.
+        """
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(digest)
+        return entry.state, entry.labels
+
+    def store(self, digest, state, labels, prefix_digests):
+        """
+        Store a snapshot, evicting the least-recently used ones if the memory bound is exceeded.
+
+        Args:
+            digest (bytes): Digest of the command stream at the checkpoint.
+            state (numpy.ndarray): State vector (is not copied).
+            labels (list): Canonical label of the qubit at each bit-location of the state vector.
+            prefix_digests (list[bytes]): Digests of all prefixes of the command stream (including digest).
+        """
+        if digest in self._entries:
+            self._remove(digest)
+        if state.nbytes > self.max_bytes:
+            return
+        self._entries[digest] = _PrefixCacheEntry(state, labels, prefix_digests)
+        self._prefixes.update(prefix_digests)
+        self._nbytes += state.nbytes
+        while self._nbytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        """Remove all snapshots."""
+        self._entries.clear()
+        self._prefixes.clear()
+        self._nbytes = 0
+
+    def _remove(self, digest):
+        entry = self._entries.pop(digest)
+        self._prefixes.subtract(entry.prefix_digests)
+        for prefix in entry.prefix_digests:
+            if self._prefixes[prefix] <= 0:
+                del self._prefixes[prefix]
+        self._nbytes -= entry.state.nbytes
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""Tests for divya.backends._sim._prefix_cache.py."""
+
+import numpy as np
+
+from divya.backends._sim._prefix_cache import EMPTY_DIGEST, PrefixCache
+
+
+def _stream(*signatures):
+    digests = []
+    digest = EMPTY_DIGEST
+    for signature in signatures:
+        digest = PrefixCache.extend_digest(digest, signature)
+        digests.append(digest)
+    return digests
+
+
+def test_extend_digest():
+    assert _stream('a', 'b') == _stream('a', 'b')
+    assert _stream('a', 'b')[-1] != _stream('b', 'a')[-1]
+    assert _stream('a', 'b')[0] == _stream('a', 'c')[0]
+
+
+def test_prefix_cache_lookup_and_prefixes():
+    cache = PrefixCache(1024)
+    digests = _stream('H0', 'CNOT01', 'Rx1')
+    state = np.ones(4, dtype=complex)
+    assert cache.lookup(digests[-1]) is None
+    cache.store(digests[-1], state, [0, 1], digests)
+    assert len(cache) == 1
+    assert cache.nbytes == state.nbytes
+    assert all(cache.is_prefix(digest) for digest in digests)
+    assert not cache.is_prefix(_stream('X0')[0])
+    restored_state, labels = cache.lookup(digests[-1])
+    assert restored_state is state
+    assert labels == [0, 1]
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_prefix_cache_lru_eviction():
+    state = np.ones(4, dtype=complex)
+    cache = PrefixCache(2 * state.nbytes)
+    streams = [_stream('H0', 'X{}'.format(i)) for i in range(3)]
+    cache.store(streams[0][-1], state, [0], streams[0])
+    cache.store(streams[1][-1], state, [0], streams[1])
+    # make the first entry the most recently used one
+    assert cache.lookup(streams[0][-1]) is not None
+    cache.store(streams[2][-1], state, [0], streams[2])
+    assert len(cache) == 2
+    assert cache.nbytes == 2 * state.nbytes
+    assert cache.lookup(streams[1][-1]) is None
+    assert not cache.is_prefix(streams[1][-1])
+    # the shared prefix is still referenced by the remaining entries
+    assert cache.is_prefix(streams[1][0])
+
+    cache.store(streams[0][-1], np.ones(2**10, dtype=complex), [0], streams[0])
+    assert len(cache) == 1
+    assert cache.lookup(streams[0][-1]) is None
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+    assert not cache.is_prefix(streams[2][0])
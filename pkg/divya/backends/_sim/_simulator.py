@@ -30,18 +30,50 @@ implementation is used as an alternative.
 import math
 import random
 
+import numpy as np
+
 from divya.cengines import BasicEngine
 from divya.meta import LogicalQubitIDTag, get_control_count, has_negative_control
 from divya.ops import (
     Allocate,
     BasicMathGate,
+    DaggeredGate,
     Deallocate,
     FlushGate,
     Measure,
+    Ph,
+    QFTGate,
+    R,
+    Rx,
+    Rxx,
+    Ry,
+    Ryy,
+    Rz,
+    Rzz,
+    StatePreparation,
     TimeEvolution,
+    UniformlyControlledRy,
+    UniformlyControlledRz,
+    get_inverse,
 )
 from divya.types import WeakQubitRef
 
+from ._prefix_cache import EMPTY_DIGEST, PrefixCache
+from ._statevector import (
+    apply_matrix,
+    apply_operator,
+    apply_qft,
+    apply_state_preparation,
+    apply_to_view,
+    apply_uniformly_controlled,
+    controlled_view,
+    get_state,
+    operator_matrix,
+    pauli_string_matrix,
+    rotation_matrices,
+    set_state,
+)
+
 FALLBACK_TO_PYSIM = False
 try:
     from ._cppsim import Simulator as SimulatorBackend
@@ -50,6 +82,122 @@ except ImportError:  # pragma: no cover
 
     FALLBACK_TO_PYSIM = True
 
+# Generators K of the parametrized gates, i.e., gate(angle) = exp(-i * angle * K)
+_ADJOINT_GENERATORS = {
+    Rx: 0.5 * pauli_string_matrix(((0, 'X'),), 1),
+    Ry: 0.5 * pauli_string_matrix(((0, 'Y'),), 1),
+    Rz: 0.5 * pauli_string_matrix(((0, 'Z'),), 1),
+    Rxx: 0.5 * pauli_string_matrix(((0, 'X'), (1, 'X')), 2),
+    Ryy: 0.5 * pauli_string_matrix(((0, 'Y'), (1, 'Y')), 2),
+    Rzz: 0.5 * pauli_string_matrix(((0, 'Z'), (1, 'Z')), 2),
+    Ph: -np.identity(2, dtype=np.complex128),
+    R: -np.diag([0.0, 1.0]).astype(np.complex128),
+}
+
+def _is_inverse_qft(gate):
+    """Return True if the gate is the inverse of divya.ops.QFT."""
+    return isinstance(gate, DaggeredGate) and isinstance(get_inverse(gate), QFTGate)
+
+def _is_register_gate(gate):
+    """Return True if the gate acts on entire registers and is emulated using NumPy kernels."""
+    return isinstance(
+        gate, (QFTGate, StatePreparation, UniformlyControlledRy, UniformlyControlledRz)
+    ) or _is_inverse_qft(gate)
+
+def _emulate_register_gate(gate, state, positions, ctrl_positions):
+    """
+    Apply a register gate (see _is_register_gate) to a state vector in place.
+
+    Args:
+        gate: QFT (or its inverse), StatePreparation, UniformlyControlledRy or UniformlyControlledRz gate.
+        state (numpy.ndarray): Contiguous state vector.
+        positions (list[list[int]]): Bit-locations of the qubits of each quantum register the gate acts upon.
+        ctrl_positions (list[int]): Bit-locations of the control qubits.
+    """
+    if isinstance(gate, QFTGate) or _is_inverse_qft(gate):
+        apply_qft(state, positions[0], ctrl_positions, inverse=not isinstance(gate, QFTGate))
+    elif isinstance(gate, StatePreparation):
+        if len(positions) != 1:
+            raise ValueError('StatePreparation does not support multiple quantum registers!')
+        if len(gate.final_state) != 2 ** len(positions[0]):
+            raise ValueError("Length of final_state is invalid.")
+        norm = sum(abs(amplitude) ** 2 for amplitude in gate.final_state)
+        if norm < 1 - 1e-10 or norm > 1 + 1e-10:
+            raise ValueError("final_state is not normalized.")
+        apply_state_preparation(state, gate.final_state, positions[0], ctrl_positions)
+    else:
+        if not (len(positions) == 2 and len(positions[1]) == 1):
+            raise TypeError("Wrong number of qubits ")
+        if not len(gate.angles) == 2 ** len(positions[0]):
+            raise ValueError("Wrong len(angles).")
+        gate_name = 'Ry' if isinstance(gate, UniformlyControlledRy) else 'Rz'
+        apply_uniformly_controlled(
+            state, rotation_matrices(gate_name, gate.angles), positions[0], positions[1][0], ctrl_positions
+        )
+
+def _register_gate_matrix(gate, qubits):
+    """
+    Return the dense matrix of a register gate (see _is_register_gate).
+
+    Args:
+        gate: Register gate.
+        qubits (tuple[Qureg]): Quantum registers the gate acts upon; bit i of a row/column index of the matrix
+            corresponds to the i-th qubit of the flattened registers.
+    """
+    positions = []
+    num_qubits = 0
+    for qureg in qubits:
+        positions.append(list(range(num_qubits, num_qubits + len(qureg))))
+        num_qubits += len(qureg)
+    columns = []
+    for col in range(1 << num_qubits):
+        column = np.zeros(1 << num_qubits, dtype=np.complex128)
+        column[col] = 1.0
+        _emulate_register_gate(gate, column, positions, [])
+        columns.append(column)
+    return np.array(columns).T
+
+def _gate_fingerprint(gate):
+    """
+    Return a string identifying the action of a gate for the digests of the prefix cache.
+
+    Gates are identified by their exact data (e.g., the bytes of their matrix) rather than by their string
+    representation, which need not be unique (e.g., for StatePreparation).
+
+    Returns:
+        The fingerprint, or None if the gate cannot be told apart from other gates.
+    """
+    if gate == Allocate or gate == Deallocate or isinstance(gate, QFTGate) or _is_inverse_qft(gate):
+        return str(gate)
+    if isinstance(gate, BasicMathGate):
+        # plain math gates cannot be told apart
+        return str(gate) if type(gate).__str__ is not BasicMathGate.__str__ else None
+    if isinstance(gate, TimeEvolution):
+        return repr((gate.time, sorted(gate.hamiltonian.terms.items())))
+    if isinstance(gate, StatePreparation):
+        data = gate.final_state
+    elif isinstance(gate, (UniformlyControlledRy, UniformlyControlledRz)):
+        data = gate.angles
+    else:
+        try:
+            data = gate.matrix
+        except (AttributeError, NotImplementedError):
+            return None
+    try:
+        data = np.asarray(data, dtype=np.complex128)
+    except (TypeError, ValueError):  # e.g., symbolic parameters
+        return None
+    return '{}:{}'.format(data.shape, data.tobytes().hex())
+
+class _AdjointTapeEntry:  # pylint: disable=too-few-public-methods
+    """Unitary applied by the simulator while recording an adjoint region."""
+
+    def __init__(self, matrix, ids, ctrlids, generator=None):
+        self.matrix = matrix
+        self.ids = ids
+        self.ctrlids = ctrlids
+        self.generator = generator
+
 class Simulator(BasicEngine):
     """
     Simulator is a compiler engine which simulates a quantum computer using C++-based kernels.
@@ -62,7 +210,7 @@ class Simulator(BasicEngine):
         export OMP_PROC_BIND=spread # bind threads to processors by spreading
     """
 
-    def __init__(self, gate_fusion=False, rnd_seed=None):
+    def __init__(self, gate_fusion=False, rnd_seed=None, prefix_cache_size=None):
         """
         Construct the C++/Python-simulator object and initialize it with a random seed.
 
@@ -70,6 +218,8 @@ class Simulator(BasicEngine):
             gate_fusion (bool): If True, gates are cached and only executed once a certain gate-size has been reached
                 (only has an effect for the c++ simulator).
             rnd_seed (int): Random seed (uses random.randint(0, 4294967295) by default).
+            prefix_cache_size (int): If not None, enables the prefix cache (see checkpoint()) and limits the memory
+                used by the cached state vectors to this number of bytes.
 
         Example of gate_fusion: Instead of applying a Hadamard gate to 5 qubits, the simulator calculates the
         kronecker product of the 1-qubit gate matrices and then applies one 5-qubit gate. This increases operational
@@ -89,13 +239,20 @@ class Simulator(BasicEngine):
         super().__init__()
         self._simulator = SimulatorBackend(rnd_seed)
         self._gate_fusion = gate_fusion
+        self._adjoint_tape = None
+        self._adjoint_recording = False
+        self.prefix_cache = PrefixCache(prefix_cache_size) if prefix_cache_size is not None else None
+        self._pending = []
+        self._reset_stream()
 
     def is_available(self, cmd):
         """
         Test whether a Command is supported by a compiler engine.
 
         Specialized implementation of is_available: The simulator can deal with all arbitrarily-controlled gates which
-        provide a gate-matrix (via gate.matrix) and acts on 5 or less qubits (not counting the control qubits).
+        provide a gate-matrix (via gate.matrix) and acts on 5 or less qubits (not counting the control qubits). In
+        addition, the (controlled) QFT and its inverse, StatePreparation as well as UniformlyControlledRy/Rz gates are
+        emulated directly, regardless of the number of qubits.
 
         Args:
             cmd (Command): Command for which to check availability (single- qubit gate, arbitrary controls)
@@ -111,6 +268,7 @@ class Simulator(BasicEngine):
             or cmd.gate == Allocate
             or cmd.gate == Deallocate
             or isinstance(cmd.gate, (BasicMathGate, TimeEvolution))
+            or _is_register_gate(cmd.gate)
         ):
             return True
         try:
@@ -166,6 +324,7 @@ class Simulator(BasicEngine):
             Exception: If `qubit_operator` acts on more qubits than present in the `qureg` argument.
         """
         qureg = self._convert_logical_to_mapped_qureg(qureg)
+        self._materialize()
         num_qubits = len(qureg)
         for term, _ in qubit_operator.terms.items():
             if not term == () and term[-1][0] >= num_qubits:
@@ -198,6 +357,8 @@ class Simulator(BasicEngine):
             mapped qubits for the qureg argument.
         """
         qureg = self._convert_logical_to_mapped_qureg(qureg)
+        self._materialize()
+        self._stream_digest = None
         num_qubits = len(qureg)
         for term, _ in qubit_operator.terms.items():
             if not term == () and term[-1][0] >= num_qubits:
@@ -225,6 +386,7 @@ class Simulator(BasicEngine):
             mapped qubits for the qureg argument.
         """
         qureg = self._convert_logical_to_mapped_qureg(qureg)
+        self._materialize()
         bit_string = [bool(int(b)) for b in bit_string]
         return self._simulator.get_probability(bit_string, [qb.id for qb in qureg])
 
@@ -251,6 +413,7 @@ class Simulator(BasicEngine):
             mapped qubits for the qureg argument.
         """
         qureg = self._convert_logical_to_mapped_qureg(qureg)
+        self._materialize()
         bit_string = [bool(int(b)) for b in bit_string]
         return self._simulator.get_amplitude(bit_string, [qb.id for qb in qureg])
 
@@ -278,6 +441,8 @@ class Simulator(BasicEngine):
             the qureg argument.
         """
         qureg = self._convert_logical_to_mapped_qureg(qureg)
+        self._materialize()
+        self._stream_digest = None
         self._simulator.set_wavefunction(wavefunction, [qb.id for qb in qureg])
 
     def collapse_wavefunction(self, qureg, values):
@@ -303,6 +468,8 @@ class Simulator(BasicEngine):
             the qureg argument.
         """
         qureg = self._convert_logical_to_mapped_qureg(qureg)
+        self._materialize()
+        self._stream_digest = None
         return self._simulator.collapse_wavefunction([qb.id for qb in qureg], [bool(int(v)) for v in values])
 
     def cheat(self):
@@ -326,8 +493,265 @@ class Simulator(BasicEngine):
             DOES NOT automatically convert from logical qubits to mapped
             qubits.
         """
+        self._materialize()
         return self._simulator.cheat()
 
+    def start_adjoint_recording(self):
+        """
+        Start recording an adjoint region for the computation of gradients.
+
+        All gates which are simulated from now on (until stop_adjoint_recording() is called) are recorded. The
+        parametrized ones (Rx, Ry, Rz, Rxx, Ryy, Rzz, Ph, R and TimeEvolution) are the parameters with respect to which
+        get_adjoint_gradients() differentiates.
+
+        Example:
+            .. code-block:: python
+
+                sim = Simulator()
+                eng = MainEngine(sim)
+                qureg = eng.allocate_qureg(2)
+                eng.flush()
+                sim.start_adjoint_recording()
+                Ry(0.3) | qureg[0]
+                CNOT | (qureg[0], qureg[1])
+                Rx(0.7) | qureg[1]
+                eng.flush()
+                sim.stop_adjoint_recording()
+                # d<H>/d(0.3) and d<H>/d(0.7):
+                gradients = sim.get_adjoint_gradients(QubitOperator('Z0 Z1'), qureg)
+
+        Note:
+            Make sure all previous commands have passed through the compilation chain (call main_engine.flush() to
+            make sure) before starting and before stopping the recording. Qubits may not be allocated, deallocated
+            or measured inside an adjoint region.
+        """
+        self._materialize()
+        self._adjoint_tape = []
+        self._adjoint_recording = True
+
+    def stop_adjoint_recording(self):
+        """
+        Stop recording the adjoint region started by start_adjoint_recording().
+
+        The recorded region remains available to get_adjoint_gradients() until the next gate is simulated.
+        """
+        self._materialize()
+        self._adjoint_recording = False
+
+    def _record_adjoint(self, cmd):
+        """
+        Record a unitary command on the adjoint tape (or drop the tape if it is no longer valid).
+
+        Args:
+            cmd (Command): Command which is being simulated.
+
+        Raises:
+            RuntimeError: If the command cannot be recorded (e.g., measurements or allocations).
+        """
+        if not self._adjoint_recording:
+            # the state no longer corresponds to the end of the recorded region
+            self._adjoint_tape = None
+            return
+        if cmd.gate == Measure or cmd.gate == Allocate or cmd.gate == Deallocate or isinstance(cmd.gate, BasicMathGate):
+            raise RuntimeError(
+                "Simulator: {} is not supported inside an adjoint region. Allocate qubits before calling "
+                "start_adjoint_recording().".format(str(cmd.gate))
+            )
+        ids = [qb.id for qureg in cmd.qubits for qb in qureg]
+        ctrlids = [qb.id for qb in cmd.control_qubits]
+        generator = None
+        if isinstance(cmd.gate, TimeEvolution):
+            generator = operator_matrix(cmd.gate.hamiltonian.terms, len(ids))
+            eigvals, eigvecs = np.linalg.eigh(generator)
+            matrix = (eigvecs * np.exp(-1j * cmd.gate.time * eigvals)) @ eigvecs.conj().T
+        elif _is_register_gate(cmd.gate):
+            matrix = _register_gate_matrix(cmd.gate, cmd.qubits)
+        else:
+            matrix = np.asarray(cmd.gate.matrix, dtype=np.complex128)
+            generator = _ADJOINT_GENERATORS.get(type(cmd.gate))
+        self._adjoint_tape.append(_AdjointTapeEntry(matrix, ids, ctrlids, generator))
+
+    def get_adjoint_gradients(self, qubit_operator, qureg):
+        """
+        Return the gradient of the expectation value of qubit_operator with respect to all recorded gate parameters.
+
+        The gradients are obtained using adjoint differentiation: starting from the current wave function (which has
+        to be the one at the end of the adjoint region), the recorded gates are undone one by one while
+        simultaneously propagating H|psi> backwards. This requires a single backward pass over the adjoint region
+        instead of two full simulations per parameter (parameter-shift rule).
+
+        Args:
+            qubit_operator (divya.ops.QubitOperator): Hermitian operator H whose expectation value to differentiate.
+            qureg (list[Qubit],Qureg): Quantum bits to which the operator refers.
+
+        Returns:
+            List of floats containing d<H>/d(parameter) for each parametrized gate of the adjoint region in the order
+            in which the gates were simulated. The parameter of a rotation or phase gate is its angle, the one of a
+            TimeEvolution gate its time.
+
+        Raises:
+            RuntimeError: If no adjoint region was recorded or if gates were simulated after the end of the region.
+            Exception: If `qubit_operator` acts on more qubits than present in the `qureg` argument.
+
+        Note:
+            If there is a mapper present in the compiler, this function automatically converts from logical qubits to
+            mapped qubits for the qureg argument.
+        """
+        if self._adjoint_tape is None:
+            raise RuntimeError(
+                "get_adjoint_gradients(): No adjoint region available. Call start_adjoint_recording() and "
+                "stop_adjoint_recording() around the gates to differentiate."
+            )
+        qureg = self._convert_logical_to_mapped_qureg(qureg)
+        self._materialize()
+        for term, _ in qubit_operator.terms.items():
+            if not term == () and term[-1][0] >= len(qureg):
+                raise Exception("qubit_operator acts on more qubits than contained in the qureg.")
+        mapping, psi = get_state(self._simulator)
+        phi = apply_operator(psi, qubit_operator.terms, [mapping[qb.id] for qb in qureg])
+
+        gradients = []
+        for entry in reversed(self._adjoint_tape):
+            positions = [mapping[qubit_id] for qubit_id in entry.ids]
+            ctrl_positions = [mapping[qubit_id] for qubit_id in entry.ctrlids]
+            if entry.generator is not None:
+                # d<H>/dtheta = 2 Im <phi| K |psi> on the subspace where all controls are 1
+                psi_view, axis = controlled_view(psi, ctrl_positions)
+                phi_view, _ = controlled_view(phi, ctrl_positions)
+                k_psi = apply_to_view(psi_view, entry.generator, [axis(pos) for pos in positions])
+                gradients.append(2.0 * np.vdot(phi_view, k_psi).imag)
+            inverse = entry.matrix.conj().T
+            apply_matrix(psi, inverse, positions, ctrl_positions)
+            apply_matrix(phi, inverse, positions, ctrl_positions)
+        gradients.reverse()
+        return gradients
+
+    def checkpoint(self):
+        """
+        Mark a checkpoint of the prefix cache.
+
+        The prefix cache (enabled using the prefix_cache_size argument of the constructor) identifies the command stream
+        executed since the simulator was last empty (i.e., had no qubits allocated) by an incrementally updated digest.
+        Qubits are identified by the order of their allocation, i.e., the digest does not depend on the qubit IDs. At a
+        checkpoint, the current state vector is stored unless a state for the same command stream has been stored
+        before, in which case that state is restored instead.
+
+        While the commands received by the simulator form a prefix of the command stream of a cached checkpoint, they
+        are not executed right away. Once the checkpoint is reached, the cached state is restored and the prefix is
+        skipped. If the command stream diverges (or the state is accessed), the deferred commands are executed.
+
+        Example:
+            .. code-block:: python
+
+                sim = Simulator(prefix_cache_size=2**30)
+                eng = MainEngine(sim)
+                for angle in angles:
+                    qureg = eng.allocate_qureg(10)
+                    prepare_reference_state(qureg)  # shared, expensive prefix
+                    eng.flush()
+                    sim.checkpoint()
+                    Rx(angle) | qureg[0]
+                    ...
+                    All(Measure) | qureg
+                    del qureg
+
+        Returns:
+            True if the state was restored from the cache and False otherwise.
+
+        Raises:
+            RuntimeError: If the prefix cache is not enabled.
+
+        Note:
+            Make sure all previous commands have passed through the compilation chain (call main_engine.flush() to
+            make sure). Measurements, as well as calls to set_wavefunction(), collapse_wavefunction() and
+            apply_qubit_operator(), disable the cache until all qubits have been deallocated.
+        """
+        if self.prefix_cache is None:
+            raise RuntimeError("checkpoint(): The prefix cache is disabled. Use Simulator(prefix_cache_size=...).")
+        if self._stream_digest is None:
+            self._materialize()
+            return False
+        snapshot = self.prefix_cache.lookup(self._stream_digest)
+        if snapshot is not None:
+            state, labels = snapshot
+            qubit_ids = {label: qubit_id for qubit_id, label in self._stream_labels.items()}
+            self._pending = []
+            self._simulator.set_wavefunction(state, [qubit_ids[label] for label in labels])
+            return True
+        self._materialize()
+        mapping, state = get_state(self._simulator)
+        labels = [self._stream_labels[qubit_id] for qubit_id in sorted(mapping, key=mapping.get)]
+        self.prefix_cache.store(self._stream_digest, state, labels, list(self._stream_prefix))
+        return False
+
+    def _reset_stream(self):
+        """Start a new command stream for the prefix cache (the simulator is empty)."""
+        self._stream_digest = EMPTY_DIGEST
+        self._stream_prefix = []
+        self._stream_labels = {}
+        self._stream_allocated = set()
+
+    def _update_stream(self, cmd):
+        """
+        Update the digest of the command stream with a command.
+
+        Args:
+            cmd (Command): Command which is being simulated.
+
+        Returns:
+            True if the execution of the command may be deferred.
+        """
+        if self._stream_digest is None:
+            return False
+        fingerprint = _gate_fingerprint(cmd.gate) if cmd.gate != Measure else None
+        if fingerprint is None:
+            # measurement outcomes are random and some gates (e.g., plain math gates) cannot be told apart
+            self._stream_digest = None
+            return False
+        if cmd.gate == Allocate:
+            self._stream_labels[cmd.qubits[0][0].id] = len(self._stream_labels)
+        try:
+            qubit_labels = tuple(tuple(self._stream_labels[qb.id] for qb in qureg) for qureg in cmd.qubits)
+            ctrl_labels = tuple(self._stream_labels[qb.id] for qb in cmd.control_qubits)
+        except KeyError:
+            # qubit allocated before the prefix cache was tracking the command stream
+            self._stream_digest = None
+            return False
+        signature = repr((type(cmd.gate).__name__, fingerprint, qubit_labels, ctrl_labels))
+        self._stream_digest = PrefixCache.extend_digest(self._stream_digest, signature)
+        self._stream_prefix.append(self._stream_digest)
+        return cmd.gate != Deallocate
+
+    def _materialize(self):
+        """Execute all commands whose execution was deferred by the prefix cache."""
+        if self._pending:
+            pending, self._pending = self._pending, []
+            for cmd in pending:
+                self._handle(cmd)
+
+    def _handle_with_prefix_cache(self, cmd):
+        """
+        Handle a command while keeping track of the command stream for the prefix cache.
+
+        Args:
+            cmd (Command): Command to handle.
+        """
+        deferrable = self._update_stream(cmd)
+        if cmd.gate == Allocate:
+            # allocations commute with all deferred commands
+            self._stream_allocated.add(cmd.qubits[0][0].id)
+            self._handle(cmd)
+            return
+        if deferrable and self._stream_digest is not None and self.prefix_cache.is_prefix(self._stream_digest):
+            self._pending.append(cmd)
+            return
+        self._materialize()
+        self._handle(cmd)
+        if cmd.gate == Deallocate:
+            self._stream_allocated.discard(cmd.qubits[0][0].id)
+            if not self._stream_allocated:
+                self._reset_stream()
+
     def _handle(self, cmd):  # pylint: disable=too-many-branches,too-many-locals,too-many-statements
         """
         Handle all commands.
@@ -342,6 +766,8 @@ class Simulator(BasicEngine):
             Exception: If a non-single-qubit gate needs to be processed (which should never happen due to
                 is_available).
         """
+        if self._adjoint_tape is not None:
+            self._record_adjoint(cmd)
         if cmd.gate == Measure:
             if get_control_count(cmd) != 0:
                 raise ValueError('Cannot have control qubits with a measurement gate!')
@@ -408,6 +834,15 @@ class Simulator(BasicEngine):
             qubitids = [qb.id for qb in cmd.qubits[0]]
             ctrlids = [qb.id for qb in cmd.control_qubits]
             self._simulator.emulate_time_evolution(op, time, qubitids, ctrlids)
+        elif _is_register_gate(cmd.gate):
+            mapping, state = get_state(self._simulator)
+            _emulate_register_gate(
+                cmd.gate,
+                state,
+                [[mapping[qb.id] for qb in qureg] for qureg in cmd.qubits],
+                [mapping[qb.id] for qb in cmd.control_qubits],
+            )
+            set_state(self._simulator, mapping, state)
         elif len(cmd.gate.matrix) <= 2**5:
             matrix = cmd.gate.matrix
             ids = [qb.id for qureg in cmd.qubits for qb in qureg]
@@ -441,7 +876,10 @@ class Simulator(BasicEngine):
         """
         for cmd in command_list:
             if not cmd.gate == FlushGate():
-                self._handle(cmd)
+                if self.prefix_cache is not None:
+                    self._handle_with_prefix_cache(cmd)
+                else:
+                    self._handle(cmd)
             else:
                 self._simulator.run()  # flush gate --> run all saved gates
             if not self.is_last_engine:
@@ -37,6 +37,7 @@ import scipy.sparse.linalg
 
 from divya import MainEngine
 from divya.backends import Simulator
+from divya.backends._sim._prefix_cache import PrefixCache
 from divya.cengines import (
     BasicMapperEngine,
     DummyEngine,
@@ -54,16 +55,24 @@ from divya.ops import (
     H,
     MatrixGate,
     Measure,
+    Ph,
+    QFT,
+    QFTGate,
     QubitOperator,
     Rx,
     Ry,
     Rz,
+    Rzz,
     S,
+    StatePreparation,
     TimeEvolution,
     Toffoli,
+    UniformlyControlledRy,
+    UniformlyControlledRz,
     X,
     Y,
     Z,
+    get_inverse,
 )
 from divya.types import WeakQubitRef
 
@@ -555,6 +564,336 @@ def test_simulator_time_evolution(sim):
     assert numpy.allclose(hadamard_f * res, final_wavefunction[half:])
     assert numpy.allclose(final_wavefunction[:half], hadamard_f * init_wavefunction)
 
+def _adjoint_circuit(eng, qureg, angles):
+    Ry(angles[0]) | qureg[0]
+    H | qureg[1]
+    CNOT | (qureg[0], qureg[1])
+    Rx(angles[1]) | qureg[1]
+    with Control(eng, qureg[1]):
+        Rz(angles[2]) | qureg[2]
+        Ph(angles[3]) | qureg[0]
+    Rzz(angles[4]) | (qureg[0], qureg[2])
+    TimeEvolution(angles[5], QubitOperator('X0 Y2', 0.5) + QubitOperator('Z1')) | qureg
+
+
+def test_simulator_adjoint_gradients(sim, mapper):
+    engine_list = []
+    if mapper is not None:
+        engine_list.append(mapper)
+    eng = MainEngine(sim, engine_list=engine_list)
+    qureg = eng.allocate_qureg(3)
+    hamiltonian = QubitOperator('Z0 X2', 0.7) + QubitOperator('Y1', -0.3) + QubitOperator('X0 X1 Z2')
+    angles = [0.3, 1.1, -0.4, 0.8, 2.1, 0.45]
+    eng.flush()
+
+    sim.start_adjoint_recording()
+    _adjoint_circuit(eng, qureg, angles)
+    eng.flush()
+    sim.stop_adjoint_recording()
+    gradients = sim.get_adjoint_gradients(hamiltonian, qureg)
+    All(Measure) | qureg
+
+    # compare to central finite differences
+    eps = 1e-6
+    assert len(gradients) == len(angles)
+    for i, gradient in enumerate(gradients):
+        energies = []
+        for shift in (eps, -eps):
+            shifted_angles = list(angles)
+            shifted_angles[i] += shift
+            qureg = eng.allocate_qureg(3)
+            _adjoint_circuit(eng, qureg, shifted_angles)
+            eng.flush()
+            energies.append(sim.get_expectation_value(hamiltonian, qureg))
+            All(Measure) | qureg
+        assert gradient == pytest.approx((energies[0] - energies[1]) / (2 * eps), abs=1e-6)
+
+
+def test_simulator_adjoint_gradients_keeps_state(sim):
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(2)
+    eng.flush()
+    sim.start_adjoint_recording()
+    Ry(0.5) | qureg[0]
+    CNOT | (qureg[0], qureg[1])
+    eng.flush()
+    sim.stop_adjoint_recording()
+    state_before = numpy.array(sim.cheat()[1])
+    gradients = sim.get_adjoint_gradients(QubitOperator('Z1'), qureg)
+    assert gradients == pytest.approx([-math.sin(0.5)])
+    assert numpy.allclose(sim.cheat()[1], state_before)
+    All(Measure) | qureg
+
+
+def test_simulator_adjoint_gradients_exceptions(sim):
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(2)
+    eng.flush()
+    with pytest.raises(RuntimeError):
+        sim.get_adjoint_gradients(QubitOperator('Z0'), qureg)
+
+    sim.start_adjoint_recording()
+    Rx(0.1) | qureg[0]
+    eng.flush()
+    sim.stop_adjoint_recording()
+    with pytest.raises(Exception):
+        sim.get_adjoint_gradients(QubitOperator('Z2'), qureg)
+    # simulating further gates invalidates the recorded region
+    X | qureg[0]
+    eng.flush()
+    with pytest.raises(RuntimeError):
+        sim.get_adjoint_gradients(QubitOperator('Z0'), qureg)
+
+    sim.start_adjoint_recording()
+    with pytest.raises(RuntimeError):
+        Measure | qureg[0]
+        eng.flush()
+    sim.stop_adjoint_recording()
+
+
+def _prefix_cache_prefix(qureg):
+    H | qureg[0]
+    CNOT | (qureg[0], qureg[1])
+    Ry(0.3) | qureg[2]
+    Toffoli | (qureg[0], qureg[2], qureg[1])
+
+
+def test_simulator_prefix_cache(sim):
+    sim.prefix_cache = PrefixCache(2**20)
+    eng = MainEngine(sim, [])
+    amplitudes = []
+    num_hits = []
+    for angle in (0.5, 1.5, 1.5):
+        qureg = eng.allocate_qureg(3)
+        _prefix_cache_prefix(qureg)
+        eng.flush()
+        sim.checkpoint()
+        Rx(angle) | qureg[1]
+        eng.flush()
+        amplitudes.append(numpy.abs([sim.get_amplitude(bits, qureg) for bits in ('000', '110', '011', '111')]))
+        All(Measure) | qureg
+        eng.flush(deallocate_qubits=True)
+        num_hits.append(sim.prefix_cache.hits)
+    assert num_hits == [0, 1, 2]
+    assert sim.prefix_cache.misses == 1
+    assert len(sim.prefix_cache) == 1
+    assert numpy.allclose(amplitudes[1], amplitudes[2])
+
+    qureg = eng.allocate_qureg(3)
+    _prefix_cache_prefix(qureg)
+    Rx(1.5) | qureg[1]
+    eng.flush()
+    # amplitudes are compared up to the global phase left behind by the previous runs
+    assert numpy.allclose(
+        numpy.abs([sim.get_amplitude(bits, qureg) for bits in ('000', '110', '011', '111')]), amplitudes[1]
+    )
+    All(Measure) | qureg
+
+
+def test_simulator_prefix_cache_skips_prefix(sim, monkeypatch):
+    sim.prefix_cache = PrefixCache(2**20)
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(3)
+    _prefix_cache_prefix(qureg)
+    eng.flush()
+    assert not sim.checkpoint()
+    All(Measure) | qureg
+    eng.flush(deallocate_qubits=True)
+
+    applied = []
+    apply_controlled_gate = sim._simulator.apply_controlled_gate
+
+    def counting_apply(*args):
+        applied.append(args)
+        return apply_controlled_gate(*args)
+
+    monkeypatch.setattr(sim._simulator, "apply_controlled_gate", counting_apply)
+    qureg = eng.allocate_qureg(3)
+    _prefix_cache_prefix(qureg)
+    eng.flush()
+    assert len(applied) == 0
+    assert sim.checkpoint()
+    assert len(applied) == 0
+    probability = sim.get_probability('1', [qureg[0]])
+    assert probability == pytest.approx(0.5)
+    All(Measure) | qureg
+    eng.flush(deallocate_qubits=True)
+
+    # a diverging command stream executes the deferred commands
+    qureg = eng.allocate_qureg(3)
+    H | qureg[0]
+    CNOT | (qureg[0], qureg[1])
+    eng.flush()
+    assert len(applied) == 0
+    X | qureg[2]
+    eng.flush()
+    assert len(applied) == 3
+    assert not sim.checkpoint()
+    assert sim.get_probability('11', [qureg[1], qureg[2]]) == pytest.approx(0.5)
+    All(Measure) | qureg
+
+
+def test_simulator_prefix_cache_measurement_disables_cache(sim):
+    sim.prefix_cache = PrefixCache(2**20)
+    eng = MainEngine(sim, [])
+    for _ in range(2):
+        qureg = eng.allocate_qureg(2)
+        H | qureg[0]
+        Measure | qureg[0]
+        eng.flush()
+        assert not sim.checkpoint()
+        All(Measure) | qureg
+        eng.flush(deallocate_qubits=True)
+    assert len(sim.prefix_cache) == 0
+
+
+def test_simulator_prefix_cache_distinguishes_gate_data(sim):
+    sim.prefix_cache = PrefixCache(2**20)
+    eng = MainEngine(sim, [])
+    for final_state, bits in (([1, 0, 0, 0], '00'), ([0, 0, 0, 1], '11')):
+        qureg = eng.allocate_qureg(2)
+        StatePreparation(final_state) | qureg
+        eng.flush()
+        sim.checkpoint()
+        assert sim.get_probability(bits, qureg) == pytest.approx(1)
+        All(Measure) | qureg
+        eng.flush(deallocate_qubits=True)
+    assert sim.prefix_cache.hits == 0
+
+    class MatrixOnlyGate(BasicGate):
+        @property
+        def matrix(self):
+            return numpy.array([[0, 1], [1, 0]])
+
+    for _ in range(2):
+        qubit = eng.allocate_qubit()
+        MatrixOnlyGate() | qubit
+        eng.flush()
+        sim.checkpoint()
+        assert sim.get_probability('1', qubit) == pytest.approx(1)
+        Measure | qubit
+        eng.flush(deallocate_qubits=True)
+    assert sim.prefix_cache.hits == 1
+
+
+def test_simulator_prefix_cache_disabled():
+    sim = Simulator()
+    with pytest.raises(RuntimeError):
+        sim.checkpoint()
+
+
+def test_simulator_qft_emulation(sim):
+    from divya.cengines import AutoReplacer, DecompositionRuleSet, InstructionFilter
+    from divya.setups.decompositions import qft2crandhadamard
+
+    def no_qft(eng, cmd):
+        return not isinstance(cmd.gate, QFTGate) and not isinstance(get_inverse(cmd.gate), QFTGate)
+
+    reference = Simulator()
+    ref_eng = MainEngine(
+        reference,
+        [AutoReplacer(DecompositionRuleSet(modules=[qft2crandhadamard])), InstructionFilter(no_qft)],
+    )
+    eng = MainEngine(sim, [])
+    assert sim.is_available(Command(None, QFT, qubits=([WeakQubitRef(None, 0)] * 7,)))
+    assert sim.is_available(Command(None, get_inverse(QFT), qubits=([WeakQubitRef(None, 0)] * 7,)))
+
+    rng = numpy.random.RandomState(42)
+    wavefunction = rng.randn(32) + 1j * rng.randn(32)
+    wavefunction /= numpy.linalg.norm(wavefunction)
+    quregs = []
+    for engine in (eng, ref_eng):
+        qureg = engine.allocate_qureg(5)
+        engine.flush()
+        engine.backend.set_wavefunction(wavefunction, qureg)
+        QFT | qureg[1:4]
+        with Control(engine, qureg[4]):
+            QFT | [qureg[3], qureg[0], qureg[2]]
+        with Dagger(engine):
+            QFT | qureg[:3]
+        with Control(engine, qureg[0]):
+            get_inverse(QFT) | qureg[1:]
+        engine.flush()
+        quregs.append(qureg)
+    for i in range(32):
+        bits = [(i >> j) & 1 for j in range(5)]
+        assert sim.get_amplitude(bits, quregs[0]) == pytest.approx(reference.get_amplitude(bits, quregs[1]))
+    for qureg in quregs:
+        All(Measure) | qureg
+
+
+def test_simulator_register_gate_emulation(sim):
+    from divya.cengines import AutoReplacer, DecompositionRuleSet, InstructionFilter
+    from divya.setups.decompositions import stateprep2cnot, uniformlycontrolledr2cnot
+
+    register_gates = (StatePreparation, UniformlyControlledRy, UniformlyControlledRz)
+
+    def no_register_gates(eng, cmd):
+        return not isinstance(cmd.gate, register_gates)
+
+    reference = Simulator()
+    ref_eng = MainEngine(
+        reference,
+        [
+            AutoReplacer(DecompositionRuleSet(modules=[stateprep2cnot, uniformlycontrolledr2cnot])),
+            InstructionFilter(no_register_gates),
+        ],
+    )
+    eng = MainEngine(sim, [])
+    qb = WeakQubitRef(None, 0)
+    assert sim.is_available(Command(None, StatePreparation([0.6, 0.8]), qubits=([qb],)))
+    assert sim.is_available(Command(None, UniformlyControlledRy([0.1] * 8), qubits=([qb] * 3, [qb])))
+    assert sim.is_available(Command(None, UniformlyControlledRz([0.1] * 8), qubits=([qb] * 3, [qb])))
+
+    rng = numpy.random.RandomState(7)
+    wavefunction = rng.randn(32) + 1j * rng.randn(32)
+    wavefunction /= numpy.linalg.norm(wavefunction)
+    final_state = rng.randn(8) + 1j * rng.randn(8)
+    final_state = list(final_state / numpy.linalg.norm(final_state))
+    quregs = []
+    for engine in (eng, ref_eng):
+        qureg = engine.allocate_qureg(5)
+        engine.flush()
+        engine.backend.set_wavefunction(wavefunction, qureg)
+        UniformlyControlledRy([0.3, -1.1, 2.0, 0.4]) | ([qureg[0], qureg[3]], qureg[2])
+        with Control(engine, qureg[1]):
+            UniformlyControlledRz([1.5, -0.2]) | ([qureg[4]], qureg[0])
+        StatePreparation(final_state) | [qureg[4], qureg[1], qureg[2]]
+        with Control(engine, qureg[3]):
+            StatePreparation([0.6, 0.8j]) | qureg[0]
+        engine.flush()
+        quregs.append(qureg)
+    for i in range(32):
+        bits = [(i >> j) & 1 for j in range(5)]
+        assert sim.get_amplitude(bits, quregs[0]) == pytest.approx(reference.get_amplitude(bits, quregs[1]))
+    for qureg in quregs:
+        All(Measure) | qureg
+    eng.flush(deallocate_qubits=True)
+
+    # a register in |0...0> gets the final state (up to the global phase left behind by the measurements)
+    qureg = eng.allocate_qureg(3)
+    StatePreparation(final_state) | qureg
+    eng.flush()
+    amplitudes = [sim.get_amplitude([(i >> j) & 1 for j in range(3)], qureg) for i in range(8)]
+    overlap = abs(numpy.vdot(final_state, amplitudes))
+    assert overlap == pytest.approx(1.0)
+    All(Measure) | qureg
+
+
+def test_simulator_register_gate_emulation_exceptions(sim):
+    eng = MainEngine(sim, [])
+    qureg = eng.allocate_qureg(3)
+    with pytest.raises(ValueError):
+        StatePreparation([0.6, 0.8]) | qureg
+    with pytest.raises(ValueError):
+        StatePreparation([0.6, 0.6, 0.0, 0.0]) | qureg[:2]
+    with pytest.raises(ValueError):
+        UniformlyControlledRy([0.1, 0.2]) | (qureg[:2], qureg[2])
+    with pytest.raises(TypeError):
+        UniformlyControlledRz([0.1, 0.2]) | (qureg[:1], qureg[1:])
+    All(Measure) | qureg
+
+
 def test_simulator_set_wavefunction(sim, mapper):
     engine_list = [LocalOptimizer()]
     if mapper is not None:
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+NumPy helpers operating directly on a state vector.
+
+These are used by the Simulator for features which are implemented on top of the (Python or C++) simulator backend,
+i.e., which read the wave function using cheat(), transform it and write it back using set_wavefunction(). The bit
+ordering follows the one of the simulator backends: the qubit at bit-location `pos` contributes `2**pos` to the index
+of an amplitude.
+"""
+
+import numpy as np
+
+_PAULI_MATRICES = {
+    'X': np.array([[0, 1], [1, 0]], dtype=np.complex128),
+    'Y': np.array([[0, -1j], [1j, 0]], dtype=np.complex128),
+    'Z': np.array([[1, 0], [0, -1]], dtype=np.complex128),
+}
+
+
+def get_state(backend):
+    """
+    Return a copy of the wave function of a simulator backend together with its qubit ordering.
+
+    Args:
+        backend: Python or C++ simulator backend (i.e., Simulator._simulator)
+
+    Returns:
+        A tuple (mapping, state) where mapping is a dictionary mapping qubit IDs to bit-locations and state is a
+        (contiguous) numpy array containing a copy of the state vector.
+    """
+    mapping, state = backend.cheat()
+    return dict(mapping), np.array(state, dtype=np.complex128)
+
+
+def set_state(backend, mapping, state):
+    """
+    Write a wave function back into a simulator backend.
+
+    Args:
+        backend: Python or C++ simulator backend (i.e., Simulator._simulator)
+        mapping (dict): Dictionary mapping qubit IDs to bit-locations (as returned by get_state).
+        state (numpy.ndarray): New state vector.
+    """
+    ordering = sorted(mapping, key=mapping.get)
+    backend.set_wavefunction(state, ordering)
+
+
+def controlled_view(state, ctrl_positions):
+    """
+    Return a view onto the part of the state vector where all control qubits are in state 1.
+
+    Args:
+        state (numpy.ndarray): Contiguous state vector.
+        ctrl_positions (list[int]): Bit-locations of the control qubits.
+
+    Returns:
+        A tuple (view, axis) where view is a tensor view (one axis of dimension 2 per non-control qubit) and axis is a
+        function returning the axis of the view which corresponds to a given (non-control) bit-location.
+    """
+    num_qubits = state.size.bit_length() - 1
+    ctrl_positions = set(ctrl_positions)
+    index = [slice(None)] * num_qubits
+    for pos in ctrl_positions:
+        index[num_qubits - 1 - pos] = 1
+    view = state.reshape((2,) * num_qubits)[tuple(index)]
+    free = [pos for pos in range(num_qubits) if pos not in ctrl_positions]
+
+    def axis(pos):
+        return sum(1 for other in free if other > pos)
+
+    return view, axis
+
+
+def apply_to_view(view, matrix, axes):
+    """
+    Return the result of applying a k-qubit matrix to a tensor view of a state vector.
+
+    Args:
+        view (numpy.ndarray): Tensor view as returned by controlled_view.
+        matrix: 2^k x 2^k matrix. Bit i of a row/column index corresponds to axes[i].
+        axes (list[int]): Axes of the view the matrix acts upon.
+
+    Returns:
+        New tensor with the same shape as view.
+    """
+    num_targets = len(axes)
+    tensor = np.asarray(matrix, dtype=np.complex128).reshape((2,) * (2 * num_targets))
+    # axis j of the reshaped matrix corresponds to bit (k - 1 - j) of the row/column index
+    source = [axes[num_targets - 1 - j] for j in range(num_targets)]
+    result = np.tensordot(tensor, view, axes=(list(range(num_targets, 2 * num_targets)), source))
+    return np.moveaxis(result, list(range(num_targets)), source)
+
+
+def apply_matrix(state, matrix, positions, ctrl_positions=()):
+    """
+    Apply a (controlled) k-qubit matrix to a state vector in place.
+
+    Args:
+        state (numpy.ndarray): Contiguous state vector.
+        matrix: 2^k x 2^k matrix. Bit i of a row/column index corresponds to positions[i].
+        positions (list[int]): Bit-locations of the target qubits.
+        ctrl_positions (list[int]): Bit-locations of the control qubits.
+    """
+    view, axis = controlled_view(state, ctrl_positions)
+    view[...] = apply_to_view(view, matrix, [axis(pos) for pos in positions])
+
+
+def pauli_string_matrix(term, num_qubits):
+    """
+    Return the dense matrix of a term of a QubitOperator acting on num_qubits qubits.
+
+    Args:
+        term (tuple): Term of a QubitOperator, i.e., a tuple of (index, 'X'|'Y'|'Z') pairs.
+        num_qubits (int): Number of qubits; bit i of a row/column index corresponds to qubit index i.
+    """
+    matrix = np.ones((1, 1), dtype=np.complex128)
+    local_ops = dict(term)
+    for index in range(num_qubits):
+        # qubit 0 is the least significant bit, hence it ends up as the right-most kronecker factor
+        matrix = np.kron(_PAULI_MATRICES.get(local_ops.get(index), np.identity(2)), matrix)
+    return matrix
+
+
+def operator_matrix(terms, num_qubits):
+    """
+    Return the dense matrix of a QubitOperator.
+
+    Args:
+        terms (dict): Terms of the operator (see QubitOperator.terms).
+        num_qubits (int): Number of qubits the operator acts upon.
+    """
+    matrix = np.zeros((1 << num_qubits, 1 << num_qubits), dtype=np.complex128)
+    for term, coefficient in terms.items():
+        matrix += coefficient * pauli_string_matrix(term, num_qubits)
+    return matrix
+
+
+def apply_operator(state, terms, positions):
+    """
+    Return the result of applying a (possibly non-unitary) QubitOperator to a state vector.
+
+    Args:
+        state (numpy.ndarray): Contiguous state vector (is left unchanged).
+        terms (dict): Terms of the operator (see QubitOperator.terms).
+        positions (list[int]): Bit-location of each qubit index used in the terms.
+    """
+    result = np.zeros_like(state)
+    for term, coefficient in terms.items():
+        tmp = state.copy()
+        for index, action in term:
+            apply_matrix(tmp, _PAULI_MATRICES[action], [positions[index]])
+        result += coefficient * tmp
+    return result
+
+
+def apply_qft(state, positions, ctrl_positions=(), inverse=False):
+    """
+    Apply a (controlled) quantum Fourier transform to a state vector in place using a fast Fourier transform.
+
+    The transform matches the decomposition of divya.ops.QFT, i.e., it does not include the final swaps: the amplitude
+    of a register value x is mapped to the (bit-reversed) register value rev(k) with amplitude
+    exp(2 pi i x k / 2^n) / sqrt(2^n).
+
+    Args:
+        state (numpy.ndarray): Contiguous state vector.
+        positions (list[int]): Bit-locations of the register (least significant qubit first).
+        ctrl_positions (list[int]): Bit-locations of the control qubits.
+        inverse (bool): If True, apply the inverse transform.
+    """
+    view, axis = controlled_view(state, ctrl_positions)
+    num_targets = len(positions)
+    trailing = list(range(view.ndim - num_targets, view.ndim))
+    # register axes ordered such that a C-order reshape yields the register value (most significant qubit first)
+    msb_first = [axis(pos) for pos in reversed(positions)]
+    # ... and in reversed order, which yields the bit-reversed register value
+    lsb_first = [axis(pos) for pos in positions]
+    if inverse:
+        msb_first, lsb_first = lsb_first, msb_first
+    tensor = np.moveaxis(view, msb_first, trailing)
+    data = tensor.reshape(tensor.shape[:-num_targets] + (1 << num_targets,))
+    if inverse:
+        result = np.fft.fft(data, axis=-1, norm='ortho')
+    else:
+        result = np.fft.ifft(data, axis=-1, norm='ortho')
+    np.moveaxis(view, lsb_first, trailing)[...] = result.reshape(tensor.shape)
+
+
+def _register_data(view, axis, positions):
+    """
+    Return a copy of the register part of a tensor view as a 2D array together with a function writing it back.
+
+    The returned array has shape (-1, 2^k) where the column index is the register value (positions[0] being the
+    least significant bit).
+    """
+    num_targets = len(positions)
+    trailing = list(range(view.ndim - num_targets, view.ndim))
+    msb_first = [axis(pos) for pos in reversed(positions)]
+    tensor = np.moveaxis(view, msb_first, trailing)
+    data = tensor.reshape((-1, 1 << num_targets))
+
+    def write_back(new_data):
+        tensor[...] = new_data.reshape(tensor.shape)
+
+    return data, write_back
+
+
+def rotation_matrices(gate_name, angles):
+    """
+    Return the 2x2 matrices of Ry or Rz rotations as an array of shape (len(angles), 2, 2).
+
+    Args:
+        gate_name (str): 'Ry' or 'Rz'
+        angles (list[float]): Rotation angles.
+    """
+    half_angles = 0.5 * np.asarray(angles, dtype=np.float64)
+    matrices = np.zeros((len(half_angles), 2, 2), dtype=np.complex128)
+    if gate_name == 'Ry':
+        matrices[:, 0, 0] = matrices[:, 1, 1] = np.cos(half_angles)
+        matrices[:, 0, 1] = -np.sin(half_angles)
+        matrices[:, 1, 0] = np.sin(half_angles)
+    else:
+        matrices[:, 0, 0] = np.exp(-1j * half_angles)
+        matrices[:, 1, 1] = np.exp(1j * half_angles)
+    return matrices
+
+
+def apply_uniformly_controlled(state, matrices, ucontrol_positions, target_position, ctrl_positions=()):
+    """
+    Apply a (controlled) uniformly controlled single-qubit gate to a state vector in place.
+
+    The gate applies matrices[k] to the target qubit if the uniform control qubits are in the classical state k, i.e.,
+    it is block-diagonal with 2x2 blocks selected by the uniform control qubits.
+
+    Args:
+        state (numpy.ndarray): Contiguous state vector.
+        matrices (numpy.ndarray): Array of shape (2^m, 2, 2) containing the 2x2 matrices.
+        ucontrol_positions (list[int]): Bit-locations of the m uniform control qubits (least significant first).
+        target_position (int): Bit-location of the target qubit.
+        ctrl_positions (list[int]): Bit-locations of the (ordinary) control qubits.
+    """
+    view, axis = controlled_view(state, ctrl_positions)
+    data, write_back = _register_data(view, axis, [target_position] + list(ucontrol_positions))
+    # column index = 2 * k + target bit
+    data = data.reshape((data.shape[0], len(matrices), 2))
+    write_back(np.einsum('kij,rkj->rki', matrices, data))
+
+
+def state_preparation_rotations(final_state):
+    """
+    Return the rotations which the StatePreparation decomposition (arXiv:quant-ph/0407010v1) applies in reverse.
+
+    Args:
+        final_state (list[complex]): Normalized amplitudes of the state to prepare.
+
+    Returns:
+        A tuple (rz_angles, phase, ry_angles) where rz_angles[i] and ry_angles[i] are the angles of the uniformly
+        controlled Rz and Ry rotations targeting qubit i (controlled by all qubits j > i) and phase is the global phase.
+    """
+    num_qubits = len(final_state).bit_length() - 1
+    final_state = np.asarray(final_state, dtype=np.complex128)
+    rz_angles = []
+    ry_angles = []
+    phases = np.angle(final_state)
+    magnitudes = np.abs(final_state)
+    for _ in range(num_qubits):
+        rz_angles.append(phases[0::2] - phases[1::2])
+        phases = 0.5 * (phases[0::2] + phases[1::2])
+        norms = np.sqrt(magnitudes[0::2] ** 2 + magnitudes[1::2] ** 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(norms > 0, magnitudes[0::2] / np.where(norms > 0, norms, 1), 1.0)
+        ry_angles.append(np.where(norms > 0, -2.0 * np.arccos(np.clip(ratios, -1.0, 1.0)), 0.0))
+        magnitudes = norms
+    return rz_angles, phases[0], ry_angles
+
+
+def apply_state_preparation(state, final_state, positions, ctrl_positions=()):
+    """
+    Apply a (controlled) StatePreparation gate to a state vector in place.
+
+    If the register is in state |0...0> (within the subspace where all controls are 1), the amplitudes of final_state
+    are written into the register in a single pass. Otherwise, the unitary of the StatePreparation decomposition is
+    applied, using one uniformly controlled rotation per qubit.
+
+    Args:
+        state (numpy.ndarray): Contiguous state vector.
+        final_state (list[complex]): Normalized amplitudes of the state to prepare.
+        positions (list[int]): Bit-locations of the register (least significant qubit first).
+        ctrl_positions (list[int]): Bit-locations of the control qubits.
+    """
+    view, axis = controlled_view(state, ctrl_positions)
+    data, write_back = _register_data(view, axis, positions)
+    if np.allclose(data[:, 1:], 0.0, rtol=0.0, atol=1e-12):
+        write_back(np.outer(data[:, 0], np.asarray(final_state, dtype=np.complex128)))
+        return
+
+    rz_angles, phase, ry_angles = state_preparation_rotations(final_state)
+    num_qubits = len(positions)
+    for qubit_idx in reversed(range(num_qubits)):
+        matrices = rotation_matrices('Ry', -ry_angles[qubit_idx])
+        apply_uniformly_controlled(state, matrices, positions[qubit_idx + 1 :], positions[qubit_idx], ctrl_positions)
+    view[...] *= np.exp(1j * phase)
+    for qubit_idx in reversed(range(num_qubits)):
+        matrices = rotation_matrices('Rz', -rz_angles[qubit_idx])
+        apply_uniformly_controlled(state, matrices, positions[qubit_idx + 1 :], positions[qubit_idx], ctrl_positions)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""Tests for divya.backends._sim._statevector.py."""
+
+import numpy as np
+import pytest
+
+from divya.backends._sim import _statevector
+from divya.ops import H, QubitOperator, Rx, Ry, Rz, SqrtSwap
+
+
+def _random_state(num_qubits, seed=3):
+    rng = np.random.RandomState(seed)
+    state = rng.randn(1 << num_qubits) + 1j * rng.randn(1 << num_qubits)
+    return state / np.linalg.norm(state)
+
+
+def _full_matrix(matrix, positions, ctrl_positions, num_qubits):
+    matrix = np.asarray(matrix)
+    full = np.zeros((1 << num_qubits, 1 << num_qubits), dtype=complex)
+    for col in range(1 << num_qubits):
+        if not all((col >> pos) & 1 for pos in ctrl_positions):
+            full[col, col] = 1
+            continue
+        sub_col = sum(((col >> pos) & 1) << i for i, pos in enumerate(positions))
+        base = col
+        for pos in positions:
+            base &= ~(1 << pos)
+        for sub_row in range(len(matrix)):
+            row = base | sum(((sub_row >> i) & 1) << pos for i, pos in enumerate(positions))
+            full[row, col] = matrix[sub_row, sub_col]
+    return full
+
+
+def _qft_matrix(num_qubits):
+    dim = 1 << num_qubits
+    indices = np.arange(dim)
+    reversed_indices = np.zeros(dim, dtype=np.int64)
+    for i in range(num_qubits):
+        reversed_indices |= ((indices >> i) & 1) << (num_qubits - 1 - i)
+    matrix = np.zeros((dim, dim), dtype=np.complex128)
+    matrix[reversed_indices, :] = np.exp(2j * np.pi * np.outer(indices, indices) / dim) / np.sqrt(dim)
+    return matrix
+
+
+@pytest.mark.parametrize(
+    "matrix, positions, ctrl_positions",
+    [
+        (H.matrix, [0], []),
+        (Rx(0.3).matrix, [2], [0]),
+        (SqrtSwap.matrix, [3, 1], []),
+        (np.kron(H.matrix, Rx(1.2).matrix), [0, 3], [2]),
+    ],
+)
+def test_apply_matrix(matrix, positions, ctrl_positions):
+    state = _random_state(4)
+    expected = _full_matrix(matrix, positions, ctrl_positions, 4).dot(state)
+    _statevector.apply_matrix(state, matrix, positions, ctrl_positions)
+    assert np.allclose(state, expected)
+
+
+def test_apply_operator():
+    state = _random_state(3)
+    operator = QubitOperator('X0 Z2', 0.5) + QubitOperator('Y1', -1.5)
+    result = _statevector.apply_operator(state, operator.terms, [1, 2, 0])
+    # qubit indices (0, 1, 2) of the operator correspond to bit-locations (1, 2, 0)
+    expected = _full_matrix(_statevector.operator_matrix(operator.terms, 3), [1, 2, 0], [], 3).dot(state)
+    assert np.allclose(result, expected)
+
+
+@pytest.mark.parametrize("inverse", [False, True])
+def test_apply_qft(inverse):
+    state = _random_state(5)
+    matrix = _qft_matrix(3)
+    if inverse:
+        matrix = matrix.conj().T
+    expected = _full_matrix(matrix, [4, 0, 2], [1], 5).dot(state)
+    _statevector.apply_qft(state, [4, 0, 2], [1], inverse=inverse)
+    assert np.allclose(state, expected)
+
+
+def test_qft_matrix():
+    matrix = _qft_matrix(3)
+    assert np.allclose(matrix.dot(matrix.conj().T), np.identity(8))
+    # |x=1> is mapped onto sum_k exp(2 pi i k / 8) |rev(k)> / sqrt(8)
+    assert matrix[0b100, 1] == pytest.approx(np.exp(2j * np.pi / 8) / np.sqrt(8))
+
+
+@pytest.mark.parametrize("gate_name", ['Ry', 'Rz'])
+def test_apply_uniformly_controlled(gate_name):
+    state = _random_state(5)
+    angles = [0.1, -0.7, 1.3, 2.9]
+    matrices = _statevector.rotation_matrices(gate_name, angles)
+    gate_class = Ry if gate_name == 'Ry' else Rz
+    for angle, matrix in zip(angles, matrices):
+        assert np.allclose(matrix, gate_class(angle).matrix)
+    # block-diagonal matrix with the target qubit as least significant bit
+    block_diagonal = np.zeros((8, 8), dtype=complex)
+    for k, matrix in enumerate(matrices):
+        block_diagonal[2 * k : 2 * k + 2, 2 * k : 2 * k + 2] = matrix
+    expected = _full_matrix(block_diagonal, [3, 0, 4], [2], 5).dot(state)
+    _statevector.apply_uniformly_controlled(state, matrices, [0, 4], 3, [2])
+    assert np.allclose(state, expected)
+
+
+def test_apply_state_preparation():
+    final_state = _random_state(3, seed=5)
+    # register in |0...0>: final_state is written into the register
+    state = np.zeros(16, dtype=complex)
+    state[0b0010] = 1.0
+    _statevector.apply_state_preparation(state, final_state, [3, 0, 2], [1])
+    for value in range(8):
+        index = 0b0010 | ((value & 1) << 3) | (((value >> 1) & 1) << 0) | (((value >> 2) & 1) << 2)
+        assert state[index] == pytest.approx(final_state[value])
+
+    # general state: the unitary has to map |0...0> onto final_state
+    columns = []
+    for col in range(8):
+        column = np.zeros(8, dtype=complex)
+        column[col] = 1.0
+        _statevector.apply_state_preparation(column, final_state, [0, 1, 2])
+        columns.append(column)
+    matrix = np.array(columns).T
+    assert np.allclose(matrix.dot(matrix.conj().T), np.identity(8))
+    assert np.allclose(matrix[:, 0], final_state)
+
+    state = _random_state(4)
+    expected = _full_matrix(matrix, [3, 0, 2], [1], 4).dot(state)
+    _statevector.apply_state_preparation(state, final_state, [3, 0, 2], [1])
+    assert np.allclose(state, expected)
@@ -22,7 +22,6 @@
 
 """Contain a backend that saves the unitary of a quantum circuit."""
 
-import itertools
 import math
 import random
 import warnings
@@ -35,37 +34,7 @@ from divya.meta import LogicalQubitIDTag, get_control_count, has_negative_contro
 from divya.ops import AllocateQubitGate, DeallocateQubitGate, FlushGate, MeasureGate
 from divya.types import WeakQubitRef
 
-def _qidmask(target_ids, control_ids, n_qubits):
-    """
-    Calculate index masks.
-
-    Args:
-        target_ids (list): list of target qubit indices
-        control_ids (list): list of control qubit indices
-        control_state (list): list of states for the control qubits (0 or 1)
-        n_qubits (int): number of qubits
-    """
-    mask_list = []
-    perms = np.array([x[::-1] for x in itertools.product("01", repeat=n_qubits)]).astype(int)
-    all_ids = np.array(range(n_qubits))
-    irel_ids = np.delete(all_ids, control_ids + target_ids)
-
-    if len(control_ids) > 0:
-        cmask = np.where(np.all(perms[:, control_ids] == [1] * len(control_ids), axis=1))
-    else:
-        cmask = np.array(range(perms.shape[0]))
-
-    if len(irel_ids) > 0:
-        irel_perms = np.array([x[::-1] for x in itertools.product("01", repeat=len(irel_ids))]).astype(int)
-        for i in range(2 ** len(irel_ids)):
-            irel_mask = np.where(np.all(perms[:, irel_ids] == irel_perms[i], axis=1))
-            common = np.intersect1d(irel_mask, cmask)
-            if len(common) > 0:
-                mask_list.append(common)
-    else:
-        irel_mask = np.array(range(perms.shape[0]))
-        mask_list.append(np.intersect1d(irel_mask, cmask))
-    return mask_list
+from ._sim._statevector import apply_matrix
 
 class UnitarySimulator(BasicEngine):
     """
@@ -194,7 +163,7 @@ class UnitarySimulator(BasicEngine):
         if isinstance(cmd.gate, AllocateQubitGate):
             self._qubit_map[cmd.qubits[0][0].id] = self._num_qubits
             self._num_qubits += 1
-            self._unitary = np.kron(np.identity(2), self._unitary)
+            self._unitary = np.kron(np.identity(2, dtype=complex), self._unitary)
             self._state.extend([0] * len(self._state))
 
         elif isinstance(cmd.gate, DeallocateQubitGate):
@@ -241,15 +210,15 @@ class UnitarySimulator(BasicEngine):
                 self._is_valid = True
 
             self._is_flushed = False
-            mask_list = _qidmask(
-                [self._qubit_map[qb.id] for qr in cmd.qubits for qb in qr],
-                [self._qubit_map[qb.id] for qb in cmd.control_qubits],
-                self._num_qubits,
+            # The flattened unitary is a state vector on 2n qubits where bit n + p of an index is bit p of the row
+            # index: applying the gate to those bits only multiplies the unitary from the left.
+            offset = self._num_qubits
+            apply_matrix(
+                self._unitary.reshape(-1),
+                cmd.gate.matrix,
+                [offset + self._qubit_map[qb.id] for qr in cmd.qubits for qb in qr],
+                [offset + self._qubit_map[qb.id] for qb in cmd.control_qubits],
             )
-            for mask in mask_list:
-                cache = np.identity(2**self._num_qubits, dtype=complex)
-                cache[np.ix_(mask, mask)] = cmd.gate.matrix
-                self._unitary = cache @ self._unitary
 
     def measure_qubits(self, ids):
         """
@@ -248,6 +248,35 @@ def test_unitary_simulator():
         All(Measure) | ref_qureg
         All(Measure) | test_qureg
 
+def test_unitary_simulator_qubit_order():
+    mat = unitary_group.rvs(4, random_state=12)
+    n_qubits = 4
+
+    def apply_gates(eng, qureg):
+        # bit i of the matrix index corresponds to the i-th qubit of the command, regardless of the qubit positions
+        MatrixGate(mat) | (qureg[3], qureg[0])
+        with Control(eng, qureg[1]):
+            MatrixGate(mat) | (qureg[2], qureg[0])
+        Rxx(0.7) | (qureg[3], qureg[1])
+
+    test_eng = MainEngine(backend=UnitarySimulator(), engine_list=[])
+    test_qureg = test_eng.allocate_qureg(n_qubits)
+    apply_gates(test_eng, test_qureg)
+    test_eng.flush()
+
+    columns = []
+    for col in range(2**n_qubits):
+        ref_eng = MainEngine(engine_list=[])
+        ref_qureg = ref_eng.allocate_qureg(n_qubits)
+        ref_eng.flush()
+        ref_eng.backend.set_wavefunction(np.identity(2**n_qubits)[col], ref_qureg)
+        apply_gates(ref_eng, ref_qureg)
+        ref_eng.flush()
+        columns.append(np.array(ref_eng.backend.cheat()[1]))
+        All(Measure) | ref_qureg
+    assert np.allclose(test_eng.backend.unitary, np.array(columns).T)
+    All(Measure) | test_qureg
+
 def test_unitary_functional_measurement():
     eng = MainEngine(UnitarySimulator())
     qubits = eng.allocate_qureg(5)
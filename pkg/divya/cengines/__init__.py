@@ -22,21 +22,33 @@
 
 """Bhojpur Quantum module containing all compiler engines."""
 
-from ._basics import BasicEngine, ForwarderEngine, LastEngineException  # isort:skip
+from ._basics import (  # isort:skip
+    BasicEngine,
+    ForwarderEngine,
+    LastEngineException,
+    get_availability_signature,
+    get_cacheable_signature,
+)
 from ._cmdmodifier import CommandModifier  # isort:skip
 from ._basicmapper import BasicMapperEngine  # isort:skip
 
+from ._asyncengine import AsyncEngine
+from ._graphmapper import GraphMapper
 from ._ibm5qubitmapper import IBM5QubitMapper
 from ._linearmapper import LinearMapper, return_swap_depth
 from ._main import MainEngine, NotYetMeasuredError, UnsupportedEngineError
 from ._manualmapper import ManualMapper
 from ._optimize import LocalOptimizer
+from ._parameterbinder import ParameterBinder
+from ._profiler import EngineStatistics, PipelineProfiler
 from ._replacer import (
     AutoReplacer,
+    CostDecompositionChooser,
     DecompositionRule,
     DecompositionRuleSet,
     InstructionFilter,
 )
+from ._resynthesis import SingleQubitResynthesizer, TwoQubitBlockResynthesizer
 from ._swapandcnotflipper import SwapAndCNOTFlipper
 from ._tagremover import TagRemover
 from ._testengine import CompareEngine, DummyEngine
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+An AsyncEngine hands the commands it receives to the next engine (usually the back-end) on a worker thread.
+
+This allows the front end and the compiler engines to keep producing commands while the back-end executes them, e.g.,
+while the simulator spends its time in numerical kernels which release the GIL.
+"""
+
+import queue
+import sys
+import threading
+
+from divya.ops import FlushGate
+
+from ._basics import BasicEngine
+
+class AsyncEngine(BasicEngine):
+    """
+    Compiler engine forwarding all commands to the next engine on a worker thread.
+
+    The command lists are passed to the worker through a bounded queue, i.e., receive blocks if the worker falls too
+    far behind. The AsyncEngine should be the last compiler engine in the engine list, right before the back-end.
+
+    A FlushGate waits for the worker to finish all pending commands, so that the back-end can be queried (e.g., using
+    Simulator.get_probability) after calling eng.flush(). Reading a measurement result (e.g., int(qubit)) waits for
+    the worker as well (see synchronize). Exceptions raised by the next engine on the worker thread are re-raised in
+    the calling thread on the next call to receive or synchronize.
+
+    Qubits deallocated on the worker thread (e.g., by the garbage collector) are deallocated again on the calling
+    thread on the next call to receive or synchronize, as the compiler engines before the AsyncEngine are not
+    thread-safe (see defer_deallocation).
+
+    Example:
+        .. code-block:: python
+
+            eng = MainEngine(Simulator(), get_engine_list() + [AsyncEngine()])
+    """
+
+    def __init__(self, max_queue_size=16):
+        """
+        Initialize an AsyncEngine.
+
+        Args:
+            max_queue_size (int): Maximum number of command lists waiting to be forwarded by the worker thread.
+        """
+        super().__init__()
+        self._queue = queue.Queue()
+        # Bounds the number of command lists queued by other threads than the worker itself
+        self._free_slots = threading.Semaphore(max_queue_size)
+        self._worker = None
+        self._error = None
+        self._deallocations = []  # (engine, qubit) pairs deferred by the worker thread
+
+    def _run(self):
+        """Forward the queued command lists to the next engine until a None sentinel is found."""
+        while True:
+            command_list, uses_slot = self._queue.get()
+            try:
+                if command_list is None:
+                    return
+                # After an error, the remaining commands are dropped (but still taken from the queue)
+                if self._error is None:
+                    self.send(command_list)
+            except Exception as err:  # pylint: disable=broad-except
+                self._error = err
+            finally:
+                if uses_slot:
+                    self._free_slots.release()
+                self._queue.task_done()
+
+    def _raise_error(self):
+        """Re-raise an exception which occurred on the worker thread."""
+        if self._error is not None:
+            err = self._error
+            self._error = None
+            raise err
+
+    def defer_deallocation(self, engine, qubit):
+        """
+        Defer the deallocation of a qubit by the worker thread (see MainEngine.defer_deallocation).
+
+        The deallocation is replayed on the calling thread on the next call to receive or synchronize, so that the
+        compiler engines before the AsyncEngine never run on the worker thread.
+
+        Args:
+            engine (BasicEngine): Engine deallocating the qubit.
+            qubit (BasicQubit): Qubit to deallocate.
+
+        Returns:
+            True if the deallocation was deferred (i.e., if called on the worker thread) and False otherwise.
+        """
+        if self._worker is None or threading.current_thread() is not self._worker:
+            return False
+        self._deallocations.append((engine, qubit))
+        return True
+
+    def _replay_deallocations(self):
+        """Deallocate the qubits whose deallocation was deferred by the worker thread (on the calling thread)."""
+        while self._deallocations:
+            engine, qubit = self._deallocations.pop(0)
+            engine.deallocate_qubit(qubit)
+
+    def synchronize(self):
+        """Wait until the worker thread has forwarded all pending commands to the next engine."""
+        if threading.current_thread() is not self._worker:
+            self._replay_deallocations()
+            if self._worker is not None:
+                self._queue.join()
+        self._raise_error()
+
+    def receive(self, command_list):
+        """
+        Receive a list of commands and queue it for the worker thread.
+
+        If the list contains a FlushGate, wait for the worker to forward all commands and stop it.
+
+        Args:
+            command_list (list<Command>): List of commands to receive.
+        """
+        if self._worker is not None and threading.current_thread() is self._worker:
+            # E.g., commands sent by the next engine itself: blocking would deadlock
+            self._queue.put((command_list, False))
+            return
+        self._raise_error()
+        self._replay_deallocations()
+        is_flush = any(isinstance(cmd.gate, FlushGate) for cmd in command_list)
+        # Threads can neither be started nor joined while the interpreter shuts down (e.g., when the MainEngine is
+        # garbage collected), and there is no need to start the worker only to wait for it
+        if sys.is_finalizing() or (self._worker is None and is_flush):
+            self.send(command_list)
+            return
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+        if is_flush:
+            # Drain the worker first: the deallocations it deferred must reach the next engine before the FlushGate
+            self._queue.join()
+            self._replay_deallocations()
+        self._free_slots.acquire()  # pylint: disable=consider-using-with
+        self._queue.put((command_list, True))
+        if is_flush:
+            self._queue.put((None, False))
+            self._worker.join()
+            self._worker = None
+            self._raise_error()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""Tests for divya.cengines._asyncengine.py."""
+
+import threading
+
+import pytest
+
+from divya.backends import Simulator
+from divya.cengines import DummyEngine, MainEngine, _asyncengine
+from divya.ops import CNOT, All, Allocate, Command, Deallocate, FlushGate, H, Measure, X
+from divya.types import WeakQubitRef
+
+def test_async_engine_forwards_on_worker_thread():
+    threads = []
+
+    class RecordingEngine(DummyEngine):
+        def receive(self, command_list):
+            threads.append(threading.current_thread())
+            super().receive(command_list)
+
+    backend = RecordingEngine(save_commands=True)
+    async_eng = _asyncengine.AsyncEngine(max_queue_size=2)
+    eng = MainEngine(backend=backend, engine_list=[async_eng])
+    qureg = eng.allocate_qureg(2)
+    for _ in range(10):
+        H | qureg[0]
+    eng.flush()
+    assert len(backend.received_commands) == 13
+    assert all(thread is not threading.main_thread() for thread in threads)
+    # the worker is stopped by the flush
+    assert async_eng._worker is None
+    eng.flush(deallocate_qubits=True)
+
+def test_async_engine_receive_on_worker_thread():
+    class ReentrantEngine(DummyEngine):
+        def receive(self, command_list):
+            # e.g., the next engine sending commands itself while the worker runs
+            if len(self.received_commands) == 0:
+                async_eng.receive([Command(eng, H, ([WeakQubitRef(eng, 0)],))])
+            super().receive(command_list)
+
+    backend = ReentrantEngine(save_commands=True)
+    async_eng = _asyncengine.AsyncEngine(max_queue_size=1)
+    eng = MainEngine(backend=backend, engine_list=[async_eng])
+    qubit = eng.allocate_qubit()
+    eng.flush()
+    assert [cmd.gate for cmd in backend.received_commands] == [Allocate, H, FlushGate()]
+    del qubit
+
+def test_async_engine_defers_deallocations_on_worker_thread():
+    threads = []
+    garbage = []
+
+    class RecordingEngine(DummyEngine):
+        def receive(self, command_list):
+            threads.append(threading.current_thread())
+            super().receive(command_list)
+
+    class CollectingEngine(DummyEngine):
+        def receive(self, command_list):
+            # e.g., the garbage collector collecting a qubit while the worker runs
+            if command_list[0].gate == H:
+                garbage.pop().__del__()
+            super().receive(command_list)
+
+    backend = CollectingEngine(save_commands=True)
+    async_eng = _asyncengine.AsyncEngine()
+    eng = MainEngine(backend=backend, engine_list=[RecordingEngine(), async_eng])
+    qureg = eng.allocate_qureg(2)
+    garbage.append(qureg[1])
+    H | qureg[0]
+    eng.flush()
+    assert [cmd.gate for cmd in backend.received_commands] == [Allocate, Allocate, H, Deallocate, FlushGate()]
+    assert backend.received_commands[3].qubits[0][0].id == 1
+    # the compiler engines before the AsyncEngine only run on the calling thread
+    assert all(thread is threading.main_thread() for thread in threads)
+    assert not async_eng._deallocations
+    eng.flush(deallocate_qubits=True)
+
+def test_async_engine_replays_deallocations_on_synchronize():
+    garbage = []
+
+    class CollectingEngine(DummyEngine):
+        def receive(self, command_list):
+            if command_list[0].gate == H:
+                garbage.pop().__del__()
+            super().receive(command_list)
+
+    backend = CollectingEngine(save_commands=True)
+    async_eng = _asyncengine.AsyncEngine()
+    eng = MainEngine(backend=backend, engine_list=[async_eng])
+    qureg = eng.allocate_qureg(2)
+    garbage.append(qureg[1])
+    H | qureg[0]
+    async_eng.synchronize()
+    assert len(async_eng._deallocations) == 1
+    assert [cmd.gate for cmd in backend.received_commands] == [Allocate, Allocate, H]
+    async_eng.synchronize()
+    assert [cmd.gate for cmd in backend.received_commands] == [Allocate, Allocate, H, Deallocate]
+    assert not async_eng._deallocations
+    # deallocations on the calling thread are not deferred
+    assert not async_eng.defer_deallocation(eng, qureg[0])
+    eng.flush(deallocate_qubits=True)
+
+def test_async_engine_simulator():
+    eng = MainEngine(backend=Simulator(), engine_list=[_asyncengine.AsyncEngine()])
+    qureg = eng.allocate_qureg(3)
+    X | qureg[0]
+    CNOT | (qureg[0], qureg[1])
+    H | qureg[2]
+    eng.flush()
+    assert eng.backend.get_probability('0', qureg[2:]) == pytest.approx(0.5)
+    assert eng.backend.get_probability('11', qureg[:2]) == pytest.approx(1.0)
+    All(Measure) | qureg
+    # reading the result waits for the worker
+    assert int(qureg[0]) == 1
+    assert int(qureg[1]) == 1
+    eng.flush(deallocate_qubits=True)
+
+def test_async_engine_exceptions():
+    class ErrorEngine(DummyEngine):
+        def receive(self, command_list):
+            raise RuntimeError("backend failure")
+
+    async_eng = _asyncengine.AsyncEngine()
+    eng = MainEngine(backend=ErrorEngine(), engine_list=[async_eng], verbose=True)
+    with pytest.raises(RuntimeError):
+        qubit = eng.allocate_qubit()
+        eng.flush()
+    with pytest.raises(RuntimeError):
+        async_eng.synchronize()  # the error is only raised once, the flush raises it again
+        eng.flush()
+    # NB: avoid throwing exceptions when destroying the MainEngine
+    async_eng.next_engine = DummyEngine()
+    async_eng.next_engine.is_last_engine = True
+    del qubit
@@ -72,10 +72,10 @@ class BasicMapperEngine(BasicEngine):
         for qureg in qubits:
             for qubit in qureg:
                 if qubit.id != -1:
-                    qubit.id = self.current_mapping[qubit.id]
+                    qubit.id = self._current_mapping[qubit.id]
         control_qubits = new_cmd.control_qubits
         for qubit in control_qubits:
-            qubit.id = self.current_mapping[qubit.id]
+            qubit.id = self._current_mapping[qubit.id]
         if isinstance(new_cmd.gate, MeasureGate):
             # Add LogicalQubitIDTag to MeasureGate
             def add_logical_id(command, old_tags=deepcopy(cmd.tags)):
@@ -22,7 +22,7 @@
 
 """Module containing the basic definition of a compiler engine."""
 
-from divya.ops import Allocate, Command, Deallocate
+from divya.ops import Allocate, Command, Deallocate, MatrixGate
 from divya.types import Qubit, Qureg, WeakQubitRef
 
 class LastEngineException(Exception):
@@ -42,6 +42,51 @@ class LastEngineException(Exception):
             ).format(engine.__class__.__name__),
         )
 
+def get_availability_signature(cmd):
+    """
+    Return a signature of a command which determines whether the command is available.
+
+    The signature consists of the gate (including its parameters), the number of qubits of each quantum register, the
+    state of the control qubits (and hence their number) and the classes of the tags. Qubit ids are not part of the
+    signature.
+
+    Args:
+        cmd (Command): Command for which to compute the signature.
+
+    Returns:
+        A tuple, or None if the availability of the command cannot be cached (the gate is a MatrixGate, whose
+        equality is only approximate).
+    """
+    if isinstance(cmd.gate, MatrixGate):
+        return None
+    return (
+        cmd.gate.__class__,
+        cmd.gate,
+        tuple(len(qureg) for qureg in cmd.qubits),
+        cmd.control_state,
+        tuple(tag.__class__ for tag in cmd.tags),
+    )
+
+def get_cacheable_signature(cmd):
+    """
+    Return the signature of a command (see get_availability_signature) if it can be used as a dictionary key.
+
+    Args:
+        cmd (Command): Command for which to compute the signature.
+
+    Returns:
+        The signature, or None if there is none or if it cannot be hashed (e.g., the gate is not hashable or does not
+        implement __str__).
+    """
+    signature = get_availability_signature(cmd)
+    if signature is None:
+        return None
+    try:
+        hash(signature)
+    except (TypeError, NotImplementedError):
+        return None
+    return signature
+
 class BasicEngine:
     """
     Basic compiler engine: All compiler engines are derived from this class.
@@ -66,6 +111,7 @@ class BasicEngine:
         self.main_engine = None
         self.next_engine = None
         self.is_last_engine = False
+        self._availability_cache = None
 
     def is_available(self, cmd):
         """
@@ -84,9 +130,38 @@ class BasicEngine:
             LastEngineException: If is_last_engine is True but is_available is not implemented.
         """
         if not self.is_last_engine:
+            if self._availability_cache is not None:
+                return self._cached_availability(cmd, self.next_engine.is_available)
             return self.next_engine.is_available(cmd)
         raise LastEngineException(self)
 
+    def _cached_availability(self, cmd, is_available):
+        """
+        Return is_available(cmd), memoized by the signature of the command (see get_cacheable_signature).
+
+        Engines opt into caching by setting self._availability_cache to a dict; they must only do so if
+        is_available(cmd) depends on nothing but the signature of cmd (and the engines following them).
+        """
+        signature = get_cacheable_signature(cmd)
+        if signature is None:
+            return is_available(cmd)
+        try:
+            return self._availability_cache[signature]
+        except KeyError:
+            result = is_available(cmd)
+            self._availability_cache[signature] = result
+            return result
+
+    def clear_availability_cache(self):
+        """
+        Clear the cached availability of commands (if this engine caches them).
+
+        This is called automatically for all engines preceding an engine which is inserted into or removed from the
+        engine list (see divya.meta.insert_engine and divya.meta.drop_engine_after).
+        """
+        if self._availability_cache is not None:
+            self._availability_cache.clear()
+
     def allocate_qubit(self, dirty=False):
         """
         Return a new qubit as a list containing 1 qubit object (quantum register of size 1).
@@ -146,6 +221,9 @@ class BasicEngine:
         """
         if qubit.id == -1:
             raise ValueError("Already deallocated.")
+        # e.g., deallocations by the worker thread of an AsyncEngine are replayed on the calling thread
+        if self.main_engine.defer_deallocation(self, qubit):
+            return
 
         from divya.meta import (  # pylint: disable=import-outside-toplevel
             DirtyQubitTag,
@@ -28,15 +28,19 @@ import pytest
 
 from divya import MainEngine
 from divya.cengines import DummyEngine, InstructionFilter, _basics
-from divya.meta import DirtyQubitTag
+from divya.meta import DirtyQubitTag, insert_engine
 from divya.ops import (
     AllocateQubitGate,
+    BasicGate,
     ClassicalInstructionGate,
+    Command,
     DeallocateQubitGate,
     FastForwardingGate,
     H,
+    MatrixGate,
+    Rx,
 )
-from divya.types import Qubit
+from divya.types import Qubit, WeakQubitRef
 
 # try:
 #     import mock
@@ -66,6 +70,68 @@ def test_basic_engine_is_available():
     assert eng.is_available("supported")
     assert not eng.is_available("something else")
 
+def test_get_availability_signature():
+    qb0 = WeakQubitRef(None, 0)
+    qb1 = WeakQubitRef(None, 1)
+    qb2 = WeakQubitRef(None, 2)
+    signature = _basics.get_availability_signature(Command(None, Rx(0.5), ([qb0],), controls=[qb1]))
+    # qubit ids are not part of the signature
+    assert signature == _basics.get_availability_signature(Command(None, Rx(0.5), ([qb2],), controls=[qb0]))
+    assert signature != _basics.get_availability_signature(Command(None, Rx(0.6), ([qb0],), controls=[qb1]))
+    assert signature != _basics.get_availability_signature(Command(None, Rx(0.5), ([qb0],)))
+    assert signature != _basics.get_availability_signature(
+        Command(None, Rx(0.5), ([qb0],), controls=[qb1], control_state='0')
+    )
+    assert signature != _basics.get_availability_signature(
+        Command(None, Rx(0.5), ([qb0],), controls=[qb1], tags=[DirtyQubitTag()])
+    )
+    assert _basics.get_availability_signature(Command(None, MatrixGate([[0, 1], [1, 0]]), ([qb0],))) is None
+
+def test_get_cacheable_signature():
+    class UnhashableGate(BasicGate):
+        __hash__ = None
+
+    qb0 = WeakQubitRef(None, 0)
+    cmd = Command(None, Rx(0.5), ([qb0],))
+    assert _basics.get_cacheable_signature(cmd) == _basics.get_availability_signature(cmd)
+    assert _basics.get_cacheable_signature(Command(None, MatrixGate([[0, 1], [1, 0]]), ([qb0],))) is None
+    assert _basics.get_cacheable_signature(Command(None, UnhashableGate(), ([qb0],))) is None
+    # BasicGate hashes its string representation, which it does not implement
+    assert _basics.get_cacheable_signature(Command(None, BasicGate(), ([qb0],))) is None
+
+def test_basic_engine_availability_cache():
+    calls = []
+
+    def filter(self, cmd):
+        calls.append(cmd)
+        return cmd.gate == H
+
+    eng = MainEngine(backend=DummyEngine(), engine_list=[InstructionFilter(filter)])
+    eng._availability_cache = {}
+    qureg = eng.allocate_qureg(2)
+    for qubit in qureg:
+        assert eng.is_available(Command(eng, H, ([qubit],)))
+        assert not eng.is_available(Command(eng, Rx(0.5), ([qubit],)))
+    assert len(calls) == 2
+    # unhashable or uncacheable gates are not cached
+    assert not eng.is_available(Command(eng, MatrixGate([[0, 1], [1, 0]]), (qureg,)))
+    assert len(calls) == 3
+
+    # modifying the engine list invalidates the cache
+    insert_engine(eng, _basics.BasicEngine())
+    assert eng.is_available(Command(eng, H, ([qureg[0]],)))
+    assert len(calls) == 4
+    eng.clear_availability_cache()
+    assert not eng.is_available(Command(eng, Rx(0.5), ([qureg[0]],)))
+    assert len(calls) == 5
+
+    # engines inserted after an engine outside of the engine list (e.g., the ForwarderEngine of a decomposition rule)
+    # leave the cache untouched
+    forwarder = _basics.ForwarderEngine(eng.next_engine)
+    insert_engine(forwarder, _basics.BasicEngine())
+    assert not eng.is_available(Command(eng, Rx(0.5), ([qureg[0]],)))
+    assert len(calls) == 5
+
 def test_basic_engine_allocate_and_deallocate_qubit_and_qureg():
     eng = _basics.BasicEngine()
     # custom receive function which checks that main_engine does not send
@@ -0,0 +1,463 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Mapper for a quantum circuit to an arbitrary coupling graph.
+
+Input: Quantum circuit with 1 and 2 qubit gates on n qubits. Gates are assumed to be applied in parallel if they act
+       on disjoint qubit(s) and any pair of qubits can perform a 2 qubit gate (all-to-all connectivity)
+Output: Quantum circuit in which qubits are placed on the nodes of a connected graph in which only qubits connected by
+        an edge can perform a 2 qubit gate. The mapper uses Swap gates in order to move qubits next to each other,
+        which are chosen with the lookahead heuristic of SABRE (Li et al., arXiv:1809.02573).
+"""
+import itertools
+from collections import deque
+
+import networkx as nx
+import numpy as np
+
+from divya.meta import LogicalQubitIDTag
+from divya.ops import (
+    Allocate,
+    AllocateQubitGate,
+    Command,
+    Deallocate,
+    DeallocateQubitGate,
+    FlushGate,
+    Swap,
+)
+from divya.types import WeakQubitRef
+
+from ._basicmapper import BasicMapperEngine
+from ._linearmapper import return_swap_depth
+
+def _all_pairs_distances(neighbors):
+    """
+    Return the matrix of the shortest path lengths between all nodes of a connected graph.
+
+    Args:
+        neighbors (list): Indices of the neighbours of each node.
+
+    Returns:
+        numpy.ndarray whose entry [i, j] is the number of edges on a shortest path from node i to node j.
+    """
+    num_nodes = len(neighbors)
+    distances = np.empty((num_nodes, num_nodes), dtype=np.int32)
+    for source in range(num_nodes):
+        row = [-1] * num_nodes
+        row[source] = 0
+        frontier = [source]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for node in frontier:
+                for neighbor in neighbors[node]:
+                    if row[neighbor] < 0:
+                        row[neighbor] = distance
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        distances[source] = row
+    return distances
+
+class GraphMapper(BasicMapperEngine):  # pylint: disable=too-many-instance-attributes
+    """
+    Mapper to an arbitrary connected coupling graph.
+
+    The nodes of the graph are the backend qubit ids and its edges are the pairs of qubits which can perform a 2 qubit
+    gate. The distances between all nodes are computed once, when the mapper is created.
+
+    Each logical qubit is placed when its Allocate gate is processed: next to the qubit it interacts with first if
+    that qubit is already placed, otherwise on the most central free node. The stored gates are then sent in order as
+    soon as their qubits are neighbours. When all the 2 qubit gates which could be sent next (the front layer) act on
+    qubits which are not neighbours, the mapper applies the Swap on an edge next to a qubit of the front layer which
+    most reduces the distances between the qubits of the front layer and (with weight lookahead_weight) the qubits of
+    the next lookahead_size 2 qubit gates. Qubits which have been swapped recently are penalized (by the factor decay)
+    to favour parallel swaps.
+
+    Attributes:
+        current_mapping: Stores the mapping: key is logical qubit id, value is backend qubit id.
+        graph (networkx.Graph): Coupling graph.
+        num_qubits (int): Number of nodes of the graph.
+        storage (int): Number of gate it caches before mapping.
+        distances (numpy.ndarray): Distances between the nodes of the graph, in the order of the sorted backend ids.
+        num_mappings (int): Number of times the mapper changed the mapping
+        depth_of_swaps (dict): Key are circuit depth of swaps, value is the number of such mappings which have been
+                               applied
+        num_of_swaps_per_mapping (dict): Key are the number of swaps per mapping, value is the number of such mappings
+                                         which have been applied
+
+    Note:
+        1) Gates are cached and only mapped from time to time. A FastForwarding gate doesn't empty the cache, only a
+           FlushGate does.
+        2) Only 1 and two qubit gates allowed.
+        3) Does not optimize for dirty qubits.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, graph, storage=1000, lookahead_size=20, lookahead_weight=0.5, decay=0.001
+    ):
+        """
+        Initialize a GraphMapper compiler engine.
+
+        Args:
+            graph (networkx.Graph): Connected coupling graph whose nodes are the backend qubit ids (integers). The
+                direction of the edges of a directed graph is ignored.
+            storage (int): Number of gates to temporarily store, default is 1000
+            lookahead_size (int): Number of 2 qubit gates following the front layer taken into account to choose a
+                Swap. Default is 20.
+            lookahead_weight (float): Weight of these gates relative to the gates of the front layer. Default is 0.5.
+            decay (float): Penalty added to a qubit each time it is swapped (reset when a 2 qubit gate is sent).
+                Default is 0.001.
+
+        Raises:
+            RuntimeError: If the graph is empty or not connected.
+        """
+        super().__init__()
+        graph = nx.Graph(graph)
+        if graph.number_of_nodes() == 0 or not nx.is_connected(graph):
+            raise RuntimeError("The coupling graph of the GraphMapper must be connected.")
+        self.graph = graph
+        self.num_qubits = graph.number_of_nodes()
+        self.storage = storage
+        self.lookahead_size = lookahead_size
+        self.lookahead_weight = lookahead_weight
+        self.decay = decay
+        self._backend_ids = sorted(graph.nodes)
+        self._node_index = {backend_id: index for index, backend_id in enumerate(self._backend_ids)}
+        self._neighbors = [
+            sorted(self._node_index[neighbor] for neighbor in graph.neighbors(backend_id))
+            for backend_id in self._backend_ids
+        ]
+        edges = [(node, neighbor) for node, neighbors in enumerate(self._neighbors) for neighbor in neighbors]
+        self._edges = np.array([edge for edge in edges if edge[0] < edge[1]], dtype=int).reshape(-1, 2)
+        self.distances = _all_pairs_distances(self._neighbors)
+        # Nested lists are faster than the array for looking up single distances
+        self._distance_rows = self.distances.tolist()
+        # Nodes sorted by the sum of their distances to all other nodes, most central first
+        self._central_nodes = np.argsort(self.distances.sum(axis=1), kind='stable').tolist()
+        # Storing commands
+        self._stored_commands = []
+        # Logical qubit ids for which the Allocate gate has already been
+        # processed and sent to the next engine but which are not yet
+        # deallocated:
+        self._currently_allocated_ids = set()
+        # Statistics:
+        self.num_mappings = 0
+        self.depth_of_swaps = {}
+        self.num_of_swaps_per_mapping = {}
+
+    def is_available(self, cmd):
+        """Only allows 1 or two qubit gates."""
+        num_qubits = 0
+        for qureg in cmd.all_qubits:
+            num_qubits += len(qureg)
+        return num_qubits <= 2
+
+    def _run(self):  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
+        """
+        Send all stored commands which can be sent, inserting Swap gates where needed.
+
+        Nodes which do not hold a logical qubit are allocated when a Swap involves them and deallocated at the end.
+        """
+        num_of_stored_commands_before = len(self._stored_commands)
+        if not self.current_mapping:
+            self.current_mapping = {}
+        stored_commands = self._stored_commands
+        distances = self._distance_rows
+        neighbors = self._neighbors
+        node_index = self._node_index
+        # Logical qubit id -> node index and node index -> logical qubit id (or None)
+        positions = {logical_id: node_index[backend_id] for logical_id, backend_id in self._current_mapping.items()}
+        occupants = [None] * self.num_qubits
+        for logical_id, node in positions.items():
+            occupants[node] = logical_id
+        # Nodes allocated for the swaps which do not hold a logical qubit
+        ancillas = set()
+        swaps = []
+        decay = np.ones(self.num_qubits)
+
+        # Positions of the stored commands acting on each logical qubit and number of qubits of each command for which
+        # the command is not the next one
+        qubit_queues = {}
+        num_waiting = []
+        qubit_ids = []
+        for pos, cmd in enumerate(stored_commands):
+            ids = [qubit.id for qureg in cmd.all_qubits for qubit in qureg]
+            qubit_ids.append(ids)
+            num_waiting.append(len(ids))
+            for logical_id in ids:
+                qubit_queues.setdefault(logical_id, deque()).append(pos)
+        for queue in qubit_queues.values():
+            num_waiting[queue[0]] -= 1
+        ready = deque(pos for pos, num in enumerate(num_waiting) if num == 0)
+        done = [False] * len(stored_commands)
+        # Blocked 2 qubit gates (front layer), indexed by position and by logical qubit id
+        front = {}
+        front_of_qubit = {}
+        # Allocations waiting for a free node and commands on qubits which are not mapped
+        blocked = []
+
+        def finish(pos):
+            done[pos] = True
+            for logical_id in qubit_ids[pos]:
+                queue = qubit_queues[logical_id]
+                queue.popleft()
+                if queue:
+                    num_waiting[queue[0]] -= 1
+                    if num_waiting[queue[0]] == 0:
+                        ready.append(queue[0])
+
+        def send_on_node(gate, node, tags=None):
+            qb = WeakQubitRef(engine=self, idx=self._backend_ids[node])
+            self.send([Command(engine=self, gate=gate, qubits=([qb],), tags=tags if tags else [])])
+
+        def send_two_qubit_gate(pos):
+            del front[pos]
+            for logical_id in qubit_ids[pos]:
+                del front_of_qubit[logical_id]
+            self._send_cmd_with_mapped_ids(stored_commands[pos])
+            decay.fill(1.0)
+            finish(pos)
+
+        def apply_swap(node0, node1):
+            for node in (node0, node1):
+                if occupants[node] is None and node not in ancillas:
+                    send_on_node(Allocate, node)
+                    ancillas.add(node)
+            qb0 = WeakQubitRef(engine=self, idx=self._backend_ids[node0])
+            qb1 = WeakQubitRef(engine=self, idx=self._backend_ids[node1])
+            self.send([Command(engine=self, gate=Swap, qubits=([qb0], [qb1]))])
+            swaps.append((self._backend_ids[node0], self._backend_ids[node1]))
+            decay[node0] += self.decay
+            decay[node1] += self.decay
+            occupants[node0], occupants[node1] = occupants[node1], occupants[node0]
+            for node in (node0, node1):
+                logical_id = occupants[node]
+                if logical_id is None:
+                    ancillas.add(node)
+                else:
+                    ancillas.discard(node)
+                    positions[logical_id] = node
+                    self._current_mapping[logical_id] = self._backend_ids[node]
+            for node in (node0, node1):
+                pos = front_of_qubit.get(occupants[node])
+                if pos is not None:
+                    logical_id0, logical_id1 = front[pos]
+                    if distances[positions[logical_id0]][positions[logical_id1]] == 1:
+                        send_two_qubit_gate(pos)
+
+        swaps_without_progress = 0
+        max_swaps_without_progress = 2 * int(self.distances.max()) + 10
+        while True:
+            while ready:
+                pos = ready.popleft()
+                cmd = stored_commands[pos]
+                ids = qubit_ids[pos]
+                if isinstance(cmd.gate, AllocateQubitGate):
+                    logical_id = ids[0]
+                    node = positions.get(logical_id)
+                    if node is None:
+                        node = self._choose_node(logical_id, qubit_queues, qubit_ids, positions, occupants)
+                        if node is None:
+                            blocked.append(pos)
+                            continue
+                        if node in ancillas:
+                            ancillas.remove(node)
+                            send_on_node(Deallocate, node)
+                        positions[logical_id] = node
+                        occupants[node] = logical_id
+                        self._current_mapping[logical_id] = self._backend_ids[node]
+                    self._currently_allocated_ids.add(logical_id)
+                    send_on_node(AllocateQubitGate(), node, [LogicalQubitIDTag(logical_id)])
+                    finish(pos)
+                elif isinstance(cmd.gate, DeallocateQubitGate):
+                    logical_id = ids[0]
+                    if logical_id not in positions:
+                        blocked.append(pos)
+                        continue
+                    node = positions.pop(logical_id)
+                    occupants[node] = None
+                    self._current_mapping.pop(logical_id)
+                    self._currently_allocated_ids.discard(logical_id)
+                    send_on_node(DeallocateQubitGate(), node, [LogicalQubitIDTag(logical_id)])
+                    finish(pos)
+                    # The freed node may be used by the allocations waiting for a node
+                    ready.extend(blocked)
+                    blocked = []
+                elif any(logical_id not in positions for logical_id in ids):
+                    blocked.append(pos)
+                elif len(ids) == 2 and distances[positions[ids[0]]][positions[ids[1]]] != 1:
+                    front[pos] = (ids[0], ids[1])
+                    front_of_qubit[ids[0]] = pos
+                    front_of_qubit[ids[1]] = pos
+                else:
+                    if len(ids) == 2:
+                        decay.fill(1.0)
+                    self._send_cmd_with_mapped_ids(cmd)
+                    finish(pos)
+                swaps_without_progress = 0
+            if not front:
+                break
+            if swaps_without_progress < max_swaps_without_progress:
+                node0, node1 = self._choose_swap(front, qubit_queues, qubit_ids, positions, decay)
+                swaps_without_progress += 1
+                apply_swap(node0, node1)
+            else:
+                # The heuristic is stuck: move the qubits of the oldest gate of the front layer next to each other
+                logical_id0, logical_id1 = front[min(front)]
+                node0, target = positions[logical_id0], positions[logical_id1]
+                while distances[node0][target] > 1:
+                    distance = distances[node0][target]
+                    node1 = next(node for node in neighbors[node0] if distances[node][target] < distance)
+                    apply_swap(node0, node1)
+                    node0 = node1
+                swaps_without_progress = 0
+
+        # Deallocate all nodes which we only needed for the swaps:
+        for node in sorted(ancillas):
+            send_on_node(Deallocate, node)
+        if swaps:
+            # Register statistics:
+            self.num_mappings += 1
+            depth = return_swap_depth(swaps)
+            if depth not in self.depth_of_swaps:
+                self.depth_of_swaps[depth] = 1
+            else:
+                self.depth_of_swaps[depth] += 1
+            if len(swaps) not in self.num_of_swaps_per_mapping:
+                self.num_of_swaps_per_mapping[len(swaps)] = 1
+            else:
+                self.num_of_swaps_per_mapping[len(swaps)] += 1
+        self._stored_commands = [cmd for pos, cmd in enumerate(stored_commands) if not done[pos]]
+        # Check that mapper actually made progress
+        if len(self._stored_commands) == num_of_stored_commands_before:
+            raise RuntimeError(
+                "Mapper is potentially in an infinite loop. It is likely that the algorithm requires too many "
+                "qubits. Increase the number of qubits for this mapper."
+            )
+
+    def _choose_node(  # pylint: disable=too-many-arguments
+        self, logical_id, qubit_queues, qubit_ids, positions, occupants
+    ):
+        """
+        Return the free node on which to place a newly allocated logical qubit, or None if all nodes are used.
+
+        The qubit is placed as close as possible to the first qubit it interacts with if that qubit is already placed,
+        otherwise on the most central free node.
+        """
+        partner_node = None
+        for pos in qubit_queues[logical_id]:
+            if len(qubit_ids[pos]) == 2:
+                partner = qubit_ids[pos][0] if qubit_ids[pos][1] == logical_id else qubit_ids[pos][1]
+                partner_node = positions.get(partner)
+                break
+        if partner_node is not None:
+            free = np.fromiter((occupant is None for occupant in occupants), dtype=bool, count=self.num_qubits)
+            if free.any():
+                return int(np.argmin(np.where(free, self.distances[partner_node], self.num_qubits)))
+            return None
+        for node in self._central_nodes:
+            if occupants[node] is None:
+                return node
+        return None
+
+    def _choose_swap(  # pylint: disable=too-many-arguments,too-many-locals
+        self, front, qubit_queues, qubit_ids, positions, decay
+    ):
+        """
+        Return the nodes of the Swap with the lowest SABRE cost.
+
+        The cost of a Swap is the mean distance between the qubits of the gates of the front layer plus lookahead_weight
+        times the mean distance between the qubits of the next lookahead_size 2 qubit gates, after the Swap, multiplied
+        by the largest decay of the two swapped nodes. The costs of all Swaps on an edge next to a qubit of the front
+        layer are evaluated at once.
+        """
+        distances = self.distances
+        front_nodes = np.array(
+            [(positions[logical_id0], positions[logical_id1]) for logical_id0, logical_id1 in front.values()]
+        )
+        # The next 2 qubit gate on each qubit of the front layer (oldest gates first)
+        extended_positions = set()
+        for front_pos in sorted(front):
+            for logical_id in front[front_pos]:
+                for pos in itertools.islice(qubit_queues[logical_id], 1, None):
+                    ids = qubit_ids[pos]
+                    if len(ids) == 2:
+                        if ids[0] in positions and ids[1] in positions:
+                            extended_positions.add(pos)
+                        break
+            if len(extended_positions) >= self.lookahead_size:
+                break
+        extended_gates = [
+            (positions[qubit_ids[pos][0]], positions[qubit_ids[pos][1]]) for pos in sorted(extended_positions)
+        ]
+
+        # The gates of the front layer act on distinct qubits, so each node has at most one partner in the front layer
+        partners = np.full(self.num_qubits, -1)
+        partners[front_nodes[:, 0]] = front_nodes[:, 1]
+        partners[front_nodes[:, 1]] = front_nodes[:, 0]
+        edges = self._edges[(partners[self._edges[:, 0]] >= 0) | (partners[self._edges[:, 1]] >= 0)]
+        nodes0, nodes1 = edges[:, 0], edges[:, 1]
+
+        front_cost = np.full(len(edges), distances[front_nodes[:, 0], front_nodes[:, 1]].sum())
+        for moved, other in ((nodes0, nodes1), (nodes1, nodes0)):
+            partner = partners[moved]
+            changed = (partner >= 0) & (partner != other)
+            partner = partner[changed]
+            front_cost[changed] += distances[other[changed], partner] - distances[moved[changed], partner]
+        cost = front_cost / len(front_nodes)
+        if extended_gates:
+            # Nodes of the gates (columns) after each Swap (rows)
+            swapped0, swapped1 = nodes0[:, np.newaxis], nodes1[:, np.newaxis]
+            gate_nodes = []
+            for gate_node in np.array(extended_gates).T:
+                gate_node = gate_node[np.newaxis, :]
+                gate_nodes.append(
+                    np.where(gate_node == swapped0, swapped1, np.where(gate_node == swapped1, swapped0, gate_node))
+                )
+            extended_cost = distances[gate_nodes[0], gate_nodes[1]].sum(axis=1)
+            cost += self.lookahead_weight * extended_cost / len(extended_gates)
+        cost *= np.maximum(decay[nodes0], decay[nodes1])
+        best = int(np.argmin(cost))
+        return int(nodes0[best]), int(nodes1[best])
+
+    def receive(self, command_list):
+        """
+        Receive a list of commands.
+
+        Receive a command list and, for each command, stores it until we do a mapping (FlushGate or Cache of stored
+        commands is full).
+
+        Args:
+            command_list (list of Command objects): list of commands to receive.
+        """
+        for cmd in command_list:
+            if isinstance(cmd.gate, FlushGate):
+                while self._stored_commands:
+                    self._run()
+                self.send([cmd])
+            else:
+                self._stored_commands.append(cmd)
+            # Storage is full: Create new map and send some gates away:
+            if len(self._stored_commands) >= self.storage:
+                self._run()
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""Tests for divya.cengines._graphmapper.py."""
+
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from divya import MainEngine
+from divya.backends import Simulator
+from divya.cengines import DummyEngine
+from divya.cengines import _graphmapper as gm
+from divya.meta import LogicalQubitIDTag
+from divya.ops import (
+    CNOT,
+    All,
+    Allocate,
+    BasicGate,
+    ClassicalInstructionGate,
+    Command,
+    Deallocate,
+    FlushGate,
+    H,
+    Measure,
+    Rz,
+    Swap,
+    X,
+)
+from divya.types import WeakQubitRef
+
+def _make_mapper(graph, **kwargs):
+    mapper = gm.GraphMapper(graph, **kwargs)
+    backend = DummyEngine(save_commands=True)
+    backend.is_last_engine = True
+    mapper.next_engine = backend
+    return mapper, backend
+
+def _flush():
+    return Command(engine=None, gate=FlushGate(), qubits=([WeakQubitRef(engine=None, idx=-1)],))
+
+def _two_qubit_cmds(backend):
+    return [cmd for cmd in backend.received_commands if sum(len(qureg) for qureg in cmd.all_qubits) == 2]
+
+def test_is_available():
+    mapper = gm.GraphMapper(nx.path_graph(3))
+    qb0 = WeakQubitRef(engine=None, idx=0)
+    qb1 = WeakQubitRef(engine=None, idx=1)
+    qb2 = WeakQubitRef(engine=None, idx=2)
+    assert mapper.is_available(Command(None, BasicGate(), qubits=([qb0],)))
+    assert mapper.is_available(Command(None, BasicGate(), qubits=([qb0],), controls=[qb1]))
+    assert not mapper.is_available(Command(None, BasicGate(), qubits=([qb0], [qb1, qb2])))
+
+def test_graph_must_be_connected():
+    with pytest.raises(RuntimeError):
+        gm.GraphMapper(nx.Graph())
+    graph = nx.path_graph(3)
+    graph.add_node(5)
+    with pytest.raises(RuntimeError):
+        gm.GraphMapper(graph)
+
+def test_distances():
+    graph = nx.relabel_nodes(nx.random_regular_graph(3, 12, seed=4), lambda node: 2 * node + 1)
+    mapper = gm.GraphMapper(graph)
+    lengths = dict(nx.all_pairs_shortest_path_length(graph))
+    backend_ids = sorted(graph.nodes)
+    for i, node0 in enumerate(backend_ids):
+        for j, node1 in enumerate(backend_ids):
+            assert mapper.distances[i, j] == lengths[node0][node1]
+
+def test_logical_id_tags_allocate_and_deallocate():
+    mapper, backend = _make_mapper(nx.path_graph(4))
+    qb0 = WeakQubitRef(engine=None, idx=0)
+    qb1 = WeakQubitRef(engine=None, idx=1)
+    cmd0 = Command(engine=None, gate=Allocate, qubits=([qb0],))
+    cmd1 = Command(engine=None, gate=Allocate, qubits=([qb1],))
+    cmd2 = Command(None, X, qubits=([qb0],), controls=[qb1])
+    cmd3 = Command(engine=None, gate=Deallocate, qubits=([qb0],))
+    cmd4 = Command(engine=None, gate=Deallocate, qubits=([qb1],))
+    mapper.receive([cmd0, cmd1, cmd2, _flush()])
+    # The most central node is used first, then its nearest free neighbour
+    assert backend.received_commands[0].gate == Allocate
+    assert backend.received_commands[0].qubits[0][0].id == 1
+    assert backend.received_commands[0].tags == [LogicalQubitIDTag(0)]
+    assert backend.received_commands[1].gate == Allocate
+    assert backend.received_commands[1].qubits[0][0].id == 0
+    assert backend.received_commands[1].tags == [LogicalQubitIDTag(1)]
+    assert backend.received_commands[2].gate == X
+    assert mapper.current_mapping == {0: 1, 1: 0}
+    mapper.receive([cmd3, cmd4, _flush()])
+    assert backend.received_commands[-3].gate == Deallocate
+    assert backend.received_commands[-3].qubits[0][0].id == 1
+    assert backend.received_commands[-3].tags == [LogicalQubitIDTag(0)]
+    assert backend.received_commands[-2].gate == Deallocate
+    assert backend.received_commands[-2].qubits[0][0].id == 0
+    assert backend.received_commands[-2].tags == [LogicalQubitIDTag(1)]
+    assert mapper.current_mapping == {}
+
+def test_swaps_on_line():
+    mapper, backend = _make_mapper(nx.path_graph(4))
+    qubits = [WeakQubitRef(engine=None, idx=i) for i in range(2)]
+    cmds = [Command(engine=None, gate=Allocate, qubits=([qubit],)) for qubit in qubits]
+    mapper.current_mapping = {0: 0, 1: 3}
+    cmds.append(Command(None, X, qubits=([qubits[0]],), controls=[qubits[1]]))
+    mapper.receive(cmds + [_flush()])
+    assert [cmd.gate for cmd in backend.received_commands[:2]] == [Allocate] * 2
+    # The free node used by the swap is allocated for the swap and deallocated afterwards
+    assert backend.received_commands[2].gate == Allocate
+    assert backend.received_commands[2].tags == []
+    free_node = backend.received_commands[2].qubits[0][0].id
+    assert backend.received_commands[3].gate == Swap
+    swapped = {qubit.id for qureg in backend.received_commands[3].qubits for qubit in qureg}
+    assert swapped in ({0, 1}, {2, 3})
+    assert free_node in swapped
+    for cmd in _two_qubit_cmds(backend):
+        node0, node1 = (qubit.id for qureg in cmd.all_qubits for qubit in qureg)
+        assert abs(node0 - node1) == 1
+    assert backend.received_commands[-2].gate == Deallocate
+    assert isinstance(backend.received_commands[-1].gate, FlushGate)
+    assert mapper.num_mappings == 1
+    assert mapper.num_of_swaps_per_mapping == {2: 1}
+    # The decay favours the swap which can be applied in parallel
+    assert mapper.depth_of_swaps == {1: 1}
+
+def test_run_infinite_loop_detection():
+    mapper, _ = _make_mapper(nx.path_graph(1))
+    qb0 = WeakQubitRef(engine=None, idx=0)
+    qb1 = WeakQubitRef(engine=None, idx=1)
+    cmd0 = Command(engine=None, gate=Allocate, qubits=([qb0],))
+    cmd1 = Command(engine=None, gate=Allocate, qubits=([qb1],))
+    cmd2 = Command(None, X, qubits=([qb0],), controls=[qb1])
+    with pytest.raises(RuntimeError):
+        mapper.receive([cmd0, cmd1, cmd2, _flush()])
+
+def test_allocation_waits_for_deallocation():
+    mapper, backend = _make_mapper(nx.path_graph(2), storage=4)
+    qb0 = WeakQubitRef(engine=None, idx=0)
+    qb1 = WeakQubitRef(engine=None, idx=1)
+    qb2 = WeakQubitRef(engine=None, idx=2)
+    cmds = [
+        Command(engine=None, gate=Allocate, qubits=([qb0],)),
+        Command(engine=None, gate=Allocate, qubits=([qb1],)),
+        Command(engine=None, gate=Allocate, qubits=([qb2],)),
+        Command(None, X, qubits=([qb2],), controls=[qb1]),
+        Command(engine=None, gate=Deallocate, qubits=([qb0],)),
+    ]
+    mapper.receive(cmds + [_flush()])
+    assert [cmd.gate for cmd in backend.received_commands[:-1]] == [Allocate, Allocate, Deallocate, Allocate, X]
+    assert backend.received_commands[3].qubits[0][0].id == backend.received_commands[2].qubits[0][0].id
+    assert backend.received_commands[3].tags == [LogicalQubitIDTag(2)]
+
+def test_stuck_heuristic_fallback():
+    mapper, backend = _make_mapper(nx.path_graph(6))
+    qubits = [WeakQubitRef(engine=None, idx=i) for i in range(2)]
+    mapper.current_mapping = {0: 0, 1: 5}
+    # A heuristic which keeps swapping the same two qubits
+    mapper._choose_swap = lambda *args: (2, 3)
+    cmds = [Command(engine=None, gate=Allocate, qubits=([qubit],)) for qubit in qubits]
+    cmds.append(Command(None, X, qubits=([qubits[0]],), controls=[qubits[1]]))
+    mapper.receive(cmds + [_flush()])
+    cnot = _two_qubit_cmds(backend)[-1]
+    assert cnot.gate == X
+    assert abs(cnot.qubits[0][0].id - cnot.control_qubits[0].id) == 1
+
+def _apply_circuit(qureg, seed=3):
+    rng = random.Random(seed)
+    for _ in range(30):
+        qubit, other = rng.sample(qureg, 2)
+        H | qubit
+        Rz(rng.random()) | other
+        CNOT | (qubit, other)
+
+@pytest.mark.parametrize(
+    "graph",
+    [
+        nx.path_graph(7),
+        nx.convert_node_labels_to_integers(nx.grid_2d_graph(2, 4)),
+        nx.random_regular_graph(3, 8, seed=1),
+    ],
+)
+def test_simulation(graph):
+    states = []
+    for engine_list in ([], [gm.GraphMapper(graph, storage=17)]):
+        backend = Simulator()
+        eng = MainEngine(backend=backend, engine_list=engine_list)
+        qureg = eng.allocate_qureg(6)
+        _apply_circuit(qureg)
+        eng.flush()
+        states.append([eng.backend.get_amplitude(format(i, '06b'), qureg) for i in range(64)])
+        All(Measure) | qureg
+    assert np.allclose(states[0], states[1])
+
+def test_gates_on_neighbours():
+    graph = nx.random_regular_graph(3, 40, seed=2)
+    backend = DummyEngine(save_commands=True)
+    mapper = gm.GraphMapper(graph, storage=50)
+    eng = MainEngine(backend=backend, engine_list=[mapper])
+    qureg = eng.allocate_qureg(30)
+    _apply_circuit(qureg)
+    All(Measure) | qureg
+    eng.flush()
+    allocated = set()
+    for cmd in backend.received_commands:
+        ids = [qubit.id for qureg in cmd.all_qubits for qubit in qureg]
+        if cmd.gate == Allocate:
+            assert ids[0] not in allocated
+            allocated.add(ids[0])
+        elif cmd.gate == Deallocate:
+            allocated.remove(ids[0])
+        elif not isinstance(cmd.gate, ClassicalInstructionGate):
+            assert set(ids) <= allocated
+            if len(ids) == 2:
+                assert graph.has_edge(*ids)
+    assert mapper.num_mappings > 0
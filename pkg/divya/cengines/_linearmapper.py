@@ -44,6 +44,7 @@ from divya.ops import (
 from divya.types import WeakQubitRef
 
 from ._basicmapper import BasicMapperEngine
+from ._storedcommands import StoredCommands
 
 def return_swap_depth(swaps):
     """
@@ -105,7 +106,7 @@ class LinearMapper(BasicMapperEngine):  # pylint: disable=too-many-instance-attr
         self.cyclic = cyclic
         self.storage = storage
         # Storing commands
-        self._stored_commands = []
+        self._stored_commands = StoredCommands()
         # Logical qubit ids for which the Allocate gate has already been
         # processed and sent to the next engine but which are not yet
         # deallocated:
@@ -453,76 +454,67 @@ class LinearMapper(BasicMapperEngine):  # pylint: disable=too-many-instance-attr
                     finished_sorting = False
         return swap_operations
 
-    def _send_possible_commands(self):  # pylint: disable=too-many-branches
+    def _send_possible_commands(self):
         """
         Send the stored commands possible without changing the mapping.
 
+        Only the ready stored commands (see StoredCommands) are tried, i.e. at most one command per qubit.
+
         Note: self.current_mapping must exist already
         """
-        active_ids = deepcopy(self._currently_allocated_ids)
-        for logical_id in self.current_mapping:
-            active_ids.add(logical_id)
-
-        new_stored_commands = []
-        for i, cmd in enumerate(self._stored_commands):
-            if len(active_ids) == 0:
-                new_stored_commands += self._stored_commands[i:]
-                break
+        if not isinstance(self._stored_commands, StoredCommands):
+            self._stored_commands = StoredCommands(self._stored_commands)
+        mapping = self._current_mapping
+
+        def send(cmd):
+            logical_id = cmd.qubits[0][0].id
             if isinstance(cmd.gate, AllocateQubitGate):
-                if cmd.qubits[0][0].id in self.current_mapping:
-                    self._currently_allocated_ids.add(cmd.qubits[0][0].id)
-                    qb = WeakQubitRef(engine=self, idx=self.current_mapping[cmd.qubits[0][0].id])
-                    new_cmd = Command(
-                        engine=self,
-                        gate=AllocateQubitGate(),
-                        qubits=([qb],),
-                        tags=[LogicalQubitIDTag(cmd.qubits[0][0].id)],
-                    )
-                    self.send([new_cmd])
-                else:
-                    new_stored_commands.append(cmd)
-            elif isinstance(cmd.gate, DeallocateQubitGate):
-                if cmd.qubits[0][0].id in active_ids:
-                    qb = WeakQubitRef(engine=self, idx=self.current_mapping[cmd.qubits[0][0].id])
-                    new_cmd = Command(
-                        engine=self,
-                        gate=DeallocateQubitGate(),
-                        qubits=([qb],),
-                        tags=[LogicalQubitIDTag(cmd.qubits[0][0].id)],
-                    )
-                    self._currently_allocated_ids.remove(cmd.qubits[0][0].id)
-                    active_ids.remove(cmd.qubits[0][0].id)
-                    self._current_mapping.pop(cmd.qubits[0][0].id)
-                    self.send([new_cmd])
-                else:
-                    new_stored_commands.append(cmd)
-            else:
-                send_gate = True
-                mapped_ids = set()
-                for qureg in cmd.all_qubits:
-                    for qubit in qureg:
-                        if qubit.id not in active_ids:
-                            send_gate = False
-                            break
-                        mapped_ids.add(self.current_mapping[qubit.id])
-                # Check that mapped ids are nearest neighbour
-                if len(mapped_ids) == 2:
-                    mapped_ids = list(mapped_ids)
-                    diff = abs(mapped_ids[0] - mapped_ids[1])
-                    if self.cyclic:
-                        if diff not in (1, self.num_qubits - 1):
-                            send_gate = False
-                    else:
-                        if diff != 1:
-                            send_gate = False
-                if send_gate:
-                    self._send_cmd_with_mapped_ids(cmd)
+                if logical_id not in mapping:
+                    return False
+                self._currently_allocated_ids.add(logical_id)
+                qb = WeakQubitRef(engine=self, idx=mapping[logical_id])
+                new_cmd = Command(
+                    engine=self,
+                    gate=AllocateQubitGate(),
+                    qubits=([qb],),
+                    tags=[LogicalQubitIDTag(logical_id)],
+                )
+                self.send([new_cmd])
+                return True
+            if isinstance(cmd.gate, DeallocateQubitGate):
+                if logical_id not in mapping:
+                    return False
+                qb = WeakQubitRef(engine=self, idx=mapping[logical_id])
+                new_cmd = Command(
+                    engine=self,
+                    gate=DeallocateQubitGate(),
+                    qubits=([qb],),
+                    tags=[LogicalQubitIDTag(logical_id)],
+                )
+                self._currently_allocated_ids.remove(logical_id)
+                mapping.pop(logical_id)
+                self.send([new_cmd])
+                return True
+            mapped_ids = set()
+            for qureg in cmd.all_qubits:
+                for qubit in qureg:
+                    if qubit.id not in mapping:
+                        return False
+                    mapped_ids.add(mapping[qubit.id])
+            # Check that mapped ids are nearest neighbour
+            if len(mapped_ids) == 2:
+                mapped_ids = list(mapped_ids)
+                diff = abs(mapped_ids[0] - mapped_ids[1])
+                if self.cyclic:
+                    if diff not in (1, self.num_qubits - 1):
+                        return False
                 else:
-                    for qureg in cmd.all_qubits:
-                        for qubit in qureg:
-                            active_ids.discard(qubit.id)
-                    new_stored_commands.append(cmd)
-        self._stored_commands = new_stored_commands
+                    if diff != 1:
+                        return False
+            self._send_cmd_with_mapped_ids(cmd)
+            return True
+
+        self._stored_commands.send_ready(send)
 
     def _run(self):  # pylint: disable=too-many-locals,too-many-branches
         """
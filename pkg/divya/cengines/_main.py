@@ -33,6 +33,7 @@ from divya.types import WeakQubitRef
 
 from ._basicmapper import BasicMapperEngine
 from ._basics import BasicEngine
+from ._profiler import PipelineProfiler
 
 class NotYetMeasuredError(Exception):
     """Exception raised when trying to access the measurement value of a qubit that has not yet been measured."""
@@ -69,10 +70,13 @@ class MainEngine(BasicEngine):  # pylint: disable=too-many-instance-attributes
         mapper (BasicMapperEngine): Access to the mapper if there is one.
         n_engines (int): Current number of compiler engines in the engine list
         n_engines_max (int): Maximum number of compiler engines allowed in the engine list. Defaults to 100.
+        batch_size (int): Maximum number of commands buffered before they are sent down the pipeline as one list
+            (None if batching is disabled).
+        profiler (PipelineProfiler): Profiler recording per-engine statistics (None if profiling is disabled).
     """
 
     def __init__(  # pylint: disable=too-many-statements,too-many-branches
-        self, backend=None, engine_list=None, verbose=False
+        self, backend=None, engine_list=None, verbose=False, batch_size=None, profile=False
     ):
         """
         Initialize the main compiler engine and all compiler engines.
@@ -87,6 +91,14 @@ class MainEngine(BasicEngine):  # pylint: disable=too-many-instance-attributes
                 Default: divya.setups.default.get_engine_list()
             verbose (bool): Either print full or compact error messages.
                             Default: False (i.e. compact error messages).
+            batch_size (int): If not None, buffer up to batch_size commands and send them down the pipeline as a
+                single list. The buffer is also delivered on flush, when a measurement result is read and when the
+                engine list is modified (e.g., when entering or leaving a meta context such as Compute or Control).
+                Default: None (i.e. every command is sent on its own).
+            profile (bool): If True, record per-engine statistics (commands received and sent, time spent in receive,
+                peak number of buffered commands, calls to is_available) for all engines in engine_list and the
+                back-end. The statistics are returned by flush() and available via the profiler attribute.
+                Default: False.
 
         Example:
             .. code-block:: python
@@ -128,6 +140,13 @@ class MainEngine(BasicEngine):  # pylint: disable=too-many-instance-attributes
         self.verbose = verbose
         self.main_engine = self
         self.n_engines_max = _N_ENGINES_THRESHOLD
+        self.batch_size = None
+        self._command_buffer = []
+        self.profiler = None
+        if batch_size is not None and batch_size < 1:
+            self.next_engine = _ErrorEngine()
+            raise ValueError('The batch size must be a positive integer!')
+        self.batch_size = batch_size
 
         if backend is None:
             backend = Simulator()
@@ -195,6 +214,7 @@ class MainEngine(BasicEngine):  # pylint: disable=too-many-instance-attributes
         engine_list[-1].main_engine = self
         engine_list[-1].is_last_engine = True
         self.next_engine = engine_list[0]
+        self.profiler = PipelineProfiler(engine_list) if profile else None
 
         # In order to terminate an example code without eng.flush
         def atexit_function(weakref_main_eng):
@@ -258,6 +278,9 @@ class MainEngine(BasicEngine):  # pylint: disable=too-many-instance-attributes
                 Measure | qubit
                 eng.get_measurement_result(qubit[0]) == int(qubit)
         """
+        # The measurement might still be waiting in the command buffer or be executed on another thread
+        self.send_buffered_commands()
+        self.synchronize()
         if qubit.id in self._measurements:
             return self._measurements[qubit.id]
         raise NotYetMeasuredError(
@@ -268,6 +291,34 @@ class MainEngine(BasicEngine):  # pylint: disable=too-many-instance-attributes
             "underlying backend failed to register the measurement result\n"
         )
 
+    def synchronize(self):
+        """Wait for all engines which execute commands asynchronously (see AsyncEngine) to finish them."""
+        engine = self.next_engine
+        while isinstance(engine, BasicEngine):
+            synchronize = getattr(engine, 'synchronize', None)
+            if synchronize is not None:
+                synchronize()
+            engine = engine.next_engine
+
+    def defer_deallocation(self, engine, qubit):
+        """
+        Let the engines which execute commands asynchronously (see AsyncEngine) defer the deallocation of a qubit.
+
+        Args:
+            engine (BasicEngine): Engine deallocating the qubit.
+            qubit (BasicQubit): Qubit to deallocate.
+
+        Returns:
+            True if one of the engines deferred the deallocation and False otherwise.
+        """
+        next_engine = self.next_engine
+        while isinstance(next_engine, BasicEngine):
+            defer_deallocation = getattr(next_engine, 'defer_deallocation', None)
+            if defer_deallocation is not None and defer_deallocation(engine, qubit):
+                return True
+            next_engine = next_engine.next_engine
+        return False
+
     def get_new_qubit_id(self):
         """
         Return a unique qubit id to be used for the next qubit allocation.
@@ -292,8 +343,27 @@ class MainEngine(BasicEngine):  # pylint: disable=too-many-instance-attributes
         """
         Forward the list of commands to the next engine in the pipeline.
 
-        It also shortens exception stack traces if self.verbose is False.
+        If batching is enabled, the commands are buffered until either batch_size commands are pending or a FlushGate
+        is sent. It also shortens exception stack traces if self.verbose is False.
         """
+        if self.batch_size is not None:
+            self._command_buffer.extend(command_list)
+            # A FlushGate always comes last in the list it is sent with
+            if len(self._command_buffer) < self.batch_size and not isinstance(self._command_buffer[-1].gate, FlushGate):
+                return
+            command_list = self._command_buffer
+            self._command_buffer = []
+        self._send(command_list)
+
+    def send_buffered_commands(self):
+        """Send all commands which are still pending in the command buffer down the pipeline."""
+        if self._command_buffer:
+            command_list = self._command_buffer
+            self._command_buffer = []
+            self._send(command_list)
+
+    def _send(self, command_list):
+        """Forward the list of commands to the next engine, shortening exception stack traces if not verbose."""
         try:
             self.next_engine.receive(command_list)
         except Exception as err:  # pylint: disable=broad-except
@@ -315,9 +385,15 @@ class MainEngine(BasicEngine):  # pylint: disable=too-many-instance-attributes
         Args:
             deallocate_qubits (bool): If True, deallocates all qubits that are still alive (invalidating references to
                 them by setting their id to -1).
+
+        Returns:
+            The profiling report (see PipelineProfiler.report) if profiling is enabled, None otherwise.
         """
         if deallocate_qubits:
             while [qb for qb in self.active_qubits if qb is not None]:
                 qb = self.active_qubits.pop()
                 qb.__del__()
-        self.receive([Command(self, FlushGate(), ([WeakQubitRef(self, -1)],))])
\ No newline at end of file
+        self.receive([Command(self, FlushGate(), ([WeakQubitRef(self, -1)],))])
+        if self.profiler is not None:
+            return self.profiler.report()
+        return None
\ No newline at end of file
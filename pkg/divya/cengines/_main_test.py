@@ -28,7 +28,16 @@ import pytest
 
 from divya.backends import Simulator
 from divya.cengines import BasicMapperEngine, DummyEngine, LocalOptimizer, _main
-from divya.ops import AllocateQubitGate, DeallocateQubitGate, FlushGate, H
+from divya.meta import Control
+from divya.ops import (
+    AllocateQubitGate,
+    Command,
+    DeallocateQubitGate,
+    FlushGate,
+    H,
+    Measure,
+    X,
+)
 
 def test_main_engine_init():
     ceng1 = DummyEngine()
@@ -152,6 +161,42 @@ def test_main_engine_flush():
     # keep the qubit alive until at least here
     assert len(str(qubit)) != 0
 
+def test_main_engine_batching():
+    received_lists = []
+
+    class RecordingEngine(DummyEngine):
+        def receive(self, command_list):
+            received_lists.append(command_list)
+            self.send(command_list)
+
+    backend = Simulator()
+    eng = _main.MainEngine(backend=backend, engine_list=[RecordingEngine()], batch_size=4)
+    qubit = eng.allocate_qubit()
+    ctrl = eng.allocate_qubit()
+    H | qubit
+    assert received_lists == []
+    X | qubit
+    assert [len(cmd_list) for cmd_list in received_lists] == [4]
+    H | qubit
+    # Entering and leaving meta contexts delivers the pending commands
+    with Control(eng, ctrl):
+        assert [len(cmd_list) for cmd_list in received_lists] == [4, 1]
+        X | qubit
+    assert [len(cmd_list) for cmd_list in received_lists] == [4, 1, 1]
+    Measure | qubit
+    assert len(received_lists) == 3
+    # Reading the measurement result delivers the pending commands
+    assert int(qubit) == 0
+    assert len(received_lists) == 4
+    H | qubit
+    eng.flush()
+    assert [len(cmd_list) for cmd_list in received_lists[4:]] == [2]
+    assert isinstance(received_lists[-1][-1].gate, FlushGate)
+
+def test_main_engine_batching_invalid_batch_size():
+    with pytest.raises(ValueError):
+        _main.MainEngine(backend=DummyEngine(), engine_list=[], batch_size=0)
+
 def test_main_engine_atexit_no_error():
     # Clear previous exceptions of other tests
     sys.last_type = None
@@ -190,4 +235,26 @@ def test_exceptions_are_forwarded():
     eng.next_engine = DummyEngine()
     eng.next_engine.is_last_engine = True
     eng2.next_engine = DummyEngine()
-    eng2.next_engine.is_last_engine = True
\ No newline at end of file
+    eng2.next_engine.is_last_engine = True
+def test_main_engine_profile():
+    eng = _main.MainEngine(backend=Simulator(), engine_list=[LocalOptimizer(3), DummyEngine()], profile=True)
+    assert _main.MainEngine(backend=DummyEngine(), engine_list=[]).flush() is None
+    qureg = eng.allocate_qureg(2)
+    H | qureg[0]
+    H | qureg[0]
+    X | qureg[1]
+    assert eng.is_available(Command(eng, X, ([qureg[1]],)))
+    report = eng.flush()
+    assert [entry['name'] for entry in report] == ['0: LocalOptimizer', '1: DummyEngine', '2: Simulator']
+    optimizer, dummy, simulator = report
+    # 2 allocations, 3 gates and the flush gate
+    assert optimizer['commands_received'] == 6
+    assert optimizer['commands_sent'] == 4
+    # the second H gate cancels the first one as soon as it is received
+    assert optimizer['peak_buffered_commands'] == 3
+    assert optimizer['is_available_calls'] == 1
+    assert dummy['commands_received'] == dummy['commands_sent'] == simulator['commands_received'] == 4
+    assert simulator['commands_sent'] == 0
+    assert all(entry['receive_time'] >= 0 for entry in report)
+    assert 'LocalOptimizer' in str(eng.profiler)
+    eng.flush(deallocate_qubits=True)
@@ -22,12 +22,105 @@
 
 """A local optimizer engine."""
 
+import itertools
 import warnings
 
-from divya.ops import FastForwardingGate, FlushGate, NotMergeable
+from divya.ops import (
+    BasicPhaseGate,
+    DaggeredGate,
+    FastForwardingGate,
+    FlushGate,
+    NotInvertible,
+    NotMergeable,
+    Rx,
+    Rxx,
+    Ry,
+    Ryy,
+    Rz,
+    Rzz,
+    SGate,
+    SqrtXGate,
+    TGate,
+    XGate,
+    YGate,
+    ZGate,
+)
 
 from ._basics import BasicEngine
 
+# Gates which are diagonal in the product basis of the Z, X or Y eigenstates of all the qubits they act upon
+_DIAGONAL_GATES = (
+    ((ZGate, SGate, TGate, Rz, Rzz, BasicPhaseGate), 'Z'),
+    ((XGate, SqrtXGate, Rx, Rxx), 'X'),
+    ((YGate, Ry, Ryy), 'Y'),
+)
+
+def _get_commutation_bases(cmd):
+    """
+    Return a dict mapping the IDs of the qubits of a command to the basis ('Z', 'X' or 'Y') in which it is diagonal.
+
+    The command is block-diagonal in the product basis of these qubits: control qubits are always in the 'Z' basis and
+    the target qubits are in the basis of the gate (if the gate is one of _DIAGONAL_GATES or their inverses). Two
+    commands commute if, on every qubit they share, they are both diagonal in the same basis.
+    """
+    bases = {qubit.id: 'Z' for qubit in cmd.control_qubits}
+    gate = cmd.gate
+    if isinstance(gate, DaggeredGate):
+        gate = gate.get_inverse()
+    for gate_classes, basis in _DIAGONAL_GATES:
+        if isinstance(gate, gate_classes):
+            for qureg in cmd.qubits:
+                for qubit in qureg:
+                    bases[qubit.id] = basis
+            break
+    return bases
+
+class _GateNode:  # pylint: disable=too-few-public-methods
+    """Node of the gate DAG of a LocalOptimizer: a command and its neighbours in the pipeline of each of its qubits."""
+
+    __slots__ = ('cmd', 'index', 'qubit_ids', 'prev', 'next', 'bases', 'removed')
+
+    def __init__(self, cmd, index, commutation=False):
+        """
+        Initialize a gate node.
+
+        Args:
+            cmd (Command): Command stored in the node.
+            index (int): Position of the command in the stream of commands received by the LocalOptimizer.
+            commutation (bool): If True, also store the commutation bases of the command.
+        """
+        self.cmd = cmd
+        self.index = index
+        self.qubit_ids = list(dict.fromkeys(qubit.id for qureg in cmd.all_qubits for qubit in qureg))
+        self.prev = dict.fromkeys(self.qubit_ids)
+        self.next = dict.fromkeys(self.qubit_ids)
+        self.bases = _get_commutation_bases(cmd) if commutation else None
+        self.removed = False
+
+    def commutes_with(self, other):
+        """Return True if the commands of this node and of another node are known to commute."""
+        for qubit_id in self.qubit_ids:
+            if qubit_id in other.prev:
+                basis = self.bases.get(qubit_id)
+                if basis is None or basis != other.bases.get(qubit_id):
+                    return False
+        return True
+
+class _QubitPipeline:  # pylint: disable=too-few-public-methods
+    """Doubly linked list of the gate nodes acting on one qubit."""
+
+    __slots__ = ('head', 'tail', 'length')
+
+    def __init__(self):
+        """Initialize an empty pipeline."""
+        self.head = None
+        self.tail = None
+        self.length = 0
+
+    def __len__(self):
+        """Return the number of gates in the pipeline."""
+        return self.length
+
 class LocalOptimizer(BasicEngine):
     """
     Circuit optimization compiler engine.
@@ -35,21 +128,28 @@ class LocalOptimizer(BasicEngine):
     LocalOptimizer is a compiler engine which optimizes locally (merging rotations, cancelling gates with their
     inverse) in a local window of user- defined size.
 
-    It stores all commands in a dict of lists, where each qubit has its own gate pipeline. After adding a gate, it
-    tries to merge / cancel successive gates using the get_merged and get_inverse functions of the gate (if
-    available). For examples, see BasicRotationGate. Once a list corresponding to a qubit contains >=m gates, the
-    pipeline is sent on to the next engine.
+    It stores all commands in a DAG in which each qubit has its own gate pipeline (a doubly linked list). When a gate
+    is added, it is merged with / cancelled against the gate preceding it on all its qubits (if any) using the
+    get_merged and get_inverse functions of the gate (if available), and identity gates are dropped. For examples, see
+    BasicRotationGate. Once the pipeline of a qubit contains >=m gates, its first gates are sent on to the next engine.
+
+    With commutation=True, a gate is also merged with / cancelled against an earlier gate if it commutes with all the
+    gates in between, e.g., Rz and other diagonal gates through CNOT controls, Rx and other X-type gates through CNOT
+    targets, and Pauli rotations (Rz, Rzz, ...) diagonal in the same basis past each other.
     """
 
-    def __init__(self, cache_size=5, m=None):  # pylint: disable=invalid-name
+    def __init__(self, cache_size=5, m=None, commutation=False):  # pylint: disable=invalid-name
         """
         Initialize a LocalOptimizer object.
 
         Args:
             cache_size (int): Number of gates to cache per qubit, before sending on the first gate.
+            commutation (bool): If True, use commutation rules to merge and cancel gates which are not adjacent.
         """
         super().__init__()
-        self._l = {}  # dict of lists containing operations for each qubit
+        self._l = {}  # dict of _QubitPipeline objects containing the operations for each qubit
+        self._commutation = commutation
+        self._node_indices = itertools.count()
 
         if m:
             warnings.warn(
@@ -60,182 +160,197 @@ class LocalOptimizer(BasicEngine):
             cache_size = m
         self._cache_size = cache_size  # wait for m gates before sending on
 
-    # sends n gate operations of the qubit with index idx
-    def _send_qubit_pipeline(self, idx, n_gates):
-        """Send n gate operations of the qubit with index idx to the next engine."""
-        il = self._l[idx]  # pylint: disable=invalid-name
-        for i in range(min(n_gates, len(il))):  # loop over first n operations
-            # send all gates before n-qubit gate for other qubits involved
-            # --> recursively call send_helper
-            other_involved_qubits = [qb for qreg in il[i].all_qubits for qb in qreg if qb.id != idx]
-            for qb in other_involved_qubits:
-                qubit_id = qb.id
-                try:
-                    gateloc = 0
-                    # find location of this gate within its list
-                    while self._l[qubit_id][gateloc] != il[i]:
-                        gateloc += 1
-
-                    gateloc = self._optimize(qubit_id, gateloc)
-
-                    # flush the gates before the n-qubit gate
-                    self._send_qubit_pipeline(qubit_id, gateloc)
-                    # delete the n-qubit gate, we're taking care of it
-                    # and don't want the other qubit to do so
-                    self._l[qubit_id] = self._l[qubit_id][1:]
-                except IndexError:  # pragma: no cover
-                    print("Invalid qubit pipeline encountered (in the process of shutting down?).")
-
-            # all qubits that need to be flushed have been flushed
-            # --> send on the n-qubit gate
-            self.send([il[i]])
-        # n operations have been sent on --> resize our gate list
-        self._l[idx] = self._l[idx][n_gates:]
-
-    def _get_gate_indices(self, idx, i, qubit_ids):
+    def _append(self, node):
+        """Append a gate node to the pipelines of all its qubits."""
+        for qubit_id in node.qubit_ids:
+            pipeline = self._l.get(qubit_id)
+            if pipeline is None:
+                pipeline = self._l[qubit_id] = _QubitPipeline()
+            if pipeline.tail is None:
+                pipeline.head = node
+            else:
+                pipeline.tail.next[qubit_id] = node
+                node.prev[qubit_id] = pipeline.tail
+            pipeline.tail = node
+            pipeline.length += 1
+
+    def _remove(self, node):
+        """Remove a gate node from the pipelines of all its qubits (empty pipelines are dropped)."""
+        node.removed = True
+        for qubit_id in node.qubit_ids:
+            pipeline = self._l[qubit_id]
+            prev_node = node.prev[qubit_id]
+            next_node = node.next[qubit_id]
+            if prev_node is None:
+                pipeline.head = next_node
+            else:
+                prev_node.next[qubit_id] = next_node
+            if next_node is None:
+                pipeline.tail = prev_node
+            else:
+                next_node.prev[qubit_id] = prev_node
+            pipeline.length -= 1
+            if pipeline.length == 0:
+                del self._l[qubit_id]
+
+    @staticmethod
+    def _get_common_predecessor(node):
+        """Return the node preceding node in the pipelines of all its qubits, or None if there is no such node."""
+        prev_node = node.prev[node.qubit_ids[0]]
+        if prev_node is None:
+            return None
+        for qubit_id in node.qubit_ids:
+            if node.prev[qubit_id] is not prev_node:
+                return None
+        return prev_node
+
+    @staticmethod
+    def _is_combinable(prev_node, node):
+        """Return True if the command of node is the inverse of, or can be merged with, the command of prev_node."""
+        try:
+            if prev_node.cmd.get_inverse() == node.cmd:
+                return True
+        except NotInvertible:
+            pass
+        try:
+            prev_node.cmd.get_merged(node.cmd)
+        except NotMergeable:
+            return False
+        return True
+
+    @staticmethod
+    def _commutes_back_to(node, prev_node, qubit_id):
+        """Return True if node commutes with all the gates between prev_node and node on the qubit with ID qubit_id."""
+        current = node.prev[qubit_id]
+        while current is not prev_node:
+            if current is None or not node.commutes_with(current):
+                return False
+            current = current.prev[qubit_id]
+        return True
+
+    def _find_commuting_partner(self, node):
         """
-        Return all indices of a command.
+        Return an earlier node node can be merged with or cancelled against, or None if there is no such node.
 
-        Each index corresponding to the command's index in one of the qubits' command lists.
-
-        Args:
-            idx (int): qubit index
-            i (int): command position in qubit idx's command list
-            IDs (list<int>): IDs of all qubits involved in the command
+        The earlier node acts on the same qubits as node and node commutes with all the gates in between.
         """
-        N = len(qubit_ids)
-        # 1-qubit gate: only gate at index i in list #idx is involved
-        if N == 1:
-            return [i]
-
-        # When the same gate appears multiple time, we need to make sure not to
-        # match earlier instances of the gate applied to the same qubits. So we
-        # count how many there are, and skip over them when looking in the
-        # other lists.
-        cmd = self._l[idx][i]
-        num_identical_to_skip = sum(1 for prev_cmd in self._l[idx][:i] if prev_cmd == cmd)
-        indices = []
-        for qubit_id in qubit_ids:
-            identical_indices = [i for i, c in enumerate(self._l[qubit_id]) if c == cmd]
-            indices.append(identical_indices[num_identical_to_skip])
-        return indices
-
-    def _optimize(self, idx, lim=None):
+        first_qubit_id = node.qubit_ids[0]
+        qubit_ids = set(node.qubit_ids)
+        current = node.prev[first_qubit_id]
+        while current is not None:
+            if (
+                len(current.qubit_ids) == len(qubit_ids)
+                and qubit_ids.issuperset(current.qubit_ids)
+                and self._is_combinable(current, node)
+                and all(self._commutes_back_to(node, current, qubit_id) for qubit_id in node.qubit_ids[1:])
+            ):
+                return current
+            if not node.commutes_with(current):
+                return None
+            current = current.prev[first_qubit_id]
+        return None
+
+    def _remove_and_revisit(self, node, worklist):
+        """Remove a node and add the gates following it to the worklist (they may now be merged or cancelled)."""
+        worklist.extend(next_node for next_node in node.next.values() if next_node is not None)
+        self._remove(node)
+
+    def _optimize(self, node):
         """
         Gate cancellation routine.
 
-        Try to remove identity gates using the is_identity function, then merge or even cancel successive gates using
-        the get_merged and get_inverse functions of the gate (see, e.g., BasicRotationGate).
+        Try to remove the newly added node if it is an identity gate (using the is_identity function), then merge or
+        even cancel it with the gate preceding it on all its qubits using the get_merged and get_inverse functions of
+        the gate (see, e.g., BasicRotationGate). A merged gate is in turn tried against its own predecessor.
 
-        It does so for all qubit command lists.
+        Without commutation rules, a gate is only ever merged or cancelled with its predecessor when it is the last gate
+        on all its qubits, so no other pair of gates becomes adjacent by a rewrite. With commutation rules, the partner
+        may be further back and the gates following a removed gate are revisited (worklist).
         """
-        # loop over all qubit indices
-        i = 0
-        limit = len(self._l[idx])
-        if lim is not None:
-            limit = lim
+        worklist = [node]
+        while worklist:
+            node = worklist.pop()
+            if node.removed:
+                continue
 
-        while i < limit - 1:
             # can be dropped if the gate is equivalent to an identity gate
-            if self._l[idx][i].is_identity():
-                # determine index of this gate on all qubits
-                qubitids = [qb.id for sublist in self._l[idx][i].all_qubits for qb in sublist]
-                gid = self._get_gate_indices(idx, i, qubitids)
-                for j, qubit_id in enumerate(qubitids):
-                    new_list = (
-                        self._l[qubit_id][0 : gid[j]] + self._l[qubit_id][gid[j] + 1 :]  # noqa: E203  # noqa: E203
-                    )
-                self._l[qubitids[j]] = new_list  # pylint: disable=undefined-loop-variable
-                i = 0
-                limit -= 1
+            if node.cmd.is_identity():
+                self._remove_and_revisit(node, worklist)
                 continue
 
-            # can be dropped if two in a row are self-inverses
-            inv = self._l[idx][i].get_inverse()
-
-            if inv == self._l[idx][i + 1]:
-                # determine index of this gate on all qubits
-                qubitids = [qb.id for sublist in self._l[idx][i].all_qubits for qb in sublist]
-                gid = self._get_gate_indices(idx, i, qubitids)
-                # check that there are no other gates between this and its
-                # inverse on any of the other qubits involved
-                erase = True
-                for j, qubit_id in enumerate(qubitids):
-                    erase *= inv == self._l[qubit_id][gid[j] + 1]
-
-                # drop these two gates if possible and goto next iteration
-                if erase:
-                    for j, qubit_id in enumerate(qubitids):
-                        new_list = (
-                            self._l[qubit_id][0 : gid[j]] + self._l[qubit_id][gid[j] + 2 :]  # noqa: E203  # noqa: E203
-                        )
-                        self._l[qubit_id] = new_list
-                    i = 0
-                    limit -= 2
-                    continue
+            if self._commutation:
+                prev_node = self._find_commuting_partner(node)
+            else:
+                prev_node = self._get_common_predecessor(node)
+            if prev_node is None:
+                continue
 
-            # gates are not each other's inverses --> check if they're
-            # mergeable
+            # can be dropped if the two are each other's inverses
             try:
-                merged_command = self._l[idx][i].get_merged(self._l[idx][i + 1])
-                # determine index of this gate on all qubits
-                qubitids = [qb.id for sublist in self._l[idx][i].all_qubits for qb in sublist]
-                gid = self._get_gate_indices(idx, i, qubitids)
-
-                merge = True
-                for j, qubit_id in enumerate(qubitids):
-                    merged = self._l[qubit_id][gid[j]].get_merged(self._l[qubit_id][gid[j] + 1])
-                    merge *= merged == merged_command
-
-                if merge:
-                    for j, qubit_id in enumerate(qubitids):
-                        self._l[qubit_id][gid[j]] = merged_command
-                        new_list = (
-                            self._l[qubit_id][0 : gid[j] + 1]  # noqa: E203
-                            + self._l[qubit_id][gid[j] + 2 :]  # noqa: E203
-                        )
-                        self._l[qubit_id] = new_list
-                    i = 0
-                    limit -= 1
+                if prev_node.cmd.get_inverse() == node.cmd:
+                    self._remove_and_revisit(node, worklist)
+                    self._remove_and_revisit(prev_node, worklist)
                     continue
-            except NotMergeable:
-                pass  # can't merge these two commands.
+            except NotInvertible:
+                pass
 
-            i += 1  # next iteration: look at next gate
-        return limit
+            # gates are not each other's inverses --> check if they're mergeable
+            try:
+                merged_command = prev_node.cmd.get_merged(node.cmd)
+            except NotMergeable:
+                continue  # can't merge these two commands.
+            self._remove_and_revisit(node, worklist)
+            prev_node.cmd = merged_command
+            if self._commutation:
+                prev_node.bases = _get_commutation_bases(merged_command)
+            worklist.append(prev_node)
+
+    def _send_node(self, node):
+        """Send a gate node on to the next engine, after all the gates it depends on."""
+        stack = [node]
+        while stack:
+            current = stack[-1]
+            for qubit_id in current.qubit_ids:
+                head = self._l[qubit_id].head
+                if head is not current:
+                    # send the gates before this one on the other qubits first
+                    stack.append(head)
+                    break
+            else:
+                stack.pop()
+                self._remove(current)
+                self.send([current.cmd])
 
-    def _check_and_send(self):
-        """Check whether a qubit pipeline must be sent on and, if so, optimize the pipeline and then send it on."""
-        # NB: self.optimize(i) modifies self._l
-        for i in self._l:  # pylint: disable=consider-using-dict-items
-            if (
-                len(self._l[i]) >= self._cache_size
-                or len(self._l[i]) > 0
-                and isinstance(self._l[i][-1].gate, FastForwardingGate)
-            ):
-                self._optimize(i)
-                if len(self._l[i]) >= self._cache_size and not isinstance(self._l[i][-1].gate, FastForwardingGate):
-                    self._send_qubit_pipeline(i, len(self._l[i]) - self._cache_size + 1)
-                elif len(self._l[i]) > 0 and isinstance(self._l[i][-1].gate, FastForwardingGate):
-                    self._send_qubit_pipeline(i, len(self._l[i]))
-        new_dict = {}
-        for idx, _l in self._l.items():
-            if len(_l) > 0:
-                new_dict[idx] = _l
-        self._l = new_dict
+    def _check_and_send(self, qubit_ids):
+        """Check whether the pipelines of some qubits must be sent on and, if so, send them on."""
+        for qubit_id in qubit_ids:
+            pipeline = self._l.get(qubit_id)
+            if pipeline is None:
+                continue
+            if isinstance(pipeline.tail.cmd.gate, FastForwardingGate):
+                self._send_node(pipeline.tail)
+            else:
+                for _ in range(len(pipeline) - self._cache_size + 1):
+                    self._send_node(pipeline.head)
+
+    def _send_all(self):
+        """Send all gate nodes on to the next engine, in the order in which their commands were received."""
+        nodes = {}
+        for qubit_id, pipeline in self._l.items():
+            node = pipeline.head
+            while node is not None:
+                nodes[node.index] = node
+                node = node.next[qubit_id]
+        for index in sorted(nodes):
+            # all the gates a node depends on were received (and hence sent) before it
+            self._send_node(nodes[index])
 
     def _cache_cmd(self, cmd):
-        """Cache a command, i.e., inserts it into the command lists of all qubits involved."""
-        # are there qubit ids that haven't been added to the list?
-        idlist = [qubit.id for sublist in cmd.all_qubits for qubit in sublist]
-
-        # add gate command to each of the qubits involved
-        for qubit_id in idlist:
-            if qubit_id not in self._l:
-                self._l[qubit_id] = []
-            self._l[qubit_id] += [cmd]
-
-        self._check_and_send()
+        """Cache a command, i.e., inserts it into the pipelines of all qubits involved and optimize it."""
+        node = _GateNode(cmd, next(self._node_indices), self._commutation)
+        self._append(node)
+        self._optimize(node)
+        self._check_and_send(node.qubit_ids)
 
     def receive(self, command_list):
         """
@@ -245,18 +360,10 @@ class LocalOptimizer(BasicEngine):
         on.
         """
         for cmd in command_list:
-            if cmd.gate == FlushGate():  # flush gate --> optimize and flush
-                # NB: self.optimize(i) modifies self._l
-                for idx in self._l:  # pylint: disable=consider-using-dict-items
-                    self._optimize(idx)
-                    self._send_qubit_pipeline(idx, len(self._l[idx]))
-                new_dict = {}
-                for idx, _l in self._l.items():
-                    if len(_l) > 0:  # pragma: no cover
-                        new_dict[idx] = _l
-                self._l = new_dict
+            if cmd.gate == FlushGate():  # flush gate --> send everything on
+                self._send_all()
                 if self._l != {}:  # pragma: no cover
                     raise RuntimeError('Internal compiler error: qubits remaining in LocalOptimizer after a flush!')
                 self.send([cmd])
             else:
-                self._cache_cmd(cmd)
\ No newline at end of file
+                self._cache_cmd(cmd)
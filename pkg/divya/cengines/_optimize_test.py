@@ -23,20 +23,32 @@
 """Tests for divya.cengines._optimize.py."""
 
 import math
+import random
 
+import numpy as np
 import pytest
 
 from divya import MainEngine
+from divya.backends import Simulator
 from divya.cengines import DummyEngine, _optimize
 from divya.ops import (
     CNOT,
     AllocateQubitGate,
+    All,
     ClassicalInstructionGate,
     FastForwardingGate,
+    FlushGate,
     H,
+    Measure,
+    Parameter,
     Rx,
     Ry,
+    Rz,
+    Rzz,
+    S,
+    T,
     X,
+    get_inverse,
 )
 
 def test_local_optimizer_init_api_change():
@@ -149,6 +161,23 @@ def test_local_optimizer_mergeable_gates():
     assert len(backend.received_commands) == 3
     assert backend.received_commands[1].gate == Rx(10 * 0.5)
 
+def test_local_optimizer_mergeable_symbolic_gates():
+    local_optimizer = _optimize.LocalOptimizer(cache_size=4)
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[local_optimizer])
+    theta, phi = Parameter('theta'), Parameter('phi')
+    qb0 = eng.allocate_qubit()
+    qb1 = eng.allocate_qubit()
+    Rx(theta) | qb0
+    Rx(phi / 2) | qb0
+    Rx(0.5) | qb0
+    Ry(theta) | qb1
+    Ry(-theta) | qb1
+    eng.flush()
+    # Expect 2 allocates, one Rx gate (the Ry gates cancel), and flush gate
+    assert len(backend.received_commands) == 4
+    assert [cmd.gate for cmd in backend.received_commands if isinstance(cmd.gate, Rx)] == [Rx(theta + phi / 2 + 0.5)]
+
 def test_local_optimizer_identity_gates():
     local_optimizer = _optimize.LocalOptimizer(cache_size=4)
     backend = DummyEngine(save_commands=True)
@@ -165,4 +194,130 @@ def test_local_optimizer_identity_gates():
     eng.flush()
     # Expect allocate, one Rx gate, and flush gate
     assert len(backend.received_commands) == 3
-    assert backend.received_commands[1].gate == Rx(0.5)
\ No newline at end of file
+    assert backend.received_commands[1].gate == Rx(0.5)
+
+def test_local_optimizer_nested_cancellation():
+    local_optimizer = _optimize.LocalOptimizer(cache_size=10)
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[local_optimizer])
+    qb0 = eng.allocate_qubit()
+    qb1 = eng.allocate_qubit()
+    CNOT | (qb0, qb1)
+    H | qb1
+    CNOT | (qb0, qb1)
+    CNOT | (qb0, qb1)
+    H | qb1
+    CNOT | (qb0, qb1)
+    eng.flush()
+    # The inner CNOTs cancel, then the H gates and finally the outer CNOTs
+    assert [cmd.gate for cmd in backend.received_commands] == [AllocateQubitGate()] * 2 + [FlushGate()]
+
+def test_local_optimizer_flush_keeps_command_order():
+    local_optimizer = _optimize.LocalOptimizer(cache_size=10)
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[local_optimizer])
+    qb0 = eng.allocate_qubit()
+    qb1 = eng.allocate_qubit()
+    X | qb1
+    CNOT | (qb1, qb0)
+    X | qb1
+    eng.flush()
+    received = [
+        (str(cmd.gate), [qubit.id for qureg in cmd.all_qubits for qubit in qureg]) for cmd in backend.received_commands
+    ]
+    assert received == [
+        ('Allocate', [qb0[0].id]),
+        ('Allocate', [qb1[0].id]),
+        ('X', [qb1[0].id]),
+        ('X', [qb1[0].id, qb0[0].id]),
+        ('X', [qb1[0].id]),
+        ('', [-1]),
+    ]
+
+def test_local_optimizer_large_window():
+    local_optimizer = _optimize.LocalOptimizer(cache_size=10000)
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[local_optimizer])
+    qureg = eng.allocate_qureg(3)
+    for _ in range(2000):
+        CNOT | (qureg[0], qureg[1])
+        CNOT | (qureg[1], qureg[2])
+        Rx(0.1) | qureg[0]
+    assert len(backend.received_commands) == 0
+    eng.flush()
+    assert len(backend.received_commands) == 3 * 2000 + 4
+    assert backend.received_commands[-1].gate == FlushGate()
+    # The gates acting on each qubit are sent in their original order
+    for qubit_id, pattern in ((qureg[0].id, [X, Rx(0.1)]), (qureg[2].id, [X])):
+        gates = [
+            cmd.gate
+            for cmd in backend.received_commands[:-1]
+            if qubit_id in [qb.id for qr in cmd.all_qubits for qb in qr]
+        ]
+        assert gates == [AllocateQubitGate()] + pattern * 2000
+
+def _get_gates(commutation, circuit):
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[_optimize.LocalOptimizer(cache_size=10, commutation=commutation)])
+    qureg = eng.allocate_qureg(2)
+    circuit(qureg)
+    eng.flush()
+    return [cmd.gate for cmd in backend.received_commands if not isinstance(cmd.gate, ClassicalInstructionGate)]
+
+def test_local_optimizer_commutation_through_cnot_control():
+    def circuit(qureg):
+        Rz(0.3) | qureg[0]
+        CNOT | (qureg[0], qureg[1])
+        Rz(-0.3) | qureg[0]
+
+    assert _get_gates(False, circuit) == [Rz(0.3), X, Rz(-0.3)]
+    assert _get_gates(True, circuit) == [X]
+
+def test_local_optimizer_commutation_through_cnot_target():
+    def circuit(qureg):
+        Rx(0.3) | qureg[1]
+        CNOT | (qureg[0], qureg[1])
+        X | qureg[1]
+        Rx(0.2) | qureg[1]
+        Rz(0.1) | qureg[1]
+        Rx(0.4) | qureg[1]
+
+    assert _get_gates(True, circuit) == [Rx(0.5), X, X, Rz(0.1), Rx(0.4)]
+
+def test_local_optimizer_commutation_cnot_ladder():
+    def circuit(qureg):
+        # Two Trotter steps of exp(-i a Z0 Z1) separated by a rotation of the control qubit
+        CNOT | (qureg[0], qureg[1])
+        Rz(0.2) | qureg[1]
+        CNOT | (qureg[0], qureg[1])
+        Rz(0.1) | qureg[0]
+        CNOT | (qureg[0], qureg[1])
+        Rz(0.3) | qureg[1]
+        CNOT | (qureg[0], qureg[1])
+        S | qureg[0]
+        H | qureg[0]
+        get_inverse(S) | qureg[0]
+
+    assert len(_get_gates(False, circuit)) == 10
+    assert _get_gates(True, circuit) == [X, Rz(0.5), Rz(0.1), X, S, H, get_inverse(S)]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_local_optimizer_commutation_keeps_state(seed):
+    rng = random.Random(seed)
+    gates = [H, X, S, T, get_inverse(T), Rz(0.5), Rz(-0.5), Rx(0.7), Rx(-0.7), Rzz(0.3), CNOT, CNOT]
+    circuit = []
+    for _ in range(60):
+        gate = rng.choice(gates)
+        qubits = rng.sample(range(3), 2)
+        circuit.append((gate, qubits if gate in (CNOT, Rzz(0.3)) else qubits[:1]))
+
+    states = []
+    for engine_list in ([], [_optimize.LocalOptimizer(cache_size=20, commutation=True)]):
+        eng = MainEngine(backend=Simulator(), engine_list=engine_list)
+        qureg = eng.allocate_qureg(3)
+        for gate, qubits in circuit:
+            gate | tuple(qureg[i] for i in qubits)
+        eng.flush()
+        states.append([eng.backend.get_amplitude(format(i, '03b'), qureg) for i in range(8)])
+        All(Measure) | qureg
+    assert np.allclose(states[0], states[1])
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+The ParameterBinder compiler engine.
+
+A ParameterBinder captures the compiled command stream of a parametrized circuit (see divya.ops.Parameter) once and
+then executes it on the next engine (usually the back-end) for many different parameter values, without running the
+compiler engines in front of it again.
+"""
+
+from divya.ops import Allocate, Command, Deallocate, FlushGate, Measure
+from divya.types import WeakQubitRef
+
+from ._basics import BasicEngine, LastEngineException
+
+class _PlaceholderValues:  # pylint: disable=too-few-public-methods
+    """Provide the same value for every parameter (used to query the availability of symbolic commands)."""
+
+    def __getitem__(self, name):
+        return 1.0
+
+def _bind_command(cmd, values):
+    """Return the command with the parameters of its gate bound (or the command itself if it has no parameters)."""
+    gate = cmd.gate.bind(values)
+    if gate is cmd.gate:
+        return cmd
+    return Command(cmd.engine, gate, cmd.qubits, cmd.control_qubits, cmd.tags, cmd.control_state)
+
+class ParameterBinder(BasicEngine):
+    """
+    Compiler engine capturing a compiled command stream and replaying it for given parameter values.
+
+    The ParameterBinder should be the last compiler engine, right before the back-end. All commands it receives are
+    recorded (instead of being sent on); eng.flush() marks the end of the circuit. Each call to bind then sends the
+    recorded commands, with numerical values substituted for all parameters, followed by a FlushGate to the back-end.
+    Qubits which are still allocated on the back-end from the previous call to bind are measured and deallocated
+    first, such that every run starts from the all-zero state.
+
+    Example:
+        .. code-block:: python
+
+            binder = ParameterBinder()
+            eng = MainEngine(Simulator(), get_engine_list() + [binder])
+            theta = Parameter('theta')
+            qureg = eng.allocate_qureg(2)
+            X | qureg[0]
+            Rx(theta) | qureg[1]
+            CNOT | (qureg[1], qureg[0])
+            eng.flush()  # compiles the circuit once
+            for value in values:
+                binder.bind({'theta': value})
+                energy = eng.backend.get_expectation_value(hamiltonian, qureg)
+    """
+
+    def __init__(self):
+        """Initialize a ParameterBinder object."""
+        super().__init__()
+        self._commands = []
+        self._allocated_ids = set()
+
+    @property
+    def commands(self):
+        """Return the recorded (compiled, possibly symbolic) commands."""
+        return list(self._commands)
+
+    def clear(self):
+        """Discard the recorded commands (e.g., to capture another circuit)."""
+        self._commands = []
+
+    def is_available(self, cmd):
+        """
+        Test whether a Command is supported by the next engine once its parameters are bound.
+
+        Args:
+            cmd (Command): Command for which to check availability.
+        """
+        if self.is_last_engine:
+            raise LastEngineException(self)
+        return self.next_engine.is_available(_bind_command(cmd, _PlaceholderValues()))
+
+    def receive(self, command_list):
+        """
+        Record the received commands (FlushGate commands are sent on).
+
+        Args:
+            command_list (list<Command>): List of commands to receive.
+        """
+        for cmd in command_list:
+            if isinstance(cmd.gate, FlushGate):
+                self.send([cmd])
+            else:
+                self._commands.append(cmd)
+
+    def bind(self, values):
+        """
+        Send the recorded commands to the next engine with the parameters bound to the given values.
+
+        Args:
+            values (dict): Dictionary mapping parameters (Parameter objects or their names) to numbers.
+
+        Raises:
+            UnboundParameterError: If no value is provided for one of the parameters of the recorded commands.
+        """
+        values = {getattr(parameter, 'name', parameter): value for parameter, value in values.items()}
+        command_list = [_bind_command(cmd, values) for cmd in self._commands]
+
+        reset_list = []
+        for qubit_id in sorted(self._allocated_ids):
+            qubit = [WeakQubitRef(self, qubit_id)]
+            reset_list.append(Command(self, Measure, (qubit,)))
+            reset_list.append(Command(self, Deallocate, (qubit,)))
+        self._allocated_ids = set()
+        for cmd in command_list:
+            if cmd.gate == Allocate:
+                self._allocated_ids.add(cmd.qubits[0][0].id)
+            elif cmd.gate == Deallocate:
+                self._allocated_ids.discard(cmd.qubits[0][0].id)
+
+        self.send(reset_list + command_list + [Command(self, FlushGate(), ([WeakQubitRef(self, -1)],))])
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""Tests for divya.cengines._parameterbinder.py."""
+
+import numpy as np
+import pytest
+
+from divya import MainEngine
+from divya.backends import Simulator
+from divya.cengines import (
+    AutoReplacer,
+    DecompositionRuleSet,
+    DummyEngine,
+    InstructionFilter,
+    LastEngineException,
+    LocalOptimizer,
+    _parameterbinder,
+)
+from divya.meta import Control
+from divya.ops import (
+    All,
+    ClassicalInstructionGate,
+    H,
+    Measure,
+    Parameter,
+    QubitOperator,
+    Rx,
+    Rz,
+    TimeEvolution,
+    UnboundParameterError,
+    X,
+)
+from divya.setups import decompositions
+
+def _circuit(eng, qureg, theta, phi):
+    X | qureg[0]
+    Rx(theta) | qureg[0]
+    Rz(phi) | qureg[0]
+    Rz(theta) | qureg[0]
+    with Control(eng, qureg[0]):
+        Rz(phi) | qureg[1]
+    TimeEvolution(theta, QubitOperator('X0 Z1')) | qureg
+
+def _reference_state(theta, phi):
+    eng = MainEngine(Simulator(), [])
+    qureg = eng.allocate_qureg(2)
+    _circuit(eng, qureg, theta, phi)
+    eng.flush()
+    state = np.array(eng.backend.cheat()[1])
+    All(Measure) | qureg
+    eng.flush(deallocate_qubits=True)
+    return state
+
+def test_parameter_binder_simulator():
+    def low_level_gates(eng, cmd):
+        if isinstance(cmd.gate, ClassicalInstructionGate):
+            return True
+        return isinstance(cmd.gate, Rz) or (cmd.gate in (H, X) and len(cmd.control_qubits) <= 1)
+
+    binder = _parameterbinder.ParameterBinder()
+    rule_set = DecompositionRuleSet(modules=[decompositions])
+    eng = MainEngine(
+        backend=Simulator(),
+        engine_list=[AutoReplacer(rule_set), InstructionFilter(low_level_gates), LocalOptimizer(5), binder],
+    )
+    theta, phi = Parameter('theta'), Parameter('phi')
+    qureg = eng.allocate_qureg(2)
+    _circuit(eng, qureg, theta, phi)
+    eng.flush()
+    assert all(
+        isinstance(cmd.gate, (ClassicalInstructionGate, Rz)) or cmd.gate in (H, X) for cmd in binder.commands
+    )
+    # the optimizer merged the consecutive Rz gates (with a sum of parameters as angle)
+    assert Rz(phi + theta) in [cmd.gate for cmd in binder.commands]
+    for theta_value, phi_value in [(0.3, 0.7), (1.1, -0.4)]:
+        binder.bind({theta: theta_value, 'phi': phi_value})
+        state = np.array(eng.backend.cheat()[1])
+        assert abs(np.vdot(_reference_state(theta_value, phi_value), state)) == pytest.approx(1.0)
+
+    with pytest.raises(UnboundParameterError):
+        binder.bind({'theta': 0.3})
+    binder.clear()
+    assert binder.commands == []
+    eng.flush(deallocate_qubits=True)
+
+def test_parameter_binder_replay():
+    binder = _parameterbinder.ParameterBinder()
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[binder])
+    theta = Parameter('theta')
+    qubit = eng.allocate_qubit()
+    Rx(theta) | qubit
+    eng.flush()
+    # only the flush was sent on
+    assert len(backend.received_commands) == 1
+    assert eng.is_available(binder.commands[-1])
+    binder.bind({'theta': 0.5})
+    assert [str(cmd) for cmd in backend.received_commands[1:]] == [
+        'Allocate | Qureg[0]',
+        'Rx(0.5) | Qureg[0]',
+        ' | Qureg[-1]',
+    ]
+    backend.received_commands = []
+    binder.bind({'theta': 1.5})
+    # the qubit allocated by the previous call is reset first
+    assert [str(cmd) for cmd in backend.received_commands] == [
+        'Measure | Qureg[0]',
+        'Deallocate | Qureg[0]',
+        'Allocate | Qureg[0]',
+        'Rx(1.5) | Qureg[0]',
+        ' | Qureg[-1]',
+    ]
+    del qubit
+    eng.flush()
+    binder.bind({'theta': 1.5})
+    assert backend.received_commands[-3].gate == Rx(1.5)
+    assert str(backend.received_commands[-2]) == 'Deallocate | Qureg[0]'
+
+def test_parameter_binder_last_engine():
+    binder = _parameterbinder.ParameterBinder()
+    binder.is_last_engine = True
+    with pytest.raises(LastEngineException):
+        binder.is_available(None)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""Profiler recording per-engine statistics of a compiler engine pipeline."""
+
+import time
+
+class EngineStatistics:  # pylint: disable=too-few-public-methods
+    """
+    Statistics collected by the PipelineProfiler for a single compiler engine.
+
+    Attributes:
+        name (str): Name of the engine (its position in the pipeline and its class name).
+        commands_received (int): Number of commands received by the engine.
+        commands_sent (int): Number of commands sent on by the engine.
+        receive_calls (int): Number of calls to receive.
+        receive_time (float): Time spent in receive in seconds, excluding the time spent in the engines downstream.
+        peak_buffered_commands (int): Largest number of commands buffered by the engine after a call to receive.
+        is_available_calls (int): Number of calls to is_available.
+    """
+
+    def __init__(self, name):
+        """Initialize an empty EngineStatistics object."""
+        self.name = name
+        self.commands_received = 0
+        self.commands_sent = 0
+        self.receive_calls = 0
+        self.receive_time = 0.0
+        self.peak_buffered_commands = 0
+        self.is_available_calls = 0
+
+    def to_dict(self):
+        """Return the statistics as a dictionary."""
+        return {
+            'name': self.name,
+            'commands_received': self.commands_received,
+            'commands_sent': self.commands_sent,
+            'receive_calls': self.receive_calls,
+            'receive_time': self.receive_time,
+            'peak_buffered_commands': self.peak_buffered_commands,
+            'is_available_calls': self.is_available_calls,
+        }
+
+def _num_buffered_commands(engine):
+    """Return the number of commands currently buffered by an engine (mappers and LocalOptimizer)."""
+    stored_commands = getattr(engine, '_stored_commands', None)
+    if stored_commands is not None:
+        return len(stored_commands)
+    qubit_pipelines = getattr(engine, '_l', None)
+    if isinstance(qubit_pipelines, dict):
+        return sum(len(pipeline) for pipeline in qubit_pipelines.values())
+    return 0
+
+class PipelineProfiler:
+    """
+    Profiler recording per-engine statistics of a compiler engine pipeline.
+
+    The profiler wraps the receive and is_available methods of each engine. The time spent in receive is measured
+    exclusively, i.e. without the time spent in the receive methods of the engines it sends commands to. Commands are
+    counted as sent by the engine whose receive is running when the next engine receives them.
+
+    Engines which are inserted into the pipeline later on (e.g., by meta contexts such as Compute or Control) are not
+    profiled.
+
+    Example:
+        .. code-block:: python
+
+            eng = MainEngine(profile=True)
+            ...
+            report = eng.flush()
+            print(eng.profiler)
+    """
+
+    def __init__(self, engines):
+        """
+        Initialize a PipelineProfiler object and instrument the engines.
+
+        Args:
+            engines (list<BasicEngine>): Engines of the pipeline (in order).
+        """
+        self.statistics = []
+        # Each entry is [statistics of the engine, start time, time spent in nested calls to receive]
+        self._stack = []
+        for idx, engine in enumerate(engines):
+            statistics = EngineStatistics('{}: {}'.format(idx, engine.__class__.__name__))
+            self.statistics.append(statistics)
+            engine.receive = self._wrap_receive(engine, engine.receive, statistics)
+            engine.is_available = self._wrap_is_available(engine.is_available, statistics)
+
+    def _wrap_receive(self, engine, receive, statistics):
+        """Return a profiled version of the receive method of an engine."""
+        stack = self._stack
+
+        def profiled_receive(command_list):
+            if stack:
+                stack[-1][0].commands_sent += len(command_list)
+            statistics.commands_received += len(command_list)
+            statistics.receive_calls += 1
+            frame = [statistics, time.perf_counter(), 0.0]
+            stack.append(frame)
+            try:
+                receive(command_list)
+            finally:
+                stack.pop()
+                elapsed = time.perf_counter() - frame[1]
+                statistics.receive_time += elapsed - frame[2]
+                if stack:
+                    stack[-1][2] += elapsed
+                statistics.peak_buffered_commands = max(
+                    statistics.peak_buffered_commands, _num_buffered_commands(engine)
+                )
+
+        return profiled_receive
+
+    @staticmethod
+    def _wrap_is_available(is_available, statistics):
+        """Return a version of the is_available method of an engine which counts its calls."""
+
+        def counted_is_available(cmd):
+            statistics.is_available_calls += 1
+            return is_available(cmd)
+
+        return counted_is_available
+
+    def report(self):
+        """
+        Return the statistics collected so far.
+
+        Returns:
+            list<dict>: One dictionary per engine (in pipeline order), see EngineStatistics.
+        """
+        return [statistics.to_dict() for statistics in self.statistics]
+
+    def __str__(self):
+        """Return a table containing the statistics of all engines."""
+        name_width = max([len('Engine')] + [len(statistics.name) for statistics in self.statistics])
+        lines = [
+            '{:<{width}} {:>10} {:>10} {:>12} {:>10} {:>12}'.format(
+                'Engine', 'Received', 'Sent', 'Time [ms]', 'Peak buf.', 'is_available', width=name_width
+            )
+        ]
+        for statistics in self.statistics:
+            lines.append(
+                '{:<{width}} {:>10} {:>10} {:>12.3f} {:>10} {:>12}'.format(
+                    statistics.name,
+                    statistics.commands_received,
+                    statistics.commands_sent,
+                    1000 * statistics.receive_time,
+                    statistics.peak_buffered_commands,
+                    statistics.is_available_calls,
+                    width=name_width,
+                )
+            )
+        return "\n".join(lines)
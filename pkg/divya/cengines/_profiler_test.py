@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""Tests for divya.cengines._profiler.py."""
+
+import time
+
+from divya.cengines import DummyEngine, LocalOptimizer, MainEngine, _profiler
+from divya.ops import H
+
+def test_engine_statistics_to_dict():
+    statistics = _profiler.EngineStatistics('0: Test')
+    assert statistics.to_dict() == {
+        'name': '0: Test',
+        'commands_received': 0,
+        'commands_sent': 0,
+        'receive_calls': 0,
+        'receive_time': 0.0,
+        'peak_buffered_commands': 0,
+        'is_available_calls': 0,
+    }
+
+def test_num_buffered_commands():
+    optimizer = LocalOptimizer()
+    optimizer._l = {0: [1, 2], 3: [4]}
+    assert _profiler._num_buffered_commands(optimizer) == 3
+    mapper = DummyEngine()
+    mapper._stored_commands = [1, 2]
+    assert _profiler._num_buffered_commands(mapper) == 2
+    assert _profiler._num_buffered_commands(DummyEngine()) == 0
+
+def test_profiler_exclusive_time():
+    class SlowEngine(DummyEngine):
+        def __init__(self, delay):
+            super().__init__()
+            self.delay = delay
+
+        def receive(self, command_list):
+            # busy wait, as time.sleep may be patched by other tests
+            start = time.perf_counter()
+            while time.perf_counter() - start < self.delay:
+                pass
+            self.send(command_list)
+
+    slow_upstream = SlowEngine(0.001)
+    slow_downstream = SlowEngine(0.05)
+    eng = MainEngine(backend=DummyEngine(), engine_list=[slow_upstream, slow_downstream])
+    profiler = _profiler.PipelineProfiler([slow_upstream, slow_downstream, eng.backend])
+    qubit = eng.allocate_qubit()
+    H | qubit
+    upstream, downstream, backend = profiler.report()
+    assert upstream['receive_calls'] == downstream['receive_calls'] == backend['receive_calls'] == 2
+    assert upstream['commands_sent'] == downstream['commands_received'] == 2
+    # the time spent downstream is not attributed to the upstream engine
+    assert 0.002 <= upstream['receive_time'] < 0.1
+    assert 0.1 <= downstream['receive_time']
+    table = str(profiler).splitlines()
+    assert len(table) == 4
+    assert table[1].startswith('0: SlowEngine')
+    eng.flush(deallocate_qubits=True)
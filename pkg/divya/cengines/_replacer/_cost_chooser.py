@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Definition of a decomposition chooser which picks the cheapest decomposition according to a cost function.
+
+The CostDecompositionChooser can be passed to an AutoReplacer as decomposition_chooser. It lowers every candidate
+decomposition of a command fully to the target gate set and returns the one whose lowered commands have the lowest
+cost.
+"""
+
+import math
+
+from divya.cengines import BasicEngine, CommandModifier, ForwarderEngine, get_cacheable_signature
+from divya.ops import ClassicalInstructionGate, T, Tdag
+
+from ._replacer import AutoReplacer, InstructionFilter
+
+def _quantum_commands(command_list):
+    """Return the commands of command_list which are not classical instructions (e.g., allocations)."""
+    return [cmd for cmd in command_list if not isinstance(cmd.gate, ClassicalInstructionGate)]
+
+def _gate_count(command_list):
+    """Return the number of gates."""
+    return len(_quantum_commands(command_list))
+
+def _two_qubit_gate_count(command_list):
+    """Return the number of gates acting on more than one qubit (control qubits included), then the gate count."""
+    commands = _quantum_commands(command_list)
+    num_multi_qubit_gates = sum(sum(len(qureg) for qureg in cmd.all_qubits) > 1 for cmd in commands)
+    return (num_multi_qubit_gates, len(commands))
+
+def _t_count(command_list):
+    """Return the number of T and Tdag gates, then the gate count."""
+    commands = _quantum_commands(command_list)
+    return (sum(cmd.gate in (T, Tdag) for cmd in commands), len(commands))
+
+def _kernel_cost(command_list):
+    """
+    Return the cost of simulating the gates.
+
+    A gate acting on k qubits (control qubits included) requires a pass over the state vector with a kernel of size
+    2^k, which costs about 2^k operations per amplitude.
+    """
+    return sum(2 ** sum(len(qureg) for qureg in cmd.all_qubits) for cmd in _quantum_commands(command_list))
+
+COST_FUNCTIONS = {
+    'gate_count': _gate_count,
+    'two_qubit_gate_count': _two_qubit_gate_count,
+    't_count': _t_count,
+    'kernel_cost': _kernel_cost,
+}
+
+class _DecompositionCycleError(Exception):
+    """Raised when a command needs to be decomposed while one of its own decompositions is being lowered."""
+
+class _CommandCollector(BasicEngine):
+    """Back-end storing the lowered commands of a candidate decomposition."""
+
+    def __init__(self):
+        """Initialize a _CommandCollector object."""
+        super().__init__()
+        self.commands = []
+
+    def is_available(self, cmd):
+        """Accept all commands (availability is decided by the preceding InstructionFilter)."""
+        return True
+
+    def receive(self, command_list):
+        """Store the commands."""
+        self.commands.extend(command_list)
+
+class CostDecompositionChooser:
+    """
+    Decomposition chooser picking the decomposition with the lowest cost after lowering to the target gate set.
+
+    For each candidate decomposition of a command, the chooser runs the decomposition and lowers the resulting
+    commands with the decomposition rules until all of them are accepted by the filter function of the target gate
+    set (sub-commands are lowered with this chooser as well). The cost function is evaluated on the lowered commands
+    and the candidate with the lowest cost is returned (the first one in case of a tie). The costs are memoized for
+    each command signature (see divya.cengines.get_availability_signature), so each candidate is only lowered once.
+
+    Candidates whose lowering requires decomposing the command itself again (e.g., CNOT -> CZ -> CNOT) are rejected,
+    which breaks the cycles the default chooser can run into. Commands without a signature (e.g., MatrixGate commands)
+    get the first decomposition of the list.
+
+    Example:
+        .. code-block:: python
+
+            rule_set = DecompositionRuleSet(modules=[divya.setups.decompositions])
+            chooser = CostDecompositionChooser(rule_set, low_level_gates, cost='two_qubit_gate_count')
+            eng = MainEngine(backend, [AutoReplacer(rule_set, chooser), InstructionFilter(low_level_gates)])
+
+    Attributes:
+        scores (dict): Costs of the candidate decompositions (in the order of the decomposition list, None for the
+            candidates which cannot be lowered) for each command signature.
+        context_free (bool): True, as the choice only depends on the signature of the command (hence the chooser can
+            be used by an AutoReplacer caching decompositions).
+    """
+
+    context_free = True
+
+    def __init__(self, decomposition_rule_set, filterfun, cost='gate_count'):
+        """
+        Initialize a CostDecompositionChooser object.
+
+        Args:
+            decomposition_rule_set (DecompositionRuleSet): Decomposition rules used to lower the candidates.
+            filterfun (function): Filter function of the target gate set, called as filterfun(eng, cmd) (see
+                InstructionFilter). It returns True for the commands which need no further decomposition.
+            cost (str|function): Cost function, called with the list of lowered commands (including classical
+                instructions such as allocations of ancilla qubits), which returns a comparable value. Predefined
+                cost functions are 'gate_count', 'two_qubit_gate_count', 't_count' and 'kernel_cost' (an estimate
+                of the time needed to simulate the gates).
+
+        Raises:
+            ValueError: If cost is an unknown cost function name.
+        """
+        if isinstance(cost, str):
+            try:
+                cost = COST_FUNCTIONS[cost]
+            except KeyError as err:
+                raise ValueError(
+                    "Unknown cost function '{}', use one of {}".format(cost, sorted(COST_FUNCTIONS))
+                ) from err
+        self.decomposition_rule_set = decomposition_rule_set
+        self._filterfun = filterfun
+        self._cost = cost
+        self.scores = {}
+        # Signatures (without the classes of the tags) of the commands whose candidates are being lowered
+        self._in_progress = []
+        # Position in _in_progress of the outermost command whose decomposition was found in the lowering
+        self._cycle_level = math.inf
+
+    def _lower(self, cmd, decomposition):
+        """
+        Return the cost of the commands obtained by running decomposition on cmd and lowering the result.
+
+        Returns:
+            The cost, or None if the commands cannot be lowered to the target gate set.
+        """
+        main_engine = cmd.engine.main_engine
+        replacer = AutoReplacer(self.decomposition_rule_set, self)
+        instruction_filter = InstructionFilter(self._filterfun)
+        collector = _CommandCollector()
+        replacer.next_engine = instruction_filter
+        instruction_filter.next_engine = collector
+
+        trial_cmd = cmd.clone()
+        old_tags = trial_cmd.tags[:]
+
+        def cmd_mod_fun(new_cmd):  # Adds the tags (see AutoReplacer)
+            new_cmd.tags = old_tags[:] + new_cmd.tags
+            new_cmd.engine = main_engine
+            return new_cmd
+
+        cmod_eng = CommandModifier(cmd_mod_fun)
+        cmod_eng.next_engine = replacer
+        for engine in (cmod_eng, replacer, instruction_filter, collector):
+            engine.main_engine = main_engine
+        trial_cmd.engine = ForwarderEngine(cmod_eng)
+        # Meta engines (e.g., of Compute sections) inserted after the ForwarderEngine are counted by the main engine
+        # and not removed if the decomposition fails
+        num_engines = main_engine.n_engines
+        try:
+            decomposition.decompose(trial_cmd)
+        except Exception:  # pylint: disable=broad-except
+            # e.g., NoGateDecompositionError or _DecompositionCycleError: this candidate cannot be lowered
+            return None
+        finally:
+            main_engine.n_engines = num_engines
+        return self._cost(collector.commands)
+
+    def __call__(self, cmd, decomposition_list):
+        """
+        Choose the decomposition with the lowest cost.
+
+        Args:
+            cmd (Command): Command to decompose.
+            decomposition_list (list): Candidate decompositions for cmd.
+
+        Returns:
+            The decomposition with the lowest cost.
+        """
+        if len(decomposition_list) == 1:
+            return decomposition_list[0]
+        signature = get_cacheable_signature(cmd)
+        if signature is None:
+            # The scores cannot be memoized, nor can decomposition cycles be detected
+            return decomposition_list[0]
+        scores = self.scores.get(signature)
+        if scores is None:
+            # The tags do not change the decompositions of a command
+            gate_signature = signature[:-1]
+            if gate_signature in self._in_progress:
+                # Choosing a decomposition would lead to an infinite loop, reject the candidate being lowered
+                self._cycle_level = min(self._cycle_level, self._in_progress.index(gate_signature))
+                raise _DecompositionCycleError(str(cmd))
+            level = len(self._in_progress)
+            outer_cycle_level = self._cycle_level
+            self._cycle_level = math.inf
+            self._in_progress.append(gate_signature)
+            try:
+                scores = [self._lower(cmd, decomposition) for decomposition in decomposition_list]
+            finally:
+                self._in_progress.pop()
+            # Candidates rejected because of a cycle through an enclosing command may be valid in another context
+            if self._cycle_level >= level:
+                self.scores[signature] = scores
+            self._cycle_level = min(outer_cycle_level, self._cycle_level)
+        candidates = [index for index, score in enumerate(scores) if score is not None]
+        if not candidates:
+            return decomposition_list[0]
+        return decomposition_list[min(candidates, key=lambda index: scores[index])]
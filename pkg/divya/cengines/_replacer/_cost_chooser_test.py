@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""Tests for divya.cengines._replacer._cost_chooser.py."""
+
+import pytest
+
+from divya import MainEngine
+from divya.cengines import DecompositionRule, DecompositionRuleSet, DummyEngine
+from divya.cengines._replacer import AutoReplacer, InstructionFilter, _cost_chooser
+from divya.meta import Compute, Uncompute
+from divya.ops import (
+    CNOT,
+    Allocate,
+    BasicGate,
+    ClassicalInstructionGate,
+    Command,
+    H,
+    MatrixGate,
+    S,
+    T,
+    Tdag,
+    X,
+)
+
+class FirstGateClass(BasicGate):
+    """Test gate class"""
+
+    def __str__(self):
+        return self.__class__.__name__
+
+class SecondGateClass(BasicGate):
+    """Test gate class"""
+
+    def __str__(self):
+        return self.__class__.__name__
+
+class NoRuleGateClass(BasicGate):
+    """Test gate class without decomposition rule"""
+
+    def __str__(self):
+        return self.__class__.__name__
+
+FirstGate = FirstGateClass()
+SecondGate = SecondGateClass()
+NoRuleGate = NoRuleGateClass()
+
+def _low_level_gates(eng, cmd):
+    if isinstance(cmd.gate, ClassicalInstructionGate):
+        return True
+    if cmd.gate == X and len(cmd.control_qubits) <= 1:
+        return True
+    return cmd.gate in (H, S, T) and len(cmd.control_qubits) == 0
+
+def _make_rule_set(*rules):
+    rule_set = DecompositionRuleSet()
+    for gate_class, decompose in rules:
+        rule_set.add_decomposition_rule(DecompositionRule(gate_class, decompose))
+    return rule_set
+
+def _compile(rule_set, chooser, gate, num_qubits=1):
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend, [AutoReplacer(rule_set, chooser), InstructionFilter(_low_level_gates)])
+    qureg = eng.allocate_qureg(num_qubits)
+    gate | tuple([qubit] for qubit in qureg)
+    eng.flush()
+    return [cmd.gate for cmd in backend.received_commands if not isinstance(cmd.gate, ClassicalInstructionGate)]
+
+def _default_chooser(cmd, decomposition_list):
+    return decomposition_list[0]
+
+def test_cost_functions():
+    eng = MainEngine(backend=DummyEngine(), engine_list=[])
+    qureg = eng.allocate_qureg(3)
+    commands = [
+        Command(eng, Allocate, ([qureg[2]],)),
+        Command(eng, X, ([qureg[0]],), controls=qureg[1:]),
+        Command(eng, X, ([qureg[0]],), controls=[qureg[1]]),
+        Command(eng, T, ([qureg[0]],)),
+        Command(eng, Tdag, ([qureg[1]],)),
+        Command(eng, H, ([qureg[2]],)),
+    ]
+    assert _cost_chooser._gate_count(commands) == 5
+    assert _cost_chooser._two_qubit_gate_count(commands) == (2, 5)
+    assert _cost_chooser._t_count(commands) == (2, 5)
+    assert _cost_chooser._kernel_cost(commands) == 8 + 4 + 3 * 2
+
+def test_unknown_cost_function():
+    with pytest.raises(ValueError):
+        _cost_chooser.CostDecompositionChooser(DecompositionRuleSet(), _low_level_gates, cost='depth')
+
+def test_chooser_lowers_candidates():
+    calls = []
+
+    def decompose_first_long(cmd):
+        calls.append('long')
+        SecondGate | cmd.qubits
+
+    def decompose_first_short(cmd):
+        calls.append('short')
+        X | cmd.qubits
+
+    def decompose_second(cmd):
+        for _ in range(3):
+            H | cmd.qubits
+
+    rule_set = _make_rule_set(
+        (FirstGateClass, decompose_first_long),
+        (FirstGateClass, decompose_first_short),
+        (SecondGateClass, decompose_second),
+    )
+    assert _compile(rule_set, _default_chooser, FirstGate) == [H, H, H]
+
+    chooser = _cost_chooser.CostDecompositionChooser(rule_set, _low_level_gates)
+    assert _compile(rule_set, chooser, FirstGate) == [X]
+    assert list(chooser.scores.values()) == [[3, 1]]
+    # The scores are memoized
+    del calls[:]
+    assert _compile(rule_set, chooser, FirstGate) == [X]
+    assert calls == ['short']
+
+@pytest.mark.parametrize(
+    "cost, expected",
+    [('gate_count', [X]), ('two_qubit_gate_count', [H, X, H]), ('kernel_cost', [X]), (len, [X])],
+)
+def test_chooser_cost_functions(cost, expected):
+    def decompose_cnot(cmd):
+        CNOT | (cmd.qubits[0], cmd.qubits[1])
+
+    def decompose_single_qubit_gates(cmd):
+        H | cmd.qubits[0]
+        X | cmd.qubits[1]
+        H | cmd.qubits[0]
+
+    rule_set = _make_rule_set((FirstGateClass, decompose_cnot), (FirstGateClass, decompose_single_qubit_gates))
+    chooser = _cost_chooser.CostDecompositionChooser(rule_set, _low_level_gates, cost=cost)
+    assert _compile(rule_set, chooser, FirstGate, num_qubits=2) == expected
+
+def test_chooser_t_count():
+    def decompose_t(cmd):
+        T | cmd.qubits
+        T | cmd.qubits
+
+    def decompose_s(cmd):
+        H | cmd.qubits
+        S | cmd.qubits
+        H | cmd.qubits
+
+    rule_set = _make_rule_set((FirstGateClass, decompose_t), (FirstGateClass, decompose_s))
+    for cost, expected in (('gate_count', [T, T]), ('t_count', [H, S, H])):
+        chooser = _cost_chooser.CostDecompositionChooser(rule_set, _low_level_gates, cost=cost)
+        assert _compile(rule_set, chooser, FirstGate) == expected
+
+def test_chooser_skips_candidates_which_cannot_be_lowered():
+    def decompose_no_rule(cmd):
+        NoRuleGate | cmd.qubits
+
+    def decompose_x(cmd):
+        with Compute(cmd.engine):
+            H | cmd.qubits
+        X | cmd.qubits
+        Uncompute(cmd.engine)
+
+    rule_set = _make_rule_set((FirstGateClass, decompose_no_rule), (FirstGateClass, decompose_x))
+    chooser = _cost_chooser.CostDecompositionChooser(rule_set, _low_level_gates)
+    assert _compile(rule_set, chooser, FirstGate) == [H, X, H]
+    assert list(chooser.scores.values()) == [[None, 3]]
+
+def test_chooser_avoids_decomposition_cycles():
+    def decompose_first_to_second(cmd):
+        SecondGate | cmd.qubits
+
+    def decompose_first(cmd):
+        for _ in range(3):
+            H | cmd.qubits
+
+    def decompose_second_to_first(cmd):
+        FirstGate | cmd.qubits
+
+    def decompose_second(cmd):
+        X | cmd.qubits
+        X | cmd.qubits
+
+    rule_set = _make_rule_set(
+        (FirstGateClass, decompose_first_to_second),
+        (FirstGateClass, decompose_first),
+        (SecondGateClass, decompose_second_to_first),
+        (SecondGateClass, decompose_second),
+    )
+    chooser = _cost_chooser.CostDecompositionChooser(rule_set, _low_level_gates)
+    assert _compile(rule_set, chooser, FirstGate) == [X, X]
+    assert _compile(rule_set, chooser, SecondGate) == [X, X]
+
+def test_chooser_without_signature():
+    def decompose_long(cmd):
+        for _ in range(3):
+            H | cmd.qubits
+
+    def decompose_short(cmd):
+        X | cmd.qubits
+
+    rule_set = _make_rule_set((MatrixGate, decompose_long), (MatrixGate, decompose_short))
+    chooser = _cost_chooser.CostDecompositionChooser(rule_set, _low_level_gates)
+    # Commands with a MatrixGate have no signature: the first decomposition is used
+    assert _compile(rule_set, chooser, MatrixGate([[0, -1j], [1j, 0]])) == [H, H, H]
+    assert chooser.scores == {}
@@ -22,10 +22,22 @@
 
 """Module containing the definition of a decomposition rule set."""
 
+from divya.cengines import get_cacheable_signature
 from divya.meta import Dagger
+from divya.ops import BasicGate, BasicMathGate, BasicPhaseGate, BasicRotationGate, get_inverse
+
+# Maximum number of command signatures whose recognized decompositions are memoized by a DecompositionRuleSet
+_MAX_RECOGNIZED = 1024
 
 class DecompositionRuleSet:
-    """A collection of indexed decomposition rules."""
+    """
+    A collection of indexed decomposition rules.
+
+    Besides the rules themselves (in decompositions), the rule set keeps an index of the rules to check for each gate
+    class (the rules of the gate class and of the class of the inverse gate, then of their parent classes), with the
+    inverse decompositions built once, as well as the decompositions recognizing each command signature (see
+    get_decompositions).
+    """
 
     def __init__(self, rules=None, modules=None):
         """
@@ -37,6 +49,11 @@ class DecompositionRuleSet:
                 "all_defined_decomposition_rules" property containing decomposition rules to add to the rule set.
         """
         self.decompositions = {}
+        self._inverse_decompositions = {}
+        #: Decomposition removing negatively controlled qubits, which has priority over all other decompositions
+        self.controlstate_decomposition = None
+        self._candidate_index = {}
+        self._recognized = {}
 
         if rules:
             self.add_decomposition_rules(rules)
@@ -62,7 +79,80 @@ class DecompositionRuleSet:
         cls = rule.gate_class.__name__
         if cls not in self.decompositions:
             self.decompositions[cls] = []
+            self._inverse_decompositions[cls] = []
         self.decompositions[cls].append(decomp_obj)
+        self._inverse_decompositions[cls].append(decomp_obj.get_inverse_decomposition())
+        if (
+            self.controlstate_decomposition is None
+            and rule.gate_class is BasicGate
+            and rule.gate_decomposer.__name__ == '_decompose_controlstate'
+        ):
+            self.controlstate_decomposition = decomp_obj
+        self._candidate_index.clear()
+        self._recognized.clear()
+
+    def _get_candidates(self, gate):
+        """
+        Return the lists of decompositions to check for a gate, in order of priority.
+
+        For each level of the class hierarchy, these are the decompositions of the gate class, followed by the
+        (inverted) decompositions of the class of the inverse gate. The lists are indexed by these two classes.
+        """
+        inverse_gate = get_inverse(gate)
+        key = (type(gate), type(inverse_gate))
+        try:
+            return self._candidate_index[key]
+        except KeyError:
+            pass
+        gate_mro = type(gate).mro()[:-1]
+        # If gate does not have an inverse it's parent classes are
+        # DaggeredGate, BasicGate, object. Hence don't check the last two
+        inverse_mro = type(inverse_gate).mro()[:-2]
+        candidates = []
+        for level in range(max(len(gate_mro), len(inverse_mro))):
+            if level < len(gate_mro) and gate_mro[level].__name__ in self.decompositions:
+                candidates.append(self.decompositions[gate_mro[level].__name__])
+            if level < len(inverse_mro) and inverse_mro[level].__name__ in self._inverse_decompositions:
+                candidates.append(self._inverse_decompositions[inverse_mro[level].__name__])
+        self._candidate_index[key] = candidates
+        return candidates
+
+    def get_decompositions(self, cmd):
+        """
+        Return the decompositions which can replace a command.
+
+        The decompositions registered for the class of the gate are checked first, then those of the inverse gate
+        (run in reverse), then the ones of their parent classes, etc. The decompositions recognizing the command at
+        the first of these levels are returned. The result is memoized for the most recently used command signatures
+        (see divya.cengines.get_availability_signature, without the tags), so the gate recognizers should only depend
+        on the gate, on the number of qubits and on the control state of the command (which is the case for all the
+        rules of divya.setups.decompositions). Commands of parametrized gates (rotation, phase and math gates), whose
+        parameters take too many values for the memo to pay off, are not memoized.
+
+        Args:
+            cmd (Command): Command to decompose.
+
+        Returns:
+            list[_Decomposition]: The matching decompositions (empty if there are none).
+        """
+        key = None
+        if not isinstance(cmd.gate, (BasicRotationGate, BasicPhaseGate, BasicMathGate)):
+            signature = get_cacheable_signature(cmd)
+            key = signature[:-1] if signature is not None else None
+        decompositions = self._recognized.pop(key, None) if key is not None else None
+        if decompositions is None:
+            decompositions = []
+            for candidates in self._get_candidates(cmd.gate):
+                decompositions = [decomp for decomp in candidates if decomp.check(cmd)]
+                if decompositions:
+                    break
+            if key is not None and len(self._recognized) >= _MAX_RECOGNIZED:
+                # Evict the least recently used
+                del self._recognized[next(iter(self._recognized))]
+        if key is not None:
+            # (Re-)inserted as the most recently used
+            self._recognized[key] = decompositions
+        return list(decompositions)
 
 class ModuleWithDecompositionRuleSet:  # pragma: no cover # pylint: disable=too-few-public-methods
     """Interface type for explaining one of the parameters that can be given to DecompositionRuleSet."""
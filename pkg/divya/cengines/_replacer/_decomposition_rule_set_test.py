@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""Tests for divya.cengines._replacer._decomposition_rule_set.py."""
+
+from divya import MainEngine
+from divya.cengines import DummyEngine
+from divya.ops import BasicGate, Command, Rx, Ry, SelfInverseGate, get_inverse
+
+from . import DecompositionRule, DecompositionRuleSet, _decomposition_rule_set
+
+class SomeGateClass(BasicGate):
+    """Test gate class"""
+
+    def __str__(self):
+        return "SomeGate"
+
+class SomeSelfInverseGateClass(SelfInverseGate):
+    """Test gate class"""
+
+    def __str__(self):
+        return "SomeSelfInverseGate"
+
+def _decompose(cmd):
+    pass  # pragma: no cover
+
+def _decompose_controlstate(cmd):
+    pass  # pragma: no cover
+
+def _make_command(gate, num_controls=0):
+    eng = MainEngine(backend=DummyEngine(), engine_list=[])
+    qureg = eng.allocate_qureg(num_controls + 1)
+    return Command(eng, gate, ([qureg[0]],), controls=qureg[1:])
+
+def test_get_decompositions_order():
+    rule_set = DecompositionRuleSet(
+        rules=[
+            DecompositionRule(BasicGate, _decompose),
+            DecompositionRule(SomeGateClass, _decompose, lambda cmd: len(cmd.control_qubits) == 1),
+            DecompositionRule(SomeGateClass, _decompose, lambda cmd: len(cmd.control_qubits) > 0),
+        ]
+    )
+    decompositions = rule_set.decompositions
+    assert rule_set.get_decompositions(_make_command(SomeGateClass(), 1)) == decompositions['SomeGateClass']
+    assert rule_set.get_decompositions(_make_command(SomeGateClass(), 2)) == decompositions['SomeGateClass'][1:]
+    # Rules of parent classes are only used if no rule of the gate class recognizes the command
+    assert rule_set.get_decompositions(_make_command(SomeGateClass())) == decompositions['BasicGate']
+    assert len(decompositions['SomeGateClass']) == 2
+
+def test_get_decompositions_inverse():
+    rule_set = DecompositionRuleSet(rules=[DecompositionRule(SomeGateClass, _decompose)])
+    cmd = _make_command(get_inverse(SomeGateClass()))
+    decompositions = rule_set.get_decompositions(cmd)
+    assert len(decompositions) == 1
+    assert decompositions[0].decompose is not _decompose
+    # The inverse decompositions are built once
+    assert rule_set.get_decompositions(_make_command(get_inverse(SomeGateClass()))) == decompositions
+    assert len(rule_set.decompositions['SomeGateClass']) == 1
+    assert rule_set.get_decompositions(_make_command(SomeSelfInverseGateClass())) == []
+
+def test_get_decompositions_memoized(monkeypatch):
+    calls = []
+
+    def recognize(cmd):
+        calls.append(cmd)
+        return cmd.gate == SomeGateClass()
+
+    rule_set = DecompositionRuleSet(rules=[DecompositionRule(BasicGate, _decompose, recognize)])
+    for _ in range(3):
+        assert len(rule_set.get_decompositions(_make_command(SomeGateClass()))) == 1
+        assert len(rule_set.get_decompositions(_make_command(SomeGateClass(), 1))) == 1
+        assert rule_set.get_decompositions(_make_command(SomeSelfInverseGateClass())) == []
+    assert len(calls) == 3
+    # Adding a rule clears the memoized decompositions
+    rule_set.add_decomposition_rule(DecompositionRule(Ry, _decompose))
+    assert rule_set.get_decompositions(_make_command(SomeSelfInverseGateClass())) == []
+    assert len(calls) == 4
+
+    # Only the most recently used signatures are memoized
+    monkeypatch.setattr(_decomposition_rule_set, '_MAX_RECOGNIZED', 2)
+    for num_controls in (2, 3, 3):
+        rule_set.get_decompositions(_make_command(SomeGateClass(), num_controls))
+    assert len(calls) == 6
+    assert len(rule_set._recognized) == 2
+    rule_set.get_decompositions(_make_command(SomeSelfInverseGateClass()))
+    assert len(calls) == 7
+
+def test_get_decompositions_parametrized_gates_not_memoized():
+    calls = []
+
+    def recognize(cmd):
+        calls.append(cmd)
+        return cmd.gate == Rx(0.5)
+
+    rule_set = DecompositionRuleSet(rules=[DecompositionRule(Rx, _decompose, recognize)])
+    for _ in range(3):
+        assert len(rule_set.get_decompositions(_make_command(Rx(0.5)))) == 1
+        assert rule_set.get_decompositions(_make_command(Rx(0.6))) == []
+    # Rx(0.6) is not recognized, neither is its inverse
+    assert len(calls) == 3 * (1 + 2)
+    assert not rule_set._recognized
+
+def test_controlstate_decomposition():
+    rule_set = DecompositionRuleSet(rules=[DecompositionRule(SomeGateClass, _decompose_controlstate)])
+    assert rule_set.controlstate_decomposition is None
+    rule_set.add_decomposition_rule(DecompositionRule(BasicGate, _decompose))
+    assert rule_set.controlstate_decomposition is None
+    rule_set.add_decomposition_rule(DecompositionRule(BasicGate, _decompose_controlstate))
+    assert rule_set.controlstate_decomposition is rule_set.decompositions['BasicGate'][1]
@@ -29,8 +29,13 @@ executed. If not, it uses the loaded setup (e.g., default) to find an appropriat
 The InstructionFilter can be used to further specify which gates to replace/keep.
 """
 
-from divya.cengines import BasicEngine, CommandModifier, ForwarderEngine
-from divya.ops import FlushGate, get_inverse
+from divya.cengines import (
+    BasicEngine,
+    CommandModifier,
+    ForwarderEngine,
+    get_cacheable_signature,
+)
+from divya.ops import FlushGate
 
 class NoGateDecompositionError(Exception):
     """Exception raised when no gate decomposition rule can be found."""
@@ -44,7 +49,7 @@ class InstructionFilter(BasicEngine):
     or needs replacement (False).
     """
 
-    def __init__(self, filterfun):
+    def __init__(self, filterfun, cache_availability=False):
         """
         Initialize an InstructionFilter object.
 
@@ -54,9 +59,14 @@ class InstructionFilter(BasicEngine):
         Args:
             filterfun (function): Filter function which returns True for available commands, and False
                 otherwise. filterfun will be called as filterfun(self, cmd).
+            cache_availability (bool): If True, the result of filterfun is cached for each command signature (see
+                divya.cengines.get_availability_signature). Only use this if the result of filterfun does not depend
+                on the qubit ids of the command.
         """
         super().__init__()
         self._filterfun = filterfun
+        if cache_availability:
+            self._availability_cache = {}
 
     def is_available(self, cmd):
         """
@@ -68,6 +78,12 @@ class InstructionFilter(BasicEngine):
         Args:
             cmd (Command): Command for which to check availability.
         """
+        if self._availability_cache is not None:
+            return self._cached_availability(cmd, self._filter)
+        return self._filterfun(self, cmd)
+
+    def _filter(self, cmd):
+        """Call the filter function."""
         return self._filterfun(self, cmd)
 
     def receive(self, command_list):
@@ -81,6 +97,13 @@ class InstructionFilter(BasicEngine):
         """
         self.next_engine.receive(command_list)
 
+def _first_decomposition(cmd, decomposition_list):  # pylint: disable=unused-argument
+    """Return the first decomposition of the list (default decomposition chooser of the AutoReplacer)."""
+    return decomposition_list[0]
+
+# The choice only depends on the list of decompositions, see AutoReplacer(cache_decompositions=True)
+_first_decomposition.context_free = True
+
 class AutoReplacer(BasicEngine):
     """
     A compiler engine to automatically replace certain commands.
@@ -93,8 +116,10 @@ class AutoReplacer(BasicEngine):
     def __init__(
         self,
         decomposition_rule_se,
-        decomposition_chooser=lambda cmd, decomposition_list: decomposition_list[0],
-    ):
+        decomposition_chooser=_first_decomposition,
+        cache_availability=False,
+        cache_decompositions=False,
+    ):  # pylint: disable=too-many-arguments
         """
         Initialize an AutoReplacer.
 
@@ -118,107 +143,189 @@ class AutoReplacer(BasicEngine):
             def decomposition_chooser(cmd, decomp_list):
                 return decomp_list[0]
             repl = AutoReplacer(decomposition_chooser)
+
+        If cache_availability is True, the availability of commands (as reported by the following engines) is cached
+        for each command signature (see divya.cengines.get_availability_signature). Only use this if the availability
+        does not depend on the qubit ids of the commands, e.g., if no mapper follows.
+
+        If cache_decompositions is True, the fully lowered commands which replace a command are stored as a template
+        for its signature (see divya.cengines.get_availability_signature). Later commands with the same signature are
+        replaced by instantiating the template with their qubits and tags instead of running the decomposition rules
+        again. Decompositions which allocate ancilla qubits are not cached. Only use this if the availability of
+        commands depends on nothing but the signature of a command (and not, e.g., on its qubit ids or its position in
+        the circuit). The same holds for the decomposition chooser, which therefore must declare itself context-free
+        by having a context_free attribute set to True (as do the default chooser and CostDecompositionChooser).
+
+        Raises:
+            ValueError: If cache_decompositions is True and the decomposition chooser is not context-free.
         """
+        if cache_decompositions and not getattr(decomposition_chooser, 'context_free', False):
+            raise ValueError(
+                'The decompositions can only be cached with a context-free decomposition chooser (i.e., which has a '
+                'context_free attribute set to True)'
+            )
         super().__init__()
         self._decomp_chooser = decomposition_chooser
         self.decomposition_rule_set = decomposition_rule_se
+        if cache_availability:
+            self._availability_cache = {}
+        self._decomposition_cache = {} if cache_decompositions else None
+        self._recordings = []  # lists of the lowered commands sent while decompositions are being recorded
+
+    def clear_availability_cache(self):
+        """Clear the cached availability of commands and the cached decompositions (which depend on it)."""
+        super().clear_availability_cache()
+        if self._decomposition_cache is not None:
+            self._decomposition_cache.clear()
+
+    def send(self, command_list):
+        """Forward a list of commands to the next engine, recording them if decompositions are being cached."""
+        if self._recordings:
+            recorded_cmds = [cmd.clone() for cmd in command_list]
+            for recording in self._recordings:
+                recording.extend(recorded_cmds)
+        super().send(command_list)
+
+    @staticmethod
+    def _make_template(cmd, recorded_cmds):
+        """
+        Return the template of the lowered commands recorded for cmd, or None if they cannot be reused.
 
-    def _process_command(self, cmd):  # pylint: disable=too-many-locals,too-many-branches
+        The template consists of the recorded commands with only the tags added by the decomposition, together with
+        the positions of their qubits (target qubits first, then control qubits) in the list of all qubits of cmd.
+        """
+        qubits = [qubit for qureg in cmd.all_qubits for qubit in qureg]
+        positions = {qubit.id: index for index, qubit in enumerate(qubits)}
+        num_tags = len(cmd.tags)
+        template = []
+        for new_cmd in recorded_cmds:
+            try:
+                qubit_positions = [positions[qubit.id] for qureg in new_cmd.all_qubits[1:] for qubit in qureg]
+                qubit_positions += [positions[qubit.id] for qubit in new_cmd.control_qubits]
+            except KeyError:  # the decomposition acts on ancilla qubits
+                return None
+            new_cmd.tags = new_cmd.tags[num_tags:]
+            template.append((new_cmd, qubit_positions))
+        return template
+
+    @staticmethod
+    def _instantiate_template(cmd, template):
+        """Return the lowered commands replacing cmd, obtained by substituting its qubits and tags into template."""
+        qubit_ids = [qubit.id for qureg in cmd.all_qubits for qubit in qureg]
+        command_list = []
+        for template_cmd, qubit_positions in template:
+            new_cmd = template_cmd.clone()
+            new_cmd.tags = cmd.tags + new_cmd.tags
+            qubits = [qubit for qureg in new_cmd.qubits for qubit in qureg] + new_cmd.control_qubits
+            for qubit, position in zip(qubits, qubit_positions):
+                qubit.id = qubit_ids[position]
+            # Restore the canonical order of the qubits, which depends on their ids
+            if new_cmd.interchangeable_qubit_indices:
+                new_cmd.qubits = new_cmd.qubits
+            if len(new_cmd.control_qubits) > 1:
+                controls = sorted(zip(new_cmd.control_qubits, new_cmd.control_state), key=lambda x: x[0].id)
+                new_cmd.control_qubits = [qubit for qubit, _ in controls]
+                new_cmd.control_state = ''.join(state for _, state in controls)
+            command_list.append(new_cmd)
+        return command_list
+
+    def _replace_command(self, cmd):
         """
-        Process a command.
+        Replace a command which cannot be handled by further engines.
 
-        Check whether a command cmd can be handled by further engines and, if not, replace it using the decomposition
-        rules loaded with the setup (e.g., setups.default).
+        The command is replaced using the decomposition rules loaded with the setup (e.g., setups.default), or using
+        the decomposition cache if it is enabled.
 
         Args:
-            cmd (Command): Command to process.
+            cmd (Command): Command to replace.
+
+        Raises:
+            Exception if no replacement is available in the loaded setup.
+        """
+        if self._decomposition_cache is not None:
+            self._process_command_cached(cmd)
+        else:
+            self._decompose_command(cmd)
+
+    def _decompose_command(self, cmd):
+        """
+        Replace a command using the decomposition rules loaded with the setup.
+
+        Args:
+            cmd (Command): Command to decompose.
 
         Raises:
             Exception if no replacement is available in the loaded setup.
         """
-        if self.is_available(cmd):  # pylint: disable=too-many-nested-blocks
-            self.send([cmd])
+        rule_set = self.decomposition_rule_set
+        # If the decomposition rule to remove negatively controlled qubits is present in the list of potential
+        # decompositions, we process it immediately, before any other decompositions.
+        controlstate_decomp = rule_set.controlstate_decomposition
+        if controlstate_decomp is not None and controlstate_decomp.check(cmd):
+            chosen_decomp = controlstate_decomp
         else:
             # First check for a decomposition rules of the gate class, then
             # the gate class of the inverse gate. If nothing is found, do the
             # same for the first parent class, etc.
-            gate_mro = type(cmd.gate).mro()[:-1]
-            # If gate does not have an inverse it's parent classes are
-            # DaggeredGate, BasicGate, object. Hence don't check the last two
-            inverse_mro = type(get_inverse(cmd.gate)).mro()[:-2]
-            rules = self.decomposition_rule_set.decompositions
-
-            # If the decomposition rule to remove negatively controlled qubits is present in the list of potential
-            # decompositions, we process it immediately, before any other decompositions.
-            controlstate_rule = [
-                rule for rule in rules.get('BasicGate', []) if rule.decompose.__name__ == '_decompose_controlstate'
-            ]
-            if controlstate_rule and controlstate_rule[0].check(cmd):
-                chosen_decomp = controlstate_rule[0]
+            decomp_list = rule_set.get_decompositions(cmd)
+            if len(decomp_list) == 0:
+                raise NoGateDecompositionError("\nNo replacement found for " + str(cmd) + "!")
+
+            # use decomposition chooser to determine the best decomposition
+            chosen_decomp = self._decomp_chooser(cmd, decomp_list)
+
+        # the decomposed command must have the same tags
+        # (plus the ones it gets from meta-statements inside the
+        # decomposition rule).
+        # --> use a CommandModifier with a ForwarderEngine to achieve this.
+        old_tags = cmd.tags[:]
+
+        def cmd_mod_fun(cmd):  # Adds the tags
+            cmd.tags = old_tags[:] + cmd.tags
+            cmd.engine = self.main_engine
+            return cmd
+
+        # the CommandModifier calls cmd_mod_fun for each command
+        # --> commands get the right tags.
+        cmod_eng = CommandModifier(cmd_mod_fun)
+        cmod_eng.next_engine = self  # send modified commands back here
+        cmod_eng.main_engine = self.main_engine
+        # forward everything to cmod_eng using the ForwarderEngine
+        # which behaves just like MainEngine
+        # (--> meta functions still work)
+        forwarder_eng = ForwarderEngine(cmod_eng)
+        cmd.engine = forwarder_eng  # send gates directly to forwarder
+        # (and not to main engine, which would screw up the ordering).
+
+        chosen_decomp.decompose(cmd)  # run the decomposition
+
+    def _process_command_cached(self, cmd):
+        """
+        Replace a command which is not available using the decomposition cache.
+
+        The command is replaced by the cached template for its signature if there is one. Otherwise it is decomposed
+        as usual while recording the lowered commands, which become the template for its signature.
+
+        Args:
+            cmd (Command): Command to process.
+        """
+        signature = get_cacheable_signature(cmd)
+        if signature is None or signature in self._decomposition_cache:
+            template = self._decomposition_cache.get(signature) if signature is not None else None
+            if template is None:  # the decomposition of the command cannot be cached
+                self._decompose_command(cmd)
             else:
-                # check for decomposition rules
-                decomp_list = []
-                potential_decomps = []
-
-                for level in range(max(len(gate_mro), len(inverse_mro))):
-                    # Check for forward rules
-                    if level < len(gate_mro):
-                        class_name = gate_mro[level].__name__
-                        try:
-                            potential_decomps = rules[class_name]
-                        except KeyError:
-                            pass
-                        # throw out the ones which don't recognize the command
-                        for decomp in potential_decomps:
-                            if decomp.check(cmd):
-                                decomp_list.append(decomp)
-                        if len(decomp_list) != 0:
-                            break
-                    # Check for rules implementing the inverse gate
-                    # and run them in reverse
-                    if level < len(inverse_mro):
-                        inv_class_name = inverse_mro[level].__name__
-                        try:
-                            potential_decomps += [d.get_inverse_decomposition() for d in rules[inv_class_name]]
-                        except KeyError:
-                            pass
-                        # throw out the ones which don't recognize the command
-                        for decomp in potential_decomps:
-                            if decomp.check(cmd):
-                                decomp_list.append(decomp)
-                        if len(decomp_list) != 0:
-                            break
-
-                if len(decomp_list) == 0:
-                    raise NoGateDecompositionError("\nNo replacement found for " + str(cmd) + "!")
-
-                # use decomposition chooser to determine the best decomposition
-                chosen_decomp = self._decomp_chooser(cmd, decomp_list)
-
-            # the decomposed command must have the same tags
-            # (plus the ones it gets from meta-statements inside the
-            # decomposition rule).
-            # --> use a CommandModifier with a ForwarderEngine to achieve this.
-            old_tags = cmd.tags[:]
-
-            def cmd_mod_fun(cmd):  # Adds the tags
-                cmd.tags = old_tags[:] + cmd.tags
-                cmd.engine = self.main_engine
-                return cmd
-
-            # the CommandModifier calls cmd_mod_fun for each command
-            # --> commands get the right tags.
-            cmod_eng = CommandModifier(cmd_mod_fun)
-            cmod_eng.next_engine = self  # send modified commands back here
-            cmod_eng.main_engine = self.main_engine
-            # forward everything to cmod_eng using the ForwarderEngine
-            # which behaves just like MainEngine
-            # (--> meta functions still work)
-            forwarder_eng = ForwarderEngine(cmod_eng)
-            cmd.engine = forwarder_eng  # send gates directly to forwarder
-            # (and not to main engine, which would screw up the ordering).
-
-            chosen_decomp.decompose(cmd)  # run the decomposition
+                self.send(self._instantiate_template(cmd, template))
+            return
+
+        # Copy the command as the decomposition changes its engine
+        original = cmd.clone()
+        self._recordings.append([])
+        try:
+            self._decompose_command(cmd)
+            self._decomposition_cache[signature] = self._make_template(original, self._recordings[-1])
+        finally:
+            self._recordings.pop()
 
     def receive(self, command_list):
         """
@@ -230,8 +337,15 @@ class AutoReplacer(BasicEngine):
         Args:
             command_list (list<Command>): List of commands to handle.
         """
+        # Consecutive commands which need no replacement are forwarded as a single list
+        available_cmds = []
         for cmd in command_list:
-            if not isinstance(cmd.gate, FlushGate):
-                self._process_command(cmd)
+            if isinstance(cmd.gate, FlushGate) or self.is_available(cmd):
+                available_cmds.append(cmd)
             else:
-                self.send([cmd])
\ No newline at end of file
+                if available_cmds:
+                    self.send(available_cmds)
+                    available_cmds = []
+                self._replace_command(cmd)
+        if available_cmds:
+            self.send(available_cmds)
\ No newline at end of file
@@ -25,8 +25,9 @@
 import pytest
 
 from divya import MainEngine
-from divya.cengines import DecompositionRule, DecompositionRuleSet, DummyEngine
+from divya.cengines import CostDecompositionChooser, DecompositionRule, DecompositionRuleSet, DummyEngine
 from divya.cengines._replacer import _replacer
+from divya.meta import ComputeTag, Control, get_control_count
 from divya.ops import (
     BasicGate,
     ClassicalInstructionGate,
@@ -35,8 +36,10 @@ from divya.ops import (
     NotInvertible,
     Rx,
     S,
+    Toffoli,
     X,
 )
+from divya.setups.decompositions import cnu2toffoliandcu, toffoli2cnotandtgate
 
 def test_filter_engine():
     def my_filter(self, cmd):
@@ -54,6 +57,21 @@ def test_filter_engine():
     assert filter_eng.is_available(cmd)
     assert not filter_eng.is_available(cmd2)
 
+def test_filter_engine_cache_availability():
+    calls = []
+
+    def my_filter(self, cmd):
+        calls.append(cmd)
+        return cmd.gate == H
+
+    filter_eng = _replacer.InstructionFilter(my_filter, cache_availability=True)
+    eng = MainEngine(backend=DummyEngine(), engine_list=[filter_eng])
+    qureg = eng.allocate_qureg(2)
+    for qubit in qureg:
+        assert filter_eng.is_available(Command(eng, H, ([qubit],)))
+        assert not filter_eng.is_available(Command(eng, X, ([qubit],)))
+    assert len(calls) == 2
+
 class SomeGateClass(BasicGate):
     """Test gate class"""
 
@@ -113,6 +131,24 @@ def test_auto_replacer_default_chooser(fixture_gate_filter):
     assert len(backend.received_commands) == 3
     assert backend.received_commands[1].gate == X
 
+def test_auto_replacer_checks_availability_once():
+    queried = []
+
+    def some_gate_filter(self, cmd):
+        queried.append(cmd.gate)
+        return cmd.gate != SomeGate
+
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(
+        backend=backend,
+        engine_list=[_replacer.AutoReplacer(rule_set), _replacer.InstructionFilter(some_gate_filter)],
+    )
+    qb = eng.allocate_qubit()
+    SomeGate | qb
+    eng.flush()
+    assert backend.received_commands[1].gate == X
+    assert queried.count(SomeGate) == 1
+
 def test_auto_replacer_decomposition_chooser(fixture_gate_filter):
     # Supply a decomposition chooser which always chooses last rule.
     def test_decomp_chooser(cmd, decomposition_list):
@@ -274,4 +310,103 @@ def test_auto_replacer_priorize_controlstate_rule():
     ControlGate() | qb
     eng.flush()
     assert len(backend.received_commands) == 3
-    assert backend.received_commands[1].gate == S
\ No newline at end of file
+    assert backend.received_commands[1].gate == S
+def _lower_toffolis(cache_decompositions, calls, filter_calls=None):
+    """Lower Toffoli gates (counting the calls of the decomposition rules) and return the commands received."""
+
+    def counting_rule(rule):
+        def decompose(cmd):
+            calls.append(cmd.gate)
+            rule.gate_decomposer(cmd)
+
+        return DecompositionRule(rule.gate_class, decompose, rule.gate_recognizer)
+
+    rule_set = DecompositionRuleSet(
+        rules=[
+            counting_rule(rule)
+            for module in (toffoli2cnotandtgate, cnu2toffoliandcu)
+            for rule in module.all_defined_decomposition_rules
+        ]
+    )
+
+    def low_level_gates(eng, cmd):
+        return isinstance(cmd.gate, ClassicalInstructionGate) or get_control_count(cmd) <= 1
+
+    backend = DummyEngine(save_commands=True)
+    replacer = _replacer.AutoReplacer(rule_set, cache_decompositions=cache_decompositions)
+    eng = MainEngine(backend=backend, engine_list=[replacer, _replacer.InstructionFilter(low_level_gates)])
+    qureg = eng.allocate_qureg(5)
+    Toffoli | (qureg[0], qureg[1], qureg[2])
+    Toffoli | (qureg[3], qureg[1], qureg[4])
+    Toffoli | (qureg[4], qureg[2], qureg[0])
+    with Control(eng, qureg[4], ctrl_state='0'):
+        X | (qureg[2])
+    cmd = Command(eng, X, ([qureg[1]],), controls=[qureg[0], qureg[2]], tags=[ComputeTag()])
+    eng.send([cmd])
+    with Control(eng, qureg[0:3]):
+        X | qureg[3]
+    eng.flush()
+    return replacer, backend.received_commands
+
+def test_auto_replacer_cache_decompositions():
+    calls = []
+    _, expected = _lower_toffolis(False, calls)
+    assert len(calls) == 8
+
+    calls = []
+    replacer, received = _lower_toffolis(True, calls)
+    # The two-control Toffoli is decomposed once and the decomposition with an ancilla qubit is not cached
+    assert len(calls) == 4
+    assert len(received) == len(expected)
+    for cmd, expected_cmd in zip(received, expected):
+        assert cmd.gate == expected_cmd.gate
+        assert [[qubit.id for qubit in qureg] for qureg in cmd.all_qubits] == [
+            [qubit.id for qubit in qureg] for qureg in expected_cmd.all_qubits
+        ]
+        assert cmd.control_state == expected_cmd.control_state
+        assert cmd.tags == expected_cmd.tags
+
+    replacer.clear_availability_cache()
+    assert not replacer._decomposition_cache
+
+def test_auto_replacer_cache_decompositions_context_free_chooser():
+    rule_set = DecompositionRuleSet(modules=[toffoli2cnotandtgate])
+
+    def last_decomposition(cmd, decomposition_list):
+        return decomposition_list[-1]
+
+    with pytest.raises(ValueError):
+        _replacer.AutoReplacer(rule_set, last_decomposition, cache_decompositions=True)
+    # Choosers caching nothing need not be context-free
+    _replacer.AutoReplacer(rule_set, last_decomposition)
+    last_decomposition.context_free = True
+    _replacer.AutoReplacer(rule_set, last_decomposition, cache_decompositions=True)
+    chooser = CostDecompositionChooser(rule_set, lambda eng, cmd: True)
+    _replacer.AutoReplacer(rule_set, chooser, cache_decompositions=True)
+
+def test_auto_replacer_cache_decompositions_uncacheable_gates():
+    class UnhashableGate(BasicGate):
+        def __hash__(self):
+            raise TypeError
+
+    decomposed = []
+
+    def decompose(cmd):
+        decomposed.append(cmd)
+        H | cmd.qubits
+
+    rule_set = DecompositionRuleSet(rules=[DecompositionRule(UnhashableGate, decompose)])
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(
+        backend=backend,
+        engine_list=[
+            _replacer.AutoReplacer(rule_set, cache_decompositions=True),
+            _replacer.InstructionFilter(lambda eng, cmd: not isinstance(cmd.gate, UnhashableGate)),
+        ],
+    )
+    qubit = eng.allocate_qubit()
+    UnhashableGate() | qubit
+    UnhashableGate() | qubit
+    eng.flush()
+    assert len(decomposed) == 2
+    assert [cmd.gate for cmd in backend.received_commands[1:-1]] == [H, H]
@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Compiler engines resynthesizing short sequences of gates.
+
+A SingleQubitResynthesizer collects maximal runs of consecutive single-qubit gates on each qubit, multiplies their
+matrices and replaces each run by a single MatrixGate (if the next engines accept it) or by its Z-Y decomposition
+(Rz, Ry, Rz and a global phase, see divya.setups.decompositions.arb1qubit2rzandry), whichever is available and shorter
+than the run.
+
+A TwoQubitBlockResynthesizer does the same for maximal blocks of gates acting on the same pair of qubits: the 4x4
+unitary of a block is replaced by a two-qubit MatrixGate or by its KAK decomposition into at most three CNOT gates
+(see divya.setups.decompositions.arb2qubit2cnot).
+"""
+
+import numpy as np
+
+from divya.ops import Command, FlushGate, MatrixGate
+
+from ._basics import BasicEngine, ForwarderEngine
+
+def _get_single_qubit_matrix(cmd):
+    """Return the 2x2 matrix of an uncontrolled single-qubit command, or None if the command is not of this kind."""
+    if len(cmd.control_qubits) != 0 or len(cmd.qubits) != 1 or len(cmd.qubits[0]) != 1:
+        return None
+    try:
+        matrix = cmd.gate.matrix
+    except (AttributeError, TypeError):  # no matrix or unbound parameters
+        return None
+    if matrix is None or np.shape(matrix) != (2, 2):
+        return None
+    return np.asarray(matrix, dtype=complex)
+
+def _get_command_matrix(cmd):
+    """
+    Return the qubits and the matrix of a command acting on at most two qubits (controls included).
+
+    Returns:
+        Tuple (qubits, matrix) where qubits is the list of target qubits followed by the control qubit and the first
+        qubit is the least significant bit of matrix, or None if the command is not of this kind.
+    """
+    qubits = [qubit for qureg in cmd.qubits for qubit in qureg] + list(cmd.control_qubits)
+    num_targets = len(qubits) - len(cmd.control_qubits)
+    if not 1 <= len(qubits) <= 2 or num_targets == 0 or len({qubit.id for qubit in qubits}) != len(qubits):
+        return None
+    try:
+        matrix = cmd.gate.matrix
+    except (AttributeError, TypeError):  # no matrix or unbound parameters
+        return None
+    if matrix is None or np.shape(matrix) != (2**num_targets, 2**num_targets):
+        return None
+    matrix = np.asarray(matrix, dtype=complex)
+    if cmd.control_qubits:
+        # The control qubit is the most significant bit
+        active = slice(2, 4) if cmd.control_state == '1' else slice(0, 2)
+        matrix, target_matrix = np.identity(4, dtype=complex), matrix
+        matrix[active, active] = target_matrix
+    return qubits, matrix
+
+def _apply_decomposition_rule(rule, cmd, main_engine):
+    """Return the commands obtained by applying a decomposition rule to cmd."""
+    collector = _CommandCollector(main_engine)
+    cmd.engine = ForwarderEngine(collector)
+    rule.gate_decomposer(cmd)
+    for new_cmd in collector.commands:
+        new_cmd.engine = main_engine
+        new_cmd.tags = cmd.tags[:] + new_cmd.tags
+    return collector.commands
+
+class _CommandCollector(BasicEngine):
+    """Engine storing the commands it receives instead of sending them on (used to run decomposition rules)."""
+
+    def __init__(self, main_engine):
+        """
+        Initialize a _CommandCollector object.
+
+        Args:
+            main_engine (MainEngine): Main engine of the engine running the decomposition rule.
+        """
+        super().__init__()
+        self.main_engine = main_engine
+        self.commands = []
+
+    def receive(self, command_list):
+        """Store the commands."""
+        self.commands.extend(command_list)
+
+class SingleQubitResynthesizer(BasicEngine):
+    """
+    Compiler engine replacing runs of single-qubit gates by a minimal equivalent.
+
+    The engine caches the uncontrolled single-qubit gates (with a matrix) acting on each qubit. As soon as another
+    command acts on the qubit (or a FlushGate arrives), the run is multiplied out and replaced by one MatrixGate if the
+    next engine accepts it, otherwise by its Z-Y decomposition. The run is sent unchanged if the replacement is not
+    available or not shorter. A product equal to the identity is dropped.
+    """
+
+    def __init__(self, use_matrix_gate=True):
+        """
+        Initialize a SingleQubitResynthesizer object.
+
+        Args:
+            use_matrix_gate (bool): If True, a run is replaced by a MatrixGate if the next engine accepts it.
+        """
+        super().__init__()
+        self._use_matrix_gate = use_matrix_gate
+        self._l = {}  # dict of lists containing the cached run of commands for each qubit
+
+    def _decompose(self, cmd):
+        """Return the commands of the Z-Y decomposition of a single-qubit MatrixGate command."""
+        from divya.setups.decompositions import (  # pylint: disable=import-outside-toplevel
+            arb1qubit2rzandry,
+        )
+
+        return _apply_decomposition_rule(arb1qubit2rzandry.all_defined_decomposition_rules[0], cmd, self.main_engine)
+
+    def _resynthesize(self, run):
+        """Return the commands to send instead of a run of single-qubit commands."""
+        if len(run) == 1:
+            return run
+        matrix = np.identity(2, dtype=complex)
+        for cmd in run:
+            matrix = _get_single_qubit_matrix(cmd) @ matrix
+        if np.allclose(matrix, np.identity(2)):
+            return []
+
+        first = run[0]
+        replacement = Command(self.main_engine, MatrixGate(matrix), first.qubits, tags=first.tags[:])
+        if self._use_matrix_gate and self.is_available(replacement):
+            return [replacement]
+        try:
+            replacement_list = self._decompose(replacement)
+        except Exception:  # pylint: disable=broad-except
+            # e.g., the rule cannot find the parameters of a matrix which is only unitary up to rounding errors
+            return run
+        if len(replacement_list) < len(run) and all(self.is_available(cmd) for cmd in replacement_list):
+            return replacement_list
+        return run
+
+    def _flush_run(self, qubit_id, command_list):
+        """Append the resynthesized run of a qubit (if any) to command_list."""
+        run = self._l.pop(qubit_id, None)
+        if run is not None:
+            command_list.extend(self._resynthesize(run))
+
+    def receive(self, command_list):
+        """
+        Receive a list of commands.
+
+        Single-qubit gates are cached in the run of their qubit. Any other command first causes the runs of its qubits
+        to be resynthesized and sent on. A FlushGate sends on all runs.
+
+        Args:
+            command_list (list<Command>): List of commands to receive.
+        """
+        new_command_list = []
+        for cmd in command_list:
+            if isinstance(cmd.gate, FlushGate):
+                for qubit_id in list(self._l):
+                    self._flush_run(qubit_id, new_command_list)
+                new_command_list.append(cmd)
+            elif _get_single_qubit_matrix(cmd) is not None:
+                qubit_id = cmd.qubits[0][0].id
+                run = self._l.get(qubit_id)
+                if run is not None and run[0].tags != cmd.tags:
+                    self._flush_run(qubit_id, new_command_list)
+                    run = None
+                if run is None:
+                    self._l[qubit_id] = [cmd]
+                else:
+                    run.append(cmd)
+            else:
+                for qureg in cmd.all_qubits:
+                    for qubit in qureg:
+                        self._flush_run(qubit.id, new_command_list)
+                new_command_list.append(cmd)
+        if new_command_list:
+            self.send(new_command_list)
+
+class _GateBlock:  # pylint: disable=too-few-public-methods
+    """Cached commands acting on one qubit or on a pair of qubits."""
+
+    __slots__ = ('qubits', 'commands')
+
+    def __init__(self, qubits, commands):
+        """
+        Initialize a _GateBlock object.
+
+        Args:
+            qubits (list<BasicQubit>): Qubits of the block; the first one is the least significant bit of the block
+                matrix.
+            commands (list<Command>): Commands of the block.
+        """
+        self.qubits = qubits
+        self.commands = commands
+
+    def __len__(self):
+        """Return the number of commands in the block."""
+        return len(self.commands)
+
+class TwoQubitBlockResynthesizer(BasicEngine):
+    """
+    Compiler engine replacing blocks of gates acting on the same pair of qubits by a minimal equivalent.
+
+    The engine caches the commands with a matrix acting on (at most) two qubits, control qubits included. Consecutive
+    commands on the same pair of qubits form a block, to which pending single-qubit gates on either qubit are added.
+    As soon as a command acts on one of the qubits and another qubit (or a FlushGate arrives), the 4x4 unitary of the
+    block is computed and the block is replaced by one two-qubit MatrixGate if the next engine accepts it. Otherwise
+    the block is replaced by its KAK decomposition into one-qubit gates and at most three CNOT gates (CNOT gates are
+    decomposed into Rxx gates if only the latter are available), provided that all resulting gates are available and
+    that the replacement has fewer two-qubit gates, or as many two-qubit gates but fewer gates in total.
+
+    Typical blocks are the SWAP gates inserted by a mapper next to a gate acting on the same pair of qubits.
+    """
+
+    def __init__(self, use_matrix_gate=True):
+        """
+        Initialize a TwoQubitBlockResynthesizer object.
+
+        Args:
+            use_matrix_gate (bool): If True, a block is replaced by a MatrixGate if the next engine accepts it.
+        """
+        super().__init__()
+        self._use_matrix_gate = use_matrix_gate
+        self._l = {}  # dict containing the cached _GateBlock of each qubit (shared by the qubits of a pair)
+
+    def _get_block_matrix(self, block):
+        """Return the 4x4 unitary of a block of commands on a pair of qubits."""
+        block_ids = [qubit.id for qubit in block.qubits]
+        swap = np.identity(4, dtype=complex)[:, [0, 2, 1, 3]]
+        unitary = np.identity(4, dtype=complex)
+        for cmd in block.commands:
+            qubits, matrix = _get_command_matrix(cmd)
+            if len(qubits) == 1:
+                if qubits[0].id == block_ids[0]:
+                    matrix = np.kron(np.identity(2), matrix)
+                else:
+                    matrix = np.kron(matrix, np.identity(2))
+            elif qubits[0].id != block_ids[0]:
+                matrix = swap @ matrix @ swap
+            unitary = matrix @ unitary
+        return unitary
+
+    def _make_available(self, cmd_list):
+        """
+        Decompose the one-qubit MatrixGates and CNOT gates of a KAK decomposition which are not available.
+
+        Returns:
+            List of commands, or None if some of the commands cannot be made available (or cannot be decomposed).
+        """
+        from divya.setups.decompositions import (  # pylint: disable=import-outside-toplevel
+            arb1qubit2rzandry,
+            cnot2rxx,
+        )
+
+        available_list = []
+        for cmd in cmd_list:
+            if self.is_available(cmd):
+                available_list.append(cmd)
+                continue
+            if isinstance(cmd.gate, MatrixGate):
+                rule = arb1qubit2rzandry.all_defined_decomposition_rules[0]
+            else:
+                rule = cnot2rxx.all_defined_decomposition_rules[0]
+            try:
+                new_cmds = _apply_decomposition_rule(rule, cmd, self.main_engine)
+            except Exception:  # pylint: disable=broad-except
+                # e.g., the rule cannot find the parameters of a matrix which is only unitary up to rounding errors
+                return None
+            if not all(self.is_available(new_cmd) for new_cmd in new_cmds):
+                return None
+            available_list.extend(new_cmds)
+        return available_list
+
+    def _resynthesize(self, block):
+        """Return the commands to send instead of a block of commands."""
+        if len(block.qubits) == 1 or len(block) == 1:
+            return block.commands
+        unitary = self._get_block_matrix(block)
+        if np.allclose(unitary, np.identity(4)):
+            return []
+
+        tags = block.commands[0].tags[:]
+        replacement = Command(
+            self.main_engine, MatrixGate(unitary), ([block.qubits[0]], [block.qubits[1]]), tags=tags
+        )
+        if self._use_matrix_gate and self.is_available(replacement):
+            return [replacement]
+
+        from divya.setups.decompositions import (  # pylint: disable=import-outside-toplevel
+            arb2qubit2cnot,
+        )
+
+        replacement_list = self._make_available(
+            _apply_decomposition_rule(arb2qubit2cnot.all_defined_decomposition_rules[0], replacement, self.main_engine)
+        )
+        if replacement_list is None:
+            return block.commands
+
+        def _cost(cmd_list):
+            num_two_qubit_gates = sum(sum(len(qureg) for qureg in cmd.all_qubits) > 1 for cmd in cmd_list)
+            return (num_two_qubit_gates, len(cmd_list))
+
+        if _cost(replacement_list) < _cost(block.commands):
+            return replacement_list
+        return block.commands
+
+    def _flush_block(self, qubit_id, command_list):
+        """Append the resynthesized block of a qubit (if any) to command_list."""
+        block = self._l.get(qubit_id)
+        if block is not None:
+            for qubit in block.qubits:
+                del self._l[qubit.id]
+            command_list.extend(self._resynthesize(block))
+
+    def _cache_cmd(self, cmd, qubits, command_list):
+        """Add a command acting on one or two qubits to the block of its qubits."""
+        blocks = [self._l.get(qubit.id) for qubit in qubits]
+        if blocks[0] is not None and blocks[0].commands[0].tags != cmd.tags:
+            self._flush_block(qubits[0].id, command_list)
+            blocks = [self._l.get(qubit.id) for qubit in qubits]
+
+        if len(qubits) == 1:
+            if blocks[0] is None:
+                self._l[qubits[0].id] = _GateBlock(qubits, [cmd])
+            else:
+                blocks[0].commands.append(cmd)
+            return
+
+        if blocks[0] is not None and blocks[0] is blocks[1]:
+            blocks[0].commands.append(cmd)
+            return
+
+        # Start a new block on the pair, absorbing the pending single-qubit gates of both qubits
+        commands = []
+        for qubit, block in zip(qubits, blocks):
+            if block is None:
+                continue
+            if len(block.qubits) == 1 and block.commands[0].tags == cmd.tags:
+                del self._l[qubit.id]
+                commands.extend(block.commands)
+            else:
+                self._flush_block(qubit.id, command_list)
+        commands.append(cmd)
+        new_block = _GateBlock(qubits, commands)
+        for qubit in qubits:
+            self._l[qubit.id] = new_block
+
+    def receive(self, command_list):
+        """
+        Receive a list of commands.
+
+        Commands with a matrix acting on at most two qubits are cached in the block of their qubits. Any other command
+        first causes the blocks of its qubits to be resynthesized and sent on. A FlushGate sends on all blocks.
+
+        Args:
+            command_list (list<Command>): List of commands to receive.
+        """
+        new_command_list = []
+        for cmd in command_list:
+            if isinstance(cmd.gate, FlushGate):
+                for qubit_id in list(self._l):
+                    self._flush_block(qubit_id, new_command_list)
+                new_command_list.append(cmd)
+                continue
+            command_matrix = _get_command_matrix(cmd)
+            if command_matrix is not None:
+                self._cache_cmd(cmd, command_matrix[0], new_command_list)
+            else:
+                for qureg in cmd.all_qubits:
+                    for qubit in qureg:
+                        self._flush_block(qubit.id, new_command_list)
+                new_command_list.append(cmd)
+        if new_command_list:
+            self.send(new_command_list)
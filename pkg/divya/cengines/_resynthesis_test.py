@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""Tests for divya.cengines._resynthesis.py."""
+
+import math
+
+import numpy as np
+import pytest
+
+from divya import MainEngine
+from divya.backends import Simulator
+from divya.cengines import DummyEngine, InstructionFilter, _resynthesis
+from divya.meta import Compute, Control, Uncompute
+from divya.ops import (
+    CNOT,
+    All,
+    ClassicalInstructionGate,
+    H,
+    MatrixGate,
+    Measure,
+    Parameter,
+    Ph,
+    Rx,
+    Ry,
+    Rxx,
+    Rz,
+    Rzz,
+    S,
+    Swap,
+    T,
+    X,
+)
+
+def _apply_circuit(qureg):
+    H | qureg[0]
+    T | qureg[0]
+    Rx(0.3) | qureg[0]
+    S | qureg[1]
+    CNOT | (qureg[0], qureg[1])
+    H | qureg[1]
+    Ry(0.2) | qureg[1]
+    X | qureg[1]
+    H | qureg[0]
+    H | qureg[0]
+    Rz(0.4) | qureg[0]
+
+def _get_gates(backend):
+    return [cmd.gate for cmd in backend.received_commands if not isinstance(cmd.gate, ClassicalInstructionGate)]
+
+def test_resynthesizer_matrix_gate():
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[_resynthesis.SingleQubitResynthesizer()])
+    qureg = eng.allocate_qureg(2)
+    _apply_circuit(qureg)
+    eng.flush()
+    gates = _get_gates(backend)
+    assert len(gates) == 5
+    assert isinstance(gates[0], MatrixGate)
+    assert np.allclose(gates[0].matrix, Rx(0.3).matrix @ T.matrix @ H.matrix)
+    assert gates[1:3] == [S, X]
+    assert all(isinstance(gate, MatrixGate) for gate in gates[3:])
+    assert np.allclose(gates[4].matrix, Rz(0.4).matrix)
+
+def test_resynthesizer_single_gate_runs_unchanged():
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[_resynthesis.SingleQubitResynthesizer()])
+    qureg = eng.allocate_qureg(2)
+    H | qureg[0]
+    CNOT | (qureg[0], qureg[1])
+    Rx(0.5) | qureg[1]
+    eng.flush()
+    assert _get_gates(backend) == [H, X, Rx(0.5)]
+
+def test_resynthesizer_identity_dropped():
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[_resynthesis.SingleQubitResynthesizer()])
+    qubit = eng.allocate_qubit()
+    H | qubit
+    S | qubit
+    S | qubit
+    S | qubit
+    S | qubit
+    H | qubit
+    eng.flush()
+    assert _get_gates(backend) == []
+
+def test_resynthesizer_decomposition():
+    def is_available(eng, cmd):
+        return not isinstance(cmd.gate, MatrixGate)
+
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(
+        backend=backend, engine_list=[_resynthesis.SingleQubitResynthesizer(), InstructionFilter(is_available)]
+    )
+    qubit = eng.allocate_qubit()
+    for _ in range(3):
+        H | qubit
+        T | qubit
+        Rx(0.3) | qubit
+    eng.flush()
+    gates = _get_gates(backend)
+    assert 0 < len(gates) <= 4
+    assert all(isinstance(gate, (Rz, Ry, Ph)) for gate in gates)
+
+def test_resynthesizer_keeps_run_if_decomposition_unavailable():
+    def is_available(eng, cmd):
+        return not isinstance(cmd.gate, (MatrixGate, Ry, Ph))
+
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(
+        backend=backend, engine_list=[_resynthesis.SingleQubitResynthesizer(), InstructionFilter(is_available)]
+    )
+    qubit = eng.allocate_qubit()
+    H | qubit
+    T | qubit
+    eng.flush()
+    assert _get_gates(backend) == [H, T]
+
+def test_resynthesizer_symbolic_and_tagged_commands():
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[_resynthesis.SingleQubitResynthesizer()])
+    qubit = eng.allocate_qubit()
+    H | qubit
+    Rx(Parameter('theta')) | qubit
+    H | qubit
+    with Compute(eng):
+        S | qubit
+        T | qubit
+    Uncompute(eng)
+    eng.flush()
+    gates = _get_gates(backend)
+    assert gates[:3] == [H, Rx(Parameter('theta')), H]
+    # The compute and the uncompute sections are resynthesized separately
+    assert len(gates) == 5
+    assert all(isinstance(gate, MatrixGate) for gate in gates[3:])
+
+def test_resynthesizer_keeps_run_if_decomposition_fails(monkeypatch):
+    from divya.setups.decompositions import arb1qubit2rzandry
+
+    def failing_decomposer(cmd):
+        raise Exception("Couldn't find parameters for matrix ")
+
+    monkeypatch.setattr(arb1qubit2rzandry.all_defined_decomposition_rules[0], 'gate_decomposer', failing_decomposer)
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(
+        backend=backend,
+        engine_list=[
+            _resynthesis.SingleQubitResynthesizer(),
+            InstructionFilter(lambda eng, cmd: not isinstance(cmd.gate, MatrixGate)),
+        ],
+    )
+    qubit = eng.allocate_qubit()
+    H | qubit
+    T | qubit
+    eng.flush()
+    assert _get_gates(backend) == [H, T]
+
+@pytest.mark.parametrize("use_matrix_gate", [True, False])
+def test_resynthesizer_simulation(use_matrix_gate):
+    states = []
+    for engine_list in ([], [_resynthesis.SingleQubitResynthesizer(use_matrix_gate)]):
+        eng = MainEngine(backend=Simulator(), engine_list=engine_list)
+        qureg = eng.allocate_qureg(2)
+        for i in range(3):
+            _apply_circuit(qureg)
+            Rx(0.1 * i) | qureg[1]
+            Rz(math.pi / 3) | qureg[1]
+        eng.flush()
+        states.append([eng.backend.get_amplitude(bits, qureg) for bits in ('00', '01', '10', '11')])
+        All(Measure) | qureg
+    assert np.allclose(states[0], states[1])
+
+def _apply_two_qubit_circuit(qureg):
+    H | qureg[0]
+    CNOT | (qureg[0], qureg[1])
+    Rzz(0.3) | (qureg[0], qureg[1])
+    Rx(0.2) | qureg[1]
+    CNOT | (qureg[1], qureg[0])
+    Swap | (qureg[0], qureg[1])
+
+def _get_two_qubit_gates(backend):
+    return [cmd for cmd in backend.received_commands if sum(len(qureg) for qureg in cmd.all_qubits) == 2]
+
+def test_two_qubit_resynthesizer_matrix_gate():
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[_resynthesis.TwoQubitBlockResynthesizer()])
+    qureg = eng.allocate_qureg(3)
+    _apply_two_qubit_circuit(qureg)
+    CNOT | (qureg[1], qureg[2])
+    eng.flush()
+    gates = _get_gates(backend)
+    assert len(gates) == 2
+    assert isinstance(gates[0], MatrixGate)
+    cnot01 = np.identity(4)[:, [0, 3, 2, 1]]
+    cnot10 = np.identity(4)[:, [0, 1, 3, 2]]
+    swap = np.identity(4)[:, [0, 2, 1, 3]]
+    expected = (
+        swap
+        @ cnot10
+        @ np.kron(Rx(0.2).matrix, np.identity(2))
+        @ Rzz(0.3).matrix
+        @ cnot01
+        @ np.kron(np.identity(2), H.matrix)
+    )
+    if backend.received_commands[3].qubits[0][0].id != qureg[0].id:
+        expected = swap @ expected @ swap
+    assert np.allclose(gates[0].matrix, expected)
+    # A block consisting of a single two-qubit gate is sent unchanged
+    assert gates[1:] == [X]
+
+def test_two_qubit_resynthesizer_identity_dropped():
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=backend, engine_list=[_resynthesis.TwoQubitBlockResynthesizer()])
+    qureg = eng.allocate_qureg(2)
+    for _ in range(3):
+        CNOT | (qureg[0], qureg[1])
+        CNOT | (qureg[1], qureg[0])
+    eng.flush()
+    assert _get_gates(backend) == []
+
+@pytest.mark.parametrize("two_qubit_gate", [X, Rxx])
+def test_two_qubit_resynthesizer_decomposition(two_qubit_gate):
+    def is_available(eng, cmd):
+        if isinstance(cmd.gate, ClassicalInstructionGate):
+            return True
+        if sum(len(qureg) for qureg in cmd.all_qubits) == 1:
+            return isinstance(cmd.gate, (Rx, Ry, Rz, Ph))
+        if two_qubit_gate == X:
+            return cmd.gate == X and len(cmd.control_qubits) == 1
+        return isinstance(cmd.gate, Rxx)
+
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(
+        backend=backend, engine_list=[_resynthesis.TwoQubitBlockResynthesizer(), InstructionFilter(is_available)]
+    )
+    qureg = eng.allocate_qureg(2)
+    _apply_two_qubit_circuit(qureg)
+    eng.flush()
+    two_qubit_cmds = _get_two_qubit_gates(backend)
+    assert 0 < len(two_qubit_cmds) <= 3
+    assert all(is_available(eng, cmd) for cmd in backend.received_commands)
+
+def test_two_qubit_resynthesizer_keeps_block_if_decomposition_unavailable():
+    def is_available(eng, cmd):
+        return not isinstance(cmd.gate, (MatrixGate, Ry, Ph))
+
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(
+        backend=backend, engine_list=[_resynthesis.TwoQubitBlockResynthesizer(), InstructionFilter(is_available)]
+    )
+    qureg = eng.allocate_qureg(2)
+    _apply_two_qubit_circuit(qureg)
+    eng.flush()
+    assert len(_get_gates(backend)) == 6
+
+def test_two_qubit_resynthesizer_keeps_block_if_decomposition_fails(monkeypatch):
+    from divya.setups.decompositions import arb1qubit2rzandry
+
+    def failing_decomposer(cmd):
+        raise Exception("Couldn't find parameters for matrix ")
+
+    monkeypatch.setattr(arb1qubit2rzandry.all_defined_decomposition_rules[0], 'gate_decomposer', failing_decomposer)
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(
+        backend=backend,
+        engine_list=[
+            _resynthesis.TwoQubitBlockResynthesizer(use_matrix_gate=False),
+            InstructionFilter(lambda eng, cmd: not isinstance(cmd.gate, MatrixGate)),
+        ],
+    )
+    qureg = eng.allocate_qureg(2)
+    _apply_two_qubit_circuit(qureg)
+    eng.flush()
+    assert len(_get_gates(backend)) == 6
+
+def test_two_qubit_resynthesizer_keeps_block_if_not_shorter():
+    def is_available(eng, cmd):
+        return not isinstance(cmd.gate, MatrixGate) or len(cmd.qubits) == 1
+
+    backend = DummyEngine(save_commands=True)
+    eng = MainEngine(
+        backend=backend, engine_list=[_resynthesis.TwoQubitBlockResynthesizer(), InstructionFilter(is_available)]
+    )
+    qureg = eng.allocate_qureg(2)
+    CNOT | (qureg[0], qureg[1])
+    Rz(0.3) | qureg[1]
+    CNOT | (qureg[0], qureg[1])
+    eng.flush()
+    assert _get_gates(backend) == [X, Rz(0.3), X]
+
+@pytest.mark.parametrize("use_matrix_gate", [True, False])
+def test_two_qubit_resynthesizer_simulation(use_matrix_gate):
+    states = []
+    for engine_list in ([], [_resynthesis.TwoQubitBlockResynthesizer(use_matrix_gate)]):
+        eng = MainEngine(backend=Simulator(), engine_list=engine_list)
+        qureg = eng.allocate_qureg(3)
+        for i in range(3):
+            _apply_two_qubit_circuit(qureg[i % 2 :])
+            with Control(eng, qureg[2], ctrl_state='0'):
+                Ry(0.3 * i) | qureg[0]
+            Swap | (qureg[1], qureg[2])
+            Rz(math.pi / 3) | qureg[1]
+        eng.flush()
+        states.append([eng.backend.get_amplitude(format(i, '03b'), qureg) for i in range(8)])
+        All(Measure) | qureg
+    assert np.allclose(states[0], states[1])
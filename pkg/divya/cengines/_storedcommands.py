@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Storage of the commands waiting in a mapper, indexed by per-qubit FIFO queues.
+
+The mappers store the commands they receive until they can be sent with the current mapping. A command can only be
+sent once all the commands stored before it which act on one of its qubits have been sent. StoredCommands keeps track
+of these ready commands, so that a mapper only needs to look at (at most) one command per qubit after changing its
+mapping instead of going through all the stored commands.
+"""
+
+import heapq
+from collections import deque
+
+class StoredCommands:
+    """
+    Commands stored by a mapper, in the order in which they were stored.
+
+    Behaves like a list of commands supporting append, len, iteration and comparison with lists. The commands are also
+    stored in a FIFO queue per qubit, and a command is ready once it is at the head of the queues of all its qubits.
+    """
+
+    def __init__(self, commands=()):
+        """
+        Initialize a StoredCommands object.
+
+        Args:
+            commands (list of Command objects): Commands to store.
+        """
+        # Commands and ids of their qubits, by position (in the order of their positions)
+        self._commands = {}
+        self._qubit_ids = {}
+        # Positions of the commands acting on each qubit
+        self._queues = {}
+        # Number of the qubits of each command on which an older command is stored
+        self._num_older = {}
+        self._ready = set()
+        self._next_position = 0
+        for cmd in commands:
+            self.append(cmd)
+
+    def append(self, cmd):
+        """
+        Store a command.
+
+        Args:
+            cmd (Command): Command to store.
+        """
+        position = self._next_position
+        self._next_position += 1
+        qubit_ids = [qubit.id for qureg in cmd.all_qubits for qubit in qureg]
+        self._commands[position] = cmd
+        self._qubit_ids[position] = qubit_ids
+        num_older = 0
+        for qubit_id in qubit_ids:
+            queue = self._queues.setdefault(qubit_id, deque())
+            if queue:
+                num_older += 1
+            queue.append(position)
+        self._num_older[position] = num_older
+        if num_older == 0:
+            self._ready.add(position)
+
+    def send_ready(self, send):
+        """
+        Offer the ready commands to send in the order in which they were stored and remove the ones it accepts.
+
+        Removing a command may make the next commands on its qubits ready, which are then offered as well. Hence,
+        send is called in the same order as when going through all stored commands, keeping the ones which cannot be
+        sent and skipping all later commands acting on their qubits.
+
+        Args:
+            send (function): Function called with a ready command, which returns True if the command was sent (and
+                has to be removed) and False otherwise.
+        """
+        positions = list(self._ready)
+        heapq.heapify(positions)
+        while positions:
+            position = heapq.heappop(positions)
+            if send(self._commands[position]):
+                for next_position in self._remove(position):
+                    heapq.heappush(positions, next_position)
+
+    def _remove(self, position):
+        """Remove the (ready) command at position and return the positions of the commands which became ready."""
+        self._ready.remove(position)
+        del self._commands[position]
+        del self._num_older[position]
+        now_ready = []
+        for qubit_id in self._qubit_ids.pop(position):
+            queue = self._queues[qubit_id]
+            queue.popleft()
+            if queue:
+                self._num_older[queue[0]] -= 1
+                if self._num_older[queue[0]] == 0:
+                    self._ready.add(queue[0])
+                    now_ready.append(queue[0])
+            else:
+                del self._queues[qubit_id]
+        return now_ready
+
+    def __len__(self):
+        """Return the number of stored commands."""
+        return len(self._commands)
+
+    def __iter__(self):
+        """Iterate over the stored commands in the order in which they were stored."""
+        return iter(self._commands.values())
+
+    def __eq__(self, other):
+        """Compare the stored commands with another StoredCommands object or a list of commands."""
+        if isinstance(other, (StoredCommands, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        """Return a string representation of the stored commands."""
+        return "StoredCommands({})".format(list(self))
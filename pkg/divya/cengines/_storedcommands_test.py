@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""Tests for divya.cengines._storedcommands.py."""
+
+from divya.cengines._storedcommands import StoredCommands
+from divya.ops import Allocate, Command, H, X
+from divya.types import WeakQubitRef
+
+def _commands():
+    qubits = [WeakQubitRef(engine=None, idx=i) for i in range(3)]
+    return [
+        Command(None, Allocate, ([qubits[0]],)),
+        Command(None, Allocate, ([qubits[1]],)),
+        Command(None, X, ([qubits[0]],), controls=[qubits[1]]),
+        Command(None, H, ([qubits[1]],)),
+        Command(None, Allocate, ([qubits[2]],)),
+        Command(None, H, ([qubits[2]],)),
+        Command(None, X, ([qubits[2]],), controls=[qubits[0]]),
+    ]
+
+def test_stored_commands_list_interface():
+    cmds = _commands()
+    stored = StoredCommands(cmds[:3])
+    stored.append(cmds[3])
+    assert len(stored) == 4
+    assert list(stored) == cmds[:4]
+    assert stored == cmds[:4]
+    assert stored == StoredCommands(cmds[:4])
+    assert stored != cmds[:3]
+    assert not StoredCommands()
+
+def test_stored_commands_send_ready_order():
+    cmds = _commands()
+    stored = StoredCommands(cmds)
+    offered = []
+
+    def send_all(cmd):
+        offered.append(cmd)
+        return True
+
+    stored.send_ready(send_all)
+    assert offered == cmds
+    assert len(stored) == 0
+
+def test_stored_commands_blocked_qubits():
+    cmds = _commands()
+    stored = StoredCommands(cmds)
+    offered = []
+    sendable = {id(cmd) for cmd in cmds if sum(len(qureg) for qureg in cmd.all_qubits) == 1}
+
+    def send(cmd):
+        offered.append(cmd)
+        return id(cmd) in sendable
+
+    stored.send_ready(send)
+    # The CNOT on qubits 0 and 1 blocks the H gate on qubit 1 and the CNOT on qubits 2 and 0
+    assert offered == [cmds[0], cmds[1], cmds[2], cmds[4], cmds[5]]
+    assert stored == [cmds[2], cmds[3], cmds[6]]
+    # Only the commands at the head of the queues of all their qubits are offered again
+    offered.clear()
+    stored.send_ready(send)
+    assert offered == [cmds[2]]
+    # Sending the first CNOT makes the next commands on its qubits ready
+    offered.clear()
+    sendable.add(id(cmds[2]))
+    stored.send_ready(send)
+    assert offered == [cmds[2], cmds[3], cmds[6]]
+    assert stored == [cmds[6]]
@@ -68,6 +68,8 @@ class TagRemover(BasicEngine):
             command_list (list<Command>): List of commands to receive and then (after removing tags) send on.
         """
         for cmd in command_list:
+            if not cmd.tags:
+                continue
             for tag in self._tags:
                 cmd.tags = [t for t in cmd.tags if not isinstance(t, tag)]
-            self.send([cmd])
\ No newline at end of file
+        self.send(command_list)
\ No newline at end of file
@@ -34,6 +34,7 @@ import random
 from copy import deepcopy
 
 import networkx as nx
+import numpy as np
 
 from divya.meta import LogicalQubitIDTag
 from divya.ops import (
@@ -47,6 +48,51 @@ from divya.types import WeakQubitRef
 
 from ._basicmapper import BasicMapperEngine
 from ._linearmapper import LinearMapper, return_swap_depth
+from ._storedcommands import StoredCommands
+
+def _odd_even_transposition_sort(keys, payloads):
+    """
+    Sort keys in place along the first axis with an odd-even transposition sort, permuting the payloads alike.
+
+    Every line keys[:, i, j, ...] is sorted independently. A round compares and swaps the elements at the positions
+    (1, 2), (3, 4), ... and then the ones at the positions (0, 1), (2, 3), ... of all the lines at once, until a round
+    swaps nothing.
+
+    Args:
+        keys (numpy.ndarray): Keys to sort.
+        payloads (tuple): Arrays of the same shape as keys, whose elements are swapped together with the keys.
+
+    Returns:
+        Tuple (first, line, phase) of arrays with one entry per swap, ordered by line and then in the order of the
+        swaps: first is the position of the first swapped element along the first axis, line the flat index of the
+        line (i.e., the index into keys.shape[1:] in row-major order) and phase the number of the half round.
+    """
+    length = keys.shape[0]
+    firsts, lines, phases = [], [], []
+    phase = 0
+    swapped = True
+    while swapped:
+        swapped = False
+        for start in (1, 0):
+            upper = slice(start, length - 1, 2)
+            lower = slice(start + 1, length, 2)
+            mask = keys[upper] > keys[lower]
+            if mask.any():
+                swapped = True
+                pair, *line = np.nonzero(mask)
+                firsts.append(start + 2 * pair)
+                lines.append(np.ravel_multi_index(line, keys.shape[1:]))
+                phases.append(np.full(len(pair), phase))
+                for array in (keys,) + tuple(payloads):
+                    upper_elements = np.where(mask, array[lower], array[upper])
+                    array[lower] = np.where(mask, array[upper], array[lower])
+                    array[upper] = upper_elements
+            phase += 1
+    if not firsts:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    first, line, phase = np.concatenate(firsts), np.concatenate(lines), np.concatenate(phases)
+    order = np.lexsort((first, phase, line))
+    return first[order], line[order], phase[order]
 
 class GridMapper(BasicMapperEngine):  # pylint: disable=too-many-instance-attributes
     """
@@ -77,6 +123,8 @@ class GridMapper(BasicMapperEngine):  # pylint: disable=too-many-instance-attrib
                                applied
         num_of_swaps_per_mapping (dict): Key are the number of swaps per mapping, value is the number of such mappings
                                          which have been applied
+        swaps_cache_size(int): Number of swap operation lists cached for the changes of mapping which have been
+                               applied
 
     """
 
@@ -88,6 +136,7 @@ class GridMapper(BasicMapperEngine):  # pylint: disable=too-many-instance-attrib
         storage=1000,
         optimization_function=return_swap_depth,
         num_optimization_steps=50,
+        swaps_cache_size=100,
     ):
         """
         Initialize a GridMapper compiler engine.
@@ -104,6 +153,9 @@ class GridMapper(BasicMapperEngine):  # pylint: disable=too-many-instance-attrib
                                    permutation which minimizes this cost.  Default optimizes for circuit depth.
             num_optimization_steps(int): Number of different permutations to of the matching to try and minimize the
                                          cost.
+            swaps_cache_size(int): Number of swap operation lists to cache for the changes of mapping which have
+                                   been applied (0 disables the cache). Set it to 0 if the optimization_function
+                                   depends on anything else than the list of swaps.
         Raises:
             RuntimeError: if incorrect `mapped_ids_to_backend_ids` parameter
         """
@@ -137,8 +189,11 @@ class GridMapper(BasicMapperEngine):  # pylint: disable=too-many-instance-attrib
         # the bound methods of the random module which might be used in other
         # places.
         self._rng = random.Random(11)
+        # Swap operations to change mapping (least recently used first), see _return_lowest_cost_swaps
+        self.swaps_cache_size = swaps_cache_size
+        self._swaps_cache = {}
         # Storing commands
-        self._stored_commands = []
+        self._stored_commands = StoredCommands()
         # Logical qubit ids for which the Allocate gate has already been
         # processed and sent to the next engine but which are not yet
         # deallocated:
@@ -219,147 +274,16 @@ class GridMapper(BasicMapperEngine):  # pylint: disable=too-many-instance-attrib
             new_mapping_2d[logical_id] = self._map_1d_to_2d[mapped_id]
         return new_mapping_2d
 
-    def _compare_and_swap(self, element0, element1, key):
-        """If swapped (inplace), then return swap operation so that key(element0) < key(element1)."""
-        if key(element0) > key(element1):
-            mapped_id0 = element0.current_column + element0.current_row * self.num_columns
-            mapped_id1 = element1.current_column + element1.current_row * self.num_columns
-            swap_operation = (mapped_id0, mapped_id1)
-            # swap elements but update also current position:
-            tmp_0 = element0.final_row
-            tmp_1 = element0.final_column
-            tmp_2 = element0.row_after_step_1
-            element0.final_row = element1.final_row
-            element0.final_column = element1.final_column
-            element0.row_after_step_1 = element1.row_after_step_1
-            element1.final_row = tmp_0
-            element1.final_column = tmp_1
-            element1.row_after_step_1 = tmp_2
-            return swap_operation
-        return None
-
-    def _sort_within_rows(self, final_positions, key):
-        swap_operations = []
-        for row in range(self.num_rows):
-            finished_sorting = False
-            while not finished_sorting:
-                finished_sorting = True
-                for column in range(1, self.num_columns - 1, 2):
-                    element0 = final_positions[row][column]
-                    element1 = final_positions[row][column + 1]
-                    swap = self._compare_and_swap(element0, element1, key=key)
-                    if swap is not None:
-                        finished_sorting = False
-                        swap_operations.append(swap)
-                for column in range(0, self.num_columns - 1, 2):
-                    element0 = final_positions[row][column]
-                    element1 = final_positions[row][column + 1]
-                    swap = self._compare_and_swap(element0, element1, key=key)
-                    if swap is not None:
-                        finished_sorting = False
-                        swap_operations.append(swap)
-        return swap_operations
-
-    def _sort_within_columns(self, final_positions, key):
-        swap_operations = []
-        for column in range(self.num_columns):
-            finished_sorting = False
-            while not finished_sorting:
-                finished_sorting = True
-                for row in range(1, self.num_rows - 1, 2):
-                    element0 = final_positions[row][column]
-                    element1 = final_positions[row + 1][column]
-                    swap = self._compare_and_swap(element0, element1, key=key)
-                    if swap is not None:
-                        finished_sorting = False
-                        swap_operations.append(swap)
-                for row in range(0, self.num_rows - 1, 2):
-                    element0 = final_positions[row][column]
-                    element1 = final_positions[row + 1][column]
-                    swap = self._compare_and_swap(element0, element1, key=key)
-                    if swap is not None:
-                        finished_sorting = False
-                        swap_operations.append(swap)
-        return swap_operations
-
-    def return_swaps(  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
-        self, old_mapping, new_mapping, permutation=None
-    ):
+    def _find_matchings(self, final_columns):
         """
-        Return the swap operation to change mapping.
+        Decompose the moves between columns into num_rows perfect matchings.
 
         Args:
-            old_mapping: dict: keys are logical ids and values are mapped qubit ids
-            new_mapping: dict: keys are logical ids and values are mapped qubit ids
-            permutation: list of int from 0, 1, ..., self.num_rows-1. It is used to permute the found perfect
-                         matchings. Default is None which keeps the original order.
+            final_columns (numpy.ndarray): Final column of the element currently at (row, column).
+
         Returns:
-            List of tuples. Each tuple is a swap operation which needs to be applied. Tuple contains the two mapped
-            qubit ids for the Swap.
+            numpy.ndarray whose entry (i, column) is the destination column matched to column in the i-th matching.
         """
-        if permutation is None:
-            permutation = list(range(self.num_rows))
-        swap_operations = []
-
-        class Position:  # pylint: disable=too-few-public-methods
-            """Custom Container."""
-
-            def __init__(  # pylint: disable=too-many-arguments
-                self,
-                current_row,
-                current_column,
-                final_row,
-                final_column,
-                row_after_step_1=None,
-            ):
-                self.current_row = current_row
-                self.current_column = current_column
-                self.final_row = final_row
-                self.final_column = final_column
-                self.row_after_step_1 = row_after_step_1
-
-        # final_positions contains info containers
-        # final_position[i][j] contains info container with
-        # current_row == i and current_column == j
-        final_positions = [[None for i in range(self.num_columns)] for j in range(self.num_rows)]
-        # move qubits which are in both mappings
-        used_mapped_ids = set()
-        for logical_id in old_mapping:
-            if logical_id in new_mapping:
-                used_mapped_ids.add(new_mapping[logical_id])
-                old_column = old_mapping[logical_id] % self.num_columns
-                old_row = old_mapping[logical_id] // self.num_columns
-                new_column = new_mapping[logical_id] % self.num_columns
-                new_row = new_mapping[logical_id] // self.num_columns
-                info_container = Position(
-                    current_row=old_row,
-                    current_column=old_column,
-                    final_row=new_row,
-                    final_column=new_column,
-                )
-                final_positions[old_row][old_column] = info_container
-        # exchange all remaining None with the not yet used mapped ids
-        all_ids = set(range(self.num_qubits))
-        not_used_mapped_ids = list(all_ids.difference(used_mapped_ids))
-        not_used_mapped_ids = sorted(not_used_mapped_ids, reverse=True)
-        for row in range(self.num_rows):
-            for column in range(self.num_columns):
-                if final_positions[row][column] is None:
-                    mapped_id = not_used_mapped_ids.pop()
-                    new_column = mapped_id % self.num_columns
-                    new_row = mapped_id // self.num_columns
-                    info_container = Position(
-                        current_row=row,
-                        current_column=column,
-                        final_row=new_row,
-                        final_column=new_column,
-                    )
-                    final_positions[row][column] = info_container
-        if len(not_used_mapped_ids) > 0:  # pragma: no cover
-            raise RuntimeError('Internal compiler error: len(not_used_mapped_ids) > 0')
-        # 1. Assign column_after_step_1 for each element
-        # Matching contains the num_columns matchings
-        matchings = [None for i in range(self.num_rows)]
         # Build bipartite graph. Nodes are the current columns numbered (0, 1, ...) and the destination columns
         # numbered with an offset of self.num_columns (0 + offset, 1+offset, ...)
         graph = nx.Graph()
@@ -368,9 +292,8 @@ class GridMapper(BasicMapperEngine):  # pylint: disable=too-many-instance-attrib
         graph.add_nodes_from(range(offset, offset + self.num_columns), bipartite=1)
         # Add an edge to the graph from (i, j+offset) for every element currently in column i which should go to
         # column j for the new mapping
-        for row in range(self.num_rows):
-            for column in range(self.num_columns):
-                destination_column = final_positions[row][column].final_column
+        for row in final_columns.tolist():
+            for column, destination_column in enumerate(row):
                 if not graph.has_edge(column, destination_column + offset):
                     graph.add_edge(column, destination_column + offset)
                     # Keep manual track of multiple edges between nodes
@@ -378,121 +301,219 @@ class GridMapper(BasicMapperEngine):  # pylint: disable=too-many-instance-attrib
                 else:
                     graph[column][destination_column + offset]['num'] += 1
         # Find perfect matching, remove those edges from the graph and do it again:
+        matchings = np.empty((self.num_rows, self.num_columns), dtype=np.intp)
         for i in range(self.num_rows):
             top_nodes = range(self.num_columns)
             matching = nx.bipartite.maximum_matching(graph, top_nodes)
-            matchings[i] = matching
             # Remove all edges of the current perfect matching
             for node in range(self.num_columns):
+                matchings[i, node] = matching[node] - offset
                 if graph[node][matching[node]]['num'] == 1:
                     graph.remove_edge(node, matching[node])
                 else:
                     graph[node][matching[node]]['num'] -= 1
-        # permute the matchings:
-        tmp = deepcopy(matchings)
-        for i in range(self.num_rows):
-            matchings[i] = tmp[permutation[i]]
-        # Assign row_after_step_1
-        for column in range(self.num_columns):
-            for row_after_step_1 in range(self.num_rows):
-                dest_column = matchings[row_after_step_1][column] - offset
-                best_element = None
-                for row in range(self.num_rows):
-                    element = final_positions[row][column]
-                    if element.row_after_step_1 is not None:
-                        continue
-                    if element.final_column == dest_column:
-                        if best_element is None:
-                            best_element = element
-                        elif best_element.final_row > element.final_row:
-                            best_element = element
-                best_element.row_after_step_1 = row_after_step_1
-        # 2. Sort inside all the rows
-        swaps = self._sort_within_columns(final_positions=final_positions, key=lambda x: x.row_after_step_1)
-        swap_operations += swaps
-        # 3. Sort inside all the columns
-        swaps = self._sort_within_rows(final_positions=final_positions, key=lambda x: x.final_column)
-        swap_operations += swaps
-        # 4. Sort inside all the rows
-        swaps = self._sort_within_columns(final_positions=final_positions, key=lambda x: x.final_row)
-        swap_operations += swaps
-        return swap_operations
-
-    def _send_possible_commands(self):  # pylint: disable=too-many-branches
+        return matchings
+
+    def _return_swaps_candidates(self, old_mapping, new_mapping, permutations):  # pylint: disable=too-many-locals
+        """
+        Return the swap operations to change the mapping for each permutation of the perfect matchings.
+
+        The perfect matchings are computed once and the sorting networks of all the permutations are computed
+        together, with arrays of shape (num_rows, number of permutations, num_columns).
+
+        Args:
+            old_mapping: dict: keys are logical ids and values are mapped qubit ids
+            new_mapping: dict: keys are logical ids and values are mapped qubit ids
+            permutations: list of permutations of 0, 1, ..., self.num_rows-1 (see return_swaps).
+
+        Returns:
+            Tuple (swaps, depths): swaps is the list with the list of swap operations (see return_swaps) of each
+            permutation and depths the array with their circuit depths (see return_swap_depth).
+        """
+        num_rows, num_columns = self.num_rows, self.num_columns
+        num_candidates = len(permutations)
+        # final_ids[row, column] is the final mapped id of the element currently at (row, column)
+        final_ids = np.full(self.num_qubits, -1, dtype=np.intp)
+        for logical_id, old_id in old_mapping.items():
+            if logical_id in new_mapping:
+                final_ids[old_id] = new_mapping[logical_id]
+        # exchange all remaining positions (in row-major order) with the not yet used mapped ids (in increasing order)
+        unused = np.ones(self.num_qubits, dtype=bool)
+        unused[final_ids[final_ids >= 0]] = False
+        final_ids[final_ids < 0] = np.flatnonzero(unused)
+        final_rows, final_columns = np.divmod(final_ids.reshape(num_rows, num_columns), num_columns)
+        # 1. Assign row_after_step_1 for each element: within each column, the elements going to the same column are
+        #    assigned (by increasing final row) to the rows whose matching sends this column there.
+        matchings = self._find_matchings(final_columns)[np.asarray(permutations, dtype=np.intp)]
+        element_order = np.lexsort((final_rows, final_columns), axis=0)
+        row_order = np.argsort(matchings, axis=1, kind='stable')
+        rows_after_step_1 = np.empty_like(matchings)
+        np.put_along_axis(rows_after_step_1, np.broadcast_to(element_order, matchings.shape), row_order, axis=1)
+        # Arrays of shape (num_rows, num_candidates, num_columns)
+        rows_after_step_1 = np.ascontiguousarray(rows_after_step_1.transpose(1, 0, 2))
+        final_rows = np.repeat(final_rows[:, np.newaxis, :], num_candidates, axis=1)
+        final_columns = np.repeat(final_columns[:, np.newaxis, :], num_candidates, axis=1)
+        # Each step is a tuple (candidate, mapped_ids0, mapped_ids1, phase) of arrays with one entry per swap
+        # 2. Sort inside all the columns
+        first, line, phase = _odd_even_transposition_sort(rows_after_step_1, (final_rows, final_columns))
+        candidate, column = np.divmod(line, num_columns)
+        mapped_ids0 = first * num_columns + column
+        steps = [(candidate, mapped_ids0, mapped_ids0 + num_columns, phase)]
+        # 3. Sort inside all the rows (columns, candidates and rows are the axes of the transposed arrays)
+        first, line, phase = _odd_even_transposition_sort(
+            final_columns.transpose(2, 1, 0), (final_rows.transpose(2, 1, 0),)
+        )
+        candidate, row = np.divmod(line, num_rows)
+        mapped_ids0 = row * num_columns + first
+        steps.append((candidate, mapped_ids0, mapped_ids0 + 1, phase))
+        # 4. Sort inside all the columns
+        first, line, phase = _odd_even_transposition_sort(final_rows, ())
+        candidate, column = np.divmod(line, num_columns)
+        mapped_ids0 = first * num_columns + column
+        steps.append((candidate, mapped_ids0, mapped_ids0 + num_columns, phase))
+
+        # The swaps of a phase act on disjoint qubits and the lines of a step too, so the depths are computed phase by
+        # phase for all candidates at once
+        depth_of_qubits = np.zeros((num_candidates, self.num_qubits), dtype=np.intp)
+        for candidate, mapped_ids0, mapped_ids1, phase in steps:
+            order = np.argsort(phase, kind='stable')
+            bounds = np.flatnonzero(np.diff(phase[order])) + 1
+            for indices in np.split(order, bounds):
+                swap_candidates, ids0, ids1 = candidate[indices], mapped_ids0[indices], mapped_ids1[indices]
+                depth = np.maximum(depth_of_qubits[swap_candidates, ids0], depth_of_qubits[swap_candidates, ids1]) + 1
+                depth_of_qubits[swap_candidates, ids0] = depth
+                depth_of_qubits[swap_candidates, ids1] = depth
+
+        candidates = np.concatenate([step[0] for step in steps])
+        # Group the swaps by candidate, keeping the order of the steps
+        order = np.argsort(candidates, kind='stable')
+        bounds = np.cumsum(np.bincount(candidates, minlength=num_candidates)).tolist()
+        swap_operations = list(
+            zip(
+                np.concatenate([step[1] for step in steps])[order].tolist(),
+                np.concatenate([step[2] for step in steps])[order].tolist(),
+            )
+        )
+        swaps = [swap_operations[start:end] for start, end in zip([0] + bounds[:-1], bounds)]
+        return swaps, depth_of_qubits.max(axis=1)
+
+    def return_swaps(self, old_mapping, new_mapping, permutation=None):
+        """
+        Return the swap operation to change mapping.
+
+        Args:
+            old_mapping: dict: keys are logical ids and values are mapped qubit ids
+            new_mapping: dict: keys are logical ids and values are mapped qubit ids
+            permutation: list of int from 0, 1, ..., self.num_rows-1. It is used to permute the found perfect
+                         matchings. Default is None which keeps the original order.
+        Returns:
+            List of tuples. Each tuple is a swap operation which needs to be applied. Tuple contains the two mapped
+            qubit ids for the Swap.
+        """
+        if permutation is None:
+            permutation = list(range(self.num_rows))
+        return self._return_swaps_candidates(old_mapping, new_mapping, [permutation])[0][0]
+
+    def _send_possible_commands(self):
         """
         Send the stored commands possible without changing the mapping.
 
+        Only the ready stored commands (see StoredCommands) are tried, i.e. at most one command per qubit.
+
         Note: self._current_row_major_mapping (hence also self.current_mapping) must exist already
         """
-        active_ids = deepcopy(self._currently_allocated_ids)
-        for logical_id in self._current_row_major_mapping:
-            # So that loop doesn't stop before AllocateGate applied
-            active_ids.add(logical_id)
-
-        new_stored_commands = []
-        for i, cmd in enumerate(self._stored_commands):
-            if len(active_ids) == 0:
-                new_stored_commands += self._stored_commands[i:]
-                break
+        if not isinstance(self._stored_commands, StoredCommands):
+            self._stored_commands = StoredCommands(self._stored_commands)
+        row_major_mapping = self._current_row_major_mapping
+
+        def send(cmd):
+            logical_id = cmd.qubits[0][0].id
             if isinstance(cmd.gate, AllocateQubitGate):
-                if cmd.qubits[0][0].id in self._current_row_major_mapping:
-                    self._currently_allocated_ids.add(cmd.qubits[0][0].id)
-
-                    mapped_id = self._current_row_major_mapping[cmd.qubits[0][0].id]
-                    qb = WeakQubitRef(engine=self, idx=self._mapped_ids_to_backend_ids[mapped_id])
-                    new_cmd = Command(
-                        engine=self,
-                        gate=AllocateQubitGate(),
-                        qubits=([qb],),
-                        tags=[LogicalQubitIDTag(cmd.qubits[0][0].id)],
-                    )
-                    self.send([new_cmd])
-                else:
-                    new_stored_commands.append(cmd)
-            elif isinstance(cmd.gate, DeallocateQubitGate):
-                if cmd.qubits[0][0].id in active_ids:
-                    mapped_id = self._current_row_major_mapping[cmd.qubits[0][0].id]
-                    qb = WeakQubitRef(engine=self, idx=self._mapped_ids_to_backend_ids[mapped_id])
-                    new_cmd = Command(
-                        engine=self,
-                        gate=DeallocateQubitGate(),
-                        qubits=([qb],),
-                        tags=[LogicalQubitIDTag(cmd.qubits[0][0].id)],
-                    )
-                    self._currently_allocated_ids.remove(cmd.qubits[0][0].id)
-                    active_ids.remove(cmd.qubits[0][0].id)
-                    self._current_row_major_mapping.pop(cmd.qubits[0][0].id)
-                    self._current_mapping.pop(cmd.qubits[0][0].id)
-                    self.send([new_cmd])
-                else:
-                    new_stored_commands.append(cmd)
-            else:
-                send_gate = True
-                mapped_ids = set()
-                for qureg in cmd.all_qubits:
-                    for qubit in qureg:
-                        if qubit.id not in active_ids:
-                            send_gate = False
-                            break
-                        mapped_ids.add(self._current_row_major_mapping[qubit.id])
-                # Check that mapped ids are nearest neighbour on 2D grid
-                if len(mapped_ids) == 2:
-                    qb0, qb1 = sorted(mapped_ids)
-                    send_gate = False
-                    if qb1 - qb0 == self.num_columns:
-                        send_gate = True
-                    elif qb1 - qb0 == 1 and qb1 % self.num_columns != 0:
-                        send_gate = True
-                if send_gate:
-                    # Note: This sends the cmd correctly with the backend ids as it looks up the mapping in
-                    #       self.current_mapping and not our internal mapping self._current_row_major_mapping
-                    self._send_cmd_with_mapped_ids(cmd)
-                else:
-                    for qureg in cmd.all_qubits:
-                        for qubit in qureg:
-                            active_ids.discard(qubit.id)
-                    new_stored_commands.append(cmd)
-        self._stored_commands = new_stored_commands
+                if logical_id not in row_major_mapping:
+                    return False
+                self._currently_allocated_ids.add(logical_id)
+                mapped_id = row_major_mapping[logical_id]
+                qb = WeakQubitRef(engine=self, idx=self._mapped_ids_to_backend_ids[mapped_id])
+                new_cmd = Command(
+                    engine=self,
+                    gate=AllocateQubitGate(),
+                    qubits=([qb],),
+                    tags=[LogicalQubitIDTag(logical_id)],
+                )
+                self.send([new_cmd])
+                return True
+            if isinstance(cmd.gate, DeallocateQubitGate):
+                if logical_id not in row_major_mapping:
+                    return False
+                mapped_id = row_major_mapping[logical_id]
+                qb = WeakQubitRef(engine=self, idx=self._mapped_ids_to_backend_ids[mapped_id])
+                new_cmd = Command(
+                    engine=self,
+                    gate=DeallocateQubitGate(),
+                    qubits=([qb],),
+                    tags=[LogicalQubitIDTag(logical_id)],
+                )
+                self._currently_allocated_ids.remove(logical_id)
+                row_major_mapping.pop(logical_id)
+                self._current_mapping.pop(logical_id)
+                self.send([new_cmd])
+                return True
+            mapped_ids = set()
+            for qureg in cmd.all_qubits:
+                for qubit in qureg:
+                    if qubit.id not in row_major_mapping:
+                        return False
+                    mapped_ids.add(row_major_mapping[qubit.id])
+            # Check that mapped ids are nearest neighbour on 2D grid
+            if len(mapped_ids) == 2:
+                qb0, qb1 = sorted(mapped_ids)
+                if qb1 - qb0 != self.num_columns and (qb1 - qb0 != 1 or qb1 % self.num_columns == 0):
+                    return False
+            # Note: This sends the cmd correctly with the backend ids as it looks up the mapping in
+            #       self.current_mapping and not our internal mapping self._current_row_major_mapping
+            self._send_cmd_with_mapped_ids(cmd)
+            return True
+
+        self._stored_commands.send_ready(send)
+
+    def _return_lowest_cost_swaps(self, old_mapping, new_mapping):
+        """
+        Return the swap operations of the permutation of the matchings with the lowest cost.
+
+        The swap operations are cached by the pattern of the move, i.e., by the pairs of old and new mapped ids of the
+        qubits in both mappings, which they only depend upon.
+        """
+        pattern = tuple(sorted((old_id, new_mapping[logical_id]) for logical_id, old_id in old_mapping.items()
+                               if logical_id in new_mapping))
+        if pattern in self._swaps_cache:
+            # Mark as the most recently used
+            swaps = self._swaps_cache.pop(pattern)
+            self._swaps_cache[pattern] = swaps
+            return swaps
+        matchings_numbers = list(range(self.num_rows))
+        if math.factorial(self.num_rows) <= self.num_optimization_steps:
+            permutations = list(itertools.permutations(matchings_numbers, self.num_rows))
+        else:
+            permutations = []
+            for _ in range(self.num_optimization_steps):
+                permutations.append(self._rng.sample(matchings_numbers, self.num_rows))
+        candidates, depths = self._return_swaps_candidates(old_mapping, new_mapping, permutations)
+        if self.optimization_function is return_swap_depth:
+            swaps = candidates[int(np.argmin(depths))]
+        else:
+            swaps = None
+            lowest_cost = None
+            for trial_swaps in candidates:
+                cost = self.optimization_function(trial_swaps)
+                if swaps is None or lowest_cost > cost:
+                    swaps = trial_swaps
+                    lowest_cost = cost
+        if self.swaps_cache_size > 0:
+            if len(self._swaps_cache) >= self.swaps_cache_size:
+                # Evict the least recently used
+                del self._swaps_cache[next(iter(self._swaps_cache))]
+            self._swaps_cache[pattern] = swaps
+        return swaps
 
     def _run(self):  # pylint: disable=too-many-locals.too-many-branches,too-many-statements
         """
@@ -510,28 +531,7 @@ class GridMapper(BasicMapperEngine):  # pylint: disable=too-many-instance-attrib
             if len(self._stored_commands) == 0:
                 return
         new_row_major_mapping = self._return_new_mapping()
-        # Find permutation of matchings with lowest cost
-        swaps = None
-        lowest_cost = None
-        matchings_numbers = list(range(self.num_rows))
-        if self.num_optimization_steps <= math.factorial(self.num_rows):
-            permutations = itertools.permutations(matchings_numbers, self.num_rows)
-        else:
-            permutations = []
-            for _ in range(self.num_optimization_steps):
-                permutations.append(self._rng.sample(matchings_numbers, self.num_rows))
-        for permutation in permutations:
-            trial_swaps = self.return_swaps(
-                old_mapping=self._current_row_major_mapping,
-                new_mapping=new_row_major_mapping,
-                permutation=permutation,
-            )
-            if swaps is None:
-                swaps = trial_swaps
-                lowest_cost = self.optimization_function(trial_swaps)
-            elif lowest_cost > self.optimization_function(trial_swaps):
-                swaps = trial_swaps
-                lowest_cost = self.optimization_function(trial_swaps)
+        swaps = self._return_lowest_cost_swaps(self._current_row_major_mapping, new_row_major_mapping)
         if swaps:  # first mapping requires no swaps
             # Allocate all mapped qubit ids (which are not already allocated,
             # i.e., contained in self._currently_allocated_ids)
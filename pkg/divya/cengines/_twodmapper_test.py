@@ -195,6 +195,67 @@ def test_return_swaps_random(num_rows, num_columns, seed, none_old, none_new):
         if new_chain[i] in old_mapping and new_chain[i] in new_mapping:
             assert test_chain[i] == new_chain[i]
 
+def test_return_swaps_candidates():
+    random.seed(9)
+    mapper = two_d.GridMapper(num_rows=3, num_columns=4)
+    old_chain = random.sample(range(12), 12)
+    new_chain = random.sample(range(12), 12)
+    old_mapping = {logical_id: i for i, logical_id in enumerate(old_chain) if logical_id != 3}
+    new_mapping = {logical_id: i for i, logical_id in enumerate(new_chain) if logical_id != 5}
+    permutations = list(itertools.permutations(range(3)))
+    candidates, depths = mapper._return_swaps_candidates(old_mapping, new_mapping, permutations)
+    assert len(candidates) == len(permutations)
+    for permutation, swaps, depth in zip(permutations, candidates, depths):
+        assert swaps == mapper.return_swaps(old_mapping, new_mapping, permutation)
+        assert depth == two_d.return_swap_depth(swaps)
+        positions = deepcopy(old_chain)
+        for pos0, pos1 in swaps:
+            positions[pos0], positions[pos1] = positions[pos1], positions[pos0]
+        for logical_id, mapped_id in new_mapping.items():
+            if logical_id in old_mapping:
+                assert positions[mapped_id] == logical_id
+    # No moves
+    candidates, depths = mapper._return_swaps_candidates(old_mapping, old_mapping, permutations)
+    assert candidates == [[]] * len(permutations)
+    assert list(depths) == [0] * len(permutations)
+
+@pytest.mark.parametrize("num_optimization_steps, num_candidates", [(2, 2), (6, 6), (50, 6)])
+def test_return_lowest_cost_swaps(num_optimization_steps, num_candidates):
+    costs = []
+
+    def num_swaps(swaps):
+        costs.append(len(swaps))
+        return len(swaps)
+
+    mapper = two_d.GridMapper(
+        num_rows=3, num_columns=3, optimization_function=num_swaps, num_optimization_steps=num_optimization_steps
+    )
+    old_mapping = {0: 0, 1: 4, 2: 8}
+    new_mapping = {0: 8, 1: 4, 2: 1}
+    swaps = mapper._return_lowest_cost_swaps(old_mapping, new_mapping)
+    assert len(costs) == num_candidates
+    assert len(swaps) == min(costs)
+    # Changes of mapping with the same pattern reuse the cached swaps
+    assert mapper._return_lowest_cost_swaps({5: 0, 6: 4, 7: 8}, {5: 8, 6: 4, 7: 1, 8: 3}) is swaps
+    assert len(costs) == num_candidates
+    assert mapper._return_lowest_cost_swaps(old_mapping, {0: 8, 1: 4, 2: 2}) is not swaps
+    assert len(costs) == 2 * num_candidates
+
+def test_swaps_cache_size():
+    mapper = two_d.GridMapper(num_rows=2, num_columns=2, swaps_cache_size=2)
+    old_mapping = {0: 0, 1: 1}
+    new_mappings = [{0: 1, 1: 0}, {0: 2, 1: 0}, {0: 3, 1: 0}]
+    for new_mapping in new_mappings:
+        mapper._return_lowest_cost_swaps(old_mapping, new_mapping)
+    assert list(mapper._swaps_cache) == [((0, 2), (1, 0)), ((0, 3), (1, 0))]
+    # The least recently used swaps are evicted
+    mapper._return_lowest_cost_swaps(old_mapping, new_mappings[1])
+    mapper._return_lowest_cost_swaps(old_mapping, new_mappings[0])
+    assert list(mapper._swaps_cache) == [((0, 2), (1, 0)), ((0, 1), (1, 0))]
+    mapper = two_d.GridMapper(num_rows=2, num_columns=2, swaps_cache_size=0)
+    mapper._return_lowest_cost_swaps(old_mapping, new_mappings[0])
+    assert not mapper._swaps_cache
+
 @pytest.mark.parametrize("different_backend_ids", [False, True])
 def test_send_possible_commands(different_backend_ids):
     if different_backend_ids:
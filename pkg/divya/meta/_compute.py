@@ -42,6 +42,8 @@ class NoComputeSectionError(Exception):
 class ComputeTag:  # pylint: disable=too-few-public-methods
     """Compute meta tag."""
 
+    __slots__ = ()
+
     def __eq__(self, other):
         """Equal operator."""
         return isinstance(other, ComputeTag)
@@ -49,6 +51,8 @@ class ComputeTag:  # pylint: disable=too-few-public-methods
 class UncomputeTag:  # pylint: disable=too-few-public-methods
     """Uncompute meta tag."""
 
+    __slots__ = ()
+
     def __eq__(self, other):
         """Equal operator."""
         return isinstance(other, UncomputeTag)
@@ -129,7 +133,7 @@ class ComputeEngine(BasicEngine):
                 # Create new local qubit which lives within uncompute section
 
                 # Allocate needs to have old tags + uncompute tag
-                def add_uncompute(command, old_tags=deepcopy(cmd.tags)):
+                def add_uncompute(command, old_tags=list(cmd.tags)):
                     command.tags = old_tags + [UncomputeTag()]
                     return command
 
@@ -203,7 +207,7 @@ class ComputeEngine(BasicEngine):
         """
         Receive a list of commands.
 
-        If in compute-mode, receive commands and store deepcopy of each cmd.  Add ComputeTag to received cmd and send
+        If in compute-mode, receive commands and store a copy of each cmd.  Add ComputeTag to received cmd and send
         it on. Otherwise, send all received commands directly to next_engine.
 
         Args:
@@ -215,7 +219,7 @@ class ComputeEngine(BasicEngine):
                     self._allocated_qubit_ids.add(cmd.qubits[0][0].id)
                 elif cmd.gate == Deallocate:
                     self._deallocated_qubit_ids.add(cmd.qubits[0][0].id)
-                self._l.append(deepcopy(cmd))
+                self._l.append(cmd.clone())
                 tags = cmd.tags
                 tags.append(ComputeTag())
             self.send(command_list)
@@ -25,6 +25,8 @@
 class DirtyQubitTag:  # pylint: disable=too-few-public-methods
     """Dirty qubit meta tag."""
 
+    __slots__ = ()
+
     def __eq__(self, other):
         """Equal operator."""
         return isinstance(other, DirtyQubitTag)
\ No newline at end of file
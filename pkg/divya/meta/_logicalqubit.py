@@ -30,6 +30,8 @@ class LogicalQubitIDTag:  # pylint: disable=too-few-public-methods
         logical_qubit_id (int): Logical qubit id
     """
 
+    __slots__ = ('logical_qubit_id',)
+
     def __init__(self, logical_qubit_id):
         """Initialize a LogicalQubitIDTag object."""
         self.logical_qubit_id = logical_qubit_id
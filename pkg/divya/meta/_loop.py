@@ -31,8 +31,6 @@ Example:
         Rz(M_PI/3.) | qb
 """
 
-from copy import deepcopy
-
 from divya.cengines import BasicEngine
 from divya.ops import Allocate, Deallocate
 
@@ -42,6 +40,8 @@ from ._util import drop_engine_after, insert_engine
 class LoopTag:  # pylint: disable=too-few-public-methods
     """Loop meta tag."""
 
+    __slots__ = ('num', 'id')
+
     def __init__(self, num):
         """Initialize a LoopTag object."""
         self.num = num
@@ -110,21 +110,21 @@ class LoopEngine(BasicEngine):
             if len(self._allocated_qubit_ids) == 0:
                 # No local qubits, just send the circuit num times
                 for i in range(self._tag.num):
-                    self.send(deepcopy(self._cmd_list))
+                    self.send([cmd.clone() for cmd in self._cmd_list])
             else:
                 # Ancilla qubits have been allocated in loop body
                 # For each iteration, allocate and deallocate a new qubit and
                 # replace the qubit id in all commands using it.
                 for i in range(self._tag.num):
                     if i == 0:  # Don't change local qubit ids
-                        self.send(deepcopy(self._cmd_list))
+                        self.send([cmd.clone() for cmd in self._cmd_list])
                     else:
                         # Change local qubit ids before sending them
                         for refs_loc_qubit in self._refs_to_local_qb.values():
                             new_qb_id = self.main_engine.get_new_qubit_id()
                             for qubit_ref in refs_loc_qubit:
                                 qubit_ref.id = new_qb_id
-                        self.send(deepcopy(self._cmd_list))
+                        self.send([cmd.clone() for cmd in self._cmd_list])
         else:
             # Next engines support loop tag so no unrolling needed only
             # check that all qubits have been deallocated which have been
@@ -22,6 +22,32 @@
 
 """Tools to add/remove compiler engines to the MainEngine list."""
 
+def _send_buffered_commands(prev_engine):
+    """Deliver the commands buffered by the MainEngine before the engine list is modified."""
+    send_buffered_commands = getattr(prev_engine.main_engine, 'send_buffered_commands', None)
+    if send_buffered_commands is not None:
+        send_buffered_commands()
+
+
+def _clear_availability_caches(prev_engine):
+    """Clear the availability caches of all engines up to (and including) prev_engine, whose successors change."""
+    engines = []
+    engine = prev_engine.main_engine if prev_engine.main_engine is not None else prev_engine
+    while engine is not None:
+        engines.append(engine)
+        if engine is prev_engine:
+            break
+        engine = engine.next_engine
+    else:
+        # prev_engine is not part of the engine list (e.g., the ForwarderEngine of a decomposition rule)
+        engines = [prev_engine]
+    for engine in engines:
+        try:
+            engine.clear_availability_cache()
+        except AttributeError:
+            pass
+
+
 def insert_engine(prev_engine, engine_to_insert):
     """
     Insert an engine into the singly-linked list of engines.
@@ -32,6 +58,8 @@ def insert_engine(prev_engine, engine_to_insert):
         prev_engine (divya.cengines.BasicEngine): The engine just before the insertion point.
         engine_to_insert (divya.cengines.BasicEngine): The engine to insert at the insertion point.
     """
+    _send_buffered_commands(prev_engine)
+    _clear_availability_caches(prev_engine)
     if prev_engine.main_engine is not None:
         prev_engine.main_engine.n_engines += 1
 
@@ -53,6 +81,8 @@ def drop_engine_after(prev_engine):
     Returns:
         Engine: The dropped engine.
     """
+    _send_buffered_commands(prev_engine)
+    _clear_availability_caches(prev_engine)
     dropped_engine = prev_engine.next_engine
     prev_engine.next_engine = dropped_engine.next_engine
     if prev_engine.main_engine is not None:
@@ -45,6 +45,7 @@ from ._metagates import (
     get_inverse,
     is_identity,
 )
+from ._parameter import Parameter, ParameterExpression, UnboundParameterError
 from ._qaagate import QAA
 from ._qftgate import QFT, QFTGate
 from ._qpegate import QPE
@@ -49,11 +49,78 @@ import numpy as np
 from divya.types import BasicQubit
 
 from ._command import Command, apply_command
+from ._parameter import is_symbolic
 
 ANGLE_PRECISION = 12
 ANGLE_TOLERANCE = 10**-ANGLE_PRECISION
 RTOL = 1e-10
 ATOL = 1e-12
+MAX_INTERNED_GATES = 4096
+
+_interned_gates = {}
+
+def _normalize_angle(angle, period):
+    """
+    Return an angle modulo period, rounded to ANGLE_PRECISION.
+
+    The constant offset of a symbolic angle (ParameterExpression) is normalized, the parameters are kept as they are.
+    """
+    if is_symbolic(angle):
+        return angle.with_constant(_normalize_angle(angle.constant, period))
+    rounded_angle = round(float(angle) % period, ANGLE_PRECISION)
+    if rounded_angle > period - ANGLE_TOLERANCE:
+        rounded_angle = 0.0
+    return rounded_angle
+
+def _intern_gate(gate):
+    """
+    Return the shared instance of the gate's class with the gate's angle.
+
+    The first gate of a given class and angle becomes the shared instance. The table is emptied once it holds
+    MAX_INTERNED_GATES gates.
+    """
+    key = (gate.__class__, gate.angle)
+    try:
+        return _interned_gates[key]
+    except KeyError:
+        if len(_interned_gates) >= MAX_INTERNED_GATES:
+            _interned_gates.clear()
+        _interned_gates[key] = gate
+        return gate
+
+def _read_only_matrix(rows):
+    """
+    Return the complex, read-only numpy array with the given rows.
+
+    Gates return such arrays from their matrix property so that the matrices can be cached and shared.
+
+    Args:
+        rows: Anything numpy.array accepts, e.g., a list of lists of numbers.
+    """
+    matrix = np.array(rows, dtype=complex)
+    matrix.flags.writeable = False
+    return matrix
+
+def _cached_matrix(function):
+    """
+    Turn a function computing the matrix of a gate with an angle into a matrix property cached per gate.
+
+    The matrix is recomputed only if the angle of the gate changed since the last access.
+
+    Args:
+        function: Function taking the gate and returning its matrix (e.g., using _read_only_matrix).
+    """
+
+    def matrix(self):
+        cache = self.__dict__.get('_matrix_cache')
+        if cache is not None and cache[0] is self.angle:
+            return cache[1]
+        value = function(self)
+        self._matrix_cache = (self.angle, value)
+        return value
+
+    matrix.__doc__ = function.__doc__
+    return property(matrix)
 
 class NotMergeable(Exception):
     """
@@ -70,7 +137,15 @@ class NotInvertible(Exception):
     """
 
 class BasicGate:
-    """Base class of all gates. (Don't use it directly but derive from it)."""
+    """
+    Base class of all gates. (Don't use it directly but derive from it).
+
+    Attributes:
+        immutable (bool): True if the gate never changes after its construction. Immutable gates are shared instead of
+            copied when a command is cloned (see Command.clone).
+    """
+
+    immutable = False
 
     def __init__(self):
         """
@@ -129,6 +204,17 @@ class BasicGate:
         """
         raise NotMergeable("BasicGate: No get_merged() implemented.")
 
+    def bind(self, values):  # pylint: disable=unused-argument
+        """
+        Return this gate with numerical values substituted for its symbolic parameters (see divya.ops.Parameter).
+
+        Standard implementation of bind: the gate has no parameters and is returned as is.
+
+        Args:
+            values (dict): Dictionary mapping parameter names to numbers.
+        """
+        return self
+
     @staticmethod
     def make_tuple_of_qureg(qubits):
         """
@@ -284,8 +370,8 @@ class MatrixGate(BasicGate):
         """
         if not hasattr(other, 'matrix'):
             return False
-        if not isinstance(self.matrix, np.matrix) or not isinstance(other.matrix, np.matrix):
-            raise TypeError("One of the gates doesn't have the correct type (numpy.matrix) for the matrix attribute.")
+        if not isinstance(self.matrix, np.ndarray) or not isinstance(other.matrix, np.ndarray):
+            raise TypeError("One of the gates doesn't have the correct type (numpy.ndarray) for the matrix attribute.")
         if self.matrix.shape == other.matrix.shape and np.allclose(
             self.matrix, other.matrix, rtol=RTOL, atol=ATOL, equal_nan=False
         ):
@@ -317,6 +403,8 @@ class SelfInverseGate(BasicGate):  # pylint: disable=abstract-method
             get_inverse(H) | qubit
     """
 
+    immutable = True
+
     def get_inverse(self):
         """Return the inverse of this gate."""
         return deepcopy(self)
@@ -328,20 +416,35 @@ class BasicRotationGate(BasicGate):
     A rotation gate has a continuous parameter (the angle), labeled 'angle' / self.angle. Its inverse is the same gate
     with the negated argument.  Rotation gates of the same class can be merged by adding the angles.  The continuous
     parameter is modulo 4 * pi, self.angle is in the interval [0, 4 * pi).
+
+    The angle may also be symbolic (see divya.ops.Parameter), in which case only its constant offset is taken modulo
+    4 * pi. Symbolic gates can be merged and inverted but have no matrix until their parameters are bound.
     """
 
+    immutable = True
+
     def __init__(self, angle):
         """
         Initialize a basic rotation gate.
 
         Args:
-            angle (float): Angle of rotation (saved modulo 4 * pi)
+            angle (float, ParameterExpression): Angle of rotation (saved modulo 4 * pi)
         """
         super().__init__()
-        rounded_angle = round(float(angle) % (4.0 * math.pi), ANGLE_PRECISION)
-        if rounded_angle > 4 * math.pi - ANGLE_TOLERANCE:
-            rounded_angle = 0.0
-        self.angle = rounded_angle
+        self.angle = _normalize_angle(angle, 4.0 * math.pi)
+
+    @classmethod
+    def interned(cls, angle):
+        """
+        Return the shared gate of this class with the given angle.
+
+        Repeated calls with the same (normalized) angle return the same object, which therefore computes its matrix
+        only once. The returned gate must not be modified.
+
+        Args:
+            angle (float, ParameterExpression): Angle of the gate
+        """
+        return _intern_gate(cls(angle))
 
     def __str__(self):
         """
@@ -363,7 +466,7 @@ class BasicRotationGate(BasicGate):
             symbols (bool): uses the pi character and round the angle for a more user friendly display if True, full
                             angle written in radian otherwise.
         """
-        if symbols:
+        if symbols and not is_symbolic(self.angle):
             angle = "(" + str(round(self.angle / math.pi, 3)) + unicodedata.lookup("GREEK SMALL LETTER PI") + ")"
         else:
             angle = "(" + str(self.angle) + ")"
@@ -379,6 +482,8 @@ class BasicRotationGate(BasicGate):
 
             [CLASSNAME]$_[ANGLE]$
         """
+        if is_symbolic(self.angle):
+            return str(self.__class__.__name__) + "$_{" + str(self.angle) + "}$"
         return str(self.__class__.__name__) + "$_{" + str(round(self.angle / math.pi, 3)) + "\\pi}$"
 
     def get_inverse(self):
@@ -387,6 +492,17 @@ class BasicRotationGate(BasicGate):
             return self.__class__(0)
         return self.__class__(-self.angle + 4 * math.pi)
 
+    def bind(self, values):
+        """
+        Return this gate with numerical values substituted for the parameters of its angle.
+
+        Args:
+            values (dict): Dictionary mapping parameter names to numbers.
+        """
+        if is_symbolic(self.angle):
+            return self.__class__(self.angle.bind(values))
+        return self
+
     def get_merged(self, other):
         """
         Return self merged with another gate.
@@ -427,20 +543,34 @@ class BasicPhaseGate(BasicGate):
     A phase gate has a continuous parameter (the angle), labeled 'angle' / self.angle. Its inverse is the same gate
     with the negated argument.  Phase gates of the same class can be merged by adding the angles.  The continuous
     parameter is modulo 2 * pi, self.angle is in the interval [0, 2 * pi).
+
+    As for BasicRotationGate, the angle may also be symbolic (see divya.ops.Parameter).
     """
 
+    immutable = True
+
     def __init__(self, angle):
         """
         Initialize a basic rotation gate.
 
         Args:
-            angle (float): Angle of rotation (saved modulo 2 * pi)
+            angle (float, ParameterExpression): Angle of rotation (saved modulo 2 * pi)
         """
         super().__init__()
-        rounded_angle = round(float(angle) % (2.0 * math.pi), ANGLE_PRECISION)
-        if rounded_angle > 2 * math.pi - ANGLE_TOLERANCE:
-            rounded_angle = 0.0
-        self.angle = rounded_angle
+        self.angle = _normalize_angle(angle, 2.0 * math.pi)
+
+    @classmethod
+    def interned(cls, angle):
+        """
+        Return the shared gate of this class with the given angle.
+
+        Repeated calls with the same (normalized) angle return the same object, which therefore computes its matrix
+        only once. The returned gate must not be modified.
+
+        Args:
+            angle (float, ParameterExpression): Angle of the gate
+        """
+        return _intern_gate(cls(angle))
 
     def __str__(self):
         """
@@ -472,6 +602,17 @@ class BasicPhaseGate(BasicGate):
             return self.__class__(0)
         return self.__class__(-self.angle + 2 * math.pi)
 
+    def bind(self, values):
+        """
+        Return this gate with numerical values substituted for the parameters of its angle.
+
+        Args:
+            values (dict): Dictionary mapping parameter names to numbers.
+        """
+        if is_symbolic(self.angle):
+            return self.__class__(self.angle.bind(values))
+        return self
+
     def get_merged(self, other):
         """
         Return self merged with another gate.
@@ -511,6 +652,8 @@ class ClassicalInstructionGate(BasicGate):  # pylint: disable=abstract-method
     allocation/deallocation, ...
     """
 
+    immutable = True
+
 class FastForwardingGate(ClassicalInstructionGate):  # pylint: disable=abstract-method
     """
     Base class for fast-forward gates.
@@ -29,7 +29,7 @@ import pytest
 
 from divya import MainEngine
 from divya.cengines import DummyEngine
-from divya.ops import Command, X, _basics
+from divya.ops import Command, Parameter, X, _basics
 from divya.types import Qubit, Qureg, WeakQubitRef
 
 @pytest.fixture
@@ -266,6 +266,29 @@ def test_basic_phase_gate_get_merged():
     merged_gate = basic_phase_gate1.get_merged(basic_phase_gate2)
     assert merged_gate == basic_phase_gate3
 
+def test_basic_rotation_and_phase_gate_symbolic():
+    theta = Parameter('theta')
+    rotation_gate = _basics.BasicRotationGate(theta / 2 + 5 * math.pi)
+    # only the constant offset is taken modulo 4 pi
+    assert rotation_gate.angle == theta / 2 + math.pi
+    assert str(rotation_gate) == "BasicRotationGate(0.5*theta + 3.14159265359)"
+    assert rotation_gate.to_string(symbols=True) == str(rotation_gate)
+    assert rotation_gate.tex_str() == "BasicRotationGate$_{0.5*theta + 3.14159265359}$"
+    assert not rotation_gate.is_identity()
+    assert rotation_gate != _basics.BasicRotationGate(math.pi)
+    assert rotation_gate.get_merged(rotation_gate) == _basics.BasicRotationGate(theta + 2 * math.pi)
+    identity = rotation_gate.get_merged(rotation_gate.get_inverse())
+    assert identity.is_identity()
+    assert identity.angle == 0.0
+    assert rotation_gate.bind({'theta': 1.0}) == _basics.BasicRotationGate(0.5 + math.pi)
+    assert _basics.BasicRotationGate(0.5).bind({'theta': 1.0}) == _basics.BasicRotationGate(0.5)
+
+    phase_gate = _basics.BasicPhaseGate(-theta)
+    assert phase_gate.get_inverse() == _basics.BasicPhaseGate(theta)
+    assert phase_gate.get_merged(phase_gate.get_inverse()).angle == 0.0
+    assert phase_gate.bind({'theta': 0.5}) == _basics.BasicPhaseGate(-0.5)
+    assert _basics.BasicGate().bind({'theta': 1.0}) is not None
+
 def test_basic_phase_gate_comparison_and_hash():
     basic_phase_gate1 = _basics.BasicPhaseGate(0.5)
     basic_phase_gate2 = _basics.BasicPhaseGate(0.5)
@@ -94,6 +94,8 @@ class Command:  # pylint: disable=too-many-instance-attributes
         all_qubits: A tuple of control_qubits + qubits
     """
 
+    __slots__ = ('gate', 'tags', '_qubits', '_control_qubits', '_engine', '_control_state')
+
     def __init__(
         self, engine, gate, qubits, controls=(), tags=(), control_state=CtrlAll.One
     ):  # pylint: disable=too-many-arguments
@@ -133,15 +135,34 @@ class Command:  # pylint: disable=too-many-instance-attributes
         self._qubits = self._order_qubits(qubits)
 
     def __deepcopy__(self, memo):
-        """Deepcopy implementation. Engine should stay a reference."""
+        """Deepcopy implementation. Engine should stay a reference and immutable gates are shared."""
         return Command(
             self.engine,
-            deepcopy(self.gate),
+            self.gate if self.gate.immutable else deepcopy(self.gate, memo),
             self.qubits,
             list(self.control_qubits),
-            deepcopy(self.tags),
+            deepcopy(self.tags, memo),
+            self.control_state,
         )
 
+    def clone(self):
+        """
+        Return a cheap copy of this command.
+
+        The copy has its own qubit references (WeakQubitRef objects) and its own list of tags, but shares the tag
+        objects (which are never modified) and the gate (unless the gate is mutable, see BasicGate.immutable) with
+        this command. The engine stays a reference.
+        """
+        cmd = Command.__new__(Command)
+        cmd.gate = self.gate if self.gate.immutable else deepcopy(self.gate)
+        cmd.tags = list(self.tags)
+        # The qubits are already in their unique order
+        cmd._qubits = tuple([WeakQubitRef(qubit.engine, qubit.id) for qubit in qureg] for qureg in self._qubits)
+        cmd._control_qubits = [WeakQubitRef(qubit.engine, qubit.id) for qubit in self._control_qubits]
+        cmd._engine = self._engine
+        cmd._control_state = self._control_state
+        return cmd
+
     def get_inverse(self):
         """
         Get the command object corresponding to the inverse of this command.
@@ -65,6 +65,14 @@ def test_command_init(main_engine):
         assert cmd_qureg[0].id == expected_qureg[0].id
     assert symmetric_cmd._engine == main_engine
 
+def test_command_slots(main_engine):
+    cmd = _command.Command(main_engine, BasicGate(), ([Qubit(main_engine, 0)],), tags=[ComputeTag()])
+    assert not hasattr(cmd, '__dict__')
+    assert not hasattr(cmd.qubits[0][0], '__dict__')
+    assert not hasattr(cmd.tags[0], '__dict__')
+    with pytest.raises(AttributeError):
+        cmd.other = 1
+
 def test_command_deepcopy(main_engine):
     qureg0 = Qureg([Qubit(main_engine, 0)])
     qureg1 = Qureg([Qubit(main_engine, 1)])
@@ -90,6 +98,29 @@ def test_command_deepcopy(main_engine):
     cmd.gate = "ChangedGate"
     assert copied_cmd.gate == gate
 
+def test_command_clone(main_engine):
+    qureg0 = Qureg([Qubit(main_engine, 0)])
+    qureg1 = Qureg([Qubit(main_engine, 1)])
+    gate = Rx(0.5)
+    cmd = _command.Command(main_engine, gate, (qureg0,), controls=qureg1, control_state='0')
+    cmd.tags.append("MyTestTag")
+    cloned_cmd = cmd.clone()
+    assert cloned_cmd == cmd
+    assert cloned_cmd.gate is gate
+    assert cloned_cmd.control_state == '0'
+    assert id(cloned_cmd.engine) == id(main_engine)
+    # Qubit references and the list of tags are not shared
+    cloned_cmd.qubits[0][0].id = 10
+    cloned_cmd.control_qubits[0].id = 11
+    cloned_cmd.tags.append("OtherTag")
+    assert cmd.qubits[0][0].id == 0
+    assert cmd.control_qubits[0].id == 1
+    assert cmd.tags == ["MyTestTag"]
+    # Mutable gates are copied
+    cmd.gate = BasicGate()
+    assert cmd.clone().gate is not cmd.gate
+    assert deepcopy(cmd).gate is not cmd.gate
+
 def test_command_get_inverse(main_engine):
     qubit = main_engine.allocate_qubit()
     ctrl_qubit = main_engine.allocate_qubit()
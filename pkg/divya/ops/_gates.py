@@ -63,10 +63,34 @@ from ._basics import (
     ClassicalInstructionGate,
     FastForwardingGate,
     SelfInverseGate,
+    _cached_matrix,
+    _read_only_matrix,
 )
 from ._command import apply_command
 from ._metagates import get_inverse
 
+_H_MATRIX = _read_only_matrix(1.0 / cmath.sqrt(2.0) * np.array([[1, 1], [1, -1]]))
+_X_MATRIX = _read_only_matrix([[0, 1], [1, 0]])
+_Y_MATRIX = _read_only_matrix([[0, -1j], [1j, 0]])
+_Z_MATRIX = _read_only_matrix([[1, 0], [0, -1]])
+_S_MATRIX = _read_only_matrix([[1, 0], [0, 1j]])
+_T_MATRIX = _read_only_matrix([[1, 0], [0, cmath.exp(1j * cmath.pi / 4)]])
+_SQRT_X_MATRIX = _read_only_matrix(0.5 * np.array([[1 + 1j, 1 - 1j], [1 - 1j, 1 + 1j]]))
+# fmt: off
+_SWAP_MATRIX = _read_only_matrix([[1, 0, 0, 0],
+                                  [0, 0, 1, 0],
+                                  [0, 1, 0, 0],
+                                  [0, 0, 0, 1]])
+# fmt: on
+_SQRT_SWAP_MATRIX = _read_only_matrix(
+    [
+        [1, 0, 0, 0],
+        [0, 0.5 + 0.5j, 0.5 - 0.5j, 0],
+        [0, 0.5 - 0.5j, 0.5 + 0.5j, 0],
+        [0, 0, 0, 1],
+    ]
+)
+
 class HGate(SelfInverseGate):
     """Hadamard gate class."""
 
@@ -77,7 +101,7 @@ class HGate(SelfInverseGate):
     @property
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return 1.0 / cmath.sqrt(2.0) * np.matrix([[1, 1], [1, -1]])
+        return _H_MATRIX
 
 #: Shortcut (instance of) :class:`divya.ops.HGate`
 H = HGate()
@@ -92,7 +116,7 @@ class XGate(SelfInverseGate):
     @property
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix([[0, 1], [1, 0]])
+        return _X_MATRIX
 
 #: Shortcut (instance of) :class:`divya.ops.XGate`
 X = NOT = XGate()
@@ -107,7 +131,7 @@ class YGate(SelfInverseGate):
     @property
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix([[0, -1j], [1j, 0]])
+        return _Y_MATRIX
 
 #: Shortcut (instance of) :class:`divya.ops.YGate`
 Y = YGate()
@@ -122,7 +146,7 @@ class ZGate(SelfInverseGate):
     @property
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix([[1, 0], [0, -1]])
+        return _Z_MATRIX
 
 #: Shortcut (instance of) :class:`divya.ops.ZGate`
 Z = ZGate()
@@ -130,10 +154,12 @@ Z = ZGate()
 class SGate(BasicGate):
     """S gate class."""
 
+    immutable = True
+
     @property
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix([[1, 0], [0, 1j]])
+        return _S_MATRIX
 
     def __str__(self):
         """Return a string representation of the object."""
@@ -147,10 +173,12 @@ Sdag = Sdagger = get_inverse(S)
 class TGate(BasicGate):
     """T gate class."""
 
+    immutable = True
+
     @property
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix([[1, 0], [0, cmath.exp(1j * cmath.pi / 4)]])
+        return _T_MATRIX
 
     def __str__(self):
         """Return a string representation of the object."""
@@ -164,10 +192,12 @@ Tdag = Tdagger = get_inverse(T)
 class SqrtXGate(BasicGate):
     """Square-root X gate class."""
 
+    immutable = True
+
     @property
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return 0.5 * np.matrix([[1 + 1j, 1 - 1j], [1 - 1j, 1 + 1j]])
+        return _SQRT_X_MATRIX
 
     def tex_str(self):  # pylint: disable=no-self-use
         """Return the Latex string representation of a SqrtXGate."""
@@ -195,12 +225,7 @@ class SwapGate(SelfInverseGate):
     @property
     def matrix(self):
         """Access to the matrix property of this gate."""
-        # fmt: off
-        return np.matrix([[1, 0, 0, 0],
-                          [0, 0, 1, 0],
-                          [0, 1, 0, 0],
-                          [0, 0, 0, 1]])
-        # fmt: on
+        return _SWAP_MATRIX
 
 #: Shortcut (instance of) :class:`divya.ops.SwapGate`
 Swap = SwapGate()
@@ -208,6 +233,8 @@ Swap = SwapGate()
 class SqrtSwapGate(BasicGate):
     """Square-root Swap gate class."""
 
+    immutable = True
+
     def __init__(self):
         """Initialize a SqrtSwap gate."""
         super().__init__()
@@ -220,14 +247,7 @@ class SqrtSwapGate(BasicGate):
     @property
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix(
-            [
-                [1, 0, 0, 0],
-                [0, 0.5 + 0.5j, 0.5 - 0.5j, 0],
-                [0, 0.5 - 0.5j, 0.5 + 0.5j, 0],
-                [0, 0, 0, 1],
-            ]
-        )
+        return _SQRT_SWAP_MATRIX
 
 #: Shortcut (instance of) :class:`divya.ops.SqrtSwapGate`
 SqrtSwap = SqrtSwapGate()
@@ -239,6 +259,8 @@ class EntangleGate(BasicGate):
     (Hadamard on first qubit, followed by CNOTs applied to all other qubits).
     """
 
+    immutable = True
+
     def __str__(self):
         """Return a string representation of the object."""
         return "Entangle"
@@ -249,18 +271,18 @@ Entangle = EntangleGate()
 class Ph(BasicPhaseGate):
     """Phase gate (global phase)."""
 
-    @property
+    @_cached_matrix
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix([[cmath.exp(1j * self.angle), 0], [0, cmath.exp(1j * self.angle)]])
+        return _read_only_matrix([[cmath.exp(1j * self.angle), 0], [0, cmath.exp(1j * self.angle)]])
 
 class Rx(BasicRotationGate):
     """RotationX gate class."""
 
-    @property
+    @_cached_matrix
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix(
+        return _read_only_matrix(
             [
                 [math.cos(0.5 * self.angle), -1j * math.sin(0.5 * self.angle)],
                 [-1j * math.sin(0.5 * self.angle), math.cos(0.5 * self.angle)],
@@ -270,10 +292,10 @@ class Rx(BasicRotationGate):
 class Ry(BasicRotationGate):
     """RotationY gate class."""
 
-    @property
+    @_cached_matrix
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix(
+        return _read_only_matrix(
             [
                 [math.cos(0.5 * self.angle), -math.sin(0.5 * self.angle)],
                 [math.sin(0.5 * self.angle), math.cos(0.5 * self.angle)],
@@ -283,10 +305,10 @@ class Ry(BasicRotationGate):
 class Rz(BasicRotationGate):
     """RotationZ gate class."""
 
-    @property
+    @_cached_matrix
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix(
+        return _read_only_matrix(
             [
                 [cmath.exp(-0.5 * 1j * self.angle), 0],
                 [0, cmath.exp(0.5 * 1j * self.angle)],
@@ -296,10 +318,10 @@ class Rz(BasicRotationGate):
 class Rxx(BasicRotationGate):
     """RotationXX gate class."""
 
-    @property
+    @_cached_matrix
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix(
+        return _read_only_matrix(
             [
                 [cmath.cos(0.5 * self.angle), 0, 0, -1j * cmath.sin(0.5 * self.angle)],
                 [0, cmath.cos(0.5 * self.angle), -1j * cmath.sin(0.5 * self.angle), 0],
@@ -311,10 +333,10 @@ class Rxx(BasicRotationGate):
 class Ryy(BasicRotationGate):
     """RotationYY gate class."""
 
-    @property
+    @_cached_matrix
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix(
+        return _read_only_matrix(
             [
                 [cmath.cos(0.5 * self.angle), 0, 0, 1j * cmath.sin(0.5 * self.angle)],
                 [0, cmath.cos(0.5 * self.angle), -1j * cmath.sin(0.5 * self.angle), 0],
@@ -326,10 +348,10 @@ class Ryy(BasicRotationGate):
 class Rzz(BasicRotationGate):
     """RotationZZ gate class."""
 
-    @property
+    @_cached_matrix
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix(
+        return _read_only_matrix(
             [
                 [cmath.exp(-0.5 * 1j * self.angle), 0, 0, 0],
                 [0, cmath.exp(0.5 * 1j * self.angle), 0, 0],
@@ -341,10 +363,10 @@ class Rzz(BasicRotationGate):
 class R(BasicPhaseGate):
     """Phase-shift gate (equivalent to Rz up to a global phase)."""
 
-    @property
+    @_cached_matrix
     def matrix(self):
         """Access to the matrix property of this gate."""
-        return np.matrix([[1, 0], [0, cmath.exp(1j * self.angle)]])
+        return _read_only_matrix([[1, 0], [0, cmath.exp(1j * self.angle)]])
 
 class FlushGate(FastForwardingGate):
     """
@@ -443,6 +465,8 @@ AllocateDirty = AllocateDirtyQubitGate()
 class BarrierGate(BasicGate):
     """Barrier gate class."""
 
+    immutable = True
+
     def __str__(self):
         """Return a string representation of the object."""
         return "Barrier"
@@ -80,7 +80,7 @@ def test_sqrtx_gate():
     gate = _gates.SqrtXGate()
     assert str(gate) == "SqrtX"
     assert np.array_equal(gate.matrix, np.matrix([[0.5 + 0.5j, 0.5 - 0.5j], [0.5 - 0.5j, 0.5 + 0.5j]]))
-    assert np.array_equal(gate.matrix * gate.matrix, np.matrix([[0j, 1], [1, 0]]))
+    assert np.array_equal(gate.matrix @ gate.matrix, np.matrix([[0j, 1], [1, 0]]))
     assert isinstance(_gates.SqrtX, _gates.SqrtXGate)
 
 def test_swap_gate():
@@ -95,7 +95,7 @@ def test_sqrtswap_gate():
     sqrt_gate = _gates.SqrtSwapGate()
     swap_gate = _gates.SwapGate()
     assert str(sqrt_gate) == "SqrtSwap"
-    assert np.array_equal(sqrt_gate.matrix * sqrt_gate.matrix, swap_gate.matrix)
+    assert np.array_equal(sqrt_gate.matrix @ sqrt_gate.matrix, swap_gate.matrix)
     assert np.array_equal(
         sqrt_gate.matrix,
         np.matrix(
@@ -114,6 +114,38 @@ def test_engangle_gate():
     assert str(gate) == "Entangle"
     assert isinstance(_gates.Entangle, _gates.EntangleGate)
 
+@pytest.mark.parametrize(
+    "gate", [_gates.H, _gates.X, _gates.Y, _gates.Z, _gates.S, _gates.T, _gates.SqrtX, _gates.Swap, _gates.SqrtSwap]
+)
+def test_constant_gate_matrix_is_shared_and_read_only(gate):
+    assert isinstance(gate.matrix, np.ndarray)
+    assert not isinstance(gate.matrix, np.matrix)
+    assert gate.matrix is gate.__class__().matrix
+    with pytest.raises(ValueError):
+        gate.matrix[0, 0] = 2
+
+@pytest.mark.parametrize(
+    "gate_class", [_gates.Rx, _gates.Ry, _gates.Rz, _gates.Rxx, _gates.Ryy, _gates.Rzz, _gates.Ph, _gates.R]
+)
+def test_rotation_gate_matrix_is_cached(gate_class):
+    gate = gate_class(0.5)
+    matrix = gate.matrix
+    assert gate.matrix is matrix
+    assert not matrix.flags.writeable
+    assert np.allclose(matrix, gate_class(0.5).matrix)
+    gate.angle = 1.5
+    assert not np.allclose(gate.matrix, matrix)
+    assert np.allclose(gate.matrix, gate_class(1.5).matrix)
+
+def test_rotation_gate_interned():
+    gate = _gates.Rz.interned(0.5)
+    assert gate == _gates.Rz(0.5)
+    assert _gates.Rz.interned(0.5 + 4 * math.pi) is gate
+    assert _gates.Rz.interned(0.5).matrix is gate.matrix
+    assert _gates.Rx.interned(0.5) is not gate
+    assert _gates.Rz.interned(0.6) is not gate
+    assert _gates.R.interned(0.5) is _gates.R.interned(0.5 + 2 * math.pi)
+
 @pytest.mark.parametrize("angle", [0, 0.2, 2.1, 4.1, 2 * math.pi, 4 * math.pi])
 def test_rx(angle):
     gate = _gates.Rx(angle)
@@ -75,10 +75,15 @@ class DaggeredGate(BasicGate):
 
         try:
             # Hermitian conjugate is inverse matrix
-            self.matrix = gate.matrix.getH()
+            self.matrix = gate.matrix.conj().T
         except AttributeError:
             pass
 
+    @property
+    def immutable(self):
+        """Return True if the wrapped gate is immutable."""
+        return self._gate.immutable
+
     def __str__(self):
         r"""Return string representation (str(gate) + \"^\dagger\")."""
         return str(self._gate) + r"^\dagger"
@@ -180,6 +185,11 @@ class ControlledGate(BasicGate):
             self._gate = gate
             self._n = n
 
+    @property
+    def immutable(self):
+        """Return True if the wrapped gate is immutable."""
+        return self._gate.immutable
+
     def __str__(self):
         """Return a string representation of the object."""
         return "C" * self._n + str(self._gate)
@@ -262,6 +272,11 @@ class Tensor(BasicGate):
         super().__init__()
         self._gate = gate
 
+    @property
+    def immutable(self):
+        """Return True if the wrapped gate is immutable."""
+        return self._gate.immutable
+
     def __str__(self):
         """Return a string representation of the object."""
         return "Tensor(" + str(self._gate) + ")"
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Symbolic parameters for parametrized gates.
+
+A Parameter is a named symbol which can be used instead of a number as the angle of rotation and phase gates or as the
+time of a TimeEvolution gate. Linear combinations of parameters (ParameterExpression objects) result from the
+arithmetic performed by decomposition rules and gate merging, e.g., Rz(theta / 2) or Rz(theta + phi). The numerical
+values are substituted later on using bind.
+
+Example:
+    .. code-block:: python
+
+        theta = Parameter('theta')
+        Rx(theta) | qubit
+        Rx(theta).bind({'theta': 0.5}) == Rx(0.5)
+"""
+
+import numbers
+
+# Coefficients smaller than this are considered to be zero
+_COEFFICIENT_TOLERANCE = 1e-12
+
+class UnboundParameterError(TypeError):
+    """Error raised when a numerical value is required from an expression containing unbound parameters."""
+
+class ParameterExpression:
+    """
+    Linear combination of symbolic parameters plus a constant.
+
+    Attributes:
+        terms (dict): Dictionary mapping parameter names to their coefficients.
+        constant (float): Constant offset.
+    """
+
+    __slots__ = ('terms', 'constant')
+
+    def __init__(self, terms=None, constant=0.0):
+        """
+        Initialize a ParameterExpression object.
+
+        Args:
+            terms (dict): Dictionary mapping parameter names to their coefficients.
+            constant (float): Constant offset.
+        """
+        self.terms = {
+            name: coefficient
+            for name, coefficient in (terms or {}).items()
+            if abs(coefficient) > _COEFFICIENT_TOLERANCE
+        }
+        self.constant = constant
+
+    @property
+    def parameters(self):
+        """Return the names of the parameters in this expression."""
+        return frozenset(self.terms)
+
+    def is_symbolic(self):
+        """Return True if the expression depends on at least one parameter."""
+        return len(self.terms) > 0
+
+    def bind(self, values):
+        """
+        Substitute numerical values for the parameters.
+
+        Args:
+            values (dict): Dictionary mapping parameter names to numbers.
+
+        Returns:
+            The numerical value of the expression.
+
+        Raises:
+            UnboundParameterError: If no value is provided for one of the parameters.
+        """
+        result = self.constant
+        for name, coefficient in self.terms.items():
+            try:
+                result += coefficient * values[name]
+            except KeyError as err:
+                raise UnboundParameterError("No value provided for parameter '{}'.".format(name)) from err
+        return result
+
+    def with_constant(self, constant):
+        """Return a copy of this expression with a different constant offset."""
+        return ParameterExpression(self.terms, constant)
+
+    def __float__(self):
+        """Return the value of the expression if it does not depend on any parameter."""
+        if self.terms:
+            raise UnboundParameterError("Expression {} has unbound parameters.".format(self))
+        return float(self.constant)
+
+    def __add__(self, other):
+        """Return the sum of this expression and another expression or a number."""
+        if isinstance(other, ParameterExpression):
+            terms = dict(self.terms)
+            for name, coefficient in other.terms.items():
+                terms[name] = terms.get(name, 0) + coefficient
+            return ParameterExpression(terms, self.constant + other.constant)
+        if isinstance(other, numbers.Number):
+            return ParameterExpression(self.terms, self.constant + other)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        """Return the negated expression."""
+        return self * -1
+
+    def __sub__(self, other):
+        """Return the difference of this expression and another expression or a number."""
+        if isinstance(other, (ParameterExpression, numbers.Number)):
+            return self + (-other)
+        return NotImplemented
+
+    def __rsub__(self, other):
+        """Return the difference of a number and this expression."""
+        if isinstance(other, numbers.Number):
+            return (-self) + other
+        return NotImplemented
+
+    def __mul__(self, other):
+        """Return the expression multiplied by a number."""
+        if isinstance(other, numbers.Number):
+            return ParameterExpression(
+                {name: coefficient * other for name, coefficient in self.terms.items()}, self.constant * other
+            )
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        """Return the expression divided by a number."""
+        if isinstance(other, numbers.Number):
+            return self * (1.0 / other)
+        return NotImplemented
+
+    def __eq__(self, other):
+        """Return True if both expressions are identical (a number is equal to a constant expression)."""
+        if isinstance(other, numbers.Number):
+            other = ParameterExpression(constant=other)
+        if isinstance(other, ParameterExpression):
+            return (
+                self.terms.keys() == other.terms.keys()
+                and all(
+                    abs(coefficient - other.terms[name]) <= _COEFFICIENT_TOLERANCE
+                    for name, coefficient in self.terms.items()
+                )
+                and abs(self.constant - other.constant) <= _COEFFICIENT_TOLERANCE
+            )
+        return NotImplemented
+
+    def __hash__(self):
+        """
+        Compute the hash of the object.
+
+        Consistent with __eq__: a constant expression hashes like its value and the coefficients of a symbolic
+        expression are compared up to a tolerance, hence only the names of its parameters are hashed.
+        """
+        if not self.terms:
+            return hash(self.constant)
+        return hash(frozenset(self.terms))
+
+    def __str__(self):
+        """Return a string representation of the expression, e.g., '0.5*theta + phi + 1.0'."""
+        parts = []
+        for name in sorted(self.terms):
+            coefficient = self.terms[name]
+            parts.append(name if coefficient == 1 else '{}*{}'.format(coefficient, name))
+        if self.constant != 0 or not parts:
+            parts.append(str(self.constant))
+        return ' + '.join(parts)
+
+    def __repr__(self):
+        """Return the representation of the expression."""
+        return 'ParameterExpression({!r}, {!r})'.format(self.terms, self.constant)
+
+class Parameter(ParameterExpression):
+    """
+    Named symbolic parameter.
+
+    Attributes:
+        name (str): Name of the parameter.
+    """
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        """
+        Initialize a Parameter object.
+
+        Args:
+            name (str): Name of the parameter.
+        """
+        super().__init__({name: 1.0})
+        self.name = name
+
+    def __repr__(self):
+        """Return the representation of the parameter."""
+        return 'Parameter({!r})'.format(self.name)
+
+def is_symbolic(value):
+    """Return True if value is a ParameterExpression which depends on at least one parameter."""
+    return isinstance(value, ParameterExpression) and value.is_symbolic()
+
+def bind_value(value, values):
+    """
+    Bind the parameters of a value which may be a ParameterExpression.
+
+    Args:
+        value: A number or a ParameterExpression.
+        values (dict): Dictionary mapping parameter names to numbers.
+
+    Returns:
+        The numerical value.
+    """
+    if isinstance(value, ParameterExpression):
+        return value.bind(values)
+    return value
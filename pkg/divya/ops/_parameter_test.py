@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""Tests for divya.ops._parameter."""
+
+import math
+
+import pytest
+
+from divya.ops import _parameter
+
+def test_parameter_arithmetic():
+    theta = _parameter.Parameter('theta')
+    phi = _parameter.Parameter('phi')
+    assert theta.name == 'theta'
+    assert theta.parameters == {'theta'}
+    expr = 2 * theta - phi / 2 + 1
+    assert isinstance(expr, _parameter.ParameterExpression)
+    assert expr.terms == {'theta': 2.0, 'phi': -0.5}
+    assert expr.constant == 1
+    assert expr.parameters == {'theta', 'phi'}
+    assert (1 - theta).terms == {'theta': -1.0}
+    assert (theta + phi) - (phi + theta) == 0
+    assert not ((theta + phi) - (phi + theta)).is_symbolic()
+    assert -theta * 3 == theta * -3
+    assert theta + 1e-14 == theta
+    assert theta != phi
+    assert theta != 'theta'
+    assert hash(theta + 0) == hash(theta)
+    assert hash(theta + 1e-14) == hash(theta)
+    assert hash(theta - theta) == hash(0)
+    assert hash(theta + 0.5 - theta) == hash(0.5)
+    assert len({theta - theta, 0, phi + 1, 1 + phi}) == 2
+    with pytest.raises(TypeError):
+        theta * phi  # pylint: disable=pointless-statement
+    with pytest.raises(TypeError):
+        theta + 'phi'  # pylint: disable=pointless-statement
+    with pytest.raises(TypeError):
+        'phi' - theta  # pylint: disable=pointless-statement
+    with pytest.raises(TypeError):
+        theta / phi  # pylint: disable=pointless-statement
+
+def test_parameter_bind():
+    theta = _parameter.Parameter('theta')
+    phi = _parameter.Parameter('phi')
+    expr = 2 * theta - phi / 2 + 1
+    assert expr.bind({'theta': 0.5, 'phi': 4}) == pytest.approx(0.0)
+    with pytest.raises(_parameter.UnboundParameterError):
+        expr.bind({'theta': 0.5})
+    with pytest.raises(_parameter.UnboundParameterError):
+        float(expr)
+    with pytest.raises(TypeError):
+        math.cos(expr)
+    assert float(expr - 2 * theta + phi / 2) == 1.0
+    assert _parameter.bind_value(expr, {'theta': 1, 'phi': 0}) == pytest.approx(3.0)
+    assert _parameter.bind_value(0.5, {}) == 0.5
+    assert _parameter.is_symbolic(expr)
+    assert not _parameter.is_symbolic(expr.with_constant(2) - expr)
+    assert not _parameter.is_symbolic(1.0)
+
+def test_parameter_str():
+    theta = _parameter.Parameter('theta')
+    phi = _parameter.Parameter('phi')
+    assert str(theta) == 'theta'
+    assert repr(theta) == "Parameter('theta')"
+    assert str(2 * theta + phi + 1.5) == 'phi + 2.0*theta + 1.5'
+    assert str(theta - theta) == '0.0'
+    assert repr(theta + 1) == "ParameterExpression({'theta': 1.0}, 1.0)"
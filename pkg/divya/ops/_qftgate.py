@@ -27,6 +27,8 @@ from ._basics import BasicGate
 class QFTGate(BasicGate):
     """Quantum Fourier Transform gate."""
 
+    immutable = True
+
     def __str__(self):
         """Return a string representation of the object."""
         return "QFT"
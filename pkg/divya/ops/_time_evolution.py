@@ -27,6 +27,7 @@ import copy
 from ._basics import BasicGate, NotMergeable
 from ._command import apply_command
 from ._gates import Ph
+from ._parameter import ParameterExpression, is_symbolic
 from ._qubit_operator import QubitOperator
 
 class NotHermitianOperatorError(Exception):
@@ -64,7 +65,7 @@ class TimeEvolution(BasicGate):
             Coefficients are internally converted to float.
 
         Args:
-            time (float, or int): time to evolve under (can be negative).
+            time (float, int, or ParameterExpression): time to evolve under (can be negative or symbolic).
             hamiltonian (QubitOperator): hamiltonian to evolve under.
 
         Raises:
@@ -72,10 +73,12 @@ class TimeEvolution(BasicGate):
             NotHermitianOperatorError: If the input hamiltonian is not hermitian (only real coefficients).
         """
         super().__init__()
-        if not isinstance(time, (float, int)):
+        if not isinstance(time, (float, int, ParameterExpression)):
             raise TypeError("time needs to be a (real) numeric type.")
         if not isinstance(hamiltonian, QubitOperator):
             raise TypeError("hamiltonian needs to be QubitOperator object.")
+        if isinstance(time, ParameterExpression) and not is_symbolic(time):
+            time = float(time)
         self.time = time
         self.hamiltonian = copy.deepcopy(hamiltonian)
         for term in hamiltonian.terms:
@@ -88,6 +91,17 @@ class TimeEvolution(BasicGate):
         """Return the inverse gate."""
         return TimeEvolution(self.time * -1.0, self.hamiltonian)
 
+    def bind(self, values):
+        """
+        Return this gate with numerical values substituted for the parameters of its time.
+
+        Args:
+            values (dict): Dictionary mapping parameter names to numbers.
+        """
+        if is_symbolic(self.time):
+            return TimeEvolution(self.time.bind(values), self.hamiltonian)
+        return self
+
     def get_merged(self, other):
         """
         Return self merged with another TimeEvolution gate if possible.
@@ -30,7 +30,7 @@ import pytest
 
 from divya import MainEngine
 from divya.cengines import DummyEngine
-from divya.ops import BasicGate, NotMergeable, Ph, QubitOperator
+from divya.ops import BasicGate, NotMergeable, Parameter, Ph, QubitOperator
 from divya.ops import _time_evolution as te
 
 @pytest.mark.parametrize("coefficient", [0.5, numpy.float64(2.303)])
@@ -80,6 +80,20 @@ def test_init_negative_time():
     gate = te.TimeEvolution(-1, hamiltonian)
     assert gate.time == -1
 
+def test_symbolic_time():
+    hamiltonian = QubitOperator("Z2", 2)
+    time = Parameter('t')
+    gate = te.TimeEvolution(time, hamiltonian)
+    assert gate.time == time
+    assert gate.get_inverse().time == -time
+    merged = gate.get_merged(te.TimeEvolution(time, QubitOperator("Z2", 4)))
+    assert merged.time == 3 * time
+    bound = merged.bind({'t': 0.5})
+    assert bound.time == pytest.approx(1.5)
+    assert bound.hamiltonian.isclose(hamiltonian)
+    assert bound.bind({'t': 1.0}) is bound
+    assert te.TimeEvolution(time - time + 2, hamiltonian).time == 2.0
+
 def test_get_inverse():
     hamiltonian = QubitOperator("Z2", 2)
     gate = te.TimeEvolution(2, hamiltonian)
@@ -23,6 +23,7 @@
 from . import (
     amplitudeamplification,
     arb1qubit2rzandry,
+    arb2qubit2cnot,
     barrier,
     carb1qubit2cnotrzandry,
     cnot2cz,
@@ -53,6 +54,7 @@ all_defined_decomposition_rules = [
     rule
     for module in [
         arb1qubit2rzandry,
+        arb2qubit2cnot,
         barrier,
         carb1qubit2cnotrzandry,
         crz2cxandrz,
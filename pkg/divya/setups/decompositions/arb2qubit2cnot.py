@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Register the KAK decomposition for an arbitrary two qubit gate.
+
+See "Optimal quantum circuits for general two-qubit gates" by Farrokh Vatan and
+Colin Williams, arXiv:quant-ph/0308006, and "Minimal universal two-qubit
+controlled-NOT-based circuits" by Vivek Shende et al., arXiv:quant-ph/0308033.
+
+Every two qubit gate U can be written as
+U = e^(i phi) (A1 x A0) exp(i (a XX + b YY + c ZZ)) (B1 x B0)
+with one qubit gates A0, A1, B0 and B1. The canonical gate in the middle is
+implemented with three CNOT gates in general, and with two, one or zero CNOT
+gates if its coefficients allow it. The one qubit gates are emitted as
+MatrixGates which are in turn decomposed by arb1qubit2rzandry if required.
+
+The first qubit of the gate is the least significant bit of its matrix, i.e.,
+the matrix of a gate acting on (qb0, qb1) is expressed in the basis
+|qb1 qb0>.
+"""
+
+import cmath
+import math
+
+import numpy
+
+from divya.cengines import DecompositionRule
+from divya.meta import get_control_count
+from divya.ops import CNOT, BasicGate, MatrixGate
+
+TOLERANCE = 1e-9
+
+_PAULI_X = numpy.array([[0, 1], [1, 0]], dtype=complex)
+_PAULI_Y = numpy.array([[0, -1j], [1j, 0]], dtype=complex)
+_PAULI_Z = numpy.array([[1, 0], [0, -1]], dtype=complex)
+
+# Columns are the magic basis states; one qubit gates A1 x A0 in SU(2) x SU(2) become real orthogonal matrices in it
+# and XX, YY, ZZ become diagonal.
+_MAGIC = numpy.array([[1, 1j, 0, 0], [0, 0, 1j, 1], [0, 0, 1j, -1], [1, -1j, 0, 0]]) / math.sqrt(2)
+_MAGIC_DAG = _MAGIC.conj().T
+
+# Eigenvalues of XX, YY and ZZ on the magic basis states, preceded by ones for the global phase
+_CANONICAL_EIGENVALUES = numpy.array(
+    [[1, 1, -1, 1], [1, -1, 1, 1], [1, 1, 1, -1], [1, -1, -1, -1]],
+    dtype=float,
+)
+
+def _rz(angle):
+    return numpy.diag([cmath.exp(-0.5j * angle), cmath.exp(0.5j * angle)])
+
+def _ry(angle):
+    return numpy.array(
+        [[math.cos(angle / 2), -math.sin(angle / 2)], [math.sin(angle / 2), math.cos(angle / 2)]], dtype=complex
+    )
+
+def _rx(angle):
+    return numpy.array(
+        [[math.cos(angle / 2), -1j * math.sin(angle / 2)], [-1j * math.sin(angle / 2), math.cos(angle / 2)]]
+    )
+
+_SQRT_X = _rx(math.pi / 2)
+_SQRT_Y = _ry(math.pi / 2)
+_HADAMARD = numpy.array([[1, 1], [1, -1]], dtype=complex) / math.sqrt(2)
+
+def _split_local(matrix):
+    """
+    Factor a 4x4 matrix A1 x A0 into its one qubit gates.
+
+    Args:
+        matrix (numpy.ndarray): Tensor product of two 2x2 unitaries.
+
+    Returns:
+        (A0, A1) such that matrix == numpy.kron(A1, A0), i.e., A0 acts on the first qubit.
+    """
+    # Reorder the elements M[(i1 i0), (j1 j0)] = A1[i1, j1] * A0[i0, j0] into the rank one matrix
+    # R[(i1 j1), (i0 j0)]
+    reordered = matrix.reshape(2, 2, 2, 2).transpose(0, 2, 1, 3).reshape(4, 4)
+    left, singular_values, right = numpy.linalg.svd(reordered)
+    scale = math.sqrt(singular_values[0])
+    gate1 = (scale * left[:, 0]).reshape(2, 2)
+    gate0 = (scale * right[0, :]).reshape(2, 2)
+    # Move the (irrelevant) phase such that both factors are unitary
+    phase = cmath.exp(1j * cmath.phase(numpy.linalg.det(gate0)) / 2)
+    return gate0 / phase, gate1 * phase
+
+def _kak_decomposition(matrix):
+    """
+    Compute the KAK decomposition of a two qubit gate.
+
+    Args:
+        matrix (numpy.ndarray): 4x4 unitary matrix.
+
+    Returns:
+        Tuple (phase, after, (a, b, c), before) with 4x4 matrices `after` and `before` in SU(2) x SU(2) such that
+        matrix == phase * after * exp(i (a XX + b YY + c ZZ)) * before and all coefficients in (-pi/4, pi/4].
+    """
+    phase = numpy.linalg.det(matrix) ** 0.25
+    unitary = _MAGIC_DAG @ (matrix / phase) @ _MAGIC
+
+    # unitary = O1 D O2 with real orthogonal O1, O2: the real and imaginary parts of the symmetric unitary
+    # M = unitary^T unitary commute, hence a generic real combination of them has the eigenvectors of M.
+    symmetric = unitary.T @ unitary
+    rng = numpy.random.RandomState(7)
+    for _ in range(100):
+        weight = rng.uniform()
+        _, right = numpy.linalg.eigh(weight * symmetric.real + (1 - weight) * symmetric.imag)
+        diagonal = right.T @ symmetric @ right
+        if numpy.allclose(diagonal, numpy.diag(numpy.diag(diagonal)), atol=TOLERANCE):
+            break
+    else:  # pragma: no cover
+        raise ValueError("Could not diagonalize the matrix. Maybe the matrix is not unitary?")
+    if numpy.linalg.det(right) < 0:
+        right[:, 0] *= -1
+
+    angles = numpy.angle(numpy.diag(diagonal)) / 2
+    left = (unitary @ right @ numpy.diag(numpy.exp(-1j * angles))).real
+    if numpy.linalg.det(left) < 0:
+        left[:, 0] *= -1
+        angles[0] += math.pi
+
+    after = _MAGIC @ left @ _MAGIC_DAG
+    before = _MAGIC @ right.T @ _MAGIC_DAG
+
+    # Solve angles == global + a * XX + b * YY + c * ZZ on the magic basis states
+    global_phase, *coefficients = numpy.linalg.solve(_CANONICAL_EIGENVALUES, angles)
+    phase *= cmath.exp(1j * global_phase)
+
+    # Shift all coefficients into (-pi/4, pi/4]; exp(i pi/2 PP) = i PP is absorbed into `after`
+    for index, pauli in enumerate((_PAULI_X, _PAULI_Y, _PAULI_Z)):
+        shift = int(math.ceil((coefficients[index] - math.pi / 4 - TOLERANCE) / (math.pi / 2)))
+        if shift != 0:
+            coefficients[index] -= shift * math.pi / 2
+            after = after @ numpy.linalg.matrix_power(1j * numpy.kron(pauli, pauli), shift % 4)
+    return phase, after, tuple(coefficients), before
+
+def _local_operations(matrix):
+    """Return the operations of a 4x4 matrix in SU(2) x SU(2) acting on each of the two qubits."""
+    gate0, gate1 = _split_local(matrix)
+    return [('U', 0, gate0), ('U', 1, gate1)]
+
+def _conjugated(gate, operations):
+    """Return the operations of (gate^dagger x gate^dagger) * operations * (gate x gate)."""
+    inverse = gate.conj().T
+    return [('U', 0, gate), ('U', 1, gate)] + operations + [('U', 0, inverse), ('U', 1, inverse)]
+
+def _canonical_circuit(a, b, c):  # pylint: disable=invalid-name
+    """
+    Return a circuit which implements exp(i (a XX + b YY + c ZZ)) up to a global phase.
+
+    Returns:
+        List of operations ('U', qubit, matrix) and ('CNOT', control, target) in the order in which they are applied.
+    """
+    nonzero = [abs(coefficient) > TOLERANCE for coefficient in (a, b, c)]
+    if not any(nonzero):
+        return []
+
+    if sum(nonzero) == 1:
+        angle = a + b + c
+        if abs(abs(angle) - math.pi / 4) < TOLERANCE:
+            # exp(i pi/4 ZZ) is a CZ gate up to local Rz gates; the sign is fixed by a ZZ in front
+            operations = [('U', 0, _PAULI_Z), ('U', 1, _PAULI_Z)] if angle < 0 else []
+            operations += [
+                ('U', 1, _HADAMARD),
+                ('CNOT', 0, 1),
+                ('U', 1, _HADAMARD),
+                ('U', 0, _rz(-math.pi / 2)),
+                ('U', 1, _rz(-math.pi / 2)),
+            ]
+            if nonzero[0]:
+                return _conjugated(_SQRT_Y, operations)
+            if nonzero[1]:
+                return _conjugated(_SQRT_X, operations)
+            return operations
+
+    if sum(nonzero) < 3:
+        # Bring the coefficients into the form exp(i (x XX + y ZZ)) by permuting the Pauli operators
+        if not nonzero[1]:
+            return [('CNOT', 0, 1), ('U', 0, _rx(-2 * a)), ('U', 1, _rz(-2 * c)), ('CNOT', 0, 1)]
+        if not nonzero[0]:
+            return _conjugated(_rz(math.pi / 2), _canonical_circuit(b, a, c))
+        return _conjugated(_SQRT_X, _canonical_circuit(a, c, b))
+
+    return [
+        ('U', 1, _rz(-math.pi / 2)),
+        ('CNOT', 1, 0),
+        ('U', 1, _ry(2 * a - math.pi / 2)),
+        ('U', 0, _rz(math.pi / 2 - 2 * c)),
+        ('CNOT', 0, 1),
+        ('U', 1, _ry(math.pi / 2 - 2 * b)),
+        ('CNOT', 1, 0),
+        ('U', 0, _rz(math.pi / 2)),
+    ]
+
+def _circuit_matrix(operations):
+    """Return the 4x4 matrix of a list of operations (the first qubit is the least significant bit)."""
+    matrix = numpy.identity(4, dtype=complex)
+    for operation in operations:
+        if operation[0] == 'CNOT':
+            gate = numpy.identity(4, dtype=complex)[:, [0, 3, 2, 1] if operation[1] == 0 else [0, 1, 3, 2]]
+        elif operation[1] == 0:
+            gate = numpy.kron(numpy.identity(2), operation[2])
+        else:
+            gate = numpy.kron(operation[2], numpy.identity(2))
+        matrix = gate @ matrix
+    return matrix
+
+def _merge_local_operations(operations):
+    """Multiply all consecutive one qubit gates acting on the same qubit."""
+    merged = []
+    pending = [None, None]
+    for operation in operations:
+        if operation[0] == 'CNOT':
+            for qubit in (0, 1):
+                if pending[qubit] is not None:
+                    merged.append(('U', qubit, pending[qubit]))
+                    pending[qubit] = None
+            merged.append(operation)
+        else:
+            qubit = operation[1]
+            pending[qubit] = operation[2] if pending[qubit] is None else operation[2] @ pending[qubit]
+    merged += [('U', qubit, pending[qubit]) for qubit in (0, 1) if pending[qubit] is not None]
+    return merged
+
+def _find_circuit(matrix):
+    """
+    Find a circuit of one qubit gates and at most three CNOT gates for a two qubit gate.
+
+    Args:
+        matrix (numpy.ndarray): 4x4 unitary matrix; the first qubit is the least significant bit.
+
+    Returns:
+        List of operations ('U', qubit, matrix) and ('CNOT', control, target) in the order in which they are applied,
+        where qubit, control and target are 0 or 1. The operations implement `matrix` exactly (including the global
+        phase).
+    """
+    matrix = numpy.asarray(matrix, dtype=complex)
+    _, after, coefficients, before = _kak_decomposition(matrix)
+    operations = _merge_local_operations(
+        _local_operations(before) + _canonical_circuit(*coefficients) + _local_operations(after)
+    )
+
+    # Move the global phase into the first one qubit gate and drop the remaining identities
+    product = _circuit_matrix(operations)
+    index = numpy.unravel_index(numpy.argmax(numpy.abs(product)), product.shape)
+    phase = matrix[index] / product[index]
+    first = next(i for i, operation in enumerate(operations) if operation[0] == 'U')
+    operations[first] = ('U', operations[first][1], phase * operations[first][2])
+    return [
+        operation
+        for operation in operations
+        if operation[0] == 'CNOT' or not numpy.allclose(operation[2], numpy.identity(2), atol=TOLERANCE)
+    ]
+
+def _recognize_arb2qubit(cmd):
+    """
+    Recognize an arbitrary two qubit gate which has a matrix property.
+
+    It does not allow gates which have control qubits as otherwise the
+    AutoReplacer might go into an infinite loop.
+    """
+    try:
+        return (
+            get_control_count(cmd) == 0
+            and len(cmd.gate.matrix) == 4
+            and sum(len(qureg) for qureg in cmd.qubits) == 2
+        )
+    except (AttributeError, TypeError):
+        return False
+
+def _decompose_arb2qubit(cmd):
+    """Decompose an arbitrary two qubit gate into one qubit MatrixGates and at most three CNOT gates."""
+    qubits = [qubit for qureg in cmd.qubits for qubit in qureg]
+    for operation in _find_circuit(cmd.gate.matrix):
+        if operation[0] == 'CNOT':
+            CNOT | (qubits[operation[1]], qubits[operation[2]])
+        else:
+            MatrixGate(operation[2]) | qubits[operation[1]]
+
+#: Decomposition rules
+all_defined_decomposition_rules = [DecompositionRule(BasicGate, _decompose_arb2qubit, _recognize_arb2qubit)]
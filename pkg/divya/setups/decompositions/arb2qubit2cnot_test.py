@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Bhojpur Consulting Private Limited, India. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"Tests for divya.setups.decompositions.arb2qubit2cnot.py."
+
+import math
+
+import numpy as np
+import pytest
+
+from divya.backends import Simulator
+from divya.cengines import (
+    AutoReplacer,
+    DecompositionRuleSet,
+    DummyEngine,
+    InstructionFilter,
+    MainEngine,
+)
+from divya.meta import Control
+from divya.ops import (
+    BasicGate,
+    ClassicalInstructionGate,
+    MatrixGate,
+    Measure,
+    Ph,
+    Ry,
+    Rz,
+    Swap,
+    X,
+)
+
+from . import arb1qubit2rzandry as arb1q
+from . import arb2qubit2cnot as arb2q
+
+def random_unitary(dimension, rng):
+    matrix = rng.normal(size=(dimension, dimension)) + 1j * rng.normal(size=(dimension, dimension))
+    q, r = np.linalg.qr(matrix)
+    return q * (np.diag(r) / abs(np.diag(r)))
+
+def canonical_gate(a, b, c):
+    hamiltonian = sum(
+        coefficient * np.kron(pauli, pauli)
+        for coefficient, pauli in zip((a, b, c), (arb2q._PAULI_X, arb2q._PAULI_Y, arb2q._PAULI_Z))
+    )
+    eigenvalues, eigenvectors = np.linalg.eigh(hamiltonian)
+    return eigenvectors @ np.diag(np.exp(1j * eigenvalues)) @ eigenvectors.conj().T
+
+def locally_equivalent(coefficients, rng):
+    """Return a random two qubit gate which needs as many CNOT gates as canonical_gate(*coefficients)."""
+    before = np.kron(random_unitary(2, rng), random_unitary(2, rng))
+    after = np.kron(random_unitary(2, rng), random_unitary(2, rng))
+    return np.exp(1j * rng.normal()) * after @ canonical_gate(*coefficients) @ before
+
+def create_test_matrices():
+    rng = np.random.RandomState(42)
+    matrices = [(random_unitary(4, rng), 3) for _ in range(5)]
+    for coefficients, num_cnots in [
+        ((0, 0, 0), 0),
+        ((math.pi / 4, 0, 0), 1),
+        ((0, math.pi / 4, 0), 1),
+        ((0, 0, -math.pi / 4), 1),
+        ((0.3, 0, 0), 2),
+        ((0, 0.3, 0.2), 2),
+        ((0.3, 0.1, 0), 2),
+        ((0.3, 0, -0.2), 2),
+        ((math.pi / 2, 0.3, 0), 2),
+        ((math.pi / 4, math.pi / 4, 0), 2),
+        ((math.pi / 4, math.pi / 4, math.pi / 4), 3),
+        ((0.3, 0.2, 0.1), 3),
+    ]:
+        matrices.append((locally_equivalent(coefficients, rng), num_cnots))
+    matrices.append((np.identity(4)[:, [0, 3, 2, 1]], 1))  # CNOT
+    matrices.append((np.identity(4)[:, [0, 2, 1, 3]], 3))  # Swap
+    matrices.append((np.diag([1, 1, 1, -1]), 1))  # CZ
+    return matrices
+
+@pytest.mark.parametrize("gate_matrix, num_cnots", create_test_matrices())
+def test_find_circuit(gate_matrix, num_cnots):
+    operations = arb2q._find_circuit(gate_matrix)
+    assert np.allclose(arb2q._circuit_matrix(operations), gate_matrix, atol=1e-9)
+    assert sum(operation[0] == 'CNOT' for operation in operations) == num_cnots
+
+def test_kak_decomposition():
+    rng = np.random.RandomState(1)
+    for _ in range(5):
+        matrix = random_unitary(4, rng)
+        phase, after, coefficients, before = arb2q._kak_decomposition(matrix)
+        assert np.allclose(phase * after @ canonical_gate(*coefficients) @ before, matrix)
+        assert all(-math.pi / 4 < coefficient <= math.pi / 4 + 1e-9 for coefficient in coefficients)
+        for local in (after, before):
+            gate0, gate1 = arb2q._split_local(local)
+            assert np.allclose(np.kron(gate1, gate0), local)
+
+def test_recognize_correct_gates():
+    saving_backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=saving_backend)
+    qubit1 = eng.allocate_qubit()
+    qubit2 = eng.allocate_qubit()
+    Swap | (qubit1, qubit2)
+    MatrixGate(np.identity(4)) | (qubit1, qubit2)
+    eng.flush(deallocate_qubits=True)
+    # Don't test initial allocates and trailing deallocates and flush gate.
+    for cmd in saving_backend.received_commands[2:-3]:
+        assert arb2q._recognize_arb2qubit(cmd)
+
+def test_recognize_incorrect_gates():
+    saving_backend = DummyEngine(save_commands=True)
+    eng = MainEngine(backend=saving_backend)
+    qubit1 = eng.allocate_qubit()
+    qubit2 = eng.allocate_qubit()
+    # Does not have matrix attribute:
+    BasicGate() | (qubit1, qubit2)
+    # Single qubit gate:
+    X | qubit1
+    # Controlled two qubit gate:
+    with Control(eng, eng.allocate_qubit()):
+        Swap | (qubit1, qubit2)
+    eng.flush(deallocate_qubits=True)
+    for cmd in saving_backend.received_commands:
+        assert not arb2q._recognize_arb2qubit(cmd)
+
+def cnot_and_z_y_decomp_gates(eng, cmd):
+    if isinstance(cmd.gate, ClassicalInstructionGate):
+        return True
+    if len(cmd.control_qubits) == 0:
+        return isinstance(cmd.gate, (Ry, Rz, Ph))
+    return cmd.gate == X and len(cmd.control_qubits) == 1
+
+@pytest.mark.parametrize("gate_matrix", [matrix for matrix, _ in create_test_matrices()[::3]])
+def test_decomposition(gate_matrix):
+    for basis_state in np.identity(4):
+        test_gate = MatrixGate(gate_matrix)
+
+        correct_eng = MainEngine(backend=Simulator(), engine_list=[])
+        rule_set = DecompositionRuleSet(modules=[arb1q, arb2q])
+        test_dummy_eng = DummyEngine(save_commands=True)
+        test_eng = MainEngine(
+            backend=Simulator(),
+            engine_list=[
+                AutoReplacer(rule_set),
+                InstructionFilter(cnot_and_z_y_decomp_gates),
+                test_dummy_eng,
+            ],
+        )
+
+        correct_qb = correct_eng.allocate_qureg(2)
+        correct_eng.flush()
+        test_qb = test_eng.allocate_qureg(2)
+        test_eng.flush()
+
+        correct_eng.backend.set_wavefunction(basis_state, correct_qb)
+        test_eng.backend.set_wavefunction(basis_state, test_qb)
+
+        test_gate | (correct_qb[0], correct_qb[1])
+        test_gate | (test_qb[0], test_qb[1])
+
+        test_eng.flush()
+        correct_eng.flush()
+
+        assert all(cmd.gate != test_gate for cmd in test_dummy_eng.received_commands)
+        assert sum(cmd.gate == X and len(cmd.control_qubits) == 1 for cmd in test_dummy_eng.received_commands) <= 3
+
+        for fstate in ['00', '01', '10', '11']:
+            test = test_eng.backend.get_amplitude(fstate, test_qb)
+            correct = correct_eng.backend.get_amplitude(fstate, correct_qb)
+            assert correct == pytest.approx(test, rel=1e-9, abs=1e-9)
+
+        Measure | test_qb[0]
+        Measure | test_qb[1]
+        Measure | correct_qb[0]
+        Measure | correct_qb[1]
@@ -35,6 +35,7 @@ import divya.libs.math
 import divya.setups.decompositions
 from divya.cengines import (
     AutoReplacer,
+    CostDecompositionChooser,
     DecompositionRuleSet,
     InstructionFilter,
     LocalOptimizer,
@@ -54,6 +55,7 @@ def get_engine_list(  # pylint: disable=too-many-branches,too-many-statements
     two_qubit_gates=(CNOT,),
     other_gates=(),
     compiler_chooser=default_chooser,
+    decomposition_cost=None,
 ):
     """
     Return an engine list to compile to a restricted gate set.
@@ -85,6 +87,9 @@ def get_engine_list(  # pylint: disable=too-many-branches,too-many-statements
         other_gates: A tuple of the allowed gates. If the gates are instances of a class (e.g. QFT), it allows all
                          gates which are equal to it. If the gate is a class, it allows all instances of this class.
         compiler_chooser:function selecting the decomposition to use in the Autoreplacer engine
+        decomposition_cost: If not None, the AutoReplacer engines use a CostDecompositionChooser with this cost
+                         function (e.g. 'gate_count' or 'two_qubit_gate_count') instead of compiler_chooser, which
+                         picks the decomposition with the lowest cost after lowering to the restricted gate set.
 
     Raises:
         TypeError: If input is for the gates is not "any" or a tuple. Also if element within tuple is not a class or
@@ -180,6 +185,9 @@ def get_engine_list(  # pylint: disable=too-many-branches,too-many-statements
             return True
         return False
 
+    if decomposition_cost is not None:
+        compiler_chooser = CostDecompositionChooser(rule_set, low_level_gates, decomposition_cost)
+
     return [
         AutoReplacer(rule_set, compiler_chooser),
         TagRemover(),
@@ -32,17 +32,21 @@ from divya.meta import Control
 from divya.ops import (
     CNOT,
     QFT,
+    CZ,
     BasicGate,
+    ClassicalInstructionGate,
     CRz,
     H,
     Measure,
     QubitOperator,
     Rx,
+    Ry,
     Rz,
     Swap,
     TimeEvolution,
     Toffoli,
     X,
+    Z,
 )
 
 def test_parameter_any():
@@ -103,6 +107,26 @@ def test_restriction():
         assert not isinstance(cmd.gate, MultiplyByConstantModN)
         assert not isinstance(cmd.gate, TimeEvolution)
 
+def test_decomposition_cost():
+    # With the default chooser, CNOT gates are decomposed into Rxx gates, which are decomposed into CNOT gates again
+    engine_list = restrictedgateset.get_engine_list(
+        one_qubit_gates=(Rz, Ry, H), two_qubit_gates=(CZ,), decomposition_cost='two_qubit_gate_count'
+    )
+    backend = DummyEngine(save_commands=True)
+    eng = divya.MainEngine(backend, engine_list)
+    qureg = eng.allocate_qureg(3)
+    CNOT | (qureg[0], qureg[1])
+    Toffoli | (qureg[0:2], qureg[2])
+    Swap | (qureg[1], qureg[2])
+    eng.flush()
+    gates = [cmd for cmd in backend.received_commands if not isinstance(cmd.gate, ClassicalInstructionGate)]
+    assert sum(len(cmd.control_qubits) for cmd in gates) == 1 + 6 + 3
+    for cmd in gates:
+        if cmd.control_qubits:
+            assert cmd.gate == Z and len(cmd.control_qubits) == 1
+        else:
+            assert isinstance(cmd.gate, (Rz, Ry)) or cmd.gate == H
+
 def test_wrong_init():
     with pytest.raises(TypeError):
         restrictedgateset.get_engine_list(two_qubit_gates=(CNOT))
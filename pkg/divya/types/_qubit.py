@@ -46,6 +46,8 @@ class BasicQubit:
     They have an id and a reference to the owning engine.
     """
 
+    __slots__ = ('id', 'engine')
+
     def __init__(self, engine, idx):
         """
         Initialize a BasicQubit object.
@@ -100,6 +102,9 @@ class Qubit(BasicQubit):
     Thus the qubit is not copyable; only returns a reference to the same object.
     """
 
+    # weak references to Qubit objects are kept in MainEngine.active_qubits
+    __slots__ = ('__weakref__',)
+
     def __del__(self):
         """Destroy the qubit and deallocate it (automatically)."""
         if self.id == -1:
@@ -141,6 +146,8 @@ class WeakQubitRef(BasicQubit):  # pylint: disable=too-few-public-methods
     object.
     """
 
+    __slots__ = ()
+
 class Qureg(list):
     """
     Quantum register class.
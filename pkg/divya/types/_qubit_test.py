@@ -125,6 +125,14 @@ def test_weak_qubit_ref():
     with pytest.raises(AttributeError):
         qubit.__del__()
 
+def test_qubit_slots():
+    eng = MainEngine(backend=DummyEngine(), engine_list=[DummyEngine()])
+    qubit = _qubit.WeakQubitRef(eng, 10)
+    assert not hasattr(qubit, '__dict__')
+    with pytest.raises(AttributeError):
+        qubit.other = 1
+    assert not hasattr(_qubit.Qubit(eng, -1), '__dict__')
+
 def test_qureg_str():
     assert str(_qubit.Qureg([])) == 'Qureg[]'
     eng = MainEngine(backend=DummyEngine(), engine_list=[])